@@ -4,6 +4,7 @@ import time
 import logging
 import re
 from datetime import datetime
+from importlib.util import find_spec
 
 # Set up simple logging
 logging.basicConfig(level=logging.INFO, format='%(message)s')
@@ -34,55 +35,62 @@ YOUTUBE_LINK_COL_IDX = 4  # Column E
 THUMBNAIL_COL_IDX = 8  # Column I
 ALTERNATIVE_LINK_COL_IDX = 9  # Column J
 
-YOUTUBE_QUOTA_LOG_FILE = 'youtube_quota_log.txt'
+# Resume state lives in job_state.db (see job_state.py); this old file is only cleaned up
+LEGACY_QUOTA_LOG_FILE = 'youtube_quota_log.txt'
 
-# Fuzzy matching thresholds (0-100)
-# EXACT_MATCH_THRESHOLD for song is now the primary driver for "exact" match
-EXACT_MATCH_THRESHOLD = 90  # For very close matches (e.g., minor punctuation differences, or strong song match)
-HIGH_PROBABILITY_THRESHOLD = 75  # For good, but not perfect, matches (e.g., transliteration variations, extra words)
+# Results fetched per search and ranked against the row (candidate_ranking, which also holds the
+# match thresholds); a search costs the same quota whatever the number of results
+CANDIDATES_PER_SEARCH = 5
+
+# Rows searched, then written and recorded in the job state together (one batched YouTube request
+# holds 50 searches); a crash loses at most this many rows of progress
+ROWS_PER_WRITE = 50
+
+# Link returned by the searches when queries failed (timeouts, server errors) and none found a
+# result; the row is recorded as an error, so the next run searches it again (job_state.MAX_ATTEMPTS)
+SEARCH_ERROR = "SEARCH_ERROR"
 
 
 # ========================================
 
 def check_packages():
-    """Check if required packages are installed."""
-    try:
-        import gspread
-        from google.oauth2.service_account import Credentials
-        import spotipy
-        from spotipy.oauth2 import SpotifyClientCredentials
-        from googleapiclient.discovery import build
-        from googleapiclient.errors import HttpError
-        import unidecode
-        from fuzzywuzzy import fuzz
-        # Optional: check for python-Levenshtein for performance with fuzzywuzzy
-        try:
-            import Levenshtein
-        except ImportError:
-            logger.warning(
-                "💡 For better performance with fuzzy matching, consider installing 'python-Levenshtein' (pip install python-Levenshtein).")
-        return True
-    except ImportError as e:
-        logger.error(f"Missing package: {e}")
+    """
+    Check if required packages are installed.
+
+    Only locates them (find_spec) without importing: the heavy Google and Spotify
+    libraries are imported when their clients are first built (api_clients.py).
+    """
+    missing = [name for name in ('gspread', 'google.oauth2', 'spotipy', 'googleapiclient', 'unidecode', 'fuzzywuzzy')
+               if find_spec(name) is None]
+    if missing:
+        logger.error(f"Missing package: {', '.join(missing)}")
         logger.error(
             "Please ensure all required packages are installed (e.g., pip install gspread google-auth-oauthlib spotipy google-api-python-client unidecode fuzzywuzzy).")
         return False
+    # Optional: check for python-Levenshtein for performance with fuzzywuzzy
+    if find_spec('Levenshtein') is None:
+        logger.warning(
+            "💡 For better performance with fuzzy matching, consider installing 'python-Levenshtein' (pip install python-Levenshtein).")
+    return True
 
 
 if not check_packages():
     input("Press Enter to exit...")
     sys.exit(1)
 
-# Import packages after checking
-import gspread
-from google.oauth2.service_account import Credentials
-import spotipy
-from spotipy.oauth2 import SpotifyClientCredentials
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
+# Import packages after checking (gspread, spotipy and googleapiclient load with their clients)
 import unidecode
 from fuzzywuzzy import fuzz
 
+import candidate_ranking
+import metrics
+import sheets_governor
+from api_clients import sheets_client, spotify_client, warm_up, youtube_client
+from artist_aliases import ArtistAliases
+from job_state import JobState, row_fingerprint
+from sheet_reader import read_rows
+from youtube_batch import BATCH_SIZE as YOUTUBE_BATCH_SIZE, SEARCH_FIELDS, YouTubeBatchExecutor
+
 
 def check_config():
     """Check if configuration is complete."""
@@ -108,9 +116,7 @@ def get_google_client():
     """Get Google Sheets client after testing connection."""
     try:
         print("🔍 Testing Google Sheets connection...")
-        creds = Credentials.from_service_account_file(CREDS_FILE, scopes=GOOGLE_SCOPES)
-        print("✅ Credentials loaded successfully")
-        client = gspread.authorize(creds)
+        client = sheets_client(CREDS_FILE, GOOGLE_SCOPES)
         print("✅ Authorization successful")
         return client
     except FileNotFoundError:
@@ -153,41 +159,53 @@ def normalize_song_title(text):
     return text
 
 
+def artist_match_score(sheet_artist, link_artist):
+    """Fuzzy similarity (0-100) of the sheet's and the link's artist, transliterated."""
+    return fuzz.token_set_ratio(normalize_artist_name(sheet_artist), normalize_artist_name(link_artist))
+
+
 def check_match(sheet_artist, sheet_song, link_artist, link_song):
     """
-    Checks for a match between sheet data and link metadata using fuzzy matching.
+    Checks for a match between sheet data and link metadata using fuzzy matching
+    (tiers of candidate_ranking.match_tier).
     Prioritizes song title match.
     Returns "exact", "high_probability", or "none".
     """
-    norm_sheet_artist = normalize_artist_name(sheet_artist)
-    norm_sheet_song = normalize_song_title(sheet_song)
-    norm_link_artist = normalize_artist_name(link_artist)
-    norm_link_song = normalize_song_title(link_song)
-
-    artist_score = fuzz.token_set_ratio(norm_sheet_artist, norm_link_artist)
-    song_score = fuzz.token_set_ratio(norm_sheet_song, norm_link_song)
+    artist_score = artist_match_score(sheet_artist, link_artist)
+    song_score = fuzz.token_set_ratio(normalize_song_title(sheet_song), normalize_song_title(link_song))
 
     logger.debug(
         f"   Match Scores: Artist='{sheet_artist}' vs '{link_artist}' -> {artist_score}, Song='{sheet_song}' vs '{link_song}' -> {song_score}")
 
-    # New "Exact" Match Logic: If song title is a very strong match, consider it exact.
-    # This fulfills "if there's a match in song name, but not necessarily the artist - add the link"
-    if song_score >= EXACT_MATCH_THRESHOLD:
-        return "exact"
+    return candidate_ranking.match_tier(song_score, artist_score)
 
-    # High-probability match:
-    # If both song and artist are reasonably close, but song isn't "exact"
-    if song_score >= HIGH_PROBABILITY_THRESHOLD and artist_score >= HIGH_PROBABILITY_THRESHOLD:
-        return "high_probability"
 
-    return "none"
+def artist_matches(sheet_artist, link_artist):
+    """Whether the link's artist is the row's, by the artist half of the high-probability tier."""
+    return artist_match_score(sheet_artist, link_artist) >= candidate_ranking.HIGH_PROBABILITY_THRESHOLD
 
 
-def search_spotify(sp, song, artist):
-    """Search Spotify for a song and return link, artist, song, and thumbnail."""
+def search_spotify(sp, song, artist, aliases=None):
+    """
+    Search Spotify for a song and return link, artist, song, and thumbnail.
+
+    With an ArtistAliases index, the spelling Spotify was confirmed to use for the
+    artist is tried first, before the cascade of variants of the sheet's spelling.
+
+    Returns:
+        tuple: (link, artist, song, thumbnail); all None when nothing was found, or
+            (SEARCH_ERROR, last error message, None, None) when a query failed and none found a track.
+    """
+    search_queries = []
+    alias = aliases.lookup(artist, 'spotify') if aliases else None
+    if alias and alias != artist:
+        search_queries += [
+            f'track:"{song}" artist:"{alias}"',
+            f'"{song}" "{alias}"',
+        ]
     # Use the original (non-transliterated) song for search, but transliterated artist
     # Spotify's search is often good with mixed scripts or transliterations.
-    search_queries = [
+    search_queries += [
         f'track:"{song}" artist:"{artist}"',  # Most specific, original song, original artist
         f'track:"{normalize_song_title(song)}" artist:"{normalize_artist_name(artist)}"',
         # Normalized song, transliterated artist
@@ -198,11 +216,17 @@ def search_spotify(sp, song, artist):
         f'track:"{song}" {artist}'  # Song exact, artist broad
     ]
 
+    last_error = None
     for query in search_queries:
         try:
-            results = sp.search(q=query, type='track', limit=1)
-            if results['tracks']['items']:
-                track = results['tracks']['items'][0]
+            with metrics.timed('spotify', 'search'):
+                results = sp.search(q=query, type='track', limit=CANDIDATES_PER_SEARCH)
+            tracks = results['tracks']['items']
+            if tracks:
+                # The best of the results, not just Spotify's first
+                top = candidate_ranking.best([candidate_ranking.from_spotify_track(track) for track in tracks],
+                                             artist, song)
+                track = tracks[top.index]
                 spotify_link = track['external_urls']['spotify']
                 track_artist = track['artists'][0]['name']
                 track_name = track['name']
@@ -210,85 +234,295 @@ def search_spotify(sp, song, artist):
                 return spotify_link, track_artist, track_name, thumbnail_url
         except Exception as e:
             logger.error(f"   Spotify search error with query '{query}': {e}")
+            last_error = str(e)
             # Continue to next query if there's an error with this one
+    if last_error:
+        return SEARCH_ERROR, last_error, None, None
     return None, None, None, None
 
 
-def search_youtube(youtube, song, artist, row_num_in_sheet, youtube_quota_exceeded_flag):
-    """Search YouTube for a song and return link, artist, song, and thumbnail."""
+def search_youtube(youtube, song, artist, row_num_in_sheet, youtube_quota_exceeded_flag, aliases=None):
+    """
+    Search YouTube for a song and return link, artist, song, and thumbnail.
+
+    With an ArtistAliases index, the queries use the spelling YouTube was confirmed
+    to use for the artist (each search costs 100 quota units, so none are added).
+
+    Returns:
+        tuple: As search_spotify.
+    """
     if youtube_quota_exceeded_flag[0]:
         return None, None, None, None
+    from googleapiclient.errors import HttpError  # Loaded with the YouTube client; cached after the first call
 
-    # Use original song and artist for search queries
-    search_queries = [
-        f"{song} {artist} official audio",
-        f"{song} {artist} official video",
-        f"{song} {artist} lyric video",
-        f"{song} {artist}"  # Broadest search
-    ]
-
-    for query in search_queries:
+    last_error = None
+    for query in youtube_queries(song, artist, aliases):
         try:
-            request = youtube.search().list(
-                q=query,
-                part='snippet',
-                maxResults=1,
-                type='video'
-            )
-            response = request.execute()
-            if response['items']:
-                video_item = response['items'][0]
-                video_id = video_item['id']['videoId']
-                youtube_link = f'https://www.youtube.com/watch?v={video_id}'
-
-                video_title = video_item['snippet']['title']
-                channel_title = video_item['snippet']['channelTitle']
-
-                # Heuristic for parsing artist/song from video title
-                # Prioritize parsing from title if possible, otherwise use channel/full title
-                parsed_artist = channel_title
-                parsed_song = video_title
-
-                if ' - ' in video_title:
-                    parts = video_title.split(' - ', 1)
-                    parsed_artist = parts[0].strip()
-                    parsed_song = parts[1].strip()
-                elif ' by ' in video_title:
-                    parts = video_title.split(' by ', 1)
-                    parsed_song = parts[0].strip()
-                    parsed_artist = parts[1].strip()
-
-                # If the parsed artist/song are very short or generic, fall back to broader parts
-                if len(parsed_artist) < 3 and channel_title:
-                    parsed_artist = channel_title
-                if len(parsed_song) < 3 and video_title:
-                    parsed_song = video_title
-
-                thumbnail_url = video_item['snippet']['thumbnails']['high']['url'] if 'high' in video_item['snippet'][
-                    'thumbnails'] else ""
-
-                return youtube_link, parsed_artist, parsed_song, thumbnail_url
+            with metrics.timed('youtube', 'search.list'):
+                response = youtube_search_request(youtube, query).execute()
+            if response.get('items'):
+                return parse_video_item(best_video_item(response['items'], song, artist))
         except HttpError as e:
             if e.resp.status == 403 and "quotaExceeded" in str(e):
                 logger.error(
-                    f"   ❌ YouTube API Quota Exceeded at row {row_num_in_sheet}. Logging and stopping further YouTube requests.")
-                with open(YOUTUBE_QUOTA_LOG_FILE, 'w') as f:
-                    f.write(f"{row_num_in_sheet}\n")
+                    f"   ❌ YouTube API Quota Exceeded at row {row_num_in_sheet}. Stopping further YouTube requests.")
                 youtube_quota_exceeded_flag[0] = True
                 return None, None, None, None  # Stop immediately on quota error
             else:
                 logger.error(f"   YouTube API error (HTTP {e.resp.status}) with query '{query}': {e}")
+                last_error = f"HTTP {e.resp.status}: {e}"
         except Exception as e:
             logger.error(f"   YouTube search error with query '{query}': {e}")
+            last_error = str(e)
 
+    if last_error:
+        return SEARCH_ERROR, last_error, None, None
     return None, None, None, None
 
 
+def youtube_queries(song, artist, aliases=None):
+    """The queries search_youtube tries in order, broadest last."""
+    artist = (aliases.lookup(artist, 'youtube') if aliases else None) or artist
+    # Use original song and artist for search queries
+    return [
+        f"{song} {artist} official audio",
+        f"{song} {artist} official video",
+        f"{song} {artist} lyric video",
+        f"{song} {artist}"  # Broadest search
+    ]
+
+
+def youtube_search_request(youtube, query):
+    """An unexecuted search.list request for the top videos, trimmed to the fields parse_video_item reads."""
+    return youtube.search().list(
+        q=query,
+        part='snippet',
+        maxResults=CANDIDATES_PER_SEARCH,
+        type='video',
+        fields=SEARCH_FIELDS
+    )
+
+
+def parse_video_item(video_item):
+    """Return link, artist, song, and thumbnail of a search.list item."""
+    video_id = video_item['id']['videoId']
+    youtube_link = f'https://www.youtube.com/watch?v={video_id}'
+
+    # Parse artist/song from the video title, otherwise use channel/full title
+    parsed_artist, parsed_song = candidate_ranking.split_video_title(video_item['snippet']['title'],
+                                                                     video_item['snippet']['channelTitle'])
+
+    thumbnails = video_item['snippet'].get('thumbnails', {})
+    thumbnail_url = thumbnails['high']['url'] if 'high' in thumbnails else ""
+
+    return youtube_link, parsed_artist, parsed_song, thumbnail_url
+
+
+def best_video_item(items, song, artist):
+    """The search.list item that ranks best against the row (candidate_ranking)."""
+    top = candidate_ranking.best([candidate_ranking.from_youtube_item(item) for item in items], artist, song)
+    return items[top.index]
+
+
+def search_youtube_rows(youtube, rows, youtube_quota_exceeded_flag, aliases=None):
+    """
+    search_youtube for many rows at once, sent through batched HTTP requests.
+
+    Runs the same query cascade: every row's first query goes out in batches of
+    youtube_batch.BATCH_SIZE, then the next query for the rows still without a
+    video, and so on. Same results and quota as searching row by row; far fewer
+    round trips.
+
+    Args:
+        rows: (row number in sheet, song, artist) tuples.
+
+    Returns:
+        dict: Row number -> (link, artist, song, thumbnail), as search_youtube returns;
+            the link is "QUOTA_EXCEEDED" for rows the quota stopped before every query was tried,
+            and SEARCH_ERROR (with the error in place of the artist) for rows whose failed queries
+            left them without a video.
+    """
+    from googleapiclient.errors import HttpError
+
+    results = {row_num: ("QUOTA_EXCEEDED", None, None, None) for row_num, _, _ in rows}
+    cascades = {row_num: youtube_queries(song, artist, aliases) for row_num, song, artist in rows}
+    targets = {row_num: (song, artist) for row_num, song, artist in rows}
+    pending = [row_num for row_num, _, _ in rows]
+    errors = {}  # Row number -> last failed query's error
+
+    for attempt in range(max((len(queries) for queries in cascades.values()), default=0)):
+        if youtube_quota_exceeded_flag[0] or not pending:
+            break
+        unanswered = []
+
+        def try_next_query(row_num):
+            if attempt + 1 < len(cascades[row_num]):
+                unanswered.append(row_num)
+            elif row_num in errors:
+                results[row_num] = (SEARCH_ERROR, errors[row_num], None, None)
+            else:
+                results[row_num] = (None, None, None, None)
+
+        def dispatch(row_num, query, response, error):
+            if error is None:
+                if response.get('items'):
+                    results[row_num] = parse_video_item(best_video_item(response['items'], *targets[row_num]))
+                else:
+                    try_next_query(row_num)
+            elif isinstance(error, HttpError) and error.resp.status == 403 and "quotaExceeded" in str(error):
+                if not youtube_quota_exceeded_flag[0]:
+                    logger.error(f"   ❌ YouTube API Quota Exceeded at row {row_num}. Stopping further YouTube requests.")
+                youtube_quota_exceeded_flag[0] = True
+            else:
+                if isinstance(error, HttpError):
+                    logger.error(f"   YouTube API error (HTTP {error.resp.status}) with query '{query}': {error}")
+                    errors[row_num] = f"HTTP {error.resp.status}: {error}"
+                else:
+                    logger.error(f"   YouTube search error with query '{query}': {error}")
+                    errors[row_num] = str(error)
+                try_next_query(row_num)
+
+        with YouTubeBatchExecutor(youtube) as batch:
+            for row_num in pending:
+                if youtube_quota_exceeded_flag[0]:
+                    break  # A full batch already came back with quotaExceeded
+                query = cascades[row_num][attempt]
+                batch.add(youtube_search_request(youtube, query),
+                          lambda response, error, row_num=row_num, query=query:
+                          dispatch(row_num, query, response, error))
+        pending = unanswered
+
+    return results
+
+
+def write_rows(worksheet, searched_rows, youtube_rows, outcomes, youtube, youtube_quota_exceeded_flag,
+               state=None, sheet_key=None, aliases=None):
+    """
+    Finishes a chunk of searched rows: searches YouTube for the queued ones in batched
+    requests, writes the changed cells with one batch_update, and only then records the
+    rows' outcomes in the job state, so a crash never marks an unwritten row done.
+
+    Args:
+        worksheet (gspread.Worksheet): The worksheet the rows belong to.
+        searched_rows (list): (row number, row, artist, song, current links) of the chunk.
+        youtube_rows (list): (row number, song, artist) still to search on YouTube.
+        outcomes (dict): Provider -> job state entries of the chunk; YouTube's are added here.
+        youtube: YouTube Data API client.
+        youtube_quota_exceeded_flag (list): [bool], set once the quota runs out.
+        state (JobState): Job state to record the outcomes in, or None.
+        sheet_key (str): The worksheet's key in the job state.
+        aliases (ArtistAliases): Alias index that exact matches teach, or None.
+
+    Returns:
+        int: Number of cells written.
+    """
+    updates = []
+
+    # Search YouTube for every queued row at once, then finish each row with its results
+    youtube_results = {}
+    if youtube_rows:
+        print(f"\n🔍 Searching YouTube for {len(youtube_rows)} rows ({YOUTUBE_BATCH_SIZE} searches per request)...")
+        youtube_results = search_youtube_rows(youtube, youtube_rows, youtube_quota_exceeded_flag, aliases)
+
+    for row_num_in_sheet, row, artist, song, links in searched_rows:
+        current_spotify_link = links['spotify']
+        current_youtube_link = links['youtube']
+        current_thumbnail_link = links['thumbnail']
+        current_alternative_link = links['alternative']
+
+        if row_num_in_sheet in youtube_results:
+            yt_link, yt_artist, yt_song, yt_thumbnail = youtube_results[row_num_in_sheet]
+            outcome = 'quota' if yt_link == "QUOTA_EXCEEDED" else 'not_found'
+            error = None
+
+            if yt_link == SEARCH_ERROR:
+                outcome, error, yt_link = 'error', yt_artist, None
+                print(f"   ⚠️  Row {row_num_in_sheet}: YouTube search failed, will retry next run: {error}")
+            elif yt_link and yt_link != "QUOTA_EXCEEDED":
+                match_type = check_match(artist, song, yt_artist, yt_song)
+                if match_type == "exact":
+                    current_youtube_link = yt_link
+                    # Only update thumbnail if Spotify didn't provide one or if YouTube's is preferred
+                    if not current_thumbnail_link:
+                        current_thumbnail_link = yt_thumbnail
+                    outcome = 'found'
+                    if aliases and artist_matches(artist, yt_artist):
+                        aliases.learn(artist, 'youtube', yt_artist)
+                    print(f"   📺 Row {row_num_in_sheet} YouTube (Exact Match): {yt_link}")
+                elif match_type == "high_probability":
+                    # Only add to alternative if not already set by Spotify
+                    if not current_alternative_link:
+                        current_alternative_link = yt_link
+                    outcome = 'high_probability'
+                    print(f"   📺 Row {row_num_in_sheet} YouTube (High Probability Match - Alternative): {yt_link}")
+                else:
+                    print(f"   📺 Row {row_num_in_sheet} YouTube: No definitive match found.")
+            elif yt_link == "QUOTA_EXCEEDED":
+                print(f"   ⚠️  Row {row_num_in_sheet}: YouTube search stopped due to quota.")
+            else:
+                print(f"   📺 Row {row_num_in_sheet} YouTube: Not Found.")
+            outcomes['youtube'].append((row_num_in_sheet, outcome,
+                                        row_fingerprint(artist, song, current_youtube_link), error,
+                                        yt_link))
+
+        # Prepare updates for this row
+        # Ensure the row is long enough to accommodate all new columns
+        new_row_values = row[:]  # Make a copy
+
+        # Extend the row if necessary to reach the highest column index
+        max_idx = max(SPOTIFY_LINK_COL_IDX, YOUTUBE_LINK_COL_IDX, THUMBNAIL_COL_IDX, ALTERNATIVE_LINK_COL_IDX)
+        if len(new_row_values) <= max_idx:
+            new_row_values.extend([''] * (max_idx + 1 - new_row_values))
+
+        # Update the specific cells
+        new_row_values[SPOTIFY_LINK_COL_IDX] = current_spotify_link
+        new_row_values[YOUTUBE_LINK_COL_IDX] = current_youtube_link
+        new_row_values[THUMBNAIL_COL_IDX] = current_thumbnail_link
+        new_row_values[ALTERNATIVE_LINK_COL_IDX] = current_alternative_link
+
+        # Add to batch update if any of the target cells have changed
+        # This check prevents unnecessary updates if the values are already correct
+        if (row[SPOTIFY_LINK_COL_IDX] != current_spotify_link or
+                row[YOUTUBE_LINK_COL_IDX] != current_youtube_link or
+                row[THUMBNAIL_COL_IDX] != current_thumbnail_link or
+                row[ALTERNATIVE_LINK_COL_IDX] != current_alternative_link):
+            # Only update the specific cells, not the whole row, for efficiency
+            updates.append({'range': f'{chr(65 + SPOTIFY_LINK_COL_IDX)}{row_num_in_sheet}',
+                            'values': [[current_spotify_link]]})
+            updates.append({'range': f'{chr(65 + YOUTUBE_LINK_COL_IDX)}{row_num_in_sheet}',
+                            'values': [[current_youtube_link]]})
+            updates.append({'range': f'{chr(65 + THUMBNAIL_COL_IDX)}{row_num_in_sheet}',
+                            'values': [[current_thumbnail_link]]})
+            updates.append({'range': f'{chr(65 + ALTERNATIVE_LINK_COL_IDX)}{row_num_in_sheet}',
+                            'values': [[current_alternative_link]]})
+            metrics.record_row('link_finder', 'updated')
+        else:
+            metrics.record_row('link_finder', 'unchanged')
+
+    if updates:
+        print(f"\n📝 Updating {len(updates)} cells in worksheet '{worksheet.title}'...")
+        sheets_governor.call('write', worksheet.batch_update, updates)
+    if state:
+        for provider, entries in outcomes.items():
+            state.record_many(sheet_key, provider, entries)
+    return len(updates)
+
+
 def process_worksheet(sheet, worksheet, sp, youtube, link_source, row_range, youtube_quota_exceeded_flag,
-                      resume_row=None):
-    """Processes a single worksheet to find and update music links."""
+                      state=None, aliases=None):
+    """
+    Processes a single worksheet to find and update music links.
+
+    Rows are searched, written and recorded ROWS_PER_WRITE at a time (see write_rows).
+    With a JobState, rows already searched for a provider (and unchanged since) are
+    skipped, and each row's outcome is recorded once the batch update has written it.
+    With an ArtistAliases index, searches start from each provider's known spelling of
+    the artist, and exact matches teach it new spellings.
+    """
     print(f"\n📋 Reading worksheet: '{worksheet.title}'...")
-    all_values = worksheet.get_all_values()
+    # Only the input and output columns; the others stay '' and are never written
+    all_values = read_rows(worksheet, ['A:B'] + [chr(65 + index) for index in (
+        SPOTIFY_LINK_COL_IDX, YOUTUBE_LINK_COL_IDX, THUMBNAIL_COL_IDX, ALTERNATIVE_LINK_COL_IDX)])
     if len(all_values) < 2:
         print(f"❌ No data found in worksheet '{worksheet.title}' (need at least 2 rows including header)")
         return
@@ -304,10 +538,6 @@ def process_worksheet(sheet, worksheet, sp, youtube, link_source, row_range, you
     start_row_idx = 1  # Skip header (row 1 is index 0)
     end_row_idx = len(all_values) - 1  # Last row index
 
-    if resume_row and resume_row > start_row_idx + 1:  # resume_row is 1-indexed
-        print(f"Resuming from row {resume_row} as requested.")
-        start_row_idx = resume_row - 1
-
     if row_range.lower() != 'all':
         try:
             if '-' in row_range:
@@ -318,14 +548,12 @@ def process_worksheet(sheet, worksheet, sp, youtube, link_source, row_range, you
                 else:
                     end_row_idx = int(end_str) - 1  # Convert to 0-indexed
 
-                # Use the later start_row_idx if resuming
                 start_row_idx = max(start_row_idx, temp_start_idx)
 
             else:
                 # Single row specified
                 temp_start_idx = int(row_range) - 1
                 end_row_idx = temp_start_idx
-                # Use the later start_row_idx if resuming
                 start_row_idx = max(start_row_idx, temp_start_idx)
 
             if start_row_idx < 1 or start_row_idx > end_row_idx or end_row_idx >= len(all_values):
@@ -355,8 +583,13 @@ def process_worksheet(sheet, worksheet, sp, youtube, link_source, row_range, you
         return
 
     # Process each row with CORRECTED column mapping
-    updates = []
+    cells_written = 0
     processed_count = 0
+    sheet_key = state.sheet_key(worksheet) if state else None
+    outcomes = {'spotify': [], 'youtube': []}  # Recorded in the job state after the chunk's batch update
+    resumed = {'spotify': 0, 'youtube': 0}
+    searched_rows = []  # (row number, row, artist, song, current links), completed after the YouTube searches
+    youtube_rows = []  # (row number, song, artist) still to search on YouTube
 
     # Iterate from the determined start_row_idx to end_row_idx (inclusive)
     for i in range(start_row_idx, end_row_idx + 1):
@@ -373,6 +606,9 @@ def process_worksheet(sheet, worksheet, sp, youtube, link_source, row_range, you
 
             if song and artist:
                 processed_count += 1
+                # Each provider's fingerprint covers its own output cell, so a cleared link is searched again
+                spotify_fingerprint = row_fingerprint(artist, song, row[SPOTIFY_LINK_COL_IDX])
+                youtube_fingerprint = row_fingerprint(artist, song, row[YOUTUBE_LINK_COL_IDX])
                 print(f"\n🎼 ({processed_count}) Processing Row {row_num_in_sheet}: '{song}' by '{artist}'")
 
                 # Check if links already exist in the new columns
@@ -389,107 +625,92 @@ def process_worksheet(sheet, worksheet, sp, youtube, link_source, row_range, you
 
                 # Get Spotify link if requested and not already present
                 if link_source in ['spotify', 'both']:
-                    if not spotify_link_exists:
+                    if spotify_link_exists:
+                        print("   ✅ Spotify link already exists")
+                        outcomes['spotify'].append((row_num_in_sheet, 'existing', spotify_fingerprint))
+                    elif state and state.is_finished(sheet_key, row_num_in_sheet, 'spotify', spotify_fingerprint):
+                        print("   ⏩ Spotify already searched in an earlier run")
+                        resumed['spotify'] += 1
+                    else:
                         print("   🔍 Searching Spotify...")
-                        spotify_link, sp_artist, sp_song, sp_thumbnail = search_spotify(sp, song, artist)
-
-                        if spotify_link:
+                        spotify_link, sp_artist, sp_song, sp_thumbnail = search_spotify(sp, song, artist, aliases)
+                        outcome = 'not_found'
+                        error = None
+
+                        if spotify_link == SEARCH_ERROR:
+                            outcome, error, spotify_link = 'error', sp_artist, None
+                            print(f"   ⚠️  Spotify search failed, will retry next run: {error}")
+                        elif spotify_link:
                             match_type = check_match(artist, song, sp_artist, sp_song)
                             if match_type == "exact":
                                 current_spotify_link = spotify_link
                                 current_thumbnail_link = sp_thumbnail
+                                outcome = 'found'
+                                # An exact match only needs the title; learn the spelling when the artist matched too
+                                if aliases and artist_matches(artist, sp_artist):
+                                    aliases.learn(artist, 'spotify', sp_artist)
                                 print(f"   🎵 Spotify (Exact Match): {spotify_link}")
                             elif match_type == "high_probability":
                                 current_alternative_link = spotify_link  # Store as alternative
+                                outcome = 'high_probability'
                                 print(f"   🎵 Spotify (High Probability Match - Alternative): {spotify_link}")
                             else:
                                 print("   🎵 Spotify: No definitive match found.")
                         else:
                             print("   🎵 Spotify: Not Found.")
+                        outcomes['spotify'].append((row_num_in_sheet, outcome,
+                                                    row_fingerprint(artist, song, current_spotify_link), error,
+                                                    spotify_link))
                         time.sleep(0.5)
-                    else:
-                        print("   ✅ Spotify link already exists")
                 else:
                     print("   ⏩ Spotify search skipped (not requested)")
 
-                # Get YouTube link if requested and not already present
+                # Queue the YouTube search if requested and not already present; the searches of all
+                # rows go out together in batched requests once every row has been through Spotify
                 if link_source in ['youtube', 'both'] and not youtube_quota_exceeded_flag[0]:
-                    if not youtube_link_exists:
-                        print("   🔍 Searching YouTube...")
-                        yt_link, yt_artist, yt_song, yt_thumbnail = search_youtube(youtube, song, artist,
-                                                                                   row_num_in_sheet,
-                                                                                   youtube_quota_exceeded_flag)
-
-                        if yt_link and yt_link != "QUOTA_EXCEEDED":
-                            match_type = check_match(artist, song, yt_artist, yt_song)
-                            if match_type == "exact":
-                                current_youtube_link = yt_link
-                                # Only update thumbnail if Spotify didn't provide one or if YouTube's is preferred
-                                if not current_thumbnail_link:
-                                    current_thumbnail_link = yt_thumbnail
-                                print(f"   📺 YouTube (Exact Match): {yt_link}")
-                            elif match_type == "high_probability":
-                                # Only add to alternative if not already set by Spotify
-                                if not current_alternative_link:
-                                    current_alternative_link = yt_link
-                                print(f"   📺 YouTube (High Probability Match - Alternative): {yt_link}")
-                            else:
-                                print("   📺 YouTube: No definitive match found.")
-                        elif yt_link == "QUOTA_EXCEEDED":
-                            print("   ⚠️  YouTube search stopped due to quota.")
-                        else:
-                            print("   📺 YouTube: Not Found.")
-                        time.sleep(0.5)
-                    else:
+                    if youtube_link_exists:
                         print("   ✅ YouTube link already exists")
+                        outcomes['youtube'].append((row_num_in_sheet, 'existing', youtube_fingerprint))
+                    elif state and state.is_finished(sheet_key, row_num_in_sheet, 'youtube', youtube_fingerprint):
+                        print("   ⏩ YouTube already searched in an earlier run")
+                        resumed['youtube'] += 1
+                    else:
+                        print("   🔍 Queued for YouTube search")
+                        youtube_rows.append((row_num_in_sheet, song, artist))
                 elif youtube_quota_exceeded_flag[0]:
                     print("   ⏩ YouTube search skipped (quota exceeded in previous row).")
                 else:
                     print("   ⏩ YouTube search skipped (not requested)")
 
-                # Prepare updates for this row
-                # Ensure the row is long enough to accommodate all new columns
-                new_row_values = row[:]  # Make a copy
-
-                # Extend the row if necessary to reach the highest column index
-                max_idx = max(SPOTIFY_LINK_COL_IDX, YOUTUBE_LINK_COL_IDX, THUMBNAIL_COL_IDX, ALTERNATIVE_LINK_COL_IDX)
-                if len(new_row_values) <= max_idx:
-                    new_row_values.extend([''] * (max_idx + 1 - new_row_values))
-
-                # Update the specific cells
-                new_row_values[SPOTIFY_LINK_COL_IDX] = current_spotify_link
-                new_row_values[YOUTUBE_LINK_COL_IDX] = current_youtube_link
-                new_row_values[THUMBNAIL_COL_IDX] = current_thumbnail_link
-                new_row_values[ALTERNATIVE_LINK_COL_IDX] = current_alternative_link
-
-                # Add to batch update if any of the target cells have changed
-                # This check prevents unnecessary updates if the values are already correct
-                if (row[SPOTIFY_LINK_COL_IDX] != current_spotify_link or
-                        row[YOUTUBE_LINK_COL_IDX] != current_youtube_link or
-                        row[THUMBNAIL_COL_IDX] != current_thumbnail_link or
-                        row[ALTERNATIVE_LINK_COL_IDX] != current_alternative_link):
-                    # Only update the specific cells, not the whole row, for efficiency
-                    updates.append({'range': f'{chr(65 + SPOTIFY_LINK_COL_IDX)}{row_num_in_sheet}',
-                                    'values': [[current_spotify_link]]})
-                    updates.append({'range': f'{chr(65 + YOUTUBE_LINK_COL_IDX)}{row_num_in_sheet}',
-                                    'values': [[current_youtube_link]]})
-                    updates.append({'range': f'{chr(65 + THUMBNAIL_COL_IDX)}{row_num_in_sheet}',
-                                    'values': [[current_thumbnail_link]]})
-                    updates.append({'range': f'{chr(65 + ALTERNATIVE_LINK_COL_IDX)}{row_num_in_sheet}',
-                                    'values': [[current_alternative_link]]})
+                searched_rows.append((row_num_in_sheet, row, artist, song, {
+                    'spotify': current_spotify_link,
+                    'youtube': current_youtube_link,
+                    'thumbnail': current_thumbnail_link,
+                    'alternative': current_alternative_link,
+                }))
             else:
+                metrics.record_row('link_finder', 'skipped')
                 print(f"   ⚠️  Row {row_num_in_sheet}: Missing song or artist data. Skipping.")
         else:
             print(f"   ⚠️  Row {row_num_in_sheet}: Not enough columns (expected at least 2). Skipping.")
 
-    # Apply all updates
-    if updates:
-        print(f"\n📝 Updating {len(updates)} cells in worksheet '{worksheet.title}'...")
-        worksheet.batch_update(updates)
+        # Search YouTube, write and record every ROWS_PER_WRITE rows, so a crash loses at most one chunk
+        if len(searched_rows) >= ROWS_PER_WRITE:
+            cells_written += write_rows(worksheet, searched_rows, youtube_rows, outcomes, youtube,
+                                        youtube_quota_exceeded_flag, state, sheet_key, aliases)
+            searched_rows, youtube_rows = [], []
+            outcomes = {'spotify': [], 'youtube': []}
+
+    # The last, partial chunk
+    cells_written += write_rows(worksheet, searched_rows, youtube_rows, outcomes, youtube,
+                                youtube_quota_exceeded_flag, state, sheet_key, aliases)
+    if cells_written:
         print("✅ All updates completed for this worksheet!")
     else:
         print(
             f"\nℹ️  No updates needed for worksheet '{worksheet.title}' - all songs already have requested links or no valid rows found.")
+    if resumed['spotify'] or resumed['youtube']:
+        print(f"⏩ Skipped rows searched in earlier runs: {resumed['spotify']} Spotify, {resumed['youtube']} YouTube")
     print(f"\n🎉 Finished processing worksheet '{worksheet.title}'. Processed {processed_count} valid song entries.")
 
 
@@ -505,32 +726,22 @@ def main():
 
     youtube_quota_exceeded_flag = [False]  # Use a mutable list to pass by reference
 
-    # Check for previous YouTube quota exceedance
-    resume_row = None
-    if os.path.exists(YOUTUBE_QUOTA_LOG_FILE):
-        with open(YOUTUBE_QUOTA_LOG_FILE, 'r') as f:
-            last_logged_row = f.readline().strip()
-        if last_logged_row.isdigit():
-            resume_row = int(last_logged_row)
-            print(f"\n⚠️  Previous YouTube API quota exceeded at row {resume_row}.")
-            choice = input(
-                f"Do you want to resume processing from row {resume_row}? (y/n, default 'y'): ").lower().strip()
-            if choice == 'n':
-                resume_row = None
-                os.remove(YOUTUBE_QUOTA_LOG_FILE)  # Clear log if not resuming
-                print("Starting from the beginning.")
-            else:
-                print(f"Resuming from row {resume_row}.")
-        else:
-            os.remove(YOUTUBE_QUOTA_LOG_FILE)  # Clear invalid log file
-            print("Invalid YouTube quota log file found. Starting from the beginning.")
+    # Build the API clients in the background while the questions below are answered
+    warm_up((spotify_client, (SPOTIFY_CLIENT_ID, SPOTIFY_CLIENT_SECRET)), (youtube_client, (YOUTUBE_API_KEY,)))
+
+    if os.path.exists(LEGACY_QUOTA_LOG_FILE):
+        os.remove(LEGACY_QUOTA_LOG_FILE)
+        print(f"ℹ️  Removed '{LEGACY_QUOTA_LOG_FILE}': rows are now resumed from the job state (job_state.db).")
 
+    state = JobState()
+    aliases = ArtistAliases.load()
     try:
         # Get Google Sheets client
         client = get_google_client()
         if not client:
             input("\nPress Enter to exit...")
             return
+        import gspread  # Already loaded by sheets_client; needed for its exceptions
 
         # --- A: Ask for link source ---
         link_source = ""
@@ -575,36 +786,51 @@ def main():
         if not row_range:
             row_range = 'all'  # Default to all if empty input
 
+        # --- D: Resume from the job state ---
+        for ws in worksheets_to_process:
+            sheet_key = state.sheet_key(ws)
+            previous = {provider: state.summary(sheet_key, provider) for provider in ('spotify', 'youtube')}
+            if not any(previous.values()):
+                continue
+            print(f"\n⚠️  Earlier runs already searched rows of '{ws.title}':")
+            for provider, counts in previous.items():
+                if counts:
+                    print(f"   {provider.capitalize()}: {', '.join(f'{n} {status}' for status, n in sorted(counts.items()))}")
+            choice = input("Skip rows already searched (unchanged since)? (y/n, default 'y'): ").lower().strip()
+            if choice == 'n':
+                state.clear(sheet_key)
+                print("Searching every row again.")
+
         print("\n🎧 Connecting to Spotify...")
-        sp = spotipy.Spotify(auth_manager=SpotifyClientCredentials(
-            client_id=SPOTIFY_CLIENT_ID,
-            client_secret=SPOTIFY_CLIENT_SECRET
-        ))
+        sp = spotify_client(SPOTIFY_CLIENT_ID, SPOTIFY_CLIENT_SECRET)
         print("✅ Spotify connected")
 
         print("📺 Connecting to YouTube...")
-        youtube = build('youtube', 'v3', developerKey=YOUTUBE_API_KEY)
+        youtube = youtube_client(YOUTUBE_API_KEY)
         print("✅ YouTube connected")
 
         for ws in worksheets_to_process:
             process_worksheet(spreadsheet, ws, sp, youtube, link_source, row_range, youtube_quota_exceeded_flag,
-                              resume_row)
+                              state, aliases)
+            aliases.save()
             # If quota was hit, stop processing further worksheets for YouTube
             if youtube_quota_exceeded_flag[0]:
                 print("\nStopping further YouTube searches across worksheets due to quota exceedance.")
                 break  # Exit the loop over worksheets
 
         print(f"\n🎉 All selected worksheets processed in '{spreadsheet_name}'!")
-        # If the script completes successfully, clear the quota log
-        if os.path.exists(YOUTUBE_QUOTA_LOG_FILE) and not youtube_quota_exceeded_flag[0]:
-            os.remove(YOUTUBE_QUOTA_LOG_FILE)
-            print("YouTube quota log cleared as processing completed successfully.")
+        if youtube_quota_exceeded_flag[0]:
+            print("ℹ️  Rows not searched on YouTube because of the quota are picked up by the next run.")
 
     except Exception as e:
         print(f"\n❌ An unexpected error occurred: {e}")
         print("Please check your configuration and try again.")
         logger.exception("An unexpected error occurred in main:")  # Log full traceback
+    finally:
+        state.close()
+        aliases.save()
 
+    metrics.export_run('link_finder')
     input("\nPress Enter to exit...")
 
 
@@ -0,0 +1,162 @@
+"""
+API clients that are cheap to start, shared by the scripts.
+
+  * youtube_client - YouTube Data API client built from a local discovery document:
+    the one bundled with google-api-python-client, or (on versions without bundled
+    documents) a copy cached in DISCOVERY_CACHE_DIR after the first fetch
+  * sheets_client  - gspread client whose service-account access token is cached
+    across processes, so launches within the token's hour skip re-authorizing
+  * spotify_client - spotipy client on the shared token (spotify_token_cache.py)
+
+Each library is imported on first use, and each client is built once per process,
+so a script pays only for the clients it actually uses - and can build them on a
+background thread (warm_up) while it waits for the user's answers.
+
+Usage:
+    from api_clients import sheets_client, spotify_client, youtube_client
+
+    youtube = youtube_client(YOUTUBE_API_KEY)
+"""
+
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from functools import lru_cache
+
+from file_lock import FileLock
+
+DISCOVERY_CACHE_DIR = os.environ.get('SHIRLI_DISCOVERY_CACHE',
+                                     os.path.join(os.path.expanduser('~'), '.shirli_discovery'))
+GOOGLE_TOKEN_CACHE_FILE = os.environ.get('SHIRLI_GOOGLE_TOKEN_CACHE',
+                                         os.path.join(os.path.expanduser('~'), '.shirli_google_tokens.json'))
+TOKEN_REFRESH_MARGIN_SECONDS = 300  # Re-authorize 5 minutes before the cached token expires
+
+
+@lru_cache(maxsize=None)
+def discovery_document(service, version):
+    """
+    The discovery document of a Google API, without a network request when possible.
+
+    Returns:
+        str: The document JSON.
+    """
+    from googleapiclient import discovery, discovery_cache
+
+    get_static_doc = getattr(discovery_cache, 'get_static_doc', None)  # google-api-python-client >= 2.0
+    document = get_static_doc(service, version) if get_static_doc else None
+    if document:
+        return document
+
+    path = os.path.join(DISCOVERY_CACHE_DIR, f"{service}.{version}.json")
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read()
+    except OSError:
+        pass
+
+    # First run on an old client library: fetch once, keep a copy for the next launches
+    document = json.dumps(discovery.build(service, version, developerKey='unused', cache_discovery=False)._rootDesc)
+    os.makedirs(DISCOVERY_CACHE_DIR, exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.write(document)
+    os.replace(temp_path, path)
+    return document
+
+
+@lru_cache(maxsize=None)
+def youtube_client(api_key):
+    """YouTube Data API v3 client (one per API key and process)."""
+    from googleapiclient.discovery import build_from_document
+
+    return build_from_document(discovery_document('youtube', 'v3'), developerKey=api_key)
+
+
+@lru_cache(maxsize=None)
+def spotify_client(client_id, client_secret):
+    """spotipy client authorized with the cross-process shared token (one per client ID and process)."""
+    import spotipy
+    from spotify_token_cache import SharedClientCredentials
+
+    return spotipy.Spotify(auth_manager=SharedClientCredentials(client_id=client_id, client_secret=client_secret))
+
+
+def _read_tokens():
+    try:
+        with open(GOOGLE_TOKEN_CACHE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _token_fresh(entry):
+    return bool(entry) and entry['expiry'] - time.time() > TOKEN_REFRESH_MARGIN_SECONDS
+
+
+def _authorize(creds):
+    """Give service-account credentials a token: the cached one if it's still fresh, else a new one."""
+    from google.auth.transport.requests import Request
+
+    key = f"{creds.service_account_email}|{' '.join(sorted(creds.scopes or []))}"
+    entry = _read_tokens().get(key)
+    if not _token_fresh(entry):
+        with FileLock(f"{GOOGLE_TOKEN_CACHE_FILE}.lock"):
+            entry = _read_tokens().get(key)  # Another process may have re-authorized meanwhile
+            if not _token_fresh(entry):
+                creds.refresh(Request())
+                entry = {'token': creds.token, 'expiry': creds.expiry.replace(tzinfo=timezone.utc).timestamp()}
+                tokens = _read_tokens()
+                tokens[key] = entry
+                temp_path = f"{GOOGLE_TOKEN_CACHE_FILE}.{os.getpid()}.tmp"
+                # Owner-only, like any credentials file: the tokens grant access to the sheets
+                with os.fdopen(os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), 'w',
+                               encoding='utf-8') as f:
+                    json.dump(tokens, f)
+                os.replace(temp_path, GOOGLE_TOKEN_CACHE_FILE)
+                return
+    # google-auth keeps expiry as naive UTC
+    creds.token = entry['token']
+    creds.expiry = datetime.fromtimestamp(entry['expiry'], timezone.utc).replace(tzinfo=None)
+
+
+@lru_cache(maxsize=None)
+def _sheets_client(creds_file, scopes):
+    import gspread
+    from google.oauth2.service_account import Credentials
+
+    creds = Credentials.from_service_account_file(creds_file, scopes=list(scopes))
+    _authorize(creds)
+    return gspread.authorize(creds)
+
+
+def sheets_client(creds_file, scopes):
+    """
+    gspread client for a service-account key file (one per file and scopes and process).
+    Once the token expires, google-auth refreshes it in-process as usual.
+
+    Raises:
+        FileNotFoundError: If creds_file doesn't exist.
+    """
+    return _sheets_client(creds_file, tuple(scopes))
+
+
+def warm_up(*builders):
+    """
+    Build clients on a daemon thread, e.g. while a script waits for input; later calls
+    to the same builder with the same arguments return the client it built.
+
+    Args:
+        builders: (function, args) pairs, e.g. (youtube_client, (api_key,)).
+    """
+    def run():
+        for builder, args in builders:
+            try:
+                builder(*args)
+            except Exception:
+                pass  # The script builds it again in the foreground and reports the error there
+
+    thread = threading.Thread(target=run, name='api-clients-warm-up', daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,929 @@
+"""
+Local stand-ins for the Spotify, YouTube Data and YTMusic APIs (plus the
+tab4u search page and the Gemini model used by the V0 processor).
+
+The stand-ins replay responses recorded from the real services (see
+FixtureRecorder) and fall back to answers synthesized from a local song
+catalog, so the link finder, the YTMusic linker and the V0 processor can be
+run and profiled end to end without network access or API quota.
+
+Every stand-in supports:
+    - a configurable latency distribution (LatencyModel)
+    - injected 429 rate limits and 403 quota errors (FaultInjector)
+    - per-endpoint call counters (CallCounter)
+
+Typical use:
+
+    store = FixtureStore.load('api_fixtures.json', catalog=[('אייל גולן', 'מלכת השושנים')])
+    counter = CallCounter()
+    sp = FakeSpotify(store, counter=counter, latency=LatencyModel('lognormal', mean=0.2))
+    youtube = FakeYouTube(store, counter=counter, faults=FaultInjector(quota_after=100))
+    print(counter.snapshot())
+"""
+
+import base64
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+FIXTURES_FILE = 'api_fixtures.json'
+
+SPOTIFY_TRACK_URL = 'https://open.spotify.com/track/{}'
+YOUTUBE_WATCH_URL = 'https://www.youtube.com/watch?v={}'
+
+
+# ========================================
+# Latency, faults and counters
+# ========================================
+
+class LatencyModel:
+    """Samples simulated network latency, in seconds."""
+
+    DISTRIBUTIONS = ('none', 'constant', 'uniform', 'normal', 'lognormal')
+
+    def __init__(self, distribution='none', mean=0.0, spread=0.5, minimum=0.0, maximum=10.0, seed=None):
+        """
+        Args:
+            distribution (str): One of DISTRIBUTIONS.
+            mean (float): Mean latency in seconds.
+            spread (float): Relative spread. Half-width for 'uniform', standard deviation
+                as a fraction of the mean for 'normal', sigma of the underlying normal for 'lognormal'.
+            minimum (float): Lower clamp in seconds.
+            maximum (float): Upper clamp in seconds.
+            seed (int): Optional seed for reproducible runs.
+        """
+        if distribution not in self.DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution '{distribution}' (expected one of {self.DISTRIBUTIONS})")
+        self.distribution = distribution
+        self.mean = mean
+        self.spread = spread
+        self.minimum = minimum
+        self.maximum = maximum
+        self._random = random.Random(seed)
+
+    def sample(self):
+        """Return one latency sample in seconds."""
+        if self.distribution == 'none' or self.mean <= 0:
+            return 0.0
+        if self.distribution == 'constant':
+            value = self.mean
+        elif self.distribution == 'uniform':
+            value = self._random.uniform(self.mean * (1 - self.spread), self.mean * (1 + self.spread))
+        elif self.distribution == 'normal':
+            value = self._random.gauss(self.mean, self.mean * self.spread)
+        else:
+            # Parameterized so that the distribution's mean equals self.mean
+            mu = math.log(self.mean) - self.spread ** 2 / 2
+            value = self._random.lognormvariate(mu, self.spread)
+        return min(max(value, self.minimum), self.maximum)
+
+    def wait(self):
+        """Sleep for one sampled latency and return it."""
+        delay = self.sample()
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+
+class FaultInjector:
+    """Decides when a stand-in call should fail with a rate limit (429) or a quota error (403)."""
+
+    def __init__(self, rate_limit_probability=0.0, rate_limit_every=0, quota_after=None, seed=None):
+        """
+        Args:
+            rate_limit_probability (float): Chance (0-1) that any call returns HTTP 429.
+            rate_limit_every (int): If > 0, every Nth call returns HTTP 429.
+            quota_after (int): If set, every call after this many successful calls returns
+                HTTP 403 quotaExceeded (like the YouTube daily quota running out).
+            seed (int): Optional seed for reproducible runs.
+        """
+        self.rate_limit_probability = rate_limit_probability
+        self.rate_limit_every = rate_limit_every
+        self.quota_after = quota_after
+        self._random = random.Random(seed)
+        self._calls = 0
+        self._successes = 0
+        self._lock = threading.Lock()
+
+    def check(self):
+        """Return 'quota', 'rate_limit' or None for the next call."""
+        with self._lock:
+            self._calls += 1
+            if self.quota_after is not None and self._successes >= self.quota_after:
+                return 'quota'
+            if self.rate_limit_every and self._calls % self.rate_limit_every == 0:
+                return 'rate_limit'
+            if self.rate_limit_probability and self._random.random() < self.rate_limit_probability:
+                return 'rate_limit'
+            self._successes += 1
+            return None
+
+
+class CallCounter:
+    """Thread-safe call, error and latency counters keyed by (provider, endpoint)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.calls = defaultdict(int)
+            self.errors = defaultdict(int)
+            self.latency = defaultdict(float)
+
+    def record(self, provider, endpoint, latency, error=None):
+        key = (provider, endpoint)
+        with self._lock:
+            self.calls[key] += 1
+            self.latency[key] += latency
+            if error:
+                self.errors[key] += 1
+
+    def total_calls(self, provider=None):
+        with self._lock:
+            return sum(count for (p, _), count in self.calls.items() if provider is None or p == provider)
+
+    def snapshot(self):
+        """Return the counters as a JSON-serializable dict."""
+        with self._lock:
+            return {
+                f"{provider}.{endpoint}": {
+                    'calls': count,
+                    'errors': self.errors[(provider, endpoint)],
+                    'latency_seconds': round(self.latency[(provider, endpoint)], 4),
+                }
+                for (provider, endpoint), count in sorted(self.calls.items())
+            }
+
+
+# ========================================
+# Recorded responses and synthetic catalog
+# ========================================
+
+def _normalize(text):
+    text = str(text).lower()
+    text = re.sub(r'[^\w\s]', ' ', text, flags=re.UNICODE)
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def _query_terms(query):
+    """Strips Spotify field filters (track:, artist:) and quotes from a query."""
+    query = re.sub(r'\b(track|artist|album):', ' ', query)
+    return _normalize(query.replace('"', ' '))
+
+
+def _stable_id(text, length, alphabet='base64'):
+    """Deterministic pseudo-ID so the same song always gets the same link across runs."""
+    digest = hashlib.sha1(text.encode('utf-8')).digest()
+    if alphabet == 'hex':
+        return digest.hex()[:length]
+    return base64.urlsafe_b64encode(digest).decode('ascii')[:length]
+
+
+class FixtureStore:
+    """
+    Holds recorded API responses plus an optional catalog used to synthesize
+    answers for queries that were never recorded.
+
+    Recorded responses are keyed per provider and endpoint:
+        {"spotify": {"search": {"<query>|<type>|<limit>": {...}}, "track": {"<id>": {...}}},
+         "youtube": {"search.list": {"<query>|<maxResults>": {...}}, "videos.list": {"<id>": {...}}},
+         "ytmusic": {"search": {"<query>|<filter>": [...]}}}
+    """
+
+    def __init__(self, recorded=None, catalog=None):
+        """
+        Args:
+            recorded (dict): Recorded responses in the layout described above.
+            catalog (list): Optional list of (artist, title) tuples the fake providers "know".
+        """
+        self.recorded = recorded or {}
+        self.catalog = []
+        self._token_index = defaultdict(set)
+        self._tracks_by_id = {}
+        self._videos_by_id = {}
+        for artist, title in catalog or []:
+            self.add_song(artist, title)
+
+    @classmethod
+    def load(cls, path=FIXTURES_FILE, catalog=None):
+        """Load recorded responses from a JSON file (missing file means no recordings)."""
+        recorded = {}
+        if path and os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                recorded = json.load(f)
+        return cls(recorded, catalog)
+
+    def save(self, path=FIXTURES_FILE):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.recorded, f, ensure_ascii=False, indent=2)
+
+    def recorded_response(self, provider, endpoint, key):
+        return self.recorded.get(provider, {}).get(endpoint, {}).get(key)
+
+    def record(self, provider, endpoint, key, response):
+        self.recorded.setdefault(provider, {}).setdefault(endpoint, {})[key] = response
+
+    def add_song(self, artist, title):
+        """Add one (artist, title) to the synthetic catalog."""
+        index = len(self.catalog)
+        song = {
+            'artist': artist,
+            'title': title,
+            'terms': set(_normalize(f"{artist} {title}").split()),
+            'spotify_id': _stable_id(f"sp:{artist}:{title}", 22, alphabet='hex'),
+            'video_id': _stable_id(f"yt:{artist}:{title}", 11),
+        }
+        self.catalog.append(song)
+        for term in song['terms']:
+            self._token_index[term].add(index)
+        self._tracks_by_id[song['spotify_id']] = song
+        self._videos_by_id[song['video_id']] = song
+
+    def find_songs(self, query, limit=1):
+        """Return up to `limit` catalog songs ranked by term overlap with the query."""
+        terms = set(_query_terms(query).split())
+        if not terms:
+            return []
+        overlap = defaultdict(int)
+        for term in terms:
+            for index in self._token_index.get(term, ()):
+                overlap[index] += 1
+        ranked = []
+        for index, shared in overlap.items():
+            song = self.catalog[index]
+            # Require most of the song's own terms to be present, like a real search engine would
+            if shared * 2 >= len(song['terms']):
+                ranked.append((shared / len(song['terms'] | terms), index))
+        ranked.sort(reverse=True)
+        return [self.catalog[index] for _, index in ranked[:limit]]
+
+    def track_by_id(self, track_id):
+        return self._tracks_by_id.get(track_id)
+
+    def video_by_id(self, video_id):
+        return self._videos_by_id.get(video_id)
+
+
+def spotify_track_object(song):
+    """Build a Spotify track object (the subset the scripts read) for a catalog song."""
+    return {
+        'id': song['spotify_id'],
+        'name': song['title'],
+        'artists': [{'name': song['artist']}],
+        'album': {
+            'name': song['title'],
+            'images': [{'url': f"https://i.scdn.co/image/{song['spotify_id']}"}],
+        },
+        'external_urls': {'spotify': SPOTIFY_TRACK_URL.format(song['spotify_id'])},
+    }
+
+
+def youtube_search_item(song):
+    """Build a YouTube search.list item for a catalog song."""
+    return {
+        'kind': 'youtube#searchResult',
+        'id': {'kind': 'youtube#video', 'videoId': song['video_id']},
+        'snippet': {
+            'title': f"{song['artist']} - {song['title']} (Official Video)",
+            'channelTitle': song['artist'],
+            'thumbnails': {'high': {'url': f"https://i.ytimg.com/vi/{song['video_id']}/hqdefault.jpg"}},
+        },
+    }
+
+
+def youtube_video_item(song):
+    """Build a YouTube videos.list item for a catalog song."""
+    item = youtube_search_item(song)
+    item['kind'] = 'youtube#video'
+    item['id'] = song['video_id']
+    item['status'] = {'uploadStatus': 'processed', 'privacyStatus': 'public', 'embeddable': True}
+    return item
+
+
+def ytmusic_song_result(song):
+    """Build a YTMusic search(filter='songs') result for a catalog song."""
+    return {
+        'resultType': 'song',
+        'videoId': song['video_id'],
+        'title': song['title'],
+        'artists': [{'name': song['artist'], 'id': None}],
+        'album': None,
+        'duration': '3:30',
+    }
+
+
+# ========================================
+# Base stand-in
+# ========================================
+
+class _StandIn:
+    provider = None
+
+    def __init__(self, store, latency=None, faults=None, counter=None):
+        self.store = store
+        self.latency = latency or LatencyModel()
+        self.faults = faults or FaultInjector()
+        self.counter = counter or CallCounter()
+
+    def _call(self, endpoint, respond, round_trip=True):
+        """
+        Simulate latency and injected faults around one API call (round_trip=False
+        for a call inside a batch, whose latency the batch's own round trip pays).
+        """
+        delay = self.latency.wait() if round_trip else 0.0
+        fault = self.faults.check()
+        if fault:
+            self.counter.record(self.provider, endpoint, delay, error=fault)
+            raise self._error(fault)
+        self.counter.record(self.provider, endpoint, delay)
+        return respond()
+
+    def _error(self, fault):
+        raise NotImplementedError
+
+
+# ========================================
+# Spotify
+# ========================================
+
+class FakeSpotify(_StandIn):
+    """Stand-in for spotipy.Spotify (search, track, tracks)."""
+
+    provider = 'spotify'
+
+    def _error(self, fault):
+        from spotipy.exceptions import SpotifyException
+        if fault == 'quota':
+            return SpotifyException(403, -1, 'Forbidden: quota exceeded', headers={})
+        return SpotifyException(429, -1, 'API rate limit exceeded', headers={'Retry-After': '1'})
+
+    def search(self, q, limit=10, offset=0, type='track', market=None):
+        def respond():
+            recorded = self.store.recorded_response('spotify', 'search', f"{q}|{type}|{limit}")
+            if recorded is not None:
+                return recorded
+            songs = self.store.find_songs(q, limit=limit)
+            return {'tracks': {'items': [spotify_track_object(song) for song in songs], 'total': len(songs)}}
+        return self._call('search', respond)
+
+    def track(self, track_id, market=None):
+        track_id = _spotify_id(track_id)
+
+        def respond():
+            recorded = self.store.recorded_response('spotify', 'track', track_id)
+            if recorded is not None:
+                return recorded
+            song = self.store.track_by_id(track_id)
+            if song is None:
+                from spotipy.exceptions import SpotifyException
+                raise SpotifyException(404, -1, 'Not found.', headers={})
+            return spotify_track_object(song)
+        return self._call('track', respond)
+
+    def tracks(self, tracks, market=None):
+        track_ids = [_spotify_id(track_id) for track_id in tracks]
+
+        def respond():
+            results = []
+            for track_id in track_ids:
+                recorded = self.store.recorded_response('spotify', 'track', track_id)
+                if recorded is None:
+                    song = self.store.track_by_id(track_id)
+                    recorded = spotify_track_object(song) if song else None
+                results.append(recorded)
+            return {'tracks': results}
+        return self._call('tracks', respond)
+
+
+def _spotify_id(value):
+    match = re.search(r'track[/:]([A-Za-z0-9]+)', value)
+    return match.group(1) if match else value
+
+
+# ========================================
+# YouTube Data API
+# ========================================
+
+class FakeYouTubeRequest:
+    """Mimics a googleapiclient HttpRequest: build it with list(...), run it with execute()."""
+
+    def __init__(self, service, endpoint, params, respond):
+        self.service = service
+        self.endpoint = endpoint
+        self.params = params
+        self._respond = respond
+
+    def execute(self, num_retries=0):
+        return self.service._call(self.endpoint, self._respond)
+
+
+class FakeBatchHttpRequest:
+    """
+    Mimics googleapiclient's BatchHttpRequest: one simulated round trip (recorded as
+    youtube.batch) for all the requests added, each still counted under its own endpoint.
+    """
+
+    def __init__(self, service, callback=None):
+        self.service = service
+        self.callback = callback
+        self._requests = []  # (request ID, request, callback)
+
+    def add(self, request, callback=None, request_id=None):
+        request_id = request_id if request_id is not None else str(len(self._requests) + 1)
+        self._requests.append((request_id, request, callback))
+
+    def execute(self, http=None):
+        self.service._call('batch', lambda: None)
+        for request_id, request, callback in self._requests:
+            response, exception = None, None
+            try:
+                response = self.service._call(request.endpoint, request._respond, round_trip=False)
+            except Exception as e:
+                exception = e
+            self.service.batched_requests += 1
+            (callback or self.callback)(request_id, response, exception)
+
+
+class _FakeSearchResource:
+    def __init__(self, service):
+        self.service = service
+
+    def list(self, q='', part='snippet', maxResults=5, type=None, **kwargs):
+        store = self.service.store
+
+        def respond():
+            recorded = store.recorded_response('youtube', 'search.list', f"{q}|{maxResults}")
+            if recorded is not None:
+                return recorded
+            songs = store.find_songs(q, limit=maxResults)
+            return {'kind': 'youtube#searchListResponse', 'items': [youtube_search_item(song) for song in songs]}
+        params = dict(kwargs, q=q, part=part, maxResults=maxResults, type=type)
+        return FakeYouTubeRequest(self.service, 'search.list', params, respond)
+
+
+class _FakeVideosResource:
+    def __init__(self, service):
+        self.service = service
+
+    def list(self, part='snippet', id='', **kwargs):
+        store = self.service.store
+        video_ids = [video_id for video_id in id.split(',') if video_id]
+
+        def respond():
+            items = []
+            for video_id in video_ids:
+                item = store.recorded_response('youtube', 'videos.list', video_id)
+                if item is None:
+                    song = store.video_by_id(video_id)
+                    item = youtube_video_item(song) if song else None
+                if item is not None:
+                    items.append(item)
+            return {'kind': 'youtube#videoListResponse', 'items': items}
+        params = dict(kwargs, part=part, id=id)
+        return FakeYouTubeRequest(self.service, 'videos.list', params, respond)
+
+
+class FakeYouTube(_StandIn):
+    """Stand-in for the object returned by build('youtube', 'v3', ...)."""
+
+    provider = 'youtube'
+
+    # Quota cost of each endpoint in YouTube Data API units
+    QUOTA_COST = {'search.list': 100, 'videos.list': 1}
+
+    def __init__(self, store, latency=None, faults=None, counter=None):
+        super().__init__(store, latency, faults, counter)
+        self.batched_requests = 0
+
+    def search(self):
+        return _FakeSearchResource(self)
+
+    def videos(self):
+        return _FakeVideosResource(self)
+
+    def new_batch_http_request(self, callback=None):
+        return FakeBatchHttpRequest(self, callback)
+
+    def quota_units_used(self):
+        return sum(self.counter.calls[('youtube', endpoint)] * cost for endpoint, cost in self.QUOTA_COST.items())
+
+    def round_trips(self):
+        """HTTP requests sent: each batch counts once, however many requests it carried."""
+        return self.counter.total_calls('youtube') - self.batched_requests
+
+    def _error(self, fault):
+        import httplib2
+        from googleapiclient.errors import HttpError
+        if fault == 'quota':
+            status, reason, message = 403, 'quotaExceeded', 'The request cannot be completed because you have exceeded your quota.'
+        else:
+            status, reason, message = 429, 'rateLimitExceeded', 'Too many requests.'
+        content = json.dumps({'error': {'code': status, 'message': message,
+                                        'errors': [{'message': message, 'domain': 'youtube.quota', 'reason': reason}]}})
+        return HttpError(httplib2.Response({'status': status}), content.encode('utf-8'))
+
+
+# ========================================
+# YTMusic
+# ========================================
+
+class FakeYTMusic(_StandIn):
+    """Stand-in for ytmusicapi.YTMusic (search)."""
+
+    provider = 'ytmusic'
+
+    def search(self, query, filter=None, limit=20, ignore_spelling=False):
+        def respond():
+            recorded = self.store.recorded_response('ytmusic', 'search', f"{query}|{filter}")
+            if recorded is not None:
+                return recorded
+            return [ytmusic_song_result(song) for song in self.store.find_songs(query, limit=limit)]
+        return self._call('search', respond)
+
+    def _error(self, fault):
+        try:
+            from ytmusicapi.exceptions import YTMusicServerError as error_class
+        except ImportError:
+            error_class = Exception
+        if fault == 'quota':
+            return error_class('Server returned HTTP 403: Forbidden.')
+        return error_class('Server returned HTTP 429: Too Many Requests.')
+
+
+# ========================================
+# tab4u and Gemini
+# ========================================
+
+class FakeTab4UResponse:
+    """Mimics the parts of requests.Response the tab4u scraper reads."""
+
+    def __init__(self, text, status_code=200):
+        self.text = text
+        self.status_code = status_code
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            import requests
+            raise requests.exceptions.HTTPError(f"{self.status_code} Error", response=self)
+
+
+class FakeTab4USession(_StandIn):
+    """Stand-in for the requests.Session Tab4UScraper uses to fetch tab4u search pages."""
+
+    provider = 'tab4u'
+
+    def __init__(self, store, latency=None, faults=None, counter=None):
+        super().__init__(store, latency, faults, counter)
+        self.headers = {}
+
+    def get(self, url, timeout=None, **kwargs):
+        from urllib.parse import parse_qs, urlparse
+        query = parse_qs(urlparse(url).query).get('q', [''])[0]
+
+        def respond():
+            recorded = self.store.recorded_response('tab4u', 'search', query)
+            if recorded is not None:
+                return FakeTab4UResponse(recorded)
+            return FakeTab4UResponse(tab4u_results_html(self.store.find_songs(query, limit=10)))
+        return self._call('search', respond)
+
+    def _error(self, fault):
+        import requests
+        return requests.exceptions.HTTPError(f"{429 if fault == 'rate_limit' else 403} Client Error")
+
+
+def tab4u_results_html(songs):
+    """Render a tab4u 'resultsSimple' page listing the given catalog songs."""
+    rows = []
+    for number, song in enumerate(songs, 1):
+        href = f"tabs/songs/{number}_{song['artist'].replace(' ', '_')}_-_{song['title'].replace(' ', '_')}.html"
+        rows.append(
+            f'<tr><td class="songTd1"><a class="ruSongLink" href="{href}">'
+            f'<div class="sNameI19">{song["title"]} /</div><div class="aNameI19">{song["artist"]}</div>'
+            f'</a></td></tr>'
+        )
+    return f"<html><body><table>{''.join(rows)}</table></body></html>"
+
+
+class FakeGenerativeModel(_StandIn):
+    """
+    Stand-in for google.generativeai.GenerativeModel. It answers the batch
+    prompt of batch_llm_process_songs by confirming every row as given.
+    """
+
+    provider = 'gemini'
+
+    def __init__(self, store=None, latency=None, faults=None, counter=None):
+        super().__init__(store or FixtureStore(), latency, faults, counter)
+
+    def generate_content(self, prompt):
+        def respond():
+            rows = re.findall(r'Row (\d+):\s*Artist: "(.*)"\s*Song Text: "(.*)"', prompt)
+            answer = [{
+                'row': int(row), 'identified_song_title': song, 'corrected_artist': artist,
+                'version_type': 'Original', 'is_cover_version': False, 'confidence': 'high',
+                'explanation': 'Confirmed by offline stand-in',
+            } for row, artist, song in rows]
+            return SimpleNamespace(text=json.dumps(answer, ensure_ascii=False))
+        return self._call('generate_content', respond)
+
+    def _error(self, fault):
+        return Exception(f"{429 if fault == 'rate_limit' else 403} Resource has been exhausted (e.g. check quota).")
+
+
+# ========================================
+# Google Sheets worksheet
+# ========================================
+
+def _column_index(letters):
+    index = 0
+    for char in letters.upper():
+        index = index * 26 + (ord(char) - 64)
+    return index
+
+
+def _parse_a1(a1):
+    """Parse 'B7' or 'B7:D9' into 1-indexed (start_row, start_col, end_row, end_col); missing rows are None."""
+    a1 = a1.split('!')[-1]
+    parts = a1.split(':')
+    cells = []
+    for part in parts:
+        match = re.match(r'([A-Za-z]*)(\d*)$', part)
+        if not match:
+            raise ValueError(f"Invalid A1 range '{a1}'")
+        letters, digits = match.groups()
+        cells.append((int(digits) if digits else None, _column_index(letters) if letters else None))
+    if len(cells) == 1:
+        cells.append(cells[0])
+    (start_row, start_col), (end_row, end_col) = cells
+    return start_row, start_col, end_row, end_col
+
+
+class LocalWorksheet:
+    """In-memory stand-in for a gspread Worksheet, so pipelines can run without the Sheets API."""
+
+    def __init__(self, values, title='songs', counter=None):
+        self.title = title
+        self._values = [list(row) for row in values]
+        self.counter = counter or CallCounter()
+
+    @property
+    def row_count(self):
+        return len(self._values)
+
+    @property
+    def col_count(self):
+        return max((len(row) for row in self._values), default=0)
+
+    def _record(self, endpoint):
+        self.counter.record('sheets', endpoint, 0.0)
+
+    def _ensure(self, row, col):
+        while len(self._values) < row:
+            self._values.append([])
+        current = self._values[row - 1]
+        if len(current) < col:
+            current.extend([''] * (col - len(current)))
+
+    def _read(self, a1):
+        start_row, start_col, end_row, end_col = _parse_a1(a1)
+        start_row = start_row or 1
+        end_row = end_row or len(self._values)
+        start_col = start_col or 1
+        rows = []
+        for row in self._values[start_row - 1:end_row]:
+            last = end_col or len(row)
+            rows.append([str(value) for value in row[start_col - 1:last]])
+        while rows and not any(rows[-1]):
+            rows.pop()
+        return rows
+
+    def _write(self, a1, values):
+        start_row, start_col, _, _ = _parse_a1(a1)
+        for r_offset, row_values in enumerate(values):
+            for c_offset, value in enumerate(row_values):
+                row, col = (start_row or 1) + r_offset, (start_col or 1) + c_offset
+                self._ensure(row, col)
+                self._values[row - 1][col - 1] = value
+
+    def get_all_values(self, **kwargs):
+        self._record('values.get')
+        return [[str(value) for value in row] for row in self._values]
+
+    def row_values(self, row, **kwargs):
+        self._record('values.get')
+        values = list(self._values[row - 1]) if row <= len(self._values) else []
+        while values and values[-1] == '':
+            values.pop()
+        return values
+
+    def col_values(self, col, **kwargs):
+        self._record('values.get')
+        values = [row[col - 1] if len(row) >= col else '' for row in self._values]
+        while values and values[-1] == '':
+            values.pop()
+        return values
+
+    def cell(self, row, col, **kwargs):
+        self._record('values.get')
+        in_range = row <= len(self._values) and col <= len(self._values[row - 1])
+        return SimpleNamespace(row=row, col=col, value=self._values[row - 1][col - 1] if in_range else '')
+
+    def batch_get(self, ranges, **kwargs):
+        self._record('values.batchGet')
+        return [self._read(a1) for a1 in ranges]
+
+    def update_cell(self, row, col, value):
+        self._record('values.update')
+        self._ensure(row, col)
+        self._values[row - 1][col - 1] = value
+
+    def update(self, *args, range_name=None, values=None, **kwargs):
+        # gspread accepts both update(range, values) (v5) and update(values, range_name=...) (v6)
+        for arg in args:
+            if isinstance(arg, str):
+                range_name = arg
+            else:
+                values = arg
+        self._record('values.update')
+        self._write(range_name or 'A1', values)
+
+    def batch_update(self, data, **kwargs):
+        self._record('values.batchUpdate')
+        for update in data:
+            self._write(update['range'], update['values'])
+
+    def clear(self):
+        self._record('values.clear')
+        self._values = []
+
+    def add_rows(self, rows):
+        self._record('batchUpdate')
+        self._values.extend([] for _ in range(rows))
+
+
+# ========================================
+# Recording and patching helpers
+# ========================================
+
+class FixtureRecorder:
+    """
+    Wraps real API clients and records their responses into a FixtureStore,
+    so a short live run can be replayed offline later.
+
+        recorder = FixtureRecorder(FixtureStore.load())
+        sp = recorder.wrap_spotify(spotipy.Spotify(...))
+        ...
+        recorder.store.save()
+    """
+
+    def __init__(self, store):
+        self.store = store
+
+    def wrap_spotify(self, sp):
+        store = self.store
+
+        class _RecordingSpotify:
+            def search(self, q, limit=10, offset=0, type='track', market=None):
+                response = sp.search(q=q, limit=limit, offset=offset, type=type, market=market)
+                store.record('spotify', 'search', f"{q}|{type}|{limit}", response)
+                return response
+
+            def track(self, track_id, market=None):
+                response = sp.track(track_id, market=market)
+                store.record('spotify', 'track', _spotify_id(track_id), response)
+                return response
+
+            def tracks(self, tracks, market=None):
+                response = sp.tracks(tracks, market=market)
+                for track in response.get('tracks', []):
+                    if track:
+                        store.record('spotify', 'track', track['id'], track)
+                return response
+
+            def __getattr__(self, name):
+                return getattr(sp, name)
+
+        return _RecordingSpotify()
+
+    def wrap_youtube(self, youtube):
+        store = self.store
+
+        class _RecordingRequest:
+            def __init__(self, request, endpoint, key):
+                self.request, self.endpoint, self.key = request, endpoint, key
+
+            def execute(self, num_retries=0):
+                response = self.request.execute(num_retries=num_retries)
+                self.record(response)
+                return response
+
+            def record(self, response):
+                if self.endpoint == 'search.list':
+                    store.record('youtube', 'search.list', self.key, response)
+                else:
+                    for item in response.get('items', []):
+                        store.record('youtube', 'videos.list', item['id'], item)
+
+        class _RecordingBatch:
+            def __init__(self, callback):
+                self.callback = callback
+                self.batch = youtube.new_batch_http_request()
+
+            def add(self, request, callback=None, request_id=None):
+                callback = callback or self.callback
+
+                def record(request_id, response, exception):
+                    if exception is None:
+                        request.record(response)
+                    callback(request_id, response, exception)
+                self.batch.add(request.request, callback=record, request_id=request_id)
+
+            def execute(self, http=None):
+                self.batch.execute(http=http)
+
+        class _RecordingSearch:
+            def list(self, **kwargs):
+                key = f"{kwargs.get('q', '')}|{kwargs.get('maxResults', 5)}"
+                return _RecordingRequest(youtube.search().list(**kwargs), 'search.list', key)
+
+        class _RecordingVideos:
+            def list(self, **kwargs):
+                return _RecordingRequest(youtube.videos().list(**kwargs), 'videos.list', None)
+
+        class _RecordingYouTube:
+            def search(self):
+                return _RecordingSearch()
+
+            def videos(self):
+                return _RecordingVideos()
+
+            def new_batch_http_request(self, callback=None):
+                return _RecordingBatch(callback)
+
+            def __getattr__(self, name):
+                return getattr(youtube, name)
+
+        return _RecordingYouTube()
+
+    def wrap_ytmusic(self, ytmusic):
+        store = self.store
+
+        class _RecordingYTMusic:
+            def search(self, query, filter=None, **kwargs):
+                response = ytmusic.search(query, filter=filter, **kwargs)
+                store.record('ytmusic', 'search', f"{query}|{filter}", response)
+                return response
+
+            def __getattr__(self, name):
+                return getattr(ytmusic, name)
+
+        return _RecordingYTMusic()
+
+
+@contextmanager
+def offline_clients(module, store, latency=None, faults=None, counter=None):
+    """
+    Temporarily replace the API client constructors a script imported
+    (spotipy.Spotify, build, YTMusic, api_clients' spotify_client /
+    youtube_client) with the stand-ins, so its main() runs offline.
+    Yields the shared CallCounter.
+
+        import YouTube_spotify_Link_Finder as finder
+        with offline_clients(finder, store) as counter:
+            finder.main()
+    """
+    counter = counter or CallCounter()
+    kwargs = {'latency': latency, 'faults': faults, 'counter': counter}
+    saved = {}
+
+    def replace(name, value):
+        if hasattr(module, name):
+            saved[name] = getattr(module, name)
+            setattr(module, name, value)
+
+    class _OfflineSpotipy:
+        Spotify = staticmethod(lambda *args, **kw: FakeSpotify(store, **kwargs))
+
+    replace('spotipy', _OfflineSpotipy)
+    replace('SpotifyClientCredentials', lambda *args, **kw: None)
+    replace('SharedClientCredentials', lambda *args, **kw: None)
+    replace('build', lambda *args, **kw: FakeYouTube(store, **kwargs))
+    replace('YTMusic', lambda *args, **kw: FakeYTMusic(store, **kwargs))
+    replace('spotify_client', lambda *args, **kw: FakeSpotify(store, **kwargs))
+    replace('youtube_client', lambda *args, **kw: FakeYouTube(store, **kwargs))
+    try:
+        yield counter
+    finally:
+        for name, value in saved.items():
+            setattr(module, name, value)
@@ -0,0 +1,169 @@
+"""
+Artist alias index learned from confirmed matches.
+
+Every time a search confirms a song, the sheet's artist spelling is paired with
+the artist name the provider returned ("Eyal Golan" -> "אייל גולן" on Spotify).
+Query builders look the sheet's artist up first and search the spelling each
+provider actually uses, instead of cycling through transliterated variants;
+the V0 processor also hands the learned spellings of a batch's artists to the
+LLM instead of relying on hard-coded examples.
+
+Pairs are only learned when both names plausibly refer to the same artist
+(a close artist_similarity, and skeletons that agree as a whole, so neither a
+name a consonant apart nor one artist of a duet credit is learned), so a wrong
+search result can't teach a wrong alias. Counts decide between competing spellings.
+
+Usage:
+    from artist_aliases import ArtistAliases
+
+    aliases = ArtistAliases.load()
+    artist_for_query = aliases.lookup(artist, 'spotify') or artist
+    ...
+    aliases.learn(artist, 'spotify', track['artists'][0]['name'])
+    aliases.save()
+"""
+
+import json
+import os
+import threading
+
+import metrics
+from file_lock import FileLock
+from text_matching import artist_block_key, artist_similarity, artist_skeleton, normalize_song_title, title_similarity
+
+ALIASES_FILE = os.environ.get('SHIRLI_ARTIST_ALIASES', 'artist_aliases.json')
+ALIASES_VERSION = 1
+SAME_ARTIST_THRESHOLD = 85  # artist_similarity of the names and title_similarity of their skeletons
+
+
+def _key(artist):
+    """Lookup key of a sheet artist: case, punctuation and spacing folded, script kept."""
+    return normalize_song_title(artist)
+
+
+def names_match(artist_a, artist_b):
+    """Whether two spellings (possibly in different scripts) plausibly name the same artist."""
+    if not artist_a or not artist_b:
+        return False
+    return (artist_similarity(artist_a, artist_b) >= SAME_ARTIST_THRESHOLD
+            and title_similarity(artist_skeleton(artist_a), artist_skeleton(artist_b)) >= SAME_ARTIST_THRESHOLD)
+
+
+class ArtistAliases:
+    """Sheet artist -> {provider: {provider spelling: confirmations}}, persisted as JSON."""
+
+    def __init__(self, artists=None, path=ALIASES_FILE):
+        self.path = path
+        self._artists = artists or {}  # key -> {'name': sheet spelling, 'providers': {provider: {spelling: count}}}
+        self._pending = []             # (sheet artist, provider, spelling) learned since the last save
+        self._lock = threading.Lock()
+        self._skeletons = None
+
+    @classmethod
+    def load(cls, path=ALIASES_FILE):
+        """Load the index (a missing or unreadable file means an empty one)."""
+        return cls(cls._read(path), path)
+
+    @staticmethod
+    def _read(path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if data.get('version') != ALIASES_VERSION:
+            return {}
+        return data.get('artists', {})
+
+    def _entry(self, artist):
+        entry = self._artists.get(_key(artist))
+        if entry is not None:
+            return entry
+        # Fall back to the transliterated skeleton, but only when it names a single known artist
+        if self._skeletons is None:
+            index = {}
+            for key, candidate in self._artists.items():
+                index.setdefault(artist_block_key(candidate['name']), []).append(key)
+            self._skeletons = index
+        keys = self._skeletons.get(artist_block_key(artist), [])
+        return self._artists[keys[0]] if len(keys) == 1 else None
+
+    @staticmethod
+    def _add(artists, artist, provider, spelling, count=1):
+        entry = artists.setdefault(_key(artist), {'name': artist, 'providers': {}})
+        spellings = entry['providers'].setdefault(provider, {})
+        spellings[spelling] = spellings.get(spelling, 0) + count
+
+    def learn(self, artist, provider, provider_artist):
+        """
+        Record a confirmed match between the sheet's artist and the provider's artist name.
+
+        Returns:
+            bool: Whether the pair was learned (names that don't plausibly match are ignored).
+        """
+        artist, provider_artist = (artist or '').strip(), (provider_artist or '').strip()
+        if not names_match(artist, provider_artist):
+            return False
+        with self._lock:
+            self._add(self._artists, artist, provider, provider_artist)
+            self._pending.append((artist, provider, provider_artist))
+            self._skeletons = None
+        return True
+
+    def lookup(self, artist, provider=None):
+        """
+        The most confirmed spelling of an artist on a provider (any provider if None or
+        if this one has no confirmations yet).
+
+        Returns:
+            str: The spelling, or None if the artist was never confirmed.
+        """
+        if not artist:
+            return None
+        with self._lock:
+            entry = self._entry(artist)
+            spellings = {}
+            if entry is not None:
+                spellings = entry['providers'].get(provider) if provider else None
+                if not spellings:
+                    spellings = {}
+                    for counts in entry['providers'].values():
+                        for spelling, count in counts.items():
+                            spellings[spelling] = spellings.get(spelling, 0) + count
+        metrics.record_cache('artist_aliases', hit=bool(spellings))
+        if not spellings:
+            return None
+        return max(spellings.items(), key=lambda item: item[1])[0]
+
+    def spellings_for(self, artists, limit=20):
+        """
+        Learned spellings that differ from the given ones, for prompts.
+
+        Returns:
+            list: (sheet spelling, provider spelling) pairs, at most `limit`.
+        """
+        pairs = {}
+        for artist in artists:
+            alias = self.lookup(artist)
+            if alias and _key(alias) != _key(artist) and artist not in pairs:
+                pairs[artist] = alias
+                if len(pairs) >= limit:
+                    break
+        return list(pairs.items())
+
+    def save(self):
+        """Merge what was learned into the file (other runs may have saved since we loaded)."""
+        with self._lock:
+            if not self._pending:
+                return
+            with FileLock(f"{self.path}.lock"):
+                artists = self._read(self.path)
+                for artist, provider, spelling in self._pending:
+                    self._add(artists, artist, provider, spelling)
+                temp_path = f"{self.path}.{os.getpid()}.tmp"
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    f.write(json.dumps({'version': ALIASES_VERSION, 'artists': artists}, ensure_ascii=False))
+                os.replace(temp_path, self.path)
+            self._artists = artists
+            self._pending = []
+            self._skeletons = None
@@ -0,0 +1,418 @@
+"""
+End-to-end throughput benchmark for the link-finding pipelines.
+
+Generates synthetic song sheets with a realistic mix of Hebrew and English
+artists and titles (Zipf-distributed artist popularity, duplicate rows, rows
+the providers do not know), runs each pipeline against the offline API
+stand-ins from api_fixtures, and reports rows/sec, API calls per row, peak
+memory and wall time. Results are saved as JSON so runs can be compared.
+
+Pipelines:
+    link_finder  YouTube_spotify_Link_Finder.process_worksheet
+    tab4u        tab_scrapper.Tab4UScraper.process_worksheet
+    v0           V0_music_processor.process_song_data
+    organizer    sheet_organizer.consolidate (column-wise, no API calls)
+    organizer_legacy  sheet_organizer.consolidate_legacy (original row-by-row loop)
+
+Usage:
+    python benchmark_pipelines.py --rows 1000 10000
+    python benchmark_pipelines.py --pipelines link_finder --rows 100000 --latency lognormal --latency-mean 0.05
+    python benchmark_pipelines.py --pipelines organizer organizer_legacy --rows 50000
+    python benchmark_pipelines.py --rows 1000 --compare benchmark_results/benchmark_20250801_120000.json
+"""
+
+import argparse
+import builtins
+import contextlib
+import importlib.util
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import types
+from datetime import datetime
+
+from api_fixtures import (CallCounter, FakeGenerativeModel, FakeSpotify, FakeTab4USession, FakeYouTube,
+                          FaultInjector, FixtureStore, LatencyModel, LocalWorksheet)
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRIPTS_DIR = os.path.join(REPO_DIR, 'missing_shirli_scripts')
+RESULTS_DIR = os.path.join(REPO_DIR, 'benchmark_results')
+
+PIPELINES = ('link_finder', 'tab4u', 'v0', 'organizer', 'organizer_legacy')
+
+# ========================================
+# Synthetic catalog
+# ========================================
+
+HEBREW_FIRST_NAMES = ['אייל', 'שלמה', 'אריק', 'חוה', 'עומר', 'נועה', 'יהורם', 'אביתר', 'רונה', 'שרית',
+                      'עידן', 'מאיר', 'יוסי', 'אהוד', 'ריטה', 'אושר', 'עדן', 'נתן', 'מתי', 'גלי']
+HEBREW_LAST_NAMES = ['גולן', 'ארצי', 'איינשטיין', 'אלברשטיין', 'אדם', 'קירל', 'גאון', 'בנאי', 'קינן', 'חדד',
+                     'רייכל', 'אריאל', 'כהן', 'מנור', 'כספי', 'עטרי', 'בן ארי', 'גושן', 'פרץ', 'דמארי']
+HEBREW_BANDS = ['משינה', 'כוורת', 'טיפקס', 'מכופף הבננות', 'היהודים', 'תיסלם', 'החברים של נטאשה', 'אתניקס']
+HEBREW_WORDS = ['אהבה', 'לילה', 'ים', 'שיר', 'בית', 'אור', 'לב', 'ירושלים', 'חלום', 'זמן', 'עוד', 'יום',
+                'כחול', 'ערב', 'גשם', 'רוח', 'שמש', 'ילדה', 'דרך', 'הביתה', 'תמיד', 'ארץ', 'פרח', 'מלכה', 'שקט']
+ENGLISH_FIRST_NAMES = ['John', 'Paul', 'Adele', 'Leonard', 'Nina', 'Bob', 'Amy', 'David', 'Norah', 'Freddie']
+ENGLISH_LAST_NAMES = ['Lennon', 'Simon', 'Cohen', 'Simone', 'Dylan', 'Winehouse', 'Bowie', 'Jones', 'Mercury', 'King']
+ENGLISH_BANDS = ['Queen', 'The Beatles', 'Radiohead', 'Coldplay', 'Pink Floyd', 'The Doors']
+ENGLISH_WORDS = ['love', 'night', 'sea', 'song', 'home', 'light', 'heart', 'dream', 'time', 'blue', 'rain',
+                 'wind', 'sun', 'girl', 'road', 'always', 'flower', 'queen', 'quiet', 'river']
+TAGS = ['אהבה', 'געגועים', 'זהות', 'שינוי', 'חורף', 'ילדות', 'מלחמה', 'שמחה', 'nostalgia', 'love']
+
+
+def _make_artist(rng, hebrew):
+    if hebrew:
+        if rng.random() < 0.15:
+            return rng.choice(HEBREW_BANDS)
+        return f"{rng.choice(HEBREW_FIRST_NAMES)} {rng.choice(HEBREW_LAST_NAMES)}"
+    if rng.random() < 0.2:
+        return rng.choice(ENGLISH_BANDS)
+    return f"{rng.choice(ENGLISH_FIRST_NAMES)} {rng.choice(ENGLISH_LAST_NAMES)}"
+
+
+def _make_title(rng, hebrew):
+    words = HEBREW_WORDS if hebrew else ENGLISH_WORDS
+    title = ' '.join(rng.sample(words, rng.choice([1, 2, 2, 3, 3, 4])))
+    return title if hebrew else title.title()
+
+
+def _variant(rng, text):
+    """A near-duplicate spelling, as humans type them into the sheet."""
+    choice = rng.randrange(4)
+    if choice == 0:
+        return f"  {text} "
+    if choice == 1:
+        return text.replace(' ', '  ', 1)
+    if choice == 2:
+        return f"{text}!"
+    return text.upper() if text.isascii() else text
+
+
+def generate_songs(num_rows, hebrew_ratio=0.7, duplicate_rate=0.05, known_rate=0.85, missing_rate=0.02,
+                   existing_link_rate=0.1, seed=42):
+    """
+    Generate synthetic sheet rows and the catalog the fake providers know.
+
+    Args:
+        num_rows (int): Number of data rows (header excluded).
+        hebrew_ratio (float): Share of Hebrew artists.
+        duplicate_rate (float): Share of rows that repeat an earlier song (exactly or with spacing/punctuation noise).
+        known_rate (float): Share of distinct songs the providers can find.
+        missing_rate (float): Share of rows with an empty artist or title.
+        existing_link_rate (float): Share of rows that already have links filled in.
+        seed (int): Random seed so runs are comparable.
+
+    Returns:
+        tuple: (rows, catalog) where rows are dicts with artist/title/tags/has_links
+               and catalog is a list of (artist, title) tuples.
+    """
+    rng = random.Random(seed)
+    num_artists = max(10, num_rows // 8)
+    artists = [_make_artist(rng, rng.random() < hebrew_ratio) for _ in range(num_artists)]
+    # Zipf-like popularity: a few artists account for many rows
+    weights = [1 / (rank ** 1.1) for rank in range(1, num_artists + 1)]
+
+    rows = []
+    catalog = []
+    for _ in range(num_rows):
+        if rows and rng.random() < duplicate_rate:
+            original = rng.choice(rows)
+            rows.append(dict(original, artist=_variant(rng, original['artist']), title=_variant(rng, original['title'])))
+            continue
+        artist = rng.choices(artists, weights)[0]
+        hebrew = not artist.isascii()
+        title = _make_title(rng, hebrew)
+        row = {
+            'artist': artist,
+            'title': title,
+            'tags': ', '.join(rng.sample(TAGS, 2)),
+            'has_links': rng.random() < existing_link_rate,
+        }
+        if rng.random() < missing_rate:
+            row[rng.choice(['artist', 'title'])] = ''
+        if rng.random() < known_rate:
+            catalog.append((artist, title))
+        rows.append(row)
+    return rows, catalog
+
+
+def _existing_link(row, provider):
+    key = f"{row['artist']}|{row['title']}".encode('utf-8').hex()[:11]
+    if provider == 'spotify':
+        return f"https://open.spotify.com/track/{key}"
+    if provider == 'youtube':
+        return f"https://www.youtube.com/watch?v={key}"
+    return f"https://www.tab4u.com/tabs/songs/{key}.html"
+
+
+def sheet_values(rows, pipeline):
+    """Lay the synthetic rows out the way each pipeline expects its worksheet."""
+    if pipeline == 'link_finder':
+        # A=Artist, B=Song, D=Spotify, E=YouTube, I=Thumbnail, J=Alternative
+        values = [['Artist', 'Song Title', 'Tags', 'spotify', 'youtube', 'f', 'g', 'h', 'thumbnail', 'alternative']]
+        for row in rows:
+            links = [_existing_link(row, 'spotify'), _existing_link(row, 'youtube')] if row['has_links'] else ['', '']
+            values.append([row['artist'], row['title'], row['tags']] + links + [''] * 5)
+        return values
+    if pipeline == 'tab4u':
+        # K = chords URL
+        values = [['Artist', 'Song Title', 'Tags', 'd', 'e', 'Spotify Link', 'YouTube Link', 'h', 'i', 'j', 'chords']]
+        for row in rows:
+            chords = _existing_link(row, 'tab4u') if row['has_links'] else ''
+            values.append([row['artist'], row['title'], row['tags']] + [''] * 7 + [chords])
+        return values
+    if pipeline == 'v0':
+        values = [['Artist', 'Song Title', 'Tags', 'YouTube Link', 'Spotify Link']]
+        for row in rows:
+            links = [_existing_link(row, 'youtube'), _existing_link(row, 'spotify')] if row['has_links'] else ['', '']
+            values.append([row['artist'], row['title'], row['tags']] + links)
+        return values
+    if pipeline in ('organizer', 'organizer_legacy'):
+        # The raw 'songs' tab: blank-header link columns, tags split across two columns
+        values = [['Artist', 'Title', 'tags', 'links', '', '', 'subject', 'הערות']]
+        for row in rows:
+            links = ([_existing_link(row, 'youtube'), _existing_link(row, 'spotify'), _existing_link(row, 'tab4u')]
+                     if row['has_links'] else ['', '', ''])
+            tags = row['tags'].split(', ')
+            values.append([row['artist'], row['title'], tags[0]] + links + [tags[-1], ''])
+        return values
+    raise ValueError(f"Unknown pipeline '{pipeline}'")
+
+
+# ========================================
+# Pipeline runners
+# ========================================
+
+class _NoSleepTime(types.ModuleType):
+    """Replacement for a script's `time` module that skips its polite delays."""
+
+    def __init__(self):
+        super().__init__('time')
+
+    def __getattr__(self, name):
+        return getattr(time, name)
+
+    @staticmethod
+    def sleep(seconds):
+        return None
+
+
+def _import_pipelines():
+    """Import the pipeline scripts (they print and configure logging on import)."""
+    for path in (REPO_DIR, SCRIPTS_DIR):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+    # V0_music_processor imports its API keys from config.py, which only exists where the
+    # scripts run for real; the benchmark never uses the keys, so placeholders stand in
+    if importlib.util.find_spec('config') is None:
+        placeholder = types.ModuleType('config')
+        for name in ('GOOGLE_SHEETS_SERVICE_ACCOUNT_FILE', 'GOOGLE_SHEETS_SPREADSHEET_ID', 'YOUTUBE_API_KEY',
+                     'SPOTIFY_CLIENT_ID', 'SPOTIFY_CLIENT_SECRET', 'LLM_API_KEY'):
+            setattr(placeholder, name, None)
+        sys.modules['config'] = placeholder
+    import YouTube_spotify_Link_Finder
+    import tab_scrapper
+    import V0_music_processor
+    import sheet_organizer
+    return {'link_finder': YouTube_spotify_Link_Finder, 'tab4u': tab_scrapper, 'v0': V0_music_processor,
+            'organizer': sheet_organizer, 'organizer_legacy': sheet_organizer}
+
+
+def run_link_finder(module, worksheet, clients):
+    module.process_worksheet(None, worksheet, clients['spotify'], clients['youtube'], 'both', 'all', [False])
+
+
+def run_tab4u(module, worksheet, clients):
+    scraper = module.Tab4UScraper.__new__(module.Tab4UScraper)
+    scraper.credentials_file = None
+    scraper.gc = None
+    scraper.session = clients['tab4u']
+    scraper.min_sleep = scraper.max_sleep = 0
+    scraper.process_worksheet(worksheet, 2, worksheet.row_count)
+
+
+def run_v0(module, worksheet, clients, batch_size=5):
+    saved = module.get_user_inputs, module.initialize_apis
+    module.get_user_inputs = lambda: ('benchmark', worksheet.title, 2, None, batch_size)
+    module.initialize_apis = lambda spreadsheet_id, worksheet_name: (
+        worksheet, clients['youtube'], clients['spotify'], clients['gemini'])
+    try:
+        module.process_song_data()
+    finally:
+        module.get_user_inputs, module.initialize_apis = saved
+
+
+def run_organizer(module, worksheet, clients):
+    module.consolidate(module.build_dataframe(worksheet.get_all_values()))
+
+
+def run_organizer_legacy(module, worksheet, clients):
+    module.consolidate_legacy(module.build_dataframe(worksheet.get_all_values()))
+
+
+RUNNERS = {'link_finder': run_link_finder, 'tab4u': run_tab4u, 'v0': run_v0,
+           'organizer': run_organizer, 'organizer_legacy': run_organizer_legacy}
+
+
+def benchmark_pipeline(name, module, rows, store, latency, faults_factory, keep_sleeps=False, measure_memory=True):
+    """Run one pipeline over one synthetic sheet and return its measurements."""
+    counter = CallCounter()
+    clients = {
+        'spotify': FakeSpotify(store, latency=latency, faults=faults_factory(), counter=counter),
+        'youtube': FakeYouTube(store, latency=latency, faults=faults_factory(), counter=counter),
+        'tab4u': FakeTab4USession(store, latency=latency, faults=faults_factory(), counter=counter),
+        'gemini': FakeGenerativeModel(store, latency=latency, faults=faults_factory(), counter=counter),
+    }
+    worksheet = LocalWorksheet(sheet_values(rows, name), title='Cleaned_Songs_Data' if name == 'v0' else 'songs',
+                               counter=counter)
+
+    saved_time = getattr(module, 'time', None)
+    if not keep_sleeps and saved_time is not None:
+        module.time = _NoSleepTime()
+    if measure_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        RUNNERS[name](module, worksheet, clients)
+    finally:
+        wall = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1] if measure_memory else None
+        if measure_memory:
+            tracemalloc.stop()
+        if saved_time is not None:
+            module.time = saved_time
+
+    # Requests made, however they were sent; batched YouTube requests share youtube_round_trips
+    api_calls = sum(counter.total_calls(provider) for provider in ('spotify', 'youtube', 'tab4u', 'gemini'))
+    api_calls -= counter.calls.get(('youtube', 'batch'), 0)
+    return {
+        'pipeline': name,
+        'rows': len(rows),
+        'wall_seconds': round(wall, 4),
+        'rows_per_second': round(len(rows) / wall, 2) if wall else None,
+        'api_calls': api_calls,
+        'api_calls_per_row': round(api_calls / len(rows), 4) if rows else 0,
+        'youtube_quota_units': clients['youtube'].quota_units_used(),
+        'youtube_round_trips': clients['youtube'].round_trips(),
+        'peak_memory_mb': round(peak / (1024 * 1024), 2) if peak is not None else None,
+        'calls': counter.snapshot(),
+    }
+
+
+# ========================================
+# Reporting
+# ========================================
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR, capture_output=True,
+                              text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def print_results(results):
+    print(f"\n{'pipeline':<16} {'rows':>8} {'wall s':>9} {'rows/s':>10} {'calls/row':>10} {'peak MB':>9}")
+    print('-' * 67)
+    for result in results:
+        peak = result['peak_memory_mb'] if result['peak_memory_mb'] is not None else '-'
+        print(f"{result['pipeline']:<16} {result['rows']:>8} {result['wall_seconds']:>9.2f} "
+              f"{result['rows_per_second']:>10} {result['api_calls_per_row']:>10} {peak:>9}")
+
+
+def compare_results(current, baseline_path):
+    """Print the rows/sec change of each (pipeline, rows) pair against a saved run."""
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    previous = {(r['pipeline'], r['rows']): r for r in baseline.get('results', [])}
+    print(f"\n📊 Compared with {baseline_path} (commit {baseline.get('git_commit')}):")
+    for result in current:
+        old = previous.get((result['pipeline'], result['rows']))
+        if not old or not old.get('rows_per_second'):
+            print(f"   {result['pipeline']} @ {result['rows']} rows: no baseline")
+            continue
+        speedup = result['rows_per_second'] / old['rows_per_second']
+        print(f"   {result['pipeline']} @ {result['rows']} rows: {old['rows_per_second']} -> "
+              f"{result['rows_per_second']} rows/s ({speedup:.2f}x), "
+              f"calls/row {old['api_calls_per_row']} -> {result['api_calls_per_row']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the link-finding pipelines against offline API stand-ins.")
+    parser.add_argument('--pipelines', nargs='+', choices=PIPELINES, default=list(PIPELINES))
+    parser.add_argument('--rows', nargs='+', type=int, default=[1000], help="Sheet sizes to generate (e.g. 1000 100000)")
+    parser.add_argument('--hebrew-ratio', type=float, default=0.7)
+    parser.add_argument('--duplicate-rate', type=float, default=0.05)
+    parser.add_argument('--known-rate', type=float, default=0.85, help="Share of songs the providers can find")
+    parser.add_argument('--existing-link-rate', type=float, default=0.1)
+    parser.add_argument('--latency', choices=LatencyModel.DISTRIBUTIONS, default='none')
+    parser.add_argument('--latency-mean', type=float, default=0.0, help="Mean simulated API latency in seconds")
+    parser.add_argument('--rate-limit-probability', type=float, default=0.0, help="Chance of an injected HTTP 429")
+    parser.add_argument('--quota-after', type=int, default=None, help="Inject quotaExceeded after N calls per provider")
+    parser.add_argument('--keep-sleeps', action='store_true', help="Keep the scripts' polite delays")
+    parser.add_argument('--no-memory', action='store_true', help="Skip tracemalloc (faster, no peak memory)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help="Results file (default: benchmark_results/benchmark_<timestamp>.json)")
+    parser.add_argument('--compare', help="Earlier results file to compare against")
+    args = parser.parse_args()
+
+    latency = LatencyModel(args.latency, mean=args.latency_mean, seed=args.seed)
+
+    def faults_factory():
+        return FaultInjector(rate_limit_probability=args.rate_limit_probability, quota_after=args.quota_after,
+                             seed=args.seed)
+
+    results = []
+    original_cwd = os.getcwd()
+    original_input = builtins.input
+    # The scripts write logs and progress files into the working directory; keep those out of the repo.
+    with tempfile.TemporaryDirectory() as workdir, open(os.devnull, 'w', encoding='utf-8') as devnull:
+        os.chdir(workdir)
+        builtins.input = lambda prompt='': 'y'
+        try:
+            with contextlib.redirect_stdout(devnull):
+                modules = _import_pipelines()
+            for num_rows in args.rows:
+                rows, catalog = generate_songs(num_rows, hebrew_ratio=args.hebrew_ratio,
+                                               duplicate_rate=args.duplicate_rate, known_rate=args.known_rate,
+                                               existing_link_rate=args.existing_link_rate, seed=args.seed)
+                store = FixtureStore(catalog=catalog)
+                for name in args.pipelines:
+                    print(f"⏱️  {name}: {num_rows} rows...", file=sys.stderr)
+                    with contextlib.redirect_stdout(devnull):
+                        results.append(benchmark_pipeline(name, modules[name], rows, store, latency, faults_factory,
+                                                          keep_sleeps=args.keep_sleeps,
+                                                          measure_memory=not args.no_memory))
+        finally:
+            builtins.input = original_input
+            os.chdir(original_cwd)
+
+    print_results(results)
+
+    report = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'git_commit': _git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'parameters': vars(args),
+        'results': results,
+    }
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 Results saved to {output}")
+
+    if args.compare:
+        compare_results(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
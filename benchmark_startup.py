@@ -0,0 +1,158 @@
+"""
+Startup benchmark: how long a launch takes before the first API request can go out.
+
+Each scenario runs in a fresh interpreter (so nothing is already imported or
+cached in memory) and is timed from process start to exit:
+
+    python               empty interpreter, the floor for every launch
+    eager_imports        what YouTube_spotify_Link_Finder used to do before its first
+                         request: import every library up front, build the YouTube
+                         client with build()
+    link_finder_import   importing the script now (libraries load with their clients)
+    link_finder_ready    import + the YouTube and Spotify clients from api_clients
+                         (+ the Sheets client when credentials.json is present)
+
+No request is sent: Spotify and Google tokens come from their shared caches when
+fresh, and a token fetch would cost the same network round trip in every scenario.
+
+Usage:
+    python benchmark_startup.py
+    python benchmark_startup.py --runs 20 --compare benchmark_results/startup_20250801_120000.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(REPO_DIR, 'benchmark_results')
+CREDS_FILE = os.path.join(REPO_DIR, 'credentials.json')
+
+SCENARIOS = {
+    'python': "pass",
+    'eager_imports': (
+        "import gspread\n"
+        "from google.oauth2.service_account import Credentials\n"
+        "import spotipy\n"
+        "from spotipy.oauth2 import SpotifyClientCredentials\n"
+        "from googleapiclient.discovery import build\n"
+        "from googleapiclient.errors import HttpError\n"
+        "import unidecode\n"
+        "from fuzzywuzzy import fuzz\n"
+        "build('youtube', 'v3', developerKey='benchmark')\n"
+        "spotipy.Spotify(auth_manager=SpotifyClientCredentials(client_id='benchmark', client_secret='benchmark'))\n"
+    ),
+    'link_finder_import': "import YouTube_spotify_Link_Finder\n",
+    'link_finder_ready': (
+        "import os\n"
+        "import YouTube_spotify_Link_Finder as finder\n"
+        "from api_clients import sheets_client, spotify_client, youtube_client\n"
+        "youtube_client('benchmark')\n"
+        "spotify_client('benchmark', 'benchmark')\n"
+        f"if os.path.exists({CREDS_FILE!r}):\n"
+        f"    sheets_client({CREDS_FILE!r}, finder.GOOGLE_SCOPES)\n"
+    ),
+}
+
+
+def time_scenario(code, runs, workdir):
+    """
+    Returns:
+        list: Wall seconds of each run, from spawning the interpreter until it exits.
+    """
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [REPO_DIR, os.environ.get('PYTHONPATH')])),
+               PYTHONDONTWRITEBYTECODE='1')
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        completed = subprocess.run([sys.executable, '-c', code], cwd=workdir, env=env, capture_output=True, text=True)
+        timings.append(time.perf_counter() - started)
+        if completed.returncode != 0:
+            raise RuntimeError(f"Scenario failed:\n{completed.stderr.strip()}")
+    return timings
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR, capture_output=True,
+                              text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def print_results(results):
+    print(f"\n{'scenario':<20} {'median ms':>10} {'min ms':>9} {'max ms':>9}")
+    print('-' * 51)
+    for result in results:
+        print(f"{result['scenario']:<20} {result['median_ms']:>10} {result['min_ms']:>9} {result['max_ms']:>9}")
+
+
+def compare_results(current, baseline_path):
+    """Print the median change of each scenario against a saved run."""
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    previous = {r['scenario']: r for r in baseline.get('results', [])}
+    print(f"\n📊 Compared with {baseline_path} (commit {baseline.get('git_commit')}):")
+    for result in current:
+        old = previous.get(result['scenario'])
+        if not old:
+            print(f"   {result['scenario']}: no baseline")
+            continue
+        print(f"   {result['scenario']}: {old['median_ms']} -> {result['median_ms']} ms "
+              f"({old['median_ms'] / result['median_ms']:.2f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure time-to-first-request of the link finder.")
+    parser.add_argument('--scenarios', nargs='+', choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument('--runs', type=int, default=10, help="Launches per scenario")
+    parser.add_argument('--output', help="Results file (default: benchmark_results/startup_<timestamp>.json)")
+    parser.add_argument('--compare', help="Earlier results file to compare against")
+    args = parser.parse_args()
+
+    results = []
+    # Launches may write logs or caches into the working directory; keep those out of the repo
+    with tempfile.TemporaryDirectory() as workdir:
+        time_scenario(SCENARIOS['link_finder_ready'], 1, workdir)  # Warm the OS file cache and token caches
+        for name in args.scenarios:
+            print(f"⏱️  {name}: {args.runs} launches...", file=sys.stderr)
+            timings = time_scenario(SCENARIOS[name], args.runs, workdir)
+            results.append({
+                'scenario': name,
+                'runs': args.runs,
+                'median_ms': round(statistics.median(timings) * 1000, 1),
+                'min_ms': round(min(timings) * 1000, 1),
+                'max_ms': round(max(timings) * 1000, 1),
+            })
+
+    print_results(results)
+
+    report = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'git_commit': _git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'parameters': vars(args),
+        'results': results,
+    }
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"startup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 Results saved to {output}")
+
+    if args.compare:
+        compare_results(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,277 @@
+"""
+One ranking engine for the search results of every provider.
+
+Each resolver used to judge its results its own way: the link finder's fuzzy
+check_match tiers, the Ultimate Guitar scraper's substring score with 1000/2000
+bonuses, tab4u's three-tier matching, the V0 processor's version and channel
+points, and the YTMusic linker's weighted similarity. Here they share one set of
+features and one confidence:
+
+  * title_score   - title similarity (own script and transliterated), decorations
+                    like "(Live)" or "[Official Video]" stripped
+  * title_tokens  - token-set similarity of the titles (extra words don't count)
+  * title_extends - the title contains the row's, with extra words ("Song Remastered")
+  * title_match   - the title plausibly is the row's song (contained either way,
+                    or title_score at least HIGH_PROBABILITY_THRESHOLD)
+  * artist_score  - best artist_similarity of the credited artists
+  * version       - Original / Live / Remix / Acoustic / Cover / Instrumental / Remastered
+  * official      - an official / VEVO / artist-named channel, or (for tracks
+                    without a channel) the row's artist credited first
+  * rating        - site rating (Ultimate Guitar)
+
+confidence (0-100) is the weighted title and artist similarity. The ranking score
+adds bonuses on top: a larger one for the row's song by the row's artist, so it
+outranks a closer title by someone else (usually another song or a cover), and
+small ones for the preferred version, an official source and the rating, which
+order close candidates.
+
+Features are computed a column at a time over the whole candidate list, each
+distinct string normalized and scored once, so a resolver can fetch a wide top-K
+in one request and rank it locally.
+
+Usage:
+    from candidate_ranking import Candidate, rank
+
+    candidates = [Candidate(url, title, (artist,)) for url, title, artist in results]
+    ranked = rank(candidates, row_artist, row_title, preferred_version='Original')
+    if ranked and ranked[0].confidence >= 80:
+        ...
+"""
+
+import re
+from collections import namedtuple
+
+from fuzzywuzzy import fuzz
+
+from text_matching import artist_similarity, normalize_artist_name, normalize_song_title, title_similarity
+
+TITLE_WEIGHT = 0.6  # Share of the title in confidence; the artist gets the rest
+
+# Tiers of the link finder's match check (match_tier)
+EXACT_MATCH_THRESHOLD = 90        # Title score for an "exact" match, whatever the artist
+HIGH_PROBABILITY_THRESHOLD = 75   # Title and artist scores for a "high_probability" match
+
+# Ranking score bonuses on top of confidence
+ARTIST_BONUS = 20    # artist_score and title_score reach HIGH_PROBABILITY_THRESHOLD (or title_extends)
+VERSION_BONUS = 10   # The detected version is the preferred one
+OFFICIAL_BONUS = 5   # Published by the artist
+RATING_BONUS = 5     # At RATING_CAP or more
+RATING_CAP = 100
+
+MIN_CONTAINED_LENGTH = 3  # Shorter titles must be similar, not just contained
+
+# "(Live)", "[Official Audio]", "(feat. ...)" and the like, which the sheet's titles don't carry
+_TITLE_DECORATIONS = re.compile(r'\s*[\(\[][^\)\]]*[\)\]]')
+
+# The order matters: the first group that matches names the version
+_VERSION_INDICATORS = (
+    ('Live', ('live', 'concert', 'tour')),
+    ('Remix', ('remix', 'mix', 'edit')),
+    ('Acoustic', ('acoustic', 'unplugged')),
+    ('Cover', ('cover', 'version')),
+    ('Instrumental', ('karaoke', 'instrumental')),
+    ('Remastered', ('remaster', 'remastered')),
+)
+_OFFICIAL_CHANNEL_INDICATORS = ('official', 'vevo')
+
+# One search result; artists is a tuple of the credited names
+Candidate = namedtuple('Candidate', 'url title artists channel album rating', defaults=((), '', '', 0))
+# A ranked candidate, its position in the list given to rank(), and its features
+Ranked = namedtuple('Ranked', 'candidate index confidence score title_score title_tokens artist_score '
+                              'title_match version official')
+
+
+def detect_version_type(title, album_name=''):
+    """Detect version type from title and album information"""
+    title_lower = (title or '').lower()
+    for version, indicators in _VERSION_INDICATORS:
+        if any(indicator in title_lower for indicator in indicators):
+            return version
+    album_lower = (album_name or '').lower()
+    if 'live' in album_lower or 'concert' in album_lower:
+        return 'Live'
+    return 'Original'
+
+
+def split_video_title(video_title, channel_title=''):
+    """
+    Artist and song of a YouTube video, from "Artist - Song" or "Song by Artist" titles.
+
+    Returns:
+        tuple: (artist, song); the channel and the whole title when the title doesn't split.
+    """
+    parsed_artist = channel_title
+    parsed_song = video_title
+
+    if ' - ' in video_title:
+        parts = video_title.split(' - ', 1)
+        parsed_artist = parts[0].strip()
+        parsed_song = parts[1].strip()
+    elif ' by ' in video_title:
+        parts = video_title.split(' by ', 1)
+        parsed_song = parts[0].strip()
+        parsed_artist = parts[1].strip()
+
+    # If the parsed artist/song are very short or generic, fall back to broader parts
+    if len(parsed_artist) < 3 and channel_title:
+        parsed_artist = channel_title
+    if len(parsed_song) < 3 and video_title:
+        parsed_song = video_title
+    return parsed_artist, parsed_song
+
+
+def from_youtube_item(item):
+    """Candidate of a search.list item (id/videoId and snippet title/channelTitle)."""
+    snippet = item['snippet']
+    artist, song = split_video_title(snippet['title'], snippet['channelTitle'])
+    return Candidate(f"https://www.youtube.com/watch?v={item['id']['videoId']}", song, (artist,),
+                     channel=snippet['channelTitle'])
+
+
+def from_spotify_track(track):
+    """Candidate of a Spotify track object."""
+    return Candidate(track['external_urls']['spotify'], track['name'],
+                     tuple(artist['name'] for artist in track['artists']),
+                     album=(track.get('album') or {}).get('name') or '')
+
+
+def from_ytmusic_result(result):
+    """Candidate of a YTMusic song search result (url holds the videoId)."""
+    return Candidate(result.get('videoId') or '', result.get('title') or '',
+                     tuple(artist.get('name') or '' for artist in result.get('artists') or []))
+
+
+def _column(values, score):
+    """score(value) for each value, computed once per distinct value."""
+    scores = {}
+    for value in values:
+        if value not in scores:
+            scores[value] = score(value)
+    return [scores[value] for value in values]
+
+
+def _contains(longer, shorter):
+    return len(shorter) >= MIN_CONTAINED_LENGTH and shorter in longer
+
+
+def features(candidates, artist, song_title, artist_spellings=()):
+    """
+    Feature columns of the candidates against the row.
+
+    Args:
+        candidates (list): Candidate records.
+        artist (str): The row's artist.
+        song_title (str): The row's song title.
+        artist_spellings (iterable): Other spellings of the artist (e.g. the one the
+            query used), scored like the row's own.
+
+    Returns:
+        dict: Feature name -> list with one value per candidate.
+    """
+    spellings = [name for name in dict.fromkeys([artist, *artist_spellings]) if name]
+    target_title = normalize_song_title(song_title)
+    target_latin = normalize_artist_name(song_title)
+    lowered = {name.lower() for name in spellings}
+    squeezed = [name.lower().replace(' ', '') for name in spellings]
+
+    titles = [candidate.title or '' for candidate in candidates]
+    undecorated = [_TITLE_DECORATIONS.sub('', title) or title for title in titles]
+    title_score = _column(undecorated, lambda title: max(
+        title_similarity(target_title, normalize_song_title(title)),
+        title_similarity(target_latin, normalize_artist_name(title))))
+    title_tokens = _column(titles, lambda title: fuzz.token_set_ratio(target_title, normalize_song_title(title)))
+    title_extends = _column(titles, lambda title: _contains(normalize_song_title(title), target_title))
+    title_within = _column(titles, lambda title: _contains(target_title, normalize_song_title(title)))
+
+    names = dict.fromkeys(name for candidate in candidates for name in candidate.artists)
+    name_score = {name: max([artist_similarity(spelling, name) for spelling in spellings] or [0]) for name in names}
+    artist_score = [max([name_score[name] for name in candidate.artists] or [0]) for candidate in candidates]
+
+    def published_by_artist(candidate):
+        if candidate.channel:
+            channel = candidate.channel.lower()
+            return any(indicator in channel for indicator in (*_OFFICIAL_CHANNEL_INDICATORS, *squeezed) if indicator)
+        return bool(candidate.artists) and candidate.artists[0].lower() in lowered
+
+    return {
+        'title_score': title_score,
+        'title_tokens': title_tokens,
+        'artist_score': artist_score,
+        'title_extends': title_extends,
+        'title_match': [extends or within or score >= HIGH_PROBABILITY_THRESHOLD
+                        for extends, within, score in zip(title_extends, title_within, title_score)],
+        'version': [detect_version_type(candidate.title, candidate.album) for candidate in candidates],
+        'official': [published_by_artist(candidate) for candidate in candidates],
+        'rating': [candidate.rating or 0 for candidate in candidates],
+    }
+
+
+def _confidence(title_score, artist_score, artist, song_title):
+    if not artist:
+        return title_score
+    if not song_title:
+        return artist_score
+    return round(TITLE_WEIGHT * title_score + (1 - TITLE_WEIGHT) * artist_score)
+
+
+def rank(candidates, artist, song_title, preferred_version=None, artist_spellings=(), require_title_match=False):
+    """
+    Rank candidates against the row, best first.
+
+    Args:
+        candidates (list): Candidate records, in the provider's order (kept between equal scores).
+        artist (str): The row's artist.
+        song_title (str): The row's song title.
+        preferred_version (str): Version that earns VERSION_BONUS; None for no preference.
+        artist_spellings (iterable): Other spellings of the artist.
+        require_title_match (bool): Leave out candidates whose title doesn't match the row's.
+
+    Returns:
+        list: Ranked records, highest score (then confidence) first.
+    """
+    candidates = list(candidates)
+    columns = features(candidates, artist, song_title, artist_spellings)
+    ranked = []
+    for index, candidate in enumerate(candidates):
+        title_match = columns['title_match'][index]
+        if require_title_match and not title_match:
+            continue
+        confidence = _confidence(columns['title_score'][index], columns['artist_score'][index], artist, song_title)
+        by_artist = (columns['artist_score'][index] >= HIGH_PROBABILITY_THRESHOLD
+                     and (columns['title_extends'][index]
+                          or columns['title_score'][index] >= HIGH_PROBABILITY_THRESHOLD))
+        version, official = columns['version'][index], columns['official'][index]
+        score = (confidence
+                 + (ARTIST_BONUS if by_artist else 0)
+                 + (VERSION_BONUS if preferred_version and version == preferred_version else 0)
+                 + (OFFICIAL_BONUS if official else 0)
+                 + RATING_BONUS * min(columns['rating'][index], RATING_CAP) / RATING_CAP)
+        ranked.append(Ranked(candidate, index, confidence, score, columns['title_score'][index],
+                             columns['title_tokens'][index], columns['artist_score'][index], title_match,
+                             version, official))
+    ranked.sort(key=lambda entry: (entry.score, entry.confidence), reverse=True)
+    return ranked
+
+
+def best(candidates, artist, song_title, **kwargs):
+    """The top Ranked of rank(...), or None when nothing is left."""
+    ranked = rank(candidates, artist, song_title, **kwargs)
+    return ranked[0] if ranked else None
+
+
+def match_tier(title_score, artist_score):
+    """
+    How sure a candidate is the row's song; the song title counts most.
+
+    Args:
+        title_score (int): Token-set similarity of the titles (a Ranked's title_tokens).
+        artist_score (int): Similarity of the artists.
+
+    Returns:
+        str: "exact", "high_probability" or "none".
+    """
+    if title_score >= EXACT_MATCH_THRESHOLD:
+        return "exact"
+    if title_score >= HIGH_PROBABILITY_THRESHOLD and artist_score >= HIGH_PROBABILITY_THRESHOLD:
+        return "high_probability"
+    return "none"
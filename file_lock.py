@@ -0,0 +1,101 @@
+"""
+Cross-process file lock (fcntl on Linux/macOS, msvcrt on Windows).
+
+The lock is advisory: it only excludes other processes that take the same lock
+file. It is reentrant within a thread, so a function holding it can call
+another that takes it too.
+
+Usage:
+    from file_lock import FileLock
+
+    with FileLock('shared_file.json.lock'):
+        data = read()
+        ...
+        write(data)
+"""
+
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+DEFAULT_TIMEOUT = 30  # seconds
+POLL_INTERVAL = 0.05  # seconds between attempts while another process holds the lock
+
+
+class FileLock:
+    """Exclusive lock on a lock file, shared by every process that uses the same path."""
+
+    def __init__(self, path, timeout=DEFAULT_TIMEOUT):
+        """
+        Args:
+            path (str): Lock file; created if missing and never deleted.
+            timeout (float): Seconds to wait for the lock before raising TimeoutError
+                (None waits forever).
+        """
+        self.path = path
+        self.timeout = timeout
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._file = None
+
+    def _try_lock(self):
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            return False
+
+    def acquire(self):
+        if not self._thread_lock.acquire(timeout=-1 if self.timeout is None else self.timeout):
+            raise TimeoutError(f"Timed out waiting for lock '{self.path}'")
+        if self._depth:
+            self._depth += 1
+            return self
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._file = open(self.path, 'a+')
+            deadline = None if self.timeout is None else time.monotonic() + self.timeout
+            while not self._try_lock():
+                if deadline is not None and time.monotonic() >= deadline:
+                    raise TimeoutError(f"Timed out waiting for lock '{self.path}'")
+                time.sleep(POLL_INTERVAL)
+        except BaseException:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            self._thread_lock.release()
+            raise
+        self._depth = 1
+        return self
+
+    def release(self):
+        self._depth -= 1
+        if not self._depth:
+            try:
+                if fcntl is not None:
+                    fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+                else:
+                    self._file.seek(0)
+                    msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+            finally:
+                self._file.close()
+                self._file = None
+        self._thread_lock.release()
+
+    def __enter__(self):
+        return self.acquire()
+
+    def __exit__(self, *exc):
+        self.release()
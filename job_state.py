@@ -0,0 +1,219 @@
+"""
+Per-row, per-provider job state shared by the linking and scraping scripts.
+
+One SQLite file (job_state.db, next to this module, so every script finds the same
+one whatever directory it runs from) replaces the scattered resume files
+(progress.log, youtube_quota_log.txt, processing_state.json). For every
+(sheet, row, provider) it keeps:
+
+  * status      - found / not_found / high_probability / existing / skipped / done
+                  (finished) or error / quota (tried again on the next run)
+  * attempts    - how many times the row was tried with its current contents
+  * last_error  - the last failure message
+  * fingerprint - hash of the row's input cells when it was processed, so a row
+                  whose artist / title was edited (or that moved after a re-sort)
+                  is processed again
+  * result      - the value written to the sheet, if any
+
+A script loads the state of a sheet/provider once and then checks each row
+against an in-memory dict, so skipping finished rows costs O(1) and never
+re-reads or re-checks the sheet. Rows are recorded only after their value is
+in the sheet, so a crash or quota stop resumes exactly at the first row whose
+result was not written.
+
+Usage:
+    from job_state import JobState, row_fingerprint
+
+    with JobState() as state:
+        sheet = state.sheet_key(worksheet)
+        for row_number, row in enumerate(values[1:], start=2):
+            fingerprint = row_fingerprint(row[0], row[1])
+            if state.is_finished(sheet, row_number, 'tab4u', fingerprint):
+                continue
+            ...
+            state.record(sheet, row_number, 'tab4u', 'found', fingerprint, result=url)
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter, namedtuple
+
+JOB_STATE_DB = os.environ.get('SHIRLI_JOB_STATE',
+                              os.path.join(os.path.dirname(os.path.abspath(__file__)), 'job_state.db'))
+
+# Statuses that mean "nothing left to do for this row"; anything else is retried
+FINISHED_STATUSES = frozenset({'found', 'not_found', 'high_probability', 'existing', 'skipped', 'done'})
+MAX_ATTEMPTS = 3  # Rows that failed this many times with the same contents are given up on
+
+RowState = namedtuple('RowState', 'status attempts last_error fingerprint result updated_at')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS row_state (
+    sheet       TEXT    NOT NULL,
+    row         INTEGER NOT NULL,
+    provider    TEXT    NOT NULL,
+    status      TEXT    NOT NULL,
+    attempts    INTEGER NOT NULL DEFAULT 0,
+    last_error  TEXT,
+    fingerprint TEXT,
+    result      TEXT,
+    updated_at  REAL    NOT NULL,
+    PRIMARY KEY (sheet, provider, row)
+) WITHOUT ROWID
+"""
+
+_UPSERT = """
+INSERT INTO row_state (sheet, row, provider, status, attempts, last_error, fingerprint, result, updated_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (sheet, provider, row) DO UPDATE SET
+    status = excluded.status, attempts = excluded.attempts, last_error = excluded.last_error,
+    fingerprint = excluded.fingerprint, result = excluded.result, updated_at = excluded.updated_at
+"""
+
+
+def row_fingerprint(*values):
+    """
+    Hash of a row's input cells (surrounding whitespace ignored).
+
+    Returns:
+        str: 16 hex characters.
+    """
+    text = '\x1f'.join('' if value is None else str(value).strip() for value in values)
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=8).hexdigest()
+
+
+class JobState:
+    """SQLite-backed per-row state; safe to share between threads and between processes."""
+
+    def __init__(self, path=JOB_STATE_DB, max_attempts=MAX_ATTEMPTS):
+        """
+        Args:
+            path (str): Database file, or ':memory:' for a throwaway store.
+            max_attempts (int): Failed attempts (with unchanged row contents) after which a row is skipped.
+        """
+        self.path = path
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._cache = {}  # (sheet, provider) -> {row: RowState}
+        # isolation_level=None: explicit transactions only, so record_many is one commit
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        if path != ':memory:':
+            self._conn.execute('PRAGMA journal_mode=WAL')  # Readers in other processes don't block writers
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(_SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def sheet_key(worksheet, spreadsheet_id=None):
+        """
+        Key of a worksheet: '<spreadsheet id>/<worksheet title>', or just the title when
+        the spreadsheet is unknown.
+        """
+        spreadsheet_id = spreadsheet_id or getattr(worksheet, 'spreadsheet_id', None)
+        return f"{spreadsheet_id}/{worksheet.title}" if spreadsheet_id else worksheet.title
+
+    def rows(self, sheet, provider):
+        """
+        State of every recorded row of a sheet for one provider (loaded once, then cached).
+
+        Returns:
+            dict: row number -> RowState
+        """
+        key = (sheet, provider)
+        with self._lock:
+            if key not in self._cache:
+                cursor = self._conn.execute(
+                    'SELECT row, status, attempts, last_error, fingerprint, result, updated_at '
+                    'FROM row_state WHERE sheet = ? AND provider = ?', key)
+                self._cache[key] = {row[0]: RowState(*row[1:]) for row in cursor}
+            return self._cache[key]
+
+    def get(self, sheet, row, provider):
+        """The RowState of one row, or None if it was never recorded."""
+        return self.rows(sheet, provider).get(row)
+
+    def is_finished(self, sheet, row, provider, fingerprint=None):
+        """
+        Whether a row needs no more work: it finished (or failed max_attempts times) and,
+        when a fingerprint is given, its contents haven't changed since.
+        """
+        state = self.rows(sheet, provider).get(row)
+        if state is None:
+            return False
+        if fingerprint is not None and state.fingerprint != fingerprint:
+            return False
+        return state.status in FINISHED_STATUSES or (state.status == 'error' and state.attempts >= self.max_attempts)
+
+    def record(self, sheet, row, provider, status, fingerprint=None, error=None, result=None):
+        """Record the outcome of one row. Write it only once its value is in the sheet."""
+        self.record_many(sheet, provider, [(row, status, fingerprint, error, result)])
+
+    def record_many(self, sheet, provider, entries):
+        """
+        Record several rows in one transaction.
+
+        Args:
+            entries (iterable): (row, status, fingerprint, error, result) tuples; trailing
+                items may be left out.
+        """
+        rows = self.rows(sheet, provider)
+        now = time.time()
+        params, states = [], {}
+        for entry in entries:
+            row, status, fingerprint, error, result = (tuple(entry) + (None,) * 4)[:5]
+            previous = states.get(row) or rows.get(row)
+            # Attempts count tries of the same contents; an edited row starts over
+            attempts = 1
+            if previous is not None and previous.fingerprint == fingerprint and previous.status not in FINISHED_STATUSES:
+                attempts = previous.attempts + 1
+            states[row] = RowState(status, attempts, error, fingerprint, result, now)
+            params.append((sheet, row, provider, status, attempts, error, fingerprint, result, now))
+        if not params:
+            return
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                self._conn.executemany(_UPSERT, params)
+                self._conn.execute('COMMIT')
+            except BaseException:
+                self._conn.execute('ROLLBACK')
+                raise
+            rows.update(states)
+
+    def summary(self, sheet=None, provider=None):
+        """
+        Returns:
+            Counter: status -> number of rows, optionally limited to one sheet and/or provider.
+        """
+        query, params = 'SELECT status, COUNT(*) FROM row_state WHERE 1 = 1', []
+        if sheet is not None:
+            query, params = query + ' AND sheet = ?', params + [sheet]
+        if provider is not None:
+            query, params = query + ' AND provider = ?', params + [provider]
+        with self._lock:
+            return Counter(dict(self._conn.execute(query + ' GROUP BY status', params).fetchall()))
+
+    def clear(self, sheet=None, provider=None):
+        """Forget recorded rows (all of them, or one sheet's and/or one provider's) to start over."""
+        query, params = 'DELETE FROM row_state WHERE 1 = 1', []
+        if sheet is not None:
+            query, params = query + ' AND sheet = ?', params + [sheet]
+        if provider is not None:
+            query, params = query + ' AND provider = ?', params + [provider]
+        with self._lock:
+            self._conn.execute(query, params)
+            for key in list(self._cache):
+                if (sheet is None or key[0] == sheet) and (provider is None or key[1] == provider):
+                    del self._cache[key]
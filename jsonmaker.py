@@ -44,10 +44,19 @@ def extract_curl_headers(curl_command: str) -> dict:
         header_name = match.group(1).strip()
         header_value = match.group(2).strip()
         headers[header_name] = header_value
+
+    # Browsers' "Copy as cURL" passes the cookies with -b instead of a cookie header
+    cookie_match = re.search(r"(?:-b|--cookie)\s+'([^']+)'", curl_command)
+    if cookie_match and 'cookie' not in {name.lower() for name in headers}:
+        headers['cookie'] = cookie_match.group(1).strip()
     return headers
 
-# Your example cURL command (it's long, so good for testing)
-curl_command = """
+
+if __name__ == '__main__':
+    import json
+
+    # Your example cURL command (it's long, so good for testing)
+    curl_command = """
 curl 'https://music.youtube.com/browse' \
   -H 'authority: music.youtube.com' \
   -H 'accept: */*' \
@@ -63,8 +72,7 @@ curl 'https://music.youtube.com/browse' \
   --compressed
 """
 
-extracted_headers = extract_curl_headers(curl_command)
+    extracted_headers = extract_curl_headers(curl_command)
 
-# Print the extracted headers for verification
-import json
-print(json.dumps(extracted_headers, indent=4))
\ No newline at end of file
+    # Print the extracted headers for verification
+    print(json.dumps(extracted_headers, indent=4))
\ No newline at end of file
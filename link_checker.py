@@ -0,0 +1,217 @@
+"""
+Concurrent link verification with a TTL cache.
+
+Each link gets the cheapest probe its provider answers reliably:
+
+  * YouTube / YouTube Music - the oEmbed endpoint (YouTube often rejects HEAD);
+    401/403 means the video exists but can't be embedded, which still counts as alive
+  * Spotify                 - the open.spotify.com oEmbed endpoint
+  * tab4u / anything else   - a streamed GET of the page (headers only, the body
+    is never downloaded); redirects back to the site's front page count as broken
+
+Results are cached per canonical URL (youtu.be/..., watch?v=... and
+music.youtube.com links of one video share an entry) with a TTL, so re-testing
+a request or pre-verifying a whole list costs nothing for links already seen.
+
+Usage:
+    from link_checker import LinkChecker
+
+    checker = LinkChecker()
+    results = checker.check_many([youtube_url, spotify_url, tab4u_url])
+    for url, result in results.items():
+        print(url, result.ok, result.detail)
+"""
+
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse, urlunparse
+
+import requests
+
+import metrics
+from text_matching import canonical_link_id
+
+YOUTUBE_OEMBED_URL = 'https://www.youtube.com/oembed'
+SPOTIFY_OEMBED_URL = 'https://open.spotify.com/oembed'
+
+PROBE_TIMEOUT = (3.05, 5)     # (connect, read) seconds
+MAX_WORKERS = 8
+OK_TTL_SECONDS = 24 * 3600    # Live links are re-checked daily
+BROKEN_TTL_SECONDS = 3600     # Broken links may be fixed upstream; re-check sooner
+USER_AGENT = 'Mozilla/5.0 (compatible; shirli-link-checker/1.0)'
+
+# One verification result. ok is True/False, or None when the check itself failed (timeout,
+# DNS, 5xx) - those are not cached, since they say nothing about the link.
+LinkStatus = namedtuple('LinkStatus', 'url canonical provider ok status detail checked_at')
+
+_thread_local = threading.local()
+
+
+def _session():
+    """One requests.Session per worker thread (sessions aren't thread-safe, but reuse connections)."""
+    session = getattr(_thread_local, 'session', None)
+    if session is None:
+        session = requests.Session()
+        session.headers['User-Agent'] = USER_AGENT
+        _thread_local.session = session
+    return session
+
+
+def canonicalize(url):
+    """
+    Cache key of a link.
+
+    Returns:
+        tuple: (provider, canonical URL). provider is 'youtube', 'spotify', 'tab4u' or 'web'.
+    """
+    url = (url or '').strip()
+    link_id = canonical_link_id(url)
+    if link_id:
+        provider, item_id = link_id
+        if provider == 'youtube':
+            return provider, f'https://www.youtube.com/watch?v={item_id}'
+        return provider, f'https://open.spotify.com/track/{item_id}'
+
+    parsed = urlparse(url if '://' in url else f'https://{url}')
+    host = parsed.netloc.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    path = parsed.path.rstrip('/') or '/'
+    canonical = urlunparse((parsed.scheme.lower(), host, path, '', parsed.query, ''))
+    if host.endswith('spotify.com'):
+        return 'spotify', canonical
+    if host.endswith(('youtube.com', 'youtu.be')):
+        return 'youtube', canonical
+    return ('tab4u' if host.endswith('tab4u.com') else 'web'), canonical
+
+
+def _status(url, canonical, provider, ok, status, detail):
+    return LinkStatus(url, canonical, provider, ok, status, detail, time.time())
+
+
+def _probe_oembed(url, canonical, provider):
+    endpoint = YOUTUBE_OEMBED_URL if provider == 'youtube' else SPOTIFY_OEMBED_URL
+    with metrics.timed(provider, 'oembed'):
+        response = _session().get(endpoint, params={'url': canonical, 'format': 'json'}, timeout=PROBE_TIMEOUT)
+    if response.status_code == 200:
+        title = response.json().get('title', '')
+        return _status(url, canonical, provider, True, 200, f"OK ({title})" if title else 'OK')
+    if provider == 'youtube' and response.status_code in (401, 403):
+        return _status(url, canonical, provider, True, response.status_code, 'OK (embedding disabled)')
+    if response.status_code in (400, 404):
+        return _status(url, canonical, provider, False, response.status_code, 'Not found')
+    return _status(url, canonical, provider, None, response.status_code, f'Error {response.status_code}')
+
+
+def _probe_page(url, canonical, provider):
+    target = url if '://' in url else f'https://{url}'
+    with metrics.timed(provider, 'page'):
+        # stream=True: only the status line and headers are read before the connection is released
+        with _session().get(target, allow_redirects=True, stream=True, timeout=PROBE_TIMEOUT) as response:
+            status, final_url = response.status_code, response.url
+    if status == 200:
+        requested_path = urlparse(target).path.rstrip('/')
+        if requested_path and not urlparse(final_url).path.rstrip('/'):
+            return _status(url, canonical, provider, False, status, 'Redirected to the front page')
+        return _status(url, canonical, provider, True, status, 'OK')
+    if status in (404, 410):
+        return _status(url, canonical, provider, False, status, 'Not found')
+    if status in (401, 403, 429) or status >= 500:
+        return _status(url, canonical, provider, None, status, f'Error {status}')
+    return _status(url, canonical, provider, False, status, f'Error {status}')
+
+
+def probe(url):
+    """
+    Check one link without the cache.
+
+    Returns:
+        LinkStatus
+    """
+    provider, canonical = canonicalize(url)
+    try:
+        if provider in ('youtube', 'spotify') and canonical_link_id(canonical):
+            return _probe_oembed(url, canonical, provider)
+        if provider == 'spotify' and urlparse(canonical).netloc == 'open.spotify.com':
+            return _probe_oembed(url, canonical, provider)  # Albums / playlists have oEmbed too
+        return _probe_page(url, canonical, provider)
+    except requests.exceptions.RequestException as e:
+        return _status(url, canonical, provider, None, None, f'Failed ({type(e).__name__})')
+    except ValueError as e:  # Malformed URL or oEmbed body
+        return _status(url, canonical, provider, None, None, f'Failed ({e})')
+
+
+class LinkChecker:
+    """Checks links concurrently, caching results per canonical URL until their TTL runs out."""
+
+    def __init__(self, max_workers=MAX_WORKERS, ok_ttl=OK_TTL_SECONDS, broken_ttl=BROKEN_TTL_SECONDS):
+        self.max_workers = max_workers
+        self.ok_ttl = ok_ttl
+        self.broken_ttl = broken_ttl
+        self._cache = {}  # canonical URL -> LinkStatus
+        self._lock = threading.Lock()
+
+    def cached(self, url):
+        """The cached result for url, or None if it was never checked or has expired."""
+        _, canonical = canonicalize(url)
+        with self._lock:
+            result = self._cache.get(canonical)
+        if result is None:
+            return None
+        ttl = self.ok_ttl if result.ok else self.broken_ttl
+        if time.time() - result.checked_at > ttl:
+            return None
+        return result._replace(url=url)
+
+    def _store(self, result):
+        if result.ok is not None:
+            with self._lock:
+                self._cache[result.canonical] = result
+
+    def check(self, url):
+        result = self.cached(url)
+        metrics.record_cache('link_checker', hit=result is not None)
+        if result is None:
+            result = probe(url)
+            self._store(result)
+        return result
+
+    def check_many(self, urls, cancelled=None):
+        """
+        Check several links at once; each canonical URL is probed at most once.
+
+        Args:
+            urls (iterable): Links to check; empty values are skipped.
+            cancelled (threading.Event): Optional; once set, links not yet probed are skipped.
+
+        Returns:
+            dict: url -> LinkStatus, for every link that was checked.
+        """
+        results = {}
+        to_probe = {}  # canonical -> urls sharing it
+        for url in dict.fromkeys(url.strip() for url in urls if url and url.strip()):
+            result = self.cached(url)
+            metrics.record_cache('link_checker', hit=result is not None)
+            if result is not None:
+                results[url] = result
+            else:
+                to_probe.setdefault(canonicalize(url)[1], []).append(url)
+        if not to_probe:
+            return results
+
+        def run(url):
+            if cancelled is not None and cancelled.is_set():
+                return None
+            return probe(url)
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(to_probe))) as executor:
+            probes = executor.map(run, [urls[0] for urls in to_probe.values()])
+            for same_links, result in zip(to_probe.values(), probes):
+                if result is None:
+                    continue
+                self._store(result)
+                for url in same_links:
+                    results[url] = result._replace(url=url)
+        return results
@@ -0,0 +1,313 @@
+"""
+Catalog-wide link health check, meant to run on a schedule (cron / Task Scheduler).
+
+Reads every link in the link columns (D Spotify, E YouTube, F Ultimate Guitar,
+K tab4u by default), reduces them to canonical IDs and verifies each ID once:
+
+  * YouTube videos - videos.list(part=status), 50 IDs per call (1 quota unit each)
+  * Spotify tracks - sp.tracks, 50 IDs per call
+  * tab4u / Ultimate Guitar / other pages - concurrent HTTP checks (link_checker.py)
+
+A 10k-link sweep therefore costs a few hundred API calls. The result of each
+row ('OK', or the columns of its dead / unverifiable links) is written to a
+status column with a single update per worksheet.
+
+Usage:
+    python link_health_monitor.py
+    python link_health_monitor.py --worksheet songs1 songs2 --status-column L --dry-run
+
+Needs YOUTUBE_API_KEY, SPOTIFY_CLIENT_ID and SPOTIFY_CLIENT_SECRET in the
+environment (or a .env file).
+"""
+
+import argparse
+import os
+import sys
+from datetime import datetime
+
+import gspread
+import spotipy
+from dotenv import load_dotenv
+from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
+from oauth2client.service_account import ServiceAccountCredentials
+
+import metrics
+import sheets_governor
+from link_checker import LinkChecker
+from sheet_reader import read_rows
+from spotify_token_cache import SharedClientCredentials
+from text_matching import canonical_link_id
+
+load_dotenv()
+
+# --- Configuration ---
+CREDS_FILE = 'credentials.json'
+SPREADSHEET_ID = '10BK4b1_w1iInxgDL-cDgWtK776PsqxXlspZqjNFrj3Y'
+LINK_COLUMNS = ('D', 'E', 'F', 'K')
+STATUS_COLUMN = 'L'
+STATUS_HEADER = 'Link Health'
+HEADER_ROWS = 1
+
+BATCH_SIZE = 50  # Maximum IDs per videos.list / sp.tracks call
+
+# Cell values that aren't links
+NOT_LINKS = {'', 'not found', 'n/a', '-'}
+
+
+def _column_index(letters):
+    index = 0
+    for char in letters.upper():
+        index = index * 26 + ord(char) - ord('A') + 1
+    return index - 1
+
+
+def _is_quota_error(error):
+    return isinstance(error, HttpError) and error.resp.status == 403 and 'quota' in str(error).lower()
+
+
+def collect_links(values, columns=LINK_COLUMNS, header_rows=HEADER_ROWS):
+    """
+    Extract the links of a worksheet.
+
+    Args:
+        values (list): worksheet.get_all_values().
+        columns (iterable): Column letters holding links.
+        header_rows (int): Rows to skip at the top.
+
+    Returns:
+        list: (row number, column letter, url, (kind, key)) tuples, where kind is
+        'youtube' or 'spotify' (key = video / track ID) or 'page' (key = url).
+    """
+    links = []
+    for row_number, row in enumerate(values[header_rows:], start=header_rows + 1):
+        for column in columns:
+            index = _column_index(column)
+            url = row[index].strip() if index < len(row) else ''
+            if url.lower() in NOT_LINKS:
+                continue
+            link_id = canonical_link_id(url)
+            if link_id is None and not url.startswith(('http://', 'https://', 'www.')):
+                continue  # Free text, not a link
+            links.append((row_number, column, url, link_id or ('page', url)))
+    return links
+
+
+def check_youtube_videos(youtube, video_ids):
+    """
+    Returns:
+        dict: video ID -> True (available), False (deleted / private / rejected) or
+        None (not verified, e.g. after the quota ran out).
+    """
+    results = {}
+    video_ids = list(video_ids)
+    for start in range(0, len(video_ids), BATCH_SIZE):
+        chunk = video_ids[start:start + BATCH_SIZE]
+        try:
+            with metrics.timed('youtube', 'videos.list'):
+                response = youtube.videos().list(part='status', id=','.join(chunk), maxResults=BATCH_SIZE).execute()
+        except HttpError as e:
+            if _is_quota_error(e):
+                print(f"⚠️ YouTube quota exceeded; {len(video_ids) - start} videos left unverified.")
+                results.update((video_id, None) for video_id in video_ids[start:])
+                break
+            print(f"⚠️ videos.list failed for {len(chunk)} videos: {e}")
+            results.update((video_id, None) for video_id in chunk)
+            continue
+
+        found = {}
+        for item in response.get('items', []):
+            status = item.get('status', {})
+            found[item['id']] = (status.get('uploadStatus', 'processed') in ('processed', 'uploaded')
+                                 and status.get('privacyStatus', 'public') != 'private')
+        for video_id in chunk:
+            results[video_id] = found.get(video_id, False)  # Missing from the response: deleted or private
+    return results
+
+
+def check_spotify_tracks(sp, track_ids):
+    """
+    Returns:
+        dict: track ID -> True (exists), False (gone) or None (not verified).
+    """
+    results = {}
+    track_ids = list(track_ids)
+    for start in range(0, len(track_ids), BATCH_SIZE):
+        chunk = track_ids[start:start + BATCH_SIZE]
+        try:
+            with metrics.timed('spotify', 'tracks'):
+                response = sp.tracks(chunk)
+        except Exception as e:
+            print(f"⚠️ Spotify tracks lookup failed for {len(chunk)} tracks: {e}")
+            results.update((track_id, None) for track_id in chunk)
+            continue
+        for track_id, track in zip(chunk, response.get('tracks', [])):
+            results[track_id] = track is not None
+    return results
+
+
+def check_pages(urls, checker=None):
+    """
+    Returns:
+        dict: url -> True / False / None, checked concurrently.
+    """
+    checker = checker or LinkChecker()
+    return {url: result.ok for url, result in checker.check_many(urls).items()}
+
+
+def verify_links(links, youtube, sp, checker=None):
+    """
+    Verify every distinct link target once.
+
+    Returns:
+        dict: (kind, key) -> True / False / None.
+    """
+    targets = {kind: [] for kind in ('youtube', 'spotify', 'page')}
+    for _, _, _, target in links:
+        targets[target[0]].append(target[1])
+    targets = {kind: list(dict.fromkeys(keys)) for kind, keys in targets.items()}
+    print(f"🔗 {len(links)} links -> {len(targets['youtube'])} videos, {len(targets['spotify'])} tracks, "
+          f"{len(targets['page'])} pages")
+
+    results = {}
+    if targets['youtube']:
+        results.update((('youtube', key), ok) for key, ok in check_youtube_videos(youtube, targets['youtube']).items())
+    if targets['spotify']:
+        results.update((('spotify', key), ok) for key, ok in check_spotify_tracks(sp, targets['spotify']).items())
+    if targets['page']:
+        results.update((('page', key), ok) for key, ok in check_pages(targets['page'], checker).items())
+    return results
+
+
+def row_statuses(links, results):
+    """
+    Returns:
+        dict: row number -> 'OK', or e.g. 'DEAD: E; UNVERIFIED: K'.
+    """
+    problems = {}
+    rows = set()
+    for row, column, _, target in links:
+        rows.add(row)
+        ok = results.get(target)
+        if ok is not True:
+            problems.setdefault(row, {}).setdefault('DEAD' if ok is False else 'UNVERIFIED', []).append(column)
+    statuses = {}
+    for row in rows:
+        if row not in problems:
+            statuses[row] = 'OK'
+        else:
+            statuses[row] = '; '.join(f"{state}: {', '.join(columns)}" for state, columns in sorted(problems[row].items()))
+    return statuses
+
+
+def status_update(statuses, status_column, last_row, header_rows=HEADER_ROWS):
+    """
+    One range covering the status column from the header to the last row, so the
+    whole worksheet is written in a single call (rows without links are blanked).
+    """
+    values = [[f"{STATUS_HEADER} ({datetime.now():%Y-%m-%d})"]] + [[''] for _ in range(header_rows - 1)]
+    values += [[statuses.get(row, '')] for row in range(header_rows + 1, last_row + 1)]
+    return {'range': f"{status_column}1:{status_column}{last_row}", 'values': values}
+
+
+def check_worksheet(worksheet, youtube, sp, columns, status_column, checker=None, dry_run=False, force=False):
+    """
+    Check one worksheet and write its status column.
+
+    Returns:
+        dict: Counts of 'links', 'rows', 'ok', 'dead' and 'unverified' rows.
+    """
+    values = read_rows(worksheet, list(columns) + [status_column])
+    if not values:
+        print(f"⚠️ Worksheet '{worksheet.title}' is empty. Skipping.")
+        return {}
+
+    status_index = _column_index(status_column)
+    existing_header = values[0][status_index].strip() if status_index < len(values[0]) else ''
+    if existing_header and not existing_header.startswith(STATUS_HEADER) and not force:
+        print(f"❌ Column {status_column} of '{worksheet.title}' holds '{existing_header}'. "
+              f"Pick another --status-column or pass --force.")
+        return {}
+
+    links = collect_links(values, columns)
+    results = verify_links(links, youtube, sp, checker)
+    statuses = row_statuses(links, results)
+    summary = {
+        'links': len(links),
+        'rows': len(statuses),
+        'ok': sum(1 for status in statuses.values() if status == 'OK'),
+        'dead': sum(1 for status in statuses.values() if 'DEAD' in status),
+        'unverified': sum(1 for status in statuses.values() if status.startswith('UNVERIFIED')),
+    }
+    print(f"📋 '{worksheet.title}': {summary['rows']} rows with links, {summary['ok']} OK, "
+          f"{summary['dead']} with dead links, {summary['unverified']} only partly verified")
+    metrics.record_row('link_health', 'ok', summary['ok'])
+    metrics.record_row('link_health', 'dead', summary['dead'])
+
+    if dry_run:
+        for row, status in sorted(statuses.items()):
+            if status != 'OK':
+                print(f"   Row {row}: {status}")
+        return summary
+
+    update = status_update(statuses, status_column, len(values))
+    sheets_governor.call('write', worksheet.batch_update, [update])
+    print(f"✅ Wrote {update['range']} in '{worksheet.title}'")
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Verify every link in the sheet and write a link health column.")
+    parser.add_argument('--spreadsheet-id', default=SPREADSHEET_ID)
+    parser.add_argument('--worksheet', nargs='+', help="Worksheets to check (default: all)")
+    parser.add_argument('--columns', nargs='+', default=list(LINK_COLUMNS), help="Link columns (letters)")
+    parser.add_argument('--status-column', default=STATUS_COLUMN)
+    parser.add_argument('--creds', default=CREDS_FILE)
+    parser.add_argument('--dry-run', action='store_true', help="Report without writing the status column")
+    parser.add_argument('--force', action='store_true', help="Write the status column even if it holds other data")
+    args = parser.parse_args(argv)
+
+    youtube_api_key = os.getenv('YOUTUBE_API_KEY')
+    spotify_client_id, spotify_client_secret = os.getenv('SPOTIFY_CLIENT_ID'), os.getenv('SPOTIFY_CLIENT_SECRET')
+    if not (youtube_api_key and spotify_client_id and spotify_client_secret):
+        print("❌ Set YOUTUBE_API_KEY, SPOTIFY_CLIENT_ID and SPOTIFY_CLIENT_SECRET (environment or .env).")
+        return 2
+
+    try:
+        scope = ['https://spreadsheets.google.com/feeds', 'https://www.googleapis.com/auth/drive']
+        creds = ServiceAccountCredentials.from_json_keyfile_name(args.creds, scope)
+        spreadsheet = gspread.authorize(creds).open_by_key(args.spreadsheet_id)
+    except gspread.exceptions.SpreadsheetNotFound:
+        print(f"❌ Spreadsheet with ID '{args.spreadsheet_id}' not found. Check the ID.")
+        return 1
+    except Exception as e:
+        print(f"❌ Could not connect to Google Sheets: {e}")
+        return 1
+
+    youtube = build('youtube', 'v3', developerKey=youtube_api_key)
+    sp = spotipy.Spotify(auth_manager=SharedClientCredentials(client_id=spotify_client_id,
+                                                              client_secret=spotify_client_secret))
+    checker = LinkChecker()
+
+    worksheets = spreadsheet.worksheets()
+    if args.worksheet:
+        worksheets = [ws for ws in worksheets if ws.title in args.worksheet]
+    if not worksheets:
+        print("No matching worksheets found.")
+        return 1
+
+    failed = False
+    for worksheet in worksheets:
+        try:
+            check_worksheet(worksheet, youtube, sp, args.columns, args.status_column, checker,
+                            dry_run=args.dry_run, force=args.force)
+        except Exception as e:
+            print(f"❌ Error checking worksheet '{worksheet.title}': {e}")
+            failed = True
+
+    metrics.export_run('link_health')
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,512 @@
+"""
+Streaming analytics for scraper and link-finder logs.
+
+Reads any number of log files line by line (plain, .gz, or '-' for stdin), so
+multi-megabyte logs never have to fit in memory. Understands:
+
+  * scraper.log text logs written by tab_scrapper.py and the Ultimate Guitar scraper
+  * scraper.jsonl events written through structured_logging.py
+  * saved console output of YouTube_spotify_Link_Finder.py, music_linker.py
+    and youtube_ytmusicapi_linker.py
+
+Reports hit / miss / "Not Found" rates per provider, the gap between
+consecutive searches, search latency, the slowest rows, repeated queries and
+the last completed row per worksheet, and can write a JSON resume point.
+
+Usage:
+    python log_analytics.py scraper.log missing_shirli_scripts/scraper.log
+    python log_analytics.py link_finder_output.txt --resume resume.json --json report.json
+
+Other tools reuse the parser through iter_log_events().
+"""
+
+import argparse
+import gzip
+import heapq
+import json
+import random
+import re
+import sys
+from collections import Counter, defaultdict, namedtuple
+from datetime import datetime
+
+# One parsed log event. kind is one of: worksheet, row_start, search, result, skip, quota
+LogEvent = namedtuple('LogEvent', 'source line_no ts kind worksheet row provider outcome url query artist song latency message')
+
+# Outcomes counted as hits / misses in the report
+HIT_OUTCOMES = ('found', 'high_probability')
+MISS_OUTCOMES = ('no_match',)
+NOT_FOUND_OUTCOMES = ('not_found',)
+
+RESERVOIR_SIZE = 10000
+
+# A longer pause between two searches means the script was restarted, not paced
+SESSION_BREAK_SECONDS = 600
+
+_TIMESTAMP = re.compile(r'^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}),(\d{3}) - (\w+) - (.*)$')
+
+# Worksheet headers
+_WORKSHEET_PATTERNS = (
+    re.compile(r"--- Processing worksheet: '(?P<worksheet>.+?)'"),
+    re.compile(r"Reading worksheet: '(?P<worksheet>.+?)'"),
+    re.compile(r"worksheet '(?P<worksheet>.+?)'\.$"),
+)
+
+# Start of a row
+_ROW_START_PATTERNS = (
+    # tab_scrapper.py
+    re.compile(r"Processing row (?P<row>\d+): Artist='(?P<artist>.*)', Song='(?P<song>.*)'$"),
+    # YouTube_spotify_Link_Finder.py / music_linker.py
+    re.compile(r"Processing Row (?P<row>\d+): '(?P<song>.*)' by '(?P<artist>.*)'$"),
+    # Ultimate Guitar scraper
+    re.compile(r"Row (?P<row>\d+): Processing (?P<artist>.+?) - (?P<song>.+)$"),
+    # youtube_ytmusicapi_linker.py (also a search)
+    re.compile(r"Processing row (?P<row>\d+): Searching for '(?P<query>.*)'\.\.\.$"),
+)
+
+# Searches: (pattern, provider)
+_SEARCH_PATTERNS = (
+    (re.compile(r"Searching tab4u\.com for: (?P<query>.*)$"), 'tab4u'),
+    (re.compile(r"Searching Ultimate Guitar for: (?P<query>.*)$"), 'ultimate_guitar'),
+    (re.compile(r"Searching for: (?P<query>.*) \(Attempt 1/"), 'ultimate_guitar'),
+    (re.compile(r"Searching (?P<provider>Spotify|YouTube)\.\.\."), None),
+)
+
+# Link finder result lines, e.g. "🎵 Spotify: Not Found." or "📺 Row 12 YouTube (Exact Match): https://...";
+# YouTube results are printed after the worksheet's batched search, so they name their row
+_LINK_RESULT = re.compile(r"^[🎵📺 ]*(?:Row (?P<row>\d+) )?(?P<provider>Spotify|YouTube)"
+                          r"(?: \((?P<kind>Exact Match|High Probability Match[^)]*)\))?: (?P<value>.+)$")
+_LINK_EXISTS = re.compile(r"(?P<provider>Spotify|YouTube) link already exists")
+
+# Scraper result lines: (pattern, outcome)
+_RESULT_PATTERNS = (
+    (re.compile(r"Prepared update for row (?P<row>\d+) with URL: (?P<url>\S+)"), 'found'),
+    (re.compile(r"Prepared update for row (?P<row>\d+) with 'Not Found'"), 'not_found'),
+    (re.compile(r"Updated row (?P<row>\d+) with URL(?: using alternative method)?: (?P<url>https?://\S+)"), 'found'),
+    (re.compile(r"Row (?P<row>\d+): No results found, marked as 'Not Found'"), 'not_found'),
+    (re.compile(r"Row (?P<row>\d+): URL already exists: (?P<url>\S+?)\.? Skipping"), 'existing'),
+    (re.compile(r"Row (?P<row>\d+): Skipping - already has URL"), 'existing'),
+    (re.compile(r"Row (?P<row>\d+): '.*' already has a YouTube link"), 'existing'),
+    (re.compile(r"^Found link: (?P<url>\S+)"), 'found'),
+    (re.compile(r"^No YouTube link found for"), 'not_found'),
+)
+
+_SKIP_PATTERNS = (
+    re.compile(r"Row (?P<row>\d+): (?:Missing|Not enough columns|Skipping - missing|Skipping empty row)"),
+    re.compile(r"Skipping row (?P<row>\d+):"),
+)
+
+_QUOTA_PATTERNS = (
+    re.compile(r"YouTube search stopped due to quota"),
+    re.compile(r"Quota Exceeded", re.IGNORECASE),
+)
+
+
+def _provider_from_url(url, default=None):
+    if 'tab4u.com' in url:
+        return 'tab4u'
+    if 'ultimate-guitar.com' in url:
+        return 'ultimate_guitar'
+    if 'spotify.com' in url:
+        return 'spotify'
+    if 'music.youtube.com' in url:
+        return 'ytmusic'
+    if 'youtube.com' in url or 'youtu.be' in url:
+        return 'youtube'
+    return default
+
+
+def _open_log(path):
+    if path == '-':
+        return sys.stdin
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8', errors='replace')
+    return open(path, 'r', encoding='utf-8', errors='replace')
+
+
+class _LogParser:
+    """Line-oriented state machine for one log file."""
+
+    def __init__(self, source):
+        self.source = source
+        self.worksheet = None
+        self.row = None
+        self.provider = None   # Provider of the last search, for result lines that don't name one
+        self.artist = None
+        self.song = None
+
+    def _event(self, line_no, ts, kind, message, row=None, **fields):
+        values = {
+            'source': self.source, 'line_no': line_no, 'ts': ts, 'kind': kind,
+            'worksheet': fields.pop('worksheet', self.worksheet),
+            'row': self.row if row is None else int(row),
+            'provider': None, 'outcome': None, 'url': None, 'query': None,
+            'artist': self.artist, 'song': self.song, 'latency': None, 'message': message,
+        }
+        values.update(fields)
+        return LogEvent(**values)
+
+    def parse_line(self, line_no, line):
+        """Return the LogEvents (possibly none) for one raw line."""
+        line = line.rstrip('\n')
+        if line.startswith('{'):
+            try:
+                return self._parse_json(line_no, json.loads(line))
+            except ValueError:
+                pass
+        match = _TIMESTAMP.match(line)
+        if match:
+            ts = datetime.strptime(match.group(1), '%Y-%m-%d %H:%M:%S').replace(microsecond=int(match.group(2)) * 1000)
+            return self._parse_message(line_no, ts, match.group(4).strip())
+        return self._parse_message(line_no, None, line.strip())
+
+    def _parse_json(self, line_no, record):
+        ts = None
+        if record.get('ts'):
+            try:
+                ts = datetime.fromisoformat(record['ts'])
+            except ValueError:
+                pass
+        if record.get('worksheet'):
+            self.worksheet = record['worksheet']
+        if record.get('row') is not None and record['row'] != self.row:
+            self.row = int(record['row'])
+            self.artist, self.song = record.get('artist'), record.get('song')
+        message = record.get('msg', '')
+        outcome = record.get('outcome')
+        if outcome is None:
+            return self._parse_message(line_no, ts, message)
+        kind = 'skip' if outcome == 'skipped' else 'result'
+        provider = record.get('provider') or _provider_from_url(record.get('url') or '', self.provider)
+        return [self._event(line_no, ts, kind, message, provider=provider, outcome=outcome,
+                            url=record.get('url'), latency=record.get('latency'),
+                            artist=record.get('artist', self.artist), song=record.get('song', self.song))]
+
+    def _parse_message(self, line_no, ts, message):
+        if not message:
+            return []
+
+        for pattern in _ROW_START_PATTERNS:
+            match = pattern.search(message)
+            if match:
+                fields = match.groupdict()
+                self.row = int(fields['row'])
+                self.artist, self.song = fields.get('artist'), fields.get('song')
+                self.provider = None
+                events = [self._event(line_no, ts, 'row_start', message, query=fields.get('query'))]
+                if fields.get('query') is not None:
+                    self.provider = 'ytmusic'
+                    events.append(self._event(line_no, ts, 'search', message, provider='ytmusic', query=fields['query']))
+                return events
+
+        for pattern in _WORKSHEET_PATTERNS:
+            match = pattern.search(message)
+            if match and not message.startswith(('Available', 'Applying')):
+                self.worksheet = match.group('worksheet')
+                self.row = None
+                return [self._event(line_no, ts, 'worksheet', message, worksheet=self.worksheet)]
+
+        for pattern, provider in _SEARCH_PATTERNS:
+            match = pattern.search(message)
+            if match:
+                fields = match.groupdict()
+                self.provider = provider or fields['provider'].lower()
+                query = fields.get('query') or ' - '.join(filter(None, (self.artist, self.song)))
+                return [self._event(line_no, ts, 'search', message, provider=self.provider, query=query)]
+
+        match = _LINK_EXISTS.search(message)
+        if match:
+            return [self._event(line_no, ts, 'result', message, provider=match.group('provider').lower(), outcome='existing')]
+
+        match = _LINK_RESULT.match(message)
+        if match:
+            value = match.group('value').strip()
+            if value.startswith('http'):
+                outcome = 'high_probability' if (match.group('kind') or '').startswith('High') else 'found'
+                url = value
+            else:
+                outcome = 'no_match' if 'No definitive match' in value else 'not_found'
+                url = None
+            return [self._event(line_no, ts, 'result', message, row=match.group('row'),
+                                provider=match.group('provider').lower(), outcome=outcome, url=url)]
+
+        for pattern, outcome in _RESULT_PATTERNS:
+            match = pattern.search(message)
+            if match:
+                fields = match.groupdict()
+                url = fields.get('url')
+                provider = _provider_from_url(url or '', self.provider) or 'tab4u'
+                return [self._event(line_no, ts, 'result', message, row=fields.get('row'),
+                                    provider=provider, outcome=outcome, url=url)]
+
+        for pattern in _SKIP_PATTERNS:
+            match = pattern.search(message)
+            if match:
+                return [self._event(line_no, ts, 'skip', message, row=match.group('row'), outcome='skipped')]
+
+        for pattern in _QUOTA_PATTERNS:
+            if pattern.search(message):
+                return [self._event(line_no, ts, 'quota', message, provider=self.provider, outcome='quota')]
+
+        return []
+
+
+def iter_log_events(paths):
+    """
+    Yield LogEvents from the given log files, in file order, one line at a time.
+
+    Args:
+        paths: Iterable of file paths ('-' reads stdin, '.gz' files are decompressed).
+    """
+    for path in paths:
+        parser = _LogParser(path)
+        with _open_log(path) as f:
+            for line_no, line in enumerate(f, start=1):
+                yield from parser.parse_line(line_no, line)
+
+
+class _RunningStats:
+    """Count/mean/max plus a fixed-size reservoir for percentiles."""
+
+    def __init__(self, seed=0):
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+        self._sample = []
+        self._random = random.Random(seed)
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        self.maximum = max(self.maximum, value)
+        if len(self._sample) < RESERVOIR_SIZE:
+            self._sample.append(value)
+        else:
+            slot = self._random.randrange(self.count)
+            if slot < RESERVOIR_SIZE:
+                self._sample[slot] = value
+
+    def summary(self):
+        if not self.count:
+            return {'count': 0}
+        ordered = sorted(self._sample)
+        return {
+            'count': self.count,
+            'mean': round(self.total / self.count, 3),
+            'p50': round(ordered[len(ordered) // 2], 3),
+            'p95': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+            'max': round(self.maximum, 3),
+        }
+
+
+def _normalize_query(text):
+    return re.sub(r'\s+', ' ', text or '').strip().casefold()
+
+
+class LogAnalyzer:
+    """Accumulates statistics from a stream of LogEvents."""
+
+    def __init__(self, top=10):
+        self.top = top
+        self.events = 0
+        self.outcomes = defaultdict(Counter)      # provider -> outcome -> count
+        self.search_gaps = defaultdict(_RunningStats)
+        self.search_latency = defaultdict(_RunningStats)
+        self.queries = Counter()
+        self.slowest = []                         # min-heap of (seconds, tiebreak, row info)
+        self.last_completed = {}                  # worksheet -> resume info
+        self.quota_stops = {}                     # worksheet -> first row that hit the quota
+        self.sources = []
+        self._last_search = {}                    # source -> (ts, provider)
+        self._open_rows = {}                      # source -> timing of the row being read
+
+    def consume(self, event):
+        self.events += 1
+        if event.source not in self.sources:
+            self.sources.append(event.source)
+
+        if event.kind == 'worksheet':
+            self._close_row(event.source)
+            self._last_search.pop(event.source, None)
+
+        elif event.kind == 'row_start':
+            self._close_row(event.source)
+            self._open_rows[event.source] = {'started': event.ts, 'seconds': None, 'info': None}
+            query = ' - '.join(filter(None, (event.artist, event.song))) or event.query
+            if query:
+                self.queries[_normalize_query(query)] += 1
+
+        elif event.kind == 'search':
+            previous = self._last_search.get(event.source)
+            if event.ts and previous and previous[0]:
+                gap = (event.ts - previous[0]).total_seconds()
+                if 0 <= gap <= SESSION_BREAK_SECONDS:
+                    self.search_gaps[event.provider].add(gap)
+            self._last_search[event.source] = (event.ts, event.provider)
+
+        elif event.kind in ('result', 'skip'):
+            if event.kind == 'result':
+                self.outcomes[event.provider][event.outcome] += 1
+                self._record_latency(event)
+            if event.row is not None:
+                worksheet = event.worksheet or '?'
+                self.last_completed[worksheet] = {
+                    'last_completed_row': event.row,
+                    'resume_row': event.row + 1,
+                    'source': event.source,
+                    'line': event.line_no,
+                    'ts': event.ts.isoformat(timespec='seconds') if event.ts else None,
+                }
+
+        elif event.kind == 'quota' and event.row is not None:
+            self.quota_stops.setdefault(event.worksheet or '?', event.row)
+
+    def _record_latency(self, event):
+        if event.outcome == 'existing':
+            return
+        latency = event.latency
+        last_search = self._last_search.get(event.source)
+        if latency is None and event.ts and last_search and last_search[0]:
+            latency = (event.ts - last_search[0]).total_seconds()
+        if latency is not None and 0 <= latency <= SESSION_BREAK_SECONDS:
+            self.search_latency[event.provider].add(latency)
+
+        # A row's time runs from its start to its last result; it is ranked once the next row starts
+        open_row = self._open_rows.get(event.source)
+        if open_row is None or event.row is None:
+            return
+        started = open_row['started']
+        row_seconds = (event.ts - started).total_seconds() if event.ts and started else latency
+        if row_seconds is None:
+            return
+        if open_row['seconds'] is not None and not (event.ts and started):
+            row_seconds += open_row['seconds']   # No timestamps: add up per-provider latencies
+        open_row['seconds'] = row_seconds
+        open_row['info'] = {
+            'seconds': round(row_seconds, 3), 'worksheet': event.worksheet, 'row': event.row,
+            'artist': event.artist, 'song': event.song, 'provider': event.provider,
+            'outcome': event.outcome, 'source': event.source, 'line': event.line_no,
+        }
+
+    def _close_row(self, source):
+        open_row = self._open_rows.pop(source, None)
+        if not open_row or open_row['info'] is None:
+            return
+        entry = (open_row['seconds'], self.events, open_row['info'])
+        if len(self.slowest) < self.top:
+            heapq.heappush(self.slowest, entry)
+        else:
+            heapq.heappushpop(self.slowest, entry)
+
+    def report(self):
+        """Return the analysis as a JSON-serializable dict."""
+        for source in list(self._open_rows):
+            self._close_row(source)
+        providers = {}
+        for provider, outcomes in sorted(self.outcomes.items(), key=lambda item: str(item[0])):
+            searched = sum(count for outcome, count in outcomes.items() if outcome not in ('existing', 'skipped'))
+            hits = sum(outcomes[o] for o in HIT_OUTCOMES)
+            misses = sum(outcomes[o] for o in MISS_OUTCOMES)
+            not_found = sum(outcomes[o] for o in NOT_FOUND_OUTCOMES)
+            providers[str(provider)] = {
+                'outcomes': dict(outcomes),
+                'searched': searched,
+                'hit_rate': round(hits / searched, 4) if searched else 0.0,
+                'miss_rate': round(misses / searched, 4) if searched else 0.0,
+                'not_found_rate': round(not_found / searched, 4) if searched else 0.0,
+            }
+        return {
+            'sources': self.sources,
+            'events': self.events,
+            'providers': providers,
+            'search_gap_seconds': {str(p): s.summary() for p, s in self.search_gaps.items()},
+            'search_latency_seconds': {str(p): s.summary() for p, s in self.search_latency.items()},
+            'slowest_rows': [info for _, _, info in sorted(self.slowest, reverse=True)],
+            'repeated_queries': [{'query': q, 'count': c} for q, c in self.queries.most_common(self.top) if c > 1],
+            'last_completed': self.last_completed,
+            'quota_stops': self.quota_stops,
+        }
+
+    def resume_point(self):
+        """Machine-readable resume point: the next row to process per worksheet."""
+        worksheets = {}
+        for worksheet, info in self.last_completed.items():
+            worksheets[worksheet] = dict(info)
+            if worksheet in self.quota_stops:
+                # Rows from the quota stop onward were never searched
+                worksheets[worksheet]['resume_row'] = min(info['resume_row'], self.quota_stops[worksheet])
+        return {
+            'generated': datetime.now().isoformat(timespec='seconds'),
+            'sources': self.sources,
+            'worksheets': worksheets,
+        }
+
+
+def print_report(report):
+    print(f"\n📊 Log analytics: {report['events']} events from {len(report['sources'])} file(s)")
+    print("=" * 60)
+
+    print("\n🎯 Results per provider:")
+    for provider, stats in report['providers'].items():
+        outcomes = ', '.join(f"{k}={v}" for k, v in sorted(stats['outcomes'].items()))
+        print(f"   {provider:<16} searched={stats['searched']:<6} hit {stats['hit_rate']:.1%}  "
+              f"miss {stats['miss_rate']:.1%}  Not Found {stats['not_found_rate']:.1%}   ({outcomes})")
+
+    for title, key in (("⏱️  Gap between consecutive searches (s):", 'search_gap_seconds'),
+                       ("⏱️  Search latency (s):", 'search_latency_seconds')):
+        print(f"\n{title}")
+        for provider, stats in report[key].items():
+            if stats['count']:
+                print(f"   {provider:<16} n={stats['count']:<6} mean={stats['mean']:<8} p50={stats['p50']:<8} "
+                      f"p95={stats['p95']:<8} max={stats['max']}")
+
+    if report['slowest_rows']:
+        print("\n🐢 Slowest rows:")
+        for info in report['slowest_rows']:
+            print(f"   {info['seconds']:>8.2f}s  {info['worksheet'] or '?'} row {info['row']}: "
+                  f"{info['artist'] or ''} - {info['song'] or ''} [{info['provider']}: {info['outcome']}]")
+
+    if report['repeated_queries']:
+        print("\n🔁 Repeated queries:")
+        for item in report['repeated_queries']:
+            print(f"   {item['count']:>4}x  {item['query']}")
+
+    print("\n📍 Last completed row per worksheet:")
+    for worksheet, info in report['last_completed'].items():
+        quota = report['quota_stops'].get(worksheet)
+        suffix = f" (quota hit at row {quota})" if quota else ""
+        print(f"   {worksheet:<20} row {info['last_completed_row']} -> resume at {info['resume_row']}{suffix}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream scraper / link-finder logs and report hit rates, latency and resume points.")
+    parser.add_argument('logs', nargs='+', help="Log files ('.gz' supported, '-' for stdin)")
+    parser.add_argument('--top', type=int, default=10, help="How many slowest rows / repeated queries to list")
+    parser.add_argument('--json', help="Also write the full report as JSON to this path")
+    parser.add_argument('--resume', help="Write the resume point JSON to this path")
+    args = parser.parse_args(argv)
+
+    analyzer = LogAnalyzer(top=args.top)
+    try:
+        for event in iter_log_events(args.logs):
+            analyzer.consume(event)
+    except OSError as e:
+        print(f"❌ Could not read log: {e}")
+        return 1
+
+    report = analyzer.report()
+    print_report(report)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 Report saved to {args.json}")
+    if args.resume:
+        with open(args.resume, 'w', encoding='utf-8') as f:
+            json.dump(analyzer.resume_point(), f, ensure_ascii=False, indent=2)
+        print(f"💾 Resume point saved to {args.resume}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,261 @@
+"""
+Lightweight run metrics shared by all the scripts.
+
+Counts API calls and their latency per provider and endpoint, cache hits and
+misses, rows processed and quota units spent. At the end of a run the numbers
+are exported as a Prometheus textfile (for node_exporter's textfile
+collector) and as a JSON summary.
+
+Usage:
+    import metrics
+
+    with metrics.timed('spotify', 'search'):
+        results = sp.search(q=query, type='track', limit=1)
+
+    metrics.record_cache('ytmusic_search', hit=True)
+    metrics.record_row('link_finder', outcome='found')
+    metrics.export_run('link_finder')
+"""
+
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+
+METRICS_DIR = os.environ.get('SHIRLI_METRICS_DIR', 'metrics')
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Quota cost of YouTube Data API endpoints, in units (daily default is 10,000)
+YOUTUBE_QUOTA_COST = {'search.list': 100, 'videos.list': 1}
+
+
+class _Histogram:
+    def __init__(self):
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.total += value
+        self.maximum = max(self.maximum, value)
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if value <= bound:
+                self.buckets[i] += 1
+
+    def quantile(self, q):
+        """Approximate quantile from the bucket bounds."""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        for bound, cumulative in zip(LATENCY_BUCKETS, self.buckets):
+            if cumulative >= target:
+                return bound
+        return self.maximum
+
+
+class MetricsRegistry:
+    """Thread-safe in-process store for one run's metrics."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.started = time.time()
+            self.calls = defaultdict(int)            # (provider, endpoint, outcome) -> count
+            self.latency = defaultdict(_Histogram)   # (provider, endpoint) -> histogram
+            self.cache = defaultdict(int)            # (cache, 'hit'|'miss') -> count
+            self.rows = defaultdict(int)             # (script, outcome) -> count
+            self.quota = defaultdict(float)          # provider -> units
+
+    def record_call(self, provider, endpoint, seconds, outcome='ok', quota_units=0):
+        with self._lock:
+            self.calls[(provider, endpoint, outcome)] += 1
+            self.latency[(provider, endpoint)].observe(seconds)
+            if quota_units:
+                self.quota[provider] += quota_units
+
+    def record_cache(self, cache, hit):
+        with self._lock:
+            self.cache[(cache, 'hit' if hit else 'miss')] += 1
+
+    def record_row(self, script, outcome='processed', count=1):
+        with self._lock:
+            self.rows[(script, outcome)] += count
+
+    def record_quota(self, provider, units):
+        with self._lock:
+            self.quota[provider] += units
+
+    # ----------------------------------------
+    # Exporters
+    # ----------------------------------------
+
+    def summary(self, run_name=None):
+        """Return the metrics as a JSON-serializable dict."""
+        with self._lock:
+            endpoints = {}
+            for (provider, endpoint), histogram in sorted(self.latency.items()):
+                outcomes = {outcome: count for (p, e, outcome), count in self.calls.items()
+                            if p == provider and e == endpoint}
+                endpoints[f"{provider}.{endpoint}"] = {
+                    'calls': histogram.count,
+                    'outcomes': outcomes,
+                    'latency_seconds': {
+                        'total': round(histogram.total, 4),
+                        'mean': round(histogram.total / histogram.count, 4) if histogram.count else 0.0,
+                        'p50': histogram.quantile(0.5),
+                        'p95': histogram.quantile(0.95),
+                        'max': round(histogram.maximum, 4),
+                    },
+                }
+            caches = {}
+            for cache in sorted({name for name, _ in self.cache}):
+                hits, misses = self.cache[(cache, 'hit')], self.cache[(cache, 'miss')]
+                caches[cache] = {'hits': hits, 'misses': misses,
+                                 'hit_rate': round(hits / (hits + misses), 4) if hits + misses else 0.0}
+            rows = defaultdict(dict)
+            for (script, outcome), count in sorted(self.rows.items()):
+                rows[script][outcome] = count
+            return {
+                'run': run_name,
+                'started': datetime.fromtimestamp(self.started).isoformat(timespec='seconds'),
+                'duration_seconds': round(time.time() - self.started, 2),
+                'endpoints': endpoints,
+                'caches': caches,
+                'rows': dict(rows),
+                'quota_units': dict(self.quota),
+            }
+
+    def prometheus_text(self, run_name=None):
+        """Render the metrics in the Prometheus text exposition format."""
+        run = f',run="{_escape(run_name)}"' if run_name else ''
+        lines = []
+        with self._lock:
+            lines += ['# HELP shirli_api_calls_total API calls by provider, endpoint and outcome.',
+                      '# TYPE shirli_api_calls_total counter']
+            for (provider, endpoint, outcome), count in sorted(self.calls.items()):
+                lines.append(f'shirli_api_calls_total{{provider="{provider}",endpoint="{endpoint}",'
+                             f'outcome="{_escape(outcome)}"{run}}} {count}')
+
+            lines += ['# HELP shirli_api_latency_seconds API call latency.',
+                      '# TYPE shirli_api_latency_seconds histogram']
+            for (provider, endpoint), histogram in sorted(self.latency.items()):
+                labels = f'provider="{provider}",endpoint="{endpoint}"{run}'
+                for bound, cumulative in zip(LATENCY_BUCKETS, histogram.buckets):
+                    lines.append(f'shirli_api_latency_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'shirli_api_latency_seconds_bucket{{{labels},le="+Inf"}} {histogram.count}')
+                lines.append(f'shirli_api_latency_seconds_sum{{{labels}}} {histogram.total:.6f}')
+                lines.append(f'shirli_api_latency_seconds_count{{{labels}}} {histogram.count}')
+
+            lines += ['# HELP shirli_cache_requests_total Cache lookups by result.',
+                      '# TYPE shirli_cache_requests_total counter']
+            for (cache, result), count in sorted(self.cache.items()):
+                lines.append(f'shirli_cache_requests_total{{cache="{cache}",result="{result}"{run}}} {count}')
+
+            lines += ['# HELP shirli_rows_processed_total Sheet rows processed by outcome.',
+                      '# TYPE shirli_rows_processed_total counter']
+            for (script, outcome), count in sorted(self.rows.items()):
+                lines.append(f'shirli_rows_processed_total{{script="{script}",outcome="{_escape(outcome)}"{run}}} {count}')
+
+            lines += ['# HELP shirli_quota_units_total Provider quota units spent.',
+                      '# TYPE shirli_quota_units_total counter']
+            for provider, units in sorted(self.quota.items()):
+                lines.append(f'shirli_quota_units_total{{provider="{provider}"{run}}} {units:g}')
+
+            lines += ['# HELP shirli_run_duration_seconds Wall time of the run.',
+                      '# TYPE shirli_run_duration_seconds gauge',
+                      f'shirli_run_duration_seconds{{{run.lstrip(",")}}} {time.time() - self.started:.2f}']
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', ' ')
+
+
+def _atomic_write(path, text):
+    """Write via a temporary file so a scraping textfile collector never reads half a file."""
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(temp_path, path)
+
+
+# ========================================
+# Module-level API (one registry per process)
+# ========================================
+
+REGISTRY = MetricsRegistry()
+
+
+def record_call(provider, endpoint, seconds, outcome='ok', quota_units=0):
+    REGISTRY.record_call(provider, endpoint, seconds, outcome, quota_units)
+
+
+def record_cache(cache, hit):
+    REGISTRY.record_cache(cache, hit)
+
+
+def record_row(script, outcome='processed', count=1):
+    REGISTRY.record_row(script, outcome, count)
+
+
+def record_quota(provider, units):
+    REGISTRY.record_quota(provider, units)
+
+
+def reached_api(error):
+    """
+    Whether a call that raised `error` got an answer from the API, and so was charged
+    quota. HTTP error responses carry it (googleapiclient's HttpError.resp); timeouts
+    and connection failures never reached the API.
+    """
+    return getattr(error, 'resp', None) is not None
+
+
+@contextmanager
+def timed(provider, endpoint, quota_units=None):
+    """
+    Time one API call. Exceptions are recorded with their type as the outcome
+    and re-raised. YouTube quota units default to YOUTUBE_QUOTA_COST and are only
+    charged when the call got a response (see reached_api).
+    """
+    if quota_units is None:
+        quota_units = YOUTUBE_QUOTA_COST.get(endpoint, 0) if provider == 'youtube' else 0
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        REGISTRY.record_call(provider, endpoint, time.perf_counter() - started, type(e).__name__,
+                             quota_units if reached_api(e) else 0)
+        raise
+    REGISTRY.record_call(provider, endpoint, time.perf_counter() - started, 'ok', quota_units)
+
+
+def export_run(run_name, directory=None):
+    """
+    Write <run_name>.prom (overwritten each run, for the textfile collector) and a
+    timestamped JSON summary. Returns the summary dict. Never raises: losing the
+    metrics must not fail the run.
+    """
+    directory = directory or METRICS_DIR
+    summary = REGISTRY.summary(run_name)
+    try:
+        os.makedirs(directory, exist_ok=True)
+        _atomic_write(os.path.join(directory, f"{run_name}.prom"), REGISTRY.prometheus_text(run_name))
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        with open(os.path.join(directory, f"{run_name}_{stamp}.json"), 'w', encoding='utf-8') as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        total_calls = sum(endpoint['calls'] for endpoint in summary['endpoints'].values())
+        print(f"📈 Metrics: {total_calls} API calls, quota {summary['quota_units'] or 0} -> {directory}/{run_name}.prom")
+    except OSError as e:
+        print(f"⚠️ Could not write metrics to '{directory}': {e}")
+    return summary
@@ -2,7 +2,6 @@ import gspread
 import pandas as pd
 from googleapiclient.discovery import build
 import spotipy
-from spotipy.oauth2 import SpotifyClientCredentials
 import time
 import re
 import os
@@ -11,6 +10,16 @@ import logging
 from datetime import datetime
 import sys
 
+# Shared helpers (metrics) live in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import candidate_ranking
+import metrics
+import sheets_governor
+from spotify_token_cache import SharedClientCredentials
+from artist_aliases import ArtistAliases
+from job_state import JobState, row_fingerprint
+from youtube_batch import SEARCH_FIELDS, VIDEOS_FIELDS, YouTubeBatchExecutor
+
 # Import your LLM client library
 import google.generativeai as genai
 
@@ -24,6 +33,18 @@ from config import (
 )
 
 
+JOB_PROVIDER = 'v0'
+
+# Artist spellings shown to the LLM when the alias index knows none for a batch
+DEFAULT_ARTIST_EXAMPLES = [
+    ("Osher Cohen", "אושר כהן"),
+    ("Eyal Golan", "אייל גולן"),
+    ("Tuna", "טונה"),
+    ("Chava Alberstein", "חוה אלברשטיין"),
+]
+MAX_ARTIST_EXAMPLES = 8
+
+
 # Setup logging
 def setup_logging():
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -85,7 +106,7 @@ def initialize_apis(spreadsheet_id, worksheet_name):
         logging.info("YouTube API client initialized.")
 
         # Spotify API
-        sp = spotipy.Spotify(auth_manager=SpotifyClientCredentials(
+        sp = spotipy.Spotify(auth_manager=SharedClientCredentials(
             client_id=SPOTIFY_CLIENT_ID,
             client_secret=SPOTIFY_CLIENT_SECRET
         ))
@@ -116,8 +137,9 @@ def get_youtube_metadata_from_url(url, youtube_service):
     video_id = video_id_match.group(1)
 
     try:
-        request = youtube_service.videos().list(part="snippet", id=video_id)
-        response = request.execute()
+        request = youtube_service.videos().list(part="snippet", id=video_id, fields=VIDEOS_FIELDS)
+        with metrics.timed('youtube', 'videos.list'):
+            response = request.execute()
 
         if response and response['items']:
             snippet = response['items'][0]['snippet']
@@ -125,7 +147,7 @@ def get_youtube_metadata_from_url(url, youtube_service):
             channel_title = snippet.get('channelTitle', '')
 
             # Detect version type from title
-            version_type = detect_version_type(title)
+            version_type = candidate_ranking.detect_version_type(title)
 
             return channel_title, title, version_type
         return None, None, None
@@ -147,14 +169,15 @@ def get_spotify_metadata_from_url(url, sp):
     track_id = track_id_match.group(1)
 
     try:
-        track_info = sp.track(track_id)
+        with metrics.timed('spotify', 'track'):
+            track_info = sp.track(track_id)
         if track_info:
             artist_name = track_info['artists'][0]['name'] if track_info['artists'] else None
             song_title = track_info['name']
             album_name = track_info['album']['name'] if track_info['album'] else ''
 
             # Detect version type from title and album
-            version_type = detect_version_type(song_title, album_name)
+            version_type = candidate_ranking.detect_version_type(song_title, album_name)
 
             return artist_name, song_title, version_type
         return None, None, None
@@ -164,33 +187,28 @@ def get_spotify_metadata_from_url(url, sp):
         return None, None, None
 
 
-def detect_version_type(title, album_name=''):
-    """Detect version type from title and album information"""
-    title_lower = title.lower()
-    album_lower = album_name.lower()
-
-    # Check for various version indicators
-    if any(indicator in title_lower for indicator in ['live', 'concert', 'tour']):
-        return 'Live'
-    elif any(indicator in title_lower for indicator in ['remix', 'mix', 'edit']):
-        return 'Remix'
-    elif any(indicator in title_lower for indicator in ['acoustic', 'unplugged']):
-        return 'Acoustic'
-    elif any(indicator in title_lower for indicator in ['cover', 'version']):
-        return 'Cover'
-    elif any(indicator in title_lower for indicator in ['karaoke', 'instrumental']):
-        return 'Instrumental'
-    elif any(indicator in title_lower for indicator in ['remaster', 'remastered']):
-        return 'Remastered'
-    elif 'live' in album_lower or 'concert' in album_lower:
-        return 'Live'
-    else:
-        return 'Original'
+def search_youtube_with_version(artist, song_title, youtube_client, preferred_version='Original', aliases=None,
+                                sheet_artist=None):
+    """Enhanced YouTube search with version preference (and the artist's known spelling, given aliases)"""
+    query, query_artist = youtube_version_query(artist, song_title, preferred_version, aliases, sheet_artist)
+    try:
+        with metrics.timed('youtube', 'search.list'):
+            response = youtube_version_request(youtube_client, query).execute()
+        return pick_youtube_version(response, artist, song_title, query_artist, preferred_version)
+
+    except Exception as e:
+        logging.error(f"Error searching YouTube for '{artist} - {song_title}': {e}")
+        return None
 
 
-def search_youtube_with_version(artist, song_title, youtube_client, preferred_version='Original'):
-    """Enhanced YouTube search with version preference"""
-    base_query = f"{artist} - {song_title}"
+def youtube_version_query(artist, song_title, preferred_version='Original', aliases=None, sheet_artist=None):
+    """
+    Returns:
+        tuple: (search query, artist spelling used in it)
+    """
+    alias = aliases.lookup(sheet_artist or artist, 'youtube') if aliases else None
+    query_artist = alias or artist
+    base_query = f"{query_artist} - {song_title}"
 
     # Adjust query based on preferred version
     if preferred_version == 'Live':
@@ -201,85 +219,116 @@ def search_youtube_with_version(artist, song_title, youtube_client, preferred_ve
         query = f"{base_query} remix"
     else:
         query = f"{base_query} official"
+    return query, query_artist
 
-    try:
-        request = youtube_client.search().list(
-            q=query,
-            part="snippet",
-            type="video",
-            maxResults=10
-        )
-        response = request.execute()
-
-        best_matches = []
-        for item in response['items']:
-            video_title = item['snippet']['title']
-            channel_title = item['snippet']['channelTitle']
-            video_id = item['id']['videoId']
-            video_url = f"https://www.youtube.com/watch?v={video_id}"
-
-            detected_version = detect_version_type(video_title)
-
-            # Score based on version match and channel authority
-            score = 0
-            if detected_version == preferred_version:
-                score += 10
-
-            # Check for official channels
-            if any(indicator in channel_title.lower() for indicator in
-                   ['official', 'vevo', artist.lower().replace(' ', '')]):
-                score += 5
-
-            best_matches.append({
-                'url': video_url,
-                'title': video_title,
-                'channel': channel_title,
-                'version': detected_version,
-                'score': score
-            })
-
-        # Sort by score and return best match
-        best_matches.sort(key=lambda x: x['score'], reverse=True)
-        return best_matches[0]['url'] if best_matches else None
 
-    except Exception as e:
-        logging.error(f"Error searching YouTube for '{artist} - {song_title}': {e}")
-        return None
+def youtube_version_request(youtube_client, query):
+    """Unexecuted search.list request, trimmed to the fields pick_youtube_version reads"""
+    return youtube_client.search().list(
+        q=query,
+        part="snippet",
+        type="video",
+        maxResults=10,
+        fields=SEARCH_FIELDS
+    )
 
 
-def search_spotify_with_version(artist, song_title, sp, preferred_version='Original'):
-    """Enhanced Spotify search with version preference"""
-    try:
-        # Base search
-        results = sp.search(q=f"track:{song_title} artist:{artist}", type="track", limit=20)
+def pick_youtube_version(response, artist, song_title, query_artist, preferred_version='Original'):
+    """Best search.list result for the song and the preferred version (candidate_ranking): its URL, or None"""
+    candidates = [candidate_ranking.from_youtube_item(item) for item in response.get('items', [])]
+    top = candidate_ranking.best(candidates, artist, song_title, preferred_version=preferred_version,
+                                 artist_spellings=(query_artist,))
+    return top.candidate.url if top else None
 
-        if results and results['tracks']['items']:
-            best_matches = []
 
-            for track in results['tracks']['items']:
-                track_artists = [a['name'].lower() for a in track['artists']]
-                if artist.lower() in track_artists:
-                    detected_version = detect_version_type(track['name'], track['album']['name'])
+def search_youtube_batch(searches, youtube_client, aliases=None):
+    """
+    search_youtube_with_version for many rows, sent as batched HTTP requests
+    (youtube_batch.BATCH_SIZE searches per round trip).
+
+    Args:
+        searches: {key: (artist, song title, preferred version, sheet artist)}
 
-                    score = 0
-                    if detected_version == preferred_version:
-                        score += 10
+    Returns:
+        dict: key -> best video URL, or None (errors are logged, as by search_youtube_with_version)
+    """
+    found = {}
 
-                    # Prefer exact artist match
-                    if track['artists'][0]['name'].lower() == artist.lower():
-                        score += 5
+    def dispatch(key, artist, song_title, query_artist, preferred_version, response, error):
+        try:
+            if error is not None:
+                raise error
+            found[key] = pick_youtube_version(response, artist, song_title, query_artist, preferred_version)
+        except Exception as e:
+            logging.error(f"Error searching YouTube for '{artist} - {song_title}': {e}")
+            found[key] = None
+
+    with YouTubeBatchExecutor(youtube_client) as batch:
+        for key, (artist, song_title, preferred_version, sheet_artist) in searches.items():
+            query, query_artist = youtube_version_query(artist, song_title, preferred_version, aliases, sheet_artist)
+            batch.add(youtube_version_request(youtube_client, query),
+                      lambda response, error, key=key, artist=artist, song_title=song_title,
+                      query_artist=query_artist, preferred_version=preferred_version:
+                      dispatch(key, artist, song_title, query_artist, preferred_version, response, error))
+    return found
+
+
+def apply_llm_result(llm_result, artist, song_title, version_type, notes):
+    """
+    Take the LLM's corrections of a row unless it was unsure.
+
+    Returns:
+        tuple: (artist, song title, version type, notes)
+    """
+    llm_artist = llm_result.get('corrected_artist')
+    llm_song = llm_result.get('identified_song_title')
+    llm_version = llm_result.get('version_type')
+    confidence = llm_result.get('confidence')
+
+    if confidence != "low" and llm_song and llm_artist:
+        if llm_song != song_title:
+            notes += " Song: fixed"
+            song_title = llm_song
+
+        if llm_artist != artist:
+            notes += " Artist: fixed"
+            artist = llm_artist
+
+        if llm_version and llm_version != version_type:
+            notes += f" Ver: {llm_version}"
+            version_type = llm_version
+    else:
+        notes += " LLM: uncertain"
+    return artist, song_title, version_type, notes
+
+
+def search_spotify_with_version(artist, song_title, sp, preferred_version='Original', aliases=None,
+                                sheet_artist=None):
+    """
+    Enhanced Spotify search with version preference
 
-                    best_matches.append({
-                        'url': track['external_urls']['spotify'],
-                        'name': track['name'],
-                        'artist': track['artists'][0]['name'],
-                        'version': detected_version,
-                        'score': score
-                    })
+    With an ArtistAliases index, the search uses the spelling Spotify was confirmed to
+    use for the sheet's artist, and the artist of the chosen track is learned.
+    """
+    alias = aliases.lookup(sheet_artist or artist, 'spotify') if aliases else None
+    query_artist = alias or artist
+    accepted_artists = {artist.lower(), query_artist.lower()}
+    try:
+        # Base search
+        with metrics.timed('spotify', 'search'):
+            results = sp.search(q=f"track:{song_title} artist:{query_artist}", type="track", limit=20)
 
-            # Sort by score and return best match
-            best_matches.sort(key=lambda x: x['score'], reverse=True)
-            return best_matches[0]['url'] if best_matches else None
+        if results and results['tracks']['items']:
+            # Only tracks credited to the artist, ranked by song, preferred version and first-credited artist
+            candidates = [candidate_ranking.from_spotify_track(track) for track in results['tracks']['items']
+                          if accepted_artists.intersection(a['name'].lower() for a in track['artists'])]
+            top = candidate_ranking.best(candidates, artist, song_title, preferred_version=preferred_version,
+                                         artist_spellings=(query_artist,))
+            if top is None:
+                return None
+            if aliases:
+                aliases.learn(sheet_artist or artist, 'spotify', top.candidate.artists[0])
+            return top.candidate.url
 
         return None
 
@@ -288,7 +337,19 @@ def search_spotify_with_version(artist, song_title, sp, preferred_version='Origi
         return None
 
 
-def batch_llm_process_songs(song_batch, llm_model):
+def artist_examples(artists, aliases=None):
+    """Prompt lines showing the LLM how the batch's artists are spelled (learned spellings first)"""
+    pairs = aliases.spellings_for(artists, MAX_ARTIST_EXAMPLES) if aliases else []
+    known = {sheet_artist for sheet_artist, _ in pairs}
+    for example in DEFAULT_ARTIST_EXAMPLES:
+        if len(pairs) >= MAX_ARTIST_EXAMPLES:
+            break
+        if example[0] not in known:
+            pairs.append(example)
+    return "\n".join(f'- אם הקלט הוא "{sheet_artist}" → הפלט צריך להיות "{alias}"' for sheet_artist, alias in pairs)
+
+
+def batch_llm_process_songs(song_batch, llm_model, aliases=None):
     """Process multiple songs in a single LLM call for efficiency"""
 
     # Build batch input
@@ -335,17 +396,15 @@ Song Text: "{song_title}"
 ]
 
 דוגמאות:
-- אם הקלט הוא "Osher Cohen" → הפלט צריך להיות "אושר כהן"
-- אם הקלט הוא "Eyal Golan" → הפלט צריך להיות "אייל גולן"
+{artist_examples([artist for _, artist, _ in song_batch], aliases)}
 - אם הקלט הוא מילים בעברית → זהה כותרת שיר עברית
-- אם הקלט הוא "Tuna" → הפלט צריך להיות "טונה"
-- אם הקלט הוא "Chava Alberstein" → הפלט צריך להיות "חוה אלברשטיין"
 
 השב עם מערך JSON בלבד, ללא טקסט או עיצוב נוסף.
 """
 
     try:
-        response = llm_model.generate_content(prompt)
+        with metrics.timed('gemini', 'generate_content'):
+            response = llm_model.generate_content(prompt)
         llm_output_text = response.text.strip()
 
         # Clean up markdown code blocks and extra text
@@ -417,23 +476,29 @@ def pause_for_user_input(current_row, error_msg=""):
             print("Invalid choice. Please enter 1, 2, or 3.")
 
 
-def save_progress_state(current_row, log_filename):
-    """Save current progress state"""
-    state = {
-        'last_processed_row': current_row,
-        'timestamp': datetime.now().isoformat(),
-        'log_file': log_filename
-    }
+def input_fingerprint(row):
+    """Fingerprint of the cells a row is processed from: artist, title and existing links"""
+    return row_fingerprint(row.get('Artist', ''), row.get('Song Title', ''), row.get('YouTube Link', ''),
+                           row.get('Spotify Link', ''))
 
-    with open('processing_state.json', 'w') as f:
-        json.dump(state, f, indent=2)
 
-    logging.info(f"Progress saved. Last processed row: {current_row}")
-    print(f"Progress saved to processing_state.json. Resume from row {current_row + 1} next time.")
+def report_stop(current_row, log_filename):
+    """Explain where processing stopped; per-row outcomes are already in the job state"""
+    logging.info(f"Processing stopped at row {current_row}. Log: {log_filename}")
+    print(f"Stopped at row {current_row}. The sheet is written only at the end of a run, so rows of this run "
+          f"were not saved; rows that failed are recorded in the job state (job_state.db).")
 
 
-def process_song_data():
-    """Main processing function with enhanced logic"""
+def process_song_data(state=None, aliases=None):
+    """
+    Main processing function with enhanced logic
+
+    Args:
+        state (JobState): Optional; rows are recorded as done once the sheet is written,
+            and failed rows with their error.
+        aliases (ArtistAliases): Optional; known artist spellings for searches and the
+            LLM prompt, learned from the Spotify matches.
+    """
     # Setup logging
     log_filename = setup_logging()
 
@@ -443,8 +508,11 @@ def process_song_data():
     # Initialize APIs
     worksheet, youtube_service, sp, llm_model = initialize_apis(spreadsheet_id, worksheet_name)
 
+    sheet_key = state.sheet_key(worksheet) if state else None
+    finished_rows = []  # Job state entries, recorded once the sheet is written
+
     # Get data
-    data = worksheet.get_all_values()
+    data = sheets_governor.call('read', worksheet.get_all_values)
     headers = data[0]
     df = pd.DataFrame(data[1:], columns=headers)
 
@@ -461,7 +529,19 @@ def process_song_data():
     if end_row is None:
         end_row = total_rows + 1
 
-    processing_range = range(start_row - 2, min(end_row - 1, total_rows))
+    processing_range = list(range(start_row - 2, min(end_row - 1, total_rows)))
+
+    # Rows whose artist, title and links are unchanged since they were last processed need nothing
+    if state:
+        unchanged = {index for index in processing_range
+                     if state.is_finished(sheet_key, index + 2, JOB_PROVIDER, input_fingerprint(df.iloc[index]))}
+        if unchanged:
+            choice = input(f"{len(unchanged)} rows are unchanged since they were last processed. "
+                           f"Reprocess them anyway? (y/n, default 'n'): ").strip().lower()
+            if choice != 'y':
+                processing_range = [index for index in processing_range if index not in unchanged]
+                metrics.record_row('v0_processor', 'unchanged', len(unchanged))
+                logging.info(f"Skipping {len(unchanged)} unchanged rows; {len(processing_range)} rows to process")
 
     logging.info(
         f"Processing rows {start_row} to {min(end_row, total_rows + 1)} of worksheet '{worksheet_name}' in batches of {batch_size}")
@@ -469,7 +549,7 @@ def process_song_data():
     # Process in batches
     for batch_start in range(0, len(processing_range), batch_size):
         batch_end = min(batch_start + batch_size, len(processing_range))
-        current_batch_indices = list(processing_range)[batch_start:batch_end]
+        current_batch_indices = processing_range[batch_start:batch_end]
 
         try:
             # Prepare batch for LLM processing
@@ -517,62 +597,51 @@ def process_song_data():
             # Process batch with LLM
             logging.info(
                 f"Processing LLM batch: rows {current_batch_indices[0] + 2} to {current_batch_indices[-1] + 2}")
-            llm_results = batch_llm_process_songs(llm_batch, llm_model)
+            llm_results = batch_llm_process_songs(llm_batch, llm_model, aliases)
+
+            # Apply the LLM results, then search YouTube for the whole batch in one request
+            youtube_searches = {}
+            for row_data in batch_data:
+                row = row_data['original_data']
+                resolved = (row_data['current_artist'], row_data['current_song_title'],
+                            row.get('Version Type', 'Original'), row.get('Notes', ''))
+                if row_data['row_num'] in llm_results:
+                    resolved = apply_llm_result(llm_results[row_data['row_num']], *resolved)
+                row_data['resolved'] = resolved
+                artist, song_title, version_type, _ = resolved
+                if artist and song_title:
+                    youtube_searches[row_data['row_num']] = (artist, song_title, version_type,
+                                                             row_data['current_artist'])
+            youtube_found = search_youtube_batch(youtube_searches, youtube_service, aliases)
 
             # Process each row in the batch
             for row_data in batch_data:
                 try:
                     index = row_data['index']
                     actual_row_num = row_data['row_num']
-                    current_artist = row_data['current_artist']
-                    current_song_title = row_data['current_song_title']
+                    sheet_artist = row_data['current_artist']
                     row = row_data['original_data']
 
                     youtube_link = row.get('YouTube Link', '')
                     spotify_link = row.get('Spotify Link', '')
-                    version_type = row.get('Version Type', 'Original')
-                    notes = row.get('Notes', '')
-
-                    current_version_type = version_type
 
                     logging.info(
-                        f"Processing row {actual_row_num}: Artist='{current_artist}', Song='{current_song_title}'")
-
-                    # Apply LLM results if available
-                    if actual_row_num in llm_results:
-                        llm_result = llm_results[actual_row_num]
-                        llm_artist = llm_result.get('corrected_artist')
-                        llm_song = llm_result.get('identified_song_title')
-                        llm_version = llm_result.get('version_type')
-                        confidence = llm_result.get('confidence')
-
-                        if confidence != "low" and llm_song and llm_artist:
-                            if llm_song != current_song_title:
-                                notes += " Song: fixed"
-                                current_song_title = llm_song
-
-                            if llm_artist != current_artist:
-                                notes += " Artist: fixed"
-                                current_artist = llm_artist
-
-                            if llm_version and llm_version != current_version_type:
-                                notes += f" Ver: {llm_version}"
-                                current_version_type = llm_version
-                        else:
-                            notes += " LLM: uncertain"
+                        f"Processing row {actual_row_num}: Artist='{sheet_artist}', Song='{row_data['current_song_title']}'")
+
+                    # LLM results were applied before the batch's YouTube search
+                    current_artist, current_song_title, current_version_type, notes = row_data['resolved']
 
                     # ALWAYS search for updated links if we have artist and song title
                     if current_artist and current_song_title:
                         logging.info(f"Searching for links: {current_artist} - {current_song_title}")
 
-                        # Search YouTube
-                        found_yt_link = search_youtube_with_version(
-                            current_artist, current_song_title, youtube_service, current_version_type
-                        )
+                        # YouTube was searched for the whole batch above
+                        found_yt_link = youtube_found.get(actual_row_num)
 
                         # Search Spotify
                         found_sp_link = search_spotify_with_version(
-                            current_artist, current_song_title, sp, current_version_type
+                            current_artist, current_song_title, sp, current_version_type,
+                            aliases, sheet_artist
                         )
 
                         # Update YouTube link
@@ -613,15 +682,21 @@ def process_song_data():
                     df.at[index, 'YouTube Link'] = youtube_link
                     df.at[index, 'Spotify Link'] = spotify_link
                     df.at[index, 'Notes'] = notes
+                    metrics.record_row('v0_processor', 'processed')
+                    finished_rows.append((actual_row_num, 'done', input_fingerprint(df.loc[index])))
 
                 except Exception as e:
                     error_msg = f"Error processing row {actual_row_num}: {e}"
                     logging.error(error_msg)
+                    metrics.record_row('v0_processor', 'error')
+                    if state:
+                        state.record(sheet_key, actual_row_num, JOB_PROVIDER, 'error',
+                                     input_fingerprint(row_data['original_data']), error=str(e))
 
                     choice = pause_for_user_input(actual_row_num, error_msg)
 
                     if choice == 'stop':
-                        save_progress_state(actual_row_num, log_filename)
+                        report_stop(actual_row_num, log_filename)
                         return
                     elif choice == 'skip':
                         logging.info(f"Skipping row {actual_row_num}")
@@ -637,7 +712,7 @@ def process_song_data():
             choice = pause_for_user_input(current_batch_indices[0] + 2, error_msg)
 
             if choice == 'stop':
-                save_progress_state(current_batch_indices[0] + 2, log_filename)
+                report_stop(current_batch_indices[0] + 2, log_filename)
                 return
             elif choice == 'skip':
                 logging.info(f"Skipping batch starting at row {current_batch_indices[0] + 2}")
@@ -645,8 +720,8 @@ def process_song_data():
 
     # Write updated data back to sheet
     try:
-        worksheet.clear()
-        worksheet.update([df.columns.values.tolist()] + df.values.tolist())
+        sheets_governor.call('write', worksheet.clear)
+        sheets_governor.call('write', worksheet.update, [df.columns.values.tolist()] + df.values.tolist())
         logging.info("Processing complete. Google Sheet updated successfully.")
         print("\n✅ Processing completed successfully!")
 
@@ -654,15 +729,24 @@ def process_song_data():
         error_msg = f"Error updating Google Sheet: {e}"
         logging.error(error_msg)
         print(f"❌ {error_msg}")
-        save_progress_state(len(processing_range), log_filename)
+        return
+
+    if state:
+        state.record_many(sheet_key, JOB_PROVIDER, finished_rows)
 
 
 if __name__ == '__main__':
+    job_state = JobState()
+    artist_aliases = ArtistAliases.load()
     try:
-        process_song_data()
+        process_song_data(job_state, artist_aliases)
     except KeyboardInterrupt:
         print("\n\n⚠️  Processing interrupted by user")
         logging.info("Processing interrupted by user")
     except Exception as e:
         print(f"\n❌ Unexpected error: {e}")
         logging.error(f"Unexpected error: {e}")
+    finally:
+        job_state.close()
+        artist_aliases.save()
+        metrics.export_run('v0_processor')
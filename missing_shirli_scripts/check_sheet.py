@@ -3,9 +3,16 @@ Quick script to check your Google Sheet structure
 This will show you exactly what's in each column
 """
 
+import os
+import sys
+
 import gspread
 from google.oauth2.service_account import Credentials
 
+# Shared helpers (sheet_reader) live in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sheet_reader import all_columns, iter_row_chunks, read_rows
+
 # Configuration
 CREDS_FILE = 'credentials.json'
 SHEET_NAME = 'songs'
@@ -28,14 +35,22 @@ def check_sheet_structure():
         client = gspread.authorize(creds)
         sheet = client.open(SHEET_NAME).sheet1
 
-        # Get first 5 rows to analyze structure
-        rows = sheet.get_all_values()[:5]
+        # Get first 5 rows (every column) to analyze structure
+        rows = read_rows(sheet, all_columns(sheet), last_row=5)
 
         if not rows:
             print("❌ Sheet is empty")
             return
 
-        print(f"📊 Sheet '{SHEET_NAME}' has {len(sheet.get_all_values())} total rows")
+        # Drop the grid's empty columns past the data
+        width = max(i + 1 for row in rows for i, value in enumerate(row) if value)
+        rows = [row[:width] for row in rows]
+
+        # Count rows from the artist and title columns only, a chunk at a time
+        total_rows = 0
+        for first_row, chunk in iter_row_chunks(sheet, ['A:B']):
+            total_rows = first_row + len(chunk) - 1
+        print(f"📊 Sheet '{SHEET_NAME}' has {total_rows} total rows")
         print("\n📋 Column Structure:")
 
         # Show headers
@@ -3,9 +3,24 @@ Debug script to examine the Google Sheet structure and data
 to help identify column mapping and data issues.
 """
 
+import os
+import sys
+
 import gspread
 from google.oauth2.service_account import Credentials
 
+# Shared helpers (sheet_reader) live in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sheet_reader import all_columns, iter_rows, read_rows
+
+
+def _trimmed(row):
+    """A row without its trailing empty cells, as row_values() returns it."""
+    end = len(row)
+    while end and not row[end - 1]:
+        end -= 1
+    return row[:end]
+
 
 def debug_sheet_structure(credentials_file: str, sheet_name: str):
     """Debug the Google Sheet structure and content."""
@@ -29,8 +44,12 @@ def debug_sheet_structure(credentials_file: str, sheet_name: str):
         print(f"📊 Sheet Name: {sheet_name}")
         print(f"📏 Dimensions: {worksheet.row_count} rows × {worksheet.col_count} columns")
 
+        # Every column, read in one request for the header and samples and in chunks for the analysis
+        columns = all_columns(worksheet)
+        first_rows = [_trimmed(row) for row in read_rows(worksheet, columns, last_row=10)]
+
         # Headers
-        headers = worksheet.row_values(1)
+        headers = first_rows[0] if first_rows else []
         print(f"\n📋 Column Headers ({len(headers)} columns):")
         for i, header in enumerate(headers, 1):
             print(f"  {chr(64 + i)}: '{header}'")
@@ -39,8 +58,7 @@ def debug_sheet_structure(credentials_file: str, sheet_name: str):
         print(f"\n📝 Sample Data (first 10 rows):")
         print("-" * 80)
 
-        for row_num in range(1, min(11, worksheet.row_count + 1)):
-            row_data = worksheet.row_values(row_num)
+        for row_num, row_data in enumerate(first_rows, 1):
 
             if row_num == 1:
                 print(f"Row {row_num} (HEADER): {row_data}")
@@ -66,8 +84,9 @@ def debug_sheet_structure(credentials_file: str, sheet_name: str):
         hebrew_rows = 0
         english_rows = 0
 
-        all_data = worksheet.get_all_values()
-        for i, row in enumerate(all_data[1:], 2):  # Skip header
+        k_values = []  # (row number, value) of column K, the target column
+        for i, row in iter_rows(worksheet, columns, first_row=2):  # Skip header
+            k_values.append((i, row[10] if len(row) > 10 else ''))
             if any(cell.strip() for cell in row):
                 non_empty_rows += 1
 
@@ -84,14 +103,15 @@ def debug_sheet_structure(credentials_file: str, sheet_name: str):
 
         # Column K status
         print(f"\n📍 Column K (Target column) status:")
-        k_values = worksheet.col_values(11)  # Column K
-        k_filled = sum(1 for val in k_values[1:] if val.strip())  # Skip header
+        while k_values and not k_values[-1][1]:
+            k_values.pop()
+        k_filled = sum(1 for _, val in k_values if val.strip())
         print(f"  📝 Already filled: {k_filled} cells")
-        print(f"  📄 Empty: {len(k_values) - 1 - k_filled} cells")
+        print(f"  📄 Empty: {len(k_values) - k_filled} cells")
 
         if k_filled > 0:
             print(f"  🔗 Sample filled values:")
-            for i, val in enumerate(k_values[1:6], 2):  # Show first 5
+            for i, val in k_values[:5]:  # Show first 5
                 if val.strip():
                     print(f"    Row {i}: {val}")
 
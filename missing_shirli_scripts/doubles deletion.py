@@ -2,12 +2,25 @@ import gspread
 from oauth2client.service_account import ServiceAccountCredentials
 import os
 import sys
+from collections import defaultdict
+
+# Shared helpers (text_matching, sheets_governor) live in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import sheets_governor
+from text_matching import artist_block_key, canonical_link_id, normalize_song_title, title_similarity
 
 # --- Configuration ---
 # Define the scope for Google Sheets API access
 # This scope allows read/write access to all your Google Sheets files
 SCOPES = ['https://www.googleapis.com/auth/spreadsheets']
 
+# Near-duplicate matching
+TITLE_SIMILARITY_THRESHOLD = 90  # fuzz.ratio of titles (spaces ignored) within one artist block
+MIN_FUZZY_TITLE_LENGTH = 4       # Shorter titles must match exactly
+LARGE_BLOCK_SIZE = 200           # Bigger artist blocks only compare titles sharing a prefix
+TITLE_PREFIX_LENGTH = 2
+DELETE_REQUESTS_PER_BATCH = 500  # deleteDimension requests per spreadsheets.batchUpdate call
+
 
 # --- Authentication Function ---
 def authenticate_gspread():
@@ -124,7 +137,7 @@ def get_sheet_data(client):
             # Select the specific worksheet by name
             worksheet = spreadsheet.worksheet(sheet_name)
             # Get all values from the worksheet
-            all_data = worksheet.get_all_values()
+            all_data = sheets_governor.call('read', worksheet.get_all_values)
             print(f"Successfully read data from '{sheet_name}' in spreadsheet ID '{sheet_id}'.")
             return worksheet, all_data
         except gspread.exceptions.SpreadsheetNotFound:
@@ -140,13 +153,127 @@ def get_sheet_data(client):
 
 
 # --- Find Duplicates Logic ---
-def find_duplicates(data, case_sensitive=False):
+class _UnionFind:
+    """Groups row indices; the lowest index of a group is its representative."""
+
+    def __init__(self, size):
+        self.parent = list(range(size))
+        self.reason = {}  # index -> why it joined its group
+
+    def find(self, i):
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, a, b, reason):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return
+        keep, drop = min(root_a, root_b), max(root_a, root_b)
+        self.parent[drop] = keep
+        self.reason.setdefault(max(a, b), reason)
+
+
+def _match_titles_in_block(indices, compact_titles, groups, threshold):
+    """Union rows of one artist block whose titles are equal or fuzzy-similar."""
+    by_title = defaultdict(list)
+    for i in indices:
+        by_title[compact_titles[i]].append(i)
+
+    for members in by_title.values():
+        for other in members[1:]:
+            groups.union(members[0], other, "same artist and title")
+
+    titles = [t for t in by_title if len(t) >= MIN_FUZZY_TITLE_LENGTH]
+    if len(titles) < 2:
+        return
+    # Large blocks (prolific artists) only compare titles that start alike
+    buckets = defaultdict(list)
+    for title in titles:
+        buckets[title[:TITLE_PREFIX_LENGTH] if len(indices) > LARGE_BLOCK_SIZE else ''].append(title)
+
+    for bucket in buckets.values():
+        for x, title_a in enumerate(bucket):
+            for title_b in bucket[x + 1:]:
+                # fuzz.ratio can't reach the threshold when the lengths differ too much
+                if 200 * min(len(title_a), len(title_b)) < threshold * (len(title_a) + len(title_b)):
+                    continue
+                score = title_similarity(title_a, title_b)
+                if score >= threshold:
+                    groups.union(by_title[title_a][0], by_title[title_b][0], f"similar title ({score})")
+
+
+def find_duplicate_groups(data, case_sensitive=False, fuzzy=True, threshold=TITLE_SIMILARITY_THRESHOLD):
+    """
+    Groups duplicate rows. Exact mode compares the stripped Column A / Column B
+    values. Fuzzy mode blocks rows by a transliterated artist skeleton (or the
+    normalized name, for skeletons too short to tell artists apart) and by the
+    YouTube / Spotify IDs found in any other column, then fuzzy-scores titles only
+    within each artist block, so the work grows with block sizes, not rows squared.
+    Rows without an artist only group by their links.
+
+    Args:
+        data (list of lists): The rows to check (without the header).
+        case_sensitive (bool): Only used in exact mode.
+        fuzzy (bool): Use near-duplicate matching.
+        threshold (int): Minimum title similarity (0-100) in fuzzy mode.
+
+    Returns:
+        list: Groups as (sorted row indices, {index: reason}); the first index is kept.
+    """
+    groups = _UnionFind(len(data))
+
+    if not fuzzy:
+        first_seen = {}
+        for i, row in enumerate(data):
+            if len(row) < 2:
+                continue
+            combination = (str(row[0]).strip(), str(row[1]).strip())
+            if not case_sensitive:
+                combination = (combination[0].lower(), combination[1].lower())
+            if combination in first_seen:
+                groups.union(first_seen[combination], i, "same artist and title")
+            else:
+                first_seen[combination] = i
+    else:
+        artist_blocks = defaultdict(list)
+        link_blocks = defaultdict(list)
+        compact_titles = {}
+        for i, row in enumerate(data):
+            if len(row) < 2:
+                continue
+            artist_key = artist_block_key(str(row[0]))
+            if artist_key:
+                compact_titles[i] = normalize_song_title(str(row[1])).replace(' ', '')
+                artist_blocks[artist_key].append(i)
+            for cell in row[2:]:
+                link_id = canonical_link_id(cell)
+                if link_id:
+                    link_blocks[link_id].append(i)
+
+        for (provider, link_id), members in link_blocks.items():
+            for other in members[1:]:
+                if other != members[0]:
+                    groups.union(members[0], other, f"same {provider} link ({link_id})")
+        for members in artist_blocks.values():
+            _match_titles_in_block(members, compact_titles, groups, threshold)
+
+    members_by_root = defaultdict(list)
+    for i in range(len(data)):
+        members_by_root[groups.find(i)].append(i)
+    return [(members, {i: groups.reason.get(i, '') for i in members[1:]})
+            for members in members_by_root.values() if len(members) > 1]
+
+
+def find_duplicates(data, case_sensitive=False, fuzzy=False):
     """
     Identifies duplicate rows based on Column A and Column B, keeping the first occurrence.
 
     Args:
         data (list of lists): The data from the Google Sheet.
         case_sensitive (bool): If True, comparisons are case-sensitive. Default is False.
+        fuzzy (bool): Also catch near-duplicates (see find_duplicate_groups).
 
     Returns:
         tuple: A tuple containing:
@@ -157,46 +284,41 @@ def find_duplicates(data, case_sensitive=False):
     if not data:
         return [], 0, []
 
-    # Assuming Column A is index 0 and Column B is index 1
-    col_a_idx = 0
-    col_b_idx = 1
-
-    unique_combinations = set()
-    rows_to_keep = []
-    rows_to_delete_indices = []
-    duplicate_count = 0
-
-    # Iterate through data starting from the second row if there's a header (all_values includes header)
-    # If your sheet has no header, adjust this logic.
-    # For simplicity, we'll assume the first row is data or header and start checking from there.
-    for i, row in enumerate(data):
-        # Ensure row has at least two columns
-        if len(row) < 2:
-            rows_to_keep.append(row)  # Keep rows that don't have enough columns
-            continue
+    rows_to_delete_indices = sorted(i for members, _ in find_duplicate_groups(data, case_sensitive, fuzzy)
+                                    for i in members[1:])
+    deleted = set(rows_to_delete_indices)
+    rows_to_keep = [row for i, row in enumerate(data) if i not in deleted]
+    return rows_to_delete_indices, len(rows_to_delete_indices), rows_to_keep
 
-        # Get values from Column A and B
-        val_a = str(row[col_a_idx]).strip()
-        val_b = str(row[col_b_idx]).strip()
 
-        # Apply case sensitivity logic
-        if not case_sensitive:
-            val_a = val_a.lower()
-            val_b = val_b.lower()
+def delete_rows(worksheet, sheet_row_indices):
+    """
+    Deletes rows in place with batched deleteDimension requests. Consecutive rows
+    are merged into one request and requests run from the bottom up, so earlier
+    deletions never shift the rows still to be deleted.
 
-        # Create a tuple for the combination to use in the set
-        combination = (val_a, val_b)
+    Args:
+        worksheet (gspread.Worksheet): The worksheet to delete from.
+        sheet_row_indices (list): 0-indexed sheet rows (header included in the count).
 
-        if combination in unique_combinations:
-            # This is a duplicate, mark for deletion
-            rows_to_delete_indices.append(i)
-            duplicate_count += 1
+    Returns:
+        int: Number of deleteDimension requests sent.
+    """
+    spans = []
+    for index in sorted(set(sheet_row_indices), reverse=True):
+        if spans and spans[-1][0] == index + 1:
+            spans[-1][0] = index
         else:
-            # This is a unique combination, add to set and keep the row
-            unique_combinations.add(combination)
-            rows_to_keep.append(row)
+            spans.append([index, index + 1])
 
-    return rows_to_delete_indices, duplicate_count, rows_to_keep
+    requests = [{'deleteDimension': {'range': {'sheetId': worksheet.id, 'dimension': 'ROWS',
+                                               'startIndex': start, 'endIndex': end}}}
+                for start, end in spans]
+    for batch_start in range(0, len(requests), DELETE_REQUESTS_PER_BATCH):
+        sheets_governor.call('write', worksheet.spreadsheet.batch_update,
+                             {'requests': requests[batch_start:batch_start + DELETE_REQUESTS_PER_BATCH]},
+                             endpoint='batchUpdate')
+    return len(requests)
 
 
 # --- Main Execution ---
@@ -227,27 +349,41 @@ def main():
     header_choice = input("Does your sheet have a header row? (yes/no): ").strip().lower()
     if header_choice == 'yes':
         has_header = True
-        header_row = all_data[0]
         data_to_process = all_data[1:]  # Exclude header for duplicate checking
     else:
-        header_row = []  # No header
         data_to_process = all_data  # Process all rows
 
-    # 3. Case sensitivity option
-    case_sensitive_choice = input(
-        "Perform case-sensitive comparison for columns A and B? (yes/no, default is no): ").strip().lower()
-    case_sensitive = True if case_sensitive_choice == 'yes' else False
+    # 3. Matching mode
+    fuzzy_choice = input(
+        "Also catch near-duplicates (spelling/transliteration variants, shared YouTube/Spotify links)? "
+        "(yes/no, default is yes): ").strip().lower()
+    fuzzy = fuzzy_choice != 'no'
+    case_sensitive = False
+    if not fuzzy:
+        case_sensitive_choice = input(
+            "Perform case-sensitive comparison for columns A and B? (yes/no, default is no): ").strip().lower()
+        case_sensitive = True if case_sensitive_choice == 'yes' else False
 
     # 4. Find Duplicates
-    # The indices returned here are relative to `data_to_process`
-    rows_to_delete_relative_indices, duplicate_count, cleaned_data_rows = find_duplicates(data_to_process,
-                                                                                          case_sensitive)
+    # The indices here are relative to `data_to_process`
+    duplicate_groups = find_duplicate_groups(data_to_process, case_sensitive, fuzzy)
+    rows_to_delete_relative_indices = sorted(i for members, _ in duplicate_groups for i in members[1:])
+    duplicate_count = len(rows_to_delete_relative_indices)
 
     if duplicate_count == 0:
-        print("\nNo duplicate entries found in Column A and Column B.")
+        print("\nNo duplicate entries found.")
         return
 
-    print(f"\nFound {duplicate_count} duplicate row(s) based on Column A and Column B.")
+    print(f"\nFound {duplicate_count} duplicate row(s) in {len(duplicate_groups)} group(s).")
+    row_offset = 2 if has_header else 1  # Relative index -> 1-indexed sheet row
+    for members, reasons in duplicate_groups[:10]:
+        kept = data_to_process[members[0]]
+        print(f"   Keep row {members[0] + row_offset}: {kept[0]} - {kept[1]}")
+        for i in members[1:]:
+            row = data_to_process[i]
+            print(f"      delete row {i + row_offset}: {row[0]} - {row[1]}   [{reasons[i]}]")
+    if len(duplicate_groups) > 10:
+        print(f"   ... and {len(duplicate_groups) - 10} more group(s)")
 
     # 5. User Confirmation
     while True:
@@ -260,29 +396,17 @@ def main():
         else:
             print("Invalid input. Please type 'yes' or 'no'.")
 
-    # 6. Perform Deletion (Efficiently)
+    # 6. Perform Deletion (in place, bottom-up, batched)
     try:
         print("\nDeleting duplicate rows...")
+        sheet_row_indices = [i + (1 if has_header else 0) for i in rows_to_delete_relative_indices]
+        request_count = delete_rows(worksheet, sheet_row_indices)
 
-        # If there's a header, prepend it to the cleaned data
-        final_data_to_write = []
-        if has_header:
-            final_data_to_write.append(header_row)
-        final_data_to_write.extend(cleaned_data_rows)
-
-        # Clear the entire sheet and then write the cleaned data back.
-        # This is generally more robust and efficient than deleting rows one by one,
-        # especially for larger sheets or many deletions, as it avoids indexing issues.
-        worksheet.clear()  # Clears all cells in the worksheet
-        worksheet.update(final_data_to_write)  # Writes the new data back
-
-        print(f"Successfully deleted {duplicate_count} duplicate row(s).")
-        print("The sheet has been updated with unique entries.")
+        print(f"Successfully deleted {duplicate_count} duplicate row(s) with {request_count} delete request(s).")
 
     except Exception as e:
         print(f"An error occurred during deletion: {e}")
         print("Please check your permissions and try again.")
 
-
 if __name__ == "__main__":
     main()
@@ -8,6 +8,11 @@ import os
 import time
 import logging
 
+# Shared helpers (metrics) live in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import metrics
+import sheets_governor
+
 # Set up simple logging
 logging.basicConfig(level=logging.INFO, format='%(message)s')
 logger = logging.getLogger(__name__)
@@ -55,7 +60,7 @@ if not check_packages():
 import gspread
 from google.oauth2.service_account import Credentials
 import spotipy
-from spotipy.oauth2 import SpotifyClientCredentials
+from spotify_token_cache import SharedClientCredentials
 from googleapiclient.discovery import build
 
 def check_config():
@@ -104,14 +109,16 @@ def search_spotify(sp, song, artist):
     try:
         # Try exact search first
         query = f'track:"{song}" artist:"{artist}"'
-        results = sp.search(q=query, type='track', limit=1)
+        with metrics.timed('spotify', 'search'):
+            results = sp.search(q=query, type='track', limit=1)
 
         if results['tracks']['items']:
             return results['tracks']['items'][0]['external_urls']['spotify']
 
         # Try broader search
         query = f"{song} {artist}"
-        results = sp.search(q=query, type='track', limit=1)
+        with metrics.timed('spotify', 'search'):
+            results = sp.search(q=query, type='track', limit=1)
 
         if results['tracks']['items']:
             return results['tracks']['items'][0]['external_urls']['spotify']
@@ -132,7 +139,8 @@ def search_youtube(youtube, song, artist):
             maxResults=1,
             type='video'
         )
-        response = request.execute()
+        with metrics.timed('youtube', 'search.list'):
+            response = request.execute()
 
         if response['items']:
             video_id = response['items'][0]['id']['videoId']
@@ -147,7 +155,7 @@ def process_worksheet(sheet, worksheet, sp, youtube, link_source, row_range):
     """Processes a single worksheet to find and update music links."""
     print(f"\n📋 Reading worksheet: '{worksheet.title}'...")
 
-    all_values = worksheet.get_all_values()
+    all_values = sheets_governor.call('read', worksheet.get_all_values)
 
     if len(all_values) < 2:
         print(f"❌ No data found in worksheet '{worksheet.title}' (need at least 2 rows including header)")
@@ -212,6 +220,7 @@ def process_worksheet(sheet, worksheet, sp, youtube, link_source, row_range):
 
             if song and artist:
                 processed_count += 1
+                metrics.record_row('music_linker', 'processed')
                 print(f"\n🎼 ({processed_count}) Processing Row {row_num_in_sheet}: '{song}' by '{artist}'")
 
                 # Check if links already exist (ensure row is long enough before accessing indices)
@@ -247,13 +256,14 @@ def process_worksheet(sheet, worksheet, sp, youtube, link_source, row_range):
 
             else:
                 print(f"   ⚠️  Row {row_num_in_sheet}: Missing song or artist data. Skipping.")
+                metrics.record_row('music_linker', 'skipped')
         else:
             print(f"   ⚠️  Row {row_num_in_sheet}: Not enough columns (expected at least 2). Skipping.")
 
     # Apply all updates
     if updates:
         print(f"\n📝 Updating {len(updates)} cells in worksheet '{worksheet.title}'...")
-        worksheet.batch_update(updates)
+        sheets_governor.call('write', worksheet.batch_update, updates)
         print("✅ All updates completed for this worksheet!")
     else:
         print(f"\nℹ️  No updates needed for worksheet '{worksheet.title}' - all songs already have requested links or no valid rows found.")
@@ -323,7 +333,7 @@ def main():
             row_range = 'all' # Default to all if empty input
 
         print("\n🎧 Connecting to Spotify...")
-        sp = spotipy.Spotify(auth_manager=SpotifyClientCredentials(
+        sp = spotipy.Spotify(auth_manager=SharedClientCredentials(
             client_id=SPOTIFY_CLIENT_ID,
             client_secret=SPOTIFY_CLIENT_SECRET
         ))
@@ -342,6 +352,7 @@ def main():
         print(f"\n❌ An unexpected error occurred: {e}")
         print("Please check your configuration and try again.")
 
+    metrics.export_run('music_linker')
     input("\nPress Enter to exit...")
 
 if __name__ == '__main__':
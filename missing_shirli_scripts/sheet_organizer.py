@@ -1,69 +1,24 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
 import gspread
+import numpy as np
 import pandas as pd
-from collections import defaultdict
+from collections import Counter, defaultdict
 import re
 
+# Shared helpers (sheets_governor) live in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import sheets_governor
+
 # --- Configuration ---
 # Updated names as requested
 SPREADSHEET_NAME = 'songs'
 WORKSHEET_NAME = 'songs'
 OUTPUT_WORKSHEET_NAME = 'Cleaned_Songs_Data'  # New tab name for cleaned data
 
-# --- Google Sheets API Authentication ---
-try:
-    # Authenticate with Google Sheets using the service account key file
-    # Changed filename to 'credentials.json' as requested
-    gc = gspread.service_account(filename='credentials.json')
-    spreadsheet = gc.open(SPREADSHEET_NAME)
-    worksheet = spreadsheet.worksheet(WORKSHEET_NAME)
-    print(f"Successfully connected to spreadsheet '{SPREADSHEET_NAME}' and worksheet '{WORKSHEET_NAME}'.")
-except gspread.exceptions.SpreadsheetNotFound:
-    print(f"Error: Spreadsheet '{SPREADSHEET_NAME}' not found. Please check the name.")
-    exit()
-except gspread.exceptions.WorksheetNotFound:
-    print(f"Error: Worksheet '{WORKSHEET_NAME}' not found in spreadsheet '{SPREADSHEET_NAME}'. Please check the name.")
-    exit()
-except Exception as e:
-    print(f"An error occurred during Google Sheets authentication or connection: {e}")
-    print("Please ensure 'credentials.json' is in the same directory and has the correct permissions.")
-    exit()
-
-# Fetch all values from the worksheet
-all_values = worksheet.get_all_values()
-
-if not all_values:
-    print("No data found in the worksheet. Exiting.")
-    exit()
-
-# The first row is assumed to be headers.
-# We'll create unique headers if there are duplicates or blanks.
-original_headers = [header.strip() if header.strip() != '' else f'Unnamed_Col_{i}' for i, header in
-                    enumerate(all_values[0])]
-
-# Ensure headers are unique even if they were named the same
-unique_headers = []
-counts = defaultdict(int)
-for header in original_headers:
-    original_name = header
-    temp_header = header
-    while temp_header in unique_headers:  # If this header name already exists
-        counts[original_name] += 1
-        temp_header = f"{original_name}_{counts[original_name]}"
-    unique_headers.append(temp_header)
-
-# Create DataFrame from the rest of the values with our unique headers
-# Ensure there are rows beyond headers, otherwise df will be empty
-if len(all_values) > 1:
-    df = pd.DataFrame(all_values[1:], columns=unique_headers)
-else:
-    print("No data rows found beyond the header. Exiting.")
-    exit()
-
-print("\n--- Original DataFrame Head ---")
-print(df.head())
-print("\nOriginal Columns (after initial processing):", df.columns.tolist())
-
-# --- 1. Standardize Column Names and Consolidate Data ---
 # Map possible column names to their desired unified names
 column_mapping = {
     'title': 'שם השיר', 'שם השיר': 'שם השיר',
@@ -75,133 +30,11 @@ column_mapping = {
     # 'links' will be handled contextually based on content
 }
 
-# Regex patterns for link detection
-YOUTUBE_PATTERN = r'(youtube\.com|youtu\.be)'
-SPOTIFY_PATTERN = r'(spotify\.com)'
-
-# Using a dictionary to store temporary consolidated data, mapping (artist, title) to consolidated row data
-consolidated_rows = defaultdict(lambda: {
-    'אמן': None,
-    'שם השיר': None,
-    'תגיות': set(),
-    'קישור YouTube': set(),
-    'קישור Spotify': set(),
-    'הערות/לביקורת': set(),
-    'other_cols': defaultdict(set)  # To store data from columns not explicitly mapped
-})
-
-# Iterate through each row of the original DataFrame
-for index, row in df.iterrows():
-    # Convert row to dictionary for easier access, and normalize keys
-    row_dict = {k.strip().lower(): v for k, v in row.items()}
-
-    current_artist = None
-    current_title = None
-
-    # Try to identify primary keys (artist, title) first from explicitly named columns
-    for potential_artist_col in ['artist', 'אמן']:
-        if potential_artist_col in row_dict and pd.notna(row_dict[potential_artist_col]) and str(
-                row_dict[potential_artist_col]).strip() != '':
-            current_artist = str(row_dict[potential_artist_col]).strip()
-            break
-
-    for potential_title_col in ['title', 'שם השיר']:
-        if potential_title_col in row_dict and pd.notna(row_dict[potential_title_col]) and str(
-                row_dict[potential_title_col]).strip() != '':
-            current_title = str(row_dict[potential_title_col]).strip()
-            break
-
-    # Fallback for artist/title from first two columns if not found by explicit names
-    # This addresses 'שם האמן' being in column A or B, etc.
-    if current_artist is None and len(unique_headers) > 0:
-        val_col0 = row_dict.get(unique_headers[0].lower())
-        if pd.notna(val_col0) and str(val_col0).strip() != '':
-            current_artist = str(val_col0).strip()  # Assume first col might be artist
-
-    if current_title is None and len(unique_headers) > 1:
-        val_col1 = row_dict.get(unique_headers[1].lower())
-        if pd.notna(val_col1) and str(val_col1).strip() != '' and str(val_col1).strip() != current_artist:
-            current_title = str(val_col1).strip()  # Assume second col might be title, if not identical to artist
-
-    # Handle missing essential details and add a note
-    row_notes = []
-    if not current_artist:
-        current_artist = "UNKNOWN ARTIST"
-        row_notes.append("Missing Artist details.")
-    if not current_title:
-        current_title = "UNKNOWN TITLE"
-        row_notes.append("Missing Title details.")
-
-    # Use a unique key for consolidation, even with placeholders
-    key = (current_artist, current_title)
-
-    # Consolidate data for the current row
-    for col_name, value in row_dict.items():
-        if pd.notna(value) and str(value).strip() != '':
-            value = str(value).strip()
-
-            # --- Link Handling (Columns D, E, F - general links and named link columns) ---
-            # Explicitly check for common 'links' or 'unnamed_col_X' which might contain links
-            if col_name == 'links' or col_name.startswith('unnamed_col_'):  # Covers columns D,E,F if unnamed
-                if re.search(YOUTUBE_PATTERN, value, re.IGNORECASE):
-                    consolidated_rows[key]['קישור YouTube'].add(value)
-                elif re.search(SPOTIFY_PATTERN, value, re.IGNORECASE):
-                    consolidated_rows[key]['קישור Spotify'].add(value)
-                else:  # It's a link, but not YouTube/Spotify, or just other text
-                    consolidated_rows[key]['other_cols'][col_name].add(value)  # Keep it in its original column
-
-            # Map known columns (if not already handled as specific links)
-            elif col_name in column_mapping:
-                mapped_name = column_mapping[col_name]
-                if mapped_name == 'תגיות':
-                    consolidated_rows[key][mapped_name].update(
-                        [t.strip() for t in re.split(r'[,\n;]', value) if t.strip()])
-                elif mapped_name == 'קישור YouTube':
-                    consolidated_rows[key][mapped_name].add(value)
-                elif mapped_name == 'קישור Spotify':
-                    consolidated_rows[key][mapped_name].add(value)
-                elif mapped_name == 'הערות/לביקורת':
-                    consolidated_rows[key][mapped_name].add(value)
-                # Artist and Title are set initially, avoiding overwrite by general mapping if already set
-                elif mapped_name == 'אמן' and consolidated_rows[key]['אמן'] is None:
-                    consolidated_rows[key]['אמן'] = value
-                elif mapped_name == 'שם השיר' and consolidated_rows[key]['שם השיר'] is None:
-                    consolidated_rows[key]['שם השיר'] = value
-            else:
-                # Add to other_cols if not explicitly mapped and not handled as a link
-                consolidated_rows[key]['other_cols'][col_name].add(value)
-
-    # Add notes for missing details
-    if row_notes:
-        consolidated_rows[key]['הערות/לביקורת'].add('; '.join(row_notes))
-
-    # Ensure artist and title are set on the consolidated row object from the key
-    consolidated_rows[key]['אמן'] = current_artist
-    consolidated_rows[key]['שם השיר'] = current_title
-
-# Prepare data for final DataFrame
-final_data = []
-for key, data in consolidated_rows.items():
-    row_dict = {
-        'אמן': data['אמן'],
-        'שם השיר': data['שם השיר'],
-        'תגיות': ', '.join(sorted(list(data['תגיות']))),
-        'קישור YouTube': ', '.join(sorted(list(data['קישור YouTube']))),
-        'קישור Spotify': ', '.join(sorted(list(data['קישור Spotify']))),
-        'הערות/לביקורת': ', '.join(sorted(list(data['הערות/לביקורת'])))
-    }
-    # Add other columns from 'other_cols'
-    for col_name, values_set in data['other_cols'].items():
-        if col_name not in ['links', 'youtube', 'spotify', 'title', 'artist', 'tags', 'subject', 'הערות',
-                            'needs review', 'קישורים']:
-            row_dict[col_name] = ', '.join(sorted(list(values_set)))
-
-    final_data.append(row_dict)
-
-# Create the cleaned DataFrame
-cleaned_df = pd.DataFrame(final_data)
+# Regex patterns for link detection (non-capturing, so pandas' str.contains doesn't warn)
+YOUTUBE_PATTERN = r'(?:youtube\.com|youtu\.be)'
+SPOTIFY_PATTERN = r'(?:spotify\.com)'
+TAG_SEPARATORS = r'[,\n;]'
 
-# --- 2. Sort and Reorder Columns ---
 # Define the desired order of columns
 desired_column_order = [
     'אמן',
@@ -212,49 +45,684 @@ desired_column_order = [
     'הערות/לביקורת'
 ]
 
-# Get existing columns from the cleaned DataFrame
-existing_columns = cleaned_df.columns.tolist()
+# Incremental mode: fingerprints of the source rows and where their songs sit in the output tab
+STATE_FILE = 'sheet_organizer_state.json'
+STATE_VERSION = 1
+MAX_RANGES_PER_BATCH = 500
 
-# Filter desired_column_order to only include columns that actually exist in the DataFrame
-final_columns = [col for col in desired_column_order if col in existing_columns]
+# Source columns whose content was consolidated into the main fields; never kept as extra columns
+CONSOLIDATED_SOURCE_COLUMNS = ['links', 'youtube', 'spotify', 'title', 'artist', 'tags', 'subject', 'הערות',
+                               'needs review', 'קישורים']
 
-# Add any other columns that were not explicitly mapped but existed in the original data,
-# placing them after the defined core columns.
-for col in existing_columns:
-    if col not in final_columns:
-        # Avoid re-adding original names if their content was consolidated
-        # This list ensures columns that were sources for main fields don't reappear as 'other_cols'
-        if col not in column_mapping.keys() and not col.startswith(
-                'unnamed_col_'):  # Don't add if it's an original mapped col or a generic unnamed (which should have been processed)
-            final_columns.append(col)
+MISSING_ARTIST_NOTE = "Missing Artist details."
+MISSING_TITLE_NOTE = "Missing Title details."
 
-cleaned_df = cleaned_df[final_columns]
 
-print("\n--- Cleaned DataFrame Head ---")
-print(cleaned_df.head())
-print("\nCleaned Columns:", cleaned_df.columns.tolist())
-print(f"\nOriginal rows: {len(df)} | Cleaned rows: {len(cleaned_df)}")
+def connect():
+    """
+    Authenticate with Google Sheets and open the source worksheet.
 
-# --- 3. Write Cleaned Data Back to Google Sheet ---
-try:
-    # Create a new worksheet for cleaned data, or clear existing if it exists
+    Returns:
+        tuple: (spreadsheet, worksheet), or (None, None) if the connection failed.
+    """
     try:
-        output_worksheet = spreadsheet.worksheet(OUTPUT_WORKSHEET_NAME)
-        # Clear existing content (optional, but good for reruns)
-        output_worksheet.clear()
-        print(f"Cleared existing worksheet '{OUTPUT_WORKSHEET_NAME}'.")
+        # Authenticate with Google Sheets using the service account key file
+        gc = gspread.service_account(filename='credentials.json')
+        spreadsheet = gc.open(SPREADSHEET_NAME)
+        worksheet = spreadsheet.worksheet(WORKSHEET_NAME)
+        print(f"Successfully connected to spreadsheet '{SPREADSHEET_NAME}' and worksheet '{WORKSHEET_NAME}'.")
+        return spreadsheet, worksheet
+    except gspread.exceptions.SpreadsheetNotFound:
+        print(f"Error: Spreadsheet '{SPREADSHEET_NAME}' not found. Please check the name.")
     except gspread.exceptions.WorksheetNotFound:
-        output_worksheet = spreadsheet.add_worksheet(title=OUTPUT_WORKSHEET_NAME, rows=str(len(cleaned_df) + 100),
-                                                     cols=str(len(cleaned_df.columns) + 5))
-        print(f"Created new worksheet '{OUTPUT_WORKSHEET_NAME}'.")
+        print(f"Error: Worksheet '{WORKSHEET_NAME}' not found in spreadsheet '{SPREADSHEET_NAME}'. Please check the name.")
+    except Exception as e:
+        print(f"An error occurred during Google Sheets authentication or connection: {e}")
+        print("Please ensure 'credentials.json' is in the same directory and has the correct permissions.")
+    return None, None
+
+
+def build_dataframe(all_values):
+    """
+    Turn the raw sheet values into a DataFrame with unique, non-blank headers.
+
+    Args:
+        all_values (list): Rows as returned by worksheet.get_all_values(); the first row is the header.
+
+    Returns:
+        pd.DataFrame or None if there are no data rows.
+    """
+    if len(all_values) < 2:
+        return None
+
+    # We'll create unique headers if there are duplicates or blanks.
+    original_headers = [header.strip() if header.strip() != '' else f'Unnamed_Col_{i}' for i, header in
+                        enumerate(all_values[0])]
+
+    # Ensure headers are unique even if they were named the same
+    unique_headers = []
+    counts = defaultdict(int)
+    for header in original_headers:
+        original_name = header
+        temp_header = header
+        while temp_header in unique_headers:  # If this header name already exists
+            counts[original_name] += 1
+            temp_header = f"{original_name}_{counts[original_name]}"
+        unique_headers.append(temp_header)
+
+    return pd.DataFrame(all_values[1:], columns=unique_headers)
+
+
+def order_columns(cleaned_df):
+    """Put the core columns first, followed by the extra columns that survived consolidation."""
+    existing_columns = cleaned_df.columns.tolist()
+
+    # Filter desired_column_order to only include columns that actually exist in the DataFrame
+    final_columns = [col for col in desired_column_order if col in existing_columns]
+
+    # Add any other columns that were not explicitly mapped but existed in the original data,
+    # placing them after the defined core columns.
+    for col in existing_columns:
+        if col not in final_columns:
+            # Don't add if it's an original mapped col or a generic unnamed (which should have been processed)
+            if col not in column_mapping.keys() and not col.startswith('unnamed_col_'):
+                final_columns.append(col)
+
+    return cleaned_df[final_columns]
+
+
+# --- Row-by-row consolidation (original implementation, kept for --legacy and for comparison) ---
+
+def consolidate_legacy(df):
+    """
+    Merge rows with the same (artist, title) by walking the DataFrame one row at a time.
+
+    Returns:
+        pd.DataFrame: The cleaned data, columns ordered as in the output tab.
+    """
+    unique_headers = df.columns.tolist()
+
+    # Using a dictionary to store temporary consolidated data, mapping (artist, title) to consolidated row data
+    consolidated_rows = defaultdict(lambda: {
+        'אמן': None,
+        'שם השיר': None,
+        'תגיות': set(),
+        'קישור YouTube': set(),
+        'קישור Spotify': set(),
+        'הערות/לביקורת': set(),
+        'other_cols': defaultdict(set)  # To store data from columns not explicitly mapped
+    })
+
+    # Iterate through each row of the original DataFrame
+    for index, row in df.iterrows():
+        # Convert row to dictionary for easier access, and normalize keys
+        row_dict = {k.strip().lower(): v for k, v in row.items()}
+
+        current_artist = None
+        current_title = None
+
+        # Try to identify primary keys (artist, title) first from explicitly named columns
+        for potential_artist_col in ['artist', 'אמן']:
+            if potential_artist_col in row_dict and pd.notna(row_dict[potential_artist_col]) and str(
+                    row_dict[potential_artist_col]).strip() != '':
+                current_artist = str(row_dict[potential_artist_col]).strip()
+                break
+
+        for potential_title_col in ['title', 'שם השיר']:
+            if potential_title_col in row_dict and pd.notna(row_dict[potential_title_col]) and str(
+                    row_dict[potential_title_col]).strip() != '':
+                current_title = str(row_dict[potential_title_col]).strip()
+                break
+
+        # Fallback for artist/title from first two columns if not found by explicit names
+        # This addresses 'שם האמן' being in column A or B, etc.
+        if current_artist is None and len(unique_headers) > 0:
+            val_col0 = row_dict.get(unique_headers[0].lower())
+            if pd.notna(val_col0) and str(val_col0).strip() != '':
+                current_artist = str(val_col0).strip()  # Assume first col might be artist
+
+        if current_title is None and len(unique_headers) > 1:
+            val_col1 = row_dict.get(unique_headers[1].lower())
+            if pd.notna(val_col1) and str(val_col1).strip() != '' and str(val_col1).strip() != current_artist:
+                current_title = str(val_col1).strip()  # Assume second col might be title, if not identical to artist
+
+        # Handle missing essential details and add a note
+        row_notes = []
+        if not current_artist:
+            current_artist = "UNKNOWN ARTIST"
+            row_notes.append(MISSING_ARTIST_NOTE)
+        if not current_title:
+            current_title = "UNKNOWN TITLE"
+            row_notes.append(MISSING_TITLE_NOTE)
+
+        # Use a unique key for consolidation, even with placeholders
+        key = (current_artist, current_title)
+
+        # Consolidate data for the current row
+        for col_name, value in row_dict.items():
+            if pd.notna(value) and str(value).strip() != '':
+                value = str(value).strip()
+
+                # --- Link Handling (Columns D, E, F - general links and named link columns) ---
+                # Explicitly check for common 'links' or 'unnamed_col_X' which might contain links
+                if col_name == 'links' or col_name.startswith('unnamed_col_'):  # Covers columns D,E,F if unnamed
+                    if re.search(YOUTUBE_PATTERN, value, re.IGNORECASE):
+                        consolidated_rows[key]['קישור YouTube'].add(value)
+                    elif re.search(SPOTIFY_PATTERN, value, re.IGNORECASE):
+                        consolidated_rows[key]['קישור Spotify'].add(value)
+                    else:  # It's a link, but not YouTube/Spotify, or just other text
+                        consolidated_rows[key]['other_cols'][col_name].add(value)  # Keep it in its original column
+
+                # Map known columns (if not already handled as specific links)
+                elif col_name in column_mapping:
+                    mapped_name = column_mapping[col_name]
+                    if mapped_name == 'תגיות':
+                        consolidated_rows[key][mapped_name].update(
+                            [t.strip() for t in re.split(TAG_SEPARATORS, value) if t.strip()])
+                    elif mapped_name == 'קישור YouTube':
+                        consolidated_rows[key][mapped_name].add(value)
+                    elif mapped_name == 'קישור Spotify':
+                        consolidated_rows[key][mapped_name].add(value)
+                    elif mapped_name == 'הערות/לביקורת':
+                        consolidated_rows[key][mapped_name].add(value)
+                    # Artist and Title are set initially, avoiding overwrite by general mapping if already set
+                    elif mapped_name == 'אמן' and consolidated_rows[key]['אמן'] is None:
+                        consolidated_rows[key]['אמן'] = value
+                    elif mapped_name == 'שם השיר' and consolidated_rows[key]['שם השיר'] is None:
+                        consolidated_rows[key]['שם השיר'] = value
+                else:
+                    # Add to other_cols if not explicitly mapped and not handled as a link
+                    consolidated_rows[key]['other_cols'][col_name].add(value)
+
+        # Add notes for missing details
+        if row_notes:
+            consolidated_rows[key]['הערות/לביקורת'].add('; '.join(row_notes))
+
+        # Ensure artist and title are set on the consolidated row object from the key
+        consolidated_rows[key]['אמן'] = current_artist
+        consolidated_rows[key]['שם השיר'] = current_title
+
+    # Prepare data for final DataFrame
+    final_data = []
+    for key, data in consolidated_rows.items():
+        row_dict = {
+            'אמן': data['אמן'],
+            'שם השיר': data['שם השיר'],
+            'תגיות': ', '.join(sorted(list(data['תגיות']))),
+            'קישור YouTube': ', '.join(sorted(list(data['קישור YouTube']))),
+            'קישור Spotify': ', '.join(sorted(list(data['קישור Spotify']))),
+            'הערות/לביקורת': ', '.join(sorted(list(data['הערות/לביקורת'])))
+        }
+        # Add other columns from 'other_cols'
+        for col_name, values_set in data['other_cols'].items():
+            if col_name not in CONSOLIDATED_SOURCE_COLUMNS:
+                row_dict[col_name] = ', '.join(sorted(list(values_set)))
+
+        final_data.append(row_dict)
+
+    return order_columns(pd.DataFrame(final_data))
+
+
+# --- Column-wise consolidation ---
+
+def _first_filled(values, names):
+    """Per row, the first non-empty value among the named columns (NaN if all are empty)."""
+    result = pd.Series(np.nan, index=next(iter(values.values())).index, dtype=object)
+    for name in names:
+        if name in values:
+            column = values[name]
+            result = result.where(result.notna(), column.where(column != ''))
+    return result
+
+
+def _source_values(df):
+    """
+    Same view of a row as the row-by-row version: stripped cells under lower-cased names,
+    where two headers lower-case to the same name the first one's position and the last
+    one's values win.
+    """
+    source_columns = {}
+    for header in df.columns:
+        source_columns[header.strip().lower()] = header
+    return {name: df[header].astype(object).map(str).str.strip() for name, header in source_columns.items()}
+
+
+def _row_keys(values, unique_headers):
+    """
+    The (artist, title) key of every row: explicit artist/title columns, falling back
+    to the first two columns, with placeholders for whatever is missing.
+
+    Returns:
+        tuple: (keys DataFrame with 'אמן' / 'שם השיר' columns, array of per-row missing-details notes)
+    """
+    artist = _first_filled(values, ['artist', 'אמן'])
+    column = values.get(unique_headers[0].lower()) if unique_headers else None
+    if column is not None:
+        artist = artist.where(artist.notna(), column.where(column != ''))
+    title = _first_filled(values, ['title', 'שם השיר'])
+    column = values.get(unique_headers[1].lower()) if len(unique_headers) > 1 else None
+    if column is not None:
+        title = title.where(title.notna(), column.where((column != '') & (column != artist)))
+
+    missing_artist, missing_title = artist.isna().to_numpy(), title.isna().to_numpy()
+    row_notes = np.select([missing_artist & missing_title, missing_artist, missing_title],
+                          [f"{MISSING_ARTIST_NOTE}; {MISSING_TITLE_NOTE}", MISSING_ARTIST_NOTE, MISSING_TITLE_NOTE],
+                          default='')
+    keys = pd.DataFrame({'אמן': artist.fillna("UNKNOWN ARTIST"), 'שם השיר': title.fillna("UNKNOWN TITLE")})
+    return keys, row_notes
+
+
+def row_keys(df):
+    """
+    Returns:
+        list: The (artist, title) consolidation key of each row of df.
+    """
+    if df.empty:
+        return []
+    keys, _ = _row_keys(_source_values(df), df.columns.tolist())
+    return list(zip(keys['אמן'], keys['שם השיר']))
+
+
+def consolidate(df):
+    """
+    Merge rows with the same (artist, title) using column-wise operations.
+
+    Every non-empty cell becomes one (group, field, value) entry: link columns
+    are classified with str.contains and tags are split and exploded. The
+    entries are de-duplicated and sorted once, then each group's values are
+    joined. Produces the same output as consolidate_legacy.
+
+    Returns:
+        pd.DataFrame: The cleaned data, columns ordered as in the output tab.
+    """
+    df = df.reset_index(drop=True)  # Row labels double as positions below
+    values = _source_values(df)
+    keys, row_notes = _row_keys(values, df.columns.tolist())
+    # Groups are numbered in order of first appearance, like the insertion order of the old dict
+    group = keys.groupby(['אמן', 'שם השיר'], sort=False).ngroup().to_numpy()
+
+    # --- Long format: one entry per (row, field, value) ---
+    entries = []
+
+    def add(cells, field, position):
+        if len(cells):
+            entries.append(pd.DataFrame({'group': group[cells.index], 'row': cells.index, 'position': position,
+                                         'field': field, 'value': cells.to_numpy(dtype=object)}))
+
+    extra_fields = {}  # field -> source column name, for columns kept as they are
+    for position, (name, column) in enumerate(values.items()):
+        cells = column[column != '']
+        if name == 'links' or name.startswith('unnamed_col_'):
+            is_youtube = cells.str.contains(YOUTUBE_PATTERN, case=False, regex=True)
+            is_spotify = ~is_youtube & cells.str.contains(SPOTIFY_PATTERN, case=False, regex=True)
+            add(cells[is_youtube], 'קישור YouTube', position)
+            add(cells[is_spotify], 'קישור Spotify', position)
+            extra_fields[f'other:{name}'] = name
+            add(cells[~is_youtube & ~is_spotify], f'other:{name}', position)
+        elif name in column_mapping:
+            mapped_name = column_mapping[name]
+            if mapped_name == 'תגיות':
+                tags = cells.str.split(TAG_SEPARATORS, regex=True).explode().str.strip()
+                add(tags[tags != ''], mapped_name, position)
+            elif mapped_name not in ('אמן', 'שם השיר'):
+                add(cells, mapped_name, position)
+        else:
+            extra_fields[f'other:{name}'] = name
+            add(cells, f'other:{name}', position)
+    notes = pd.Series(row_notes, index=df.index)
+    add(notes[notes != ''], 'הערות/לביקורת', len(values))
+
+    columns = {'group': [], 'row': [], 'position': [], 'field': [], 'value': []}
+    long = pd.concat(entries, ignore_index=True) if entries else pd.DataFrame(columns)
+
+    # --- Join each field's distinct values, sorted, per group ---
+    # A groupby(...).agg(', '.join) calls back into Python once per group; instead sort once and
+    # join the slices between (group, field) boundaries, then scatter into a group x field table
+    num_groups = int(group.max()) + 1 if len(group) else 0
+    distinct = long.drop_duplicates(['group', 'field', 'value']).sort_values(['group', 'field', 'value'], kind='stable')
+    field_codes, fields = pd.factorize(distinct['field'])
+    group_codes = distinct['group'].to_numpy(dtype=np.int64)
+    boundaries = (group_codes[1:] != group_codes[:-1]) | (field_codes[1:] != field_codes[:-1])
+    starts = np.flatnonzero(np.r_[len(distinct) > 0, boundaries])
+    ends = np.r_[starts[1:], len(distinct)]
+    distinct_values = distinct['value'].tolist()
+    table = np.full((num_groups, len(fields)), np.nan, dtype=object)
+    table[group_codes[starts], field_codes[starts]] = [', '.join(distinct_values[start:end])
+                                                       for start, end in zip(starts, ends)]
+    joined = pd.DataFrame(table, columns=list(fields))
+
+    first_rows = pd.Series(range(len(group))).groupby(group, sort=True).first().to_numpy()
+    cleaned = {
+        'אמן': keys['אמן'].to_numpy()[first_rows],
+        'שם השיר': keys['שם השיר'].to_numpy()[first_rows],
+    }
+    for field in desired_column_order[2:]:
+        cleaned[field] = joined[field].fillna('').to_numpy(dtype=object) if field in joined else ''
+    cleaned_df = pd.DataFrame(cleaned)
+
+    # Extra columns appear in the order the old per-group dicts first received them
+    first_seen = (long[long['field'].isin(extra_fields)]
+                  .sort_values(['group', 'row', 'position'], kind='stable')
+                  .drop_duplicates('field')['field'])
+    for field in first_seen:
+        name = extra_fields[field]
+        if name in CONSOLIDATED_SOURCE_COLUMNS:
+            continue
+        extra = joined[field].to_numpy(dtype=object)
+        if name in cleaned_df.columns:
+            # An extra column named like a core column overwrote it in the old row dicts
+            cleaned_df[name] = pd.Series(extra).combine_first(cleaned_df[name]).to_numpy(dtype=object)
+        else:
+            cleaned_df[name] = extra
+
+    return order_columns(cleaned_df)
+
+
+def write_output(spreadsheet, cleaned_df):
+    """
+    Write the cleaned data to OUTPUT_WORKSHEET_NAME, creating or clearing the tab first.
+
+    Returns:
+        bool: True if the data was written.
+    """
+    try:
+        # Create a new worksheet for cleaned data, or clear existing if it exists
+        try:
+            output_worksheet = spreadsheet.worksheet(OUTPUT_WORKSHEET_NAME)
+            # Clear existing content (optional, but good for reruns)
+            sheets_governor.call('write', output_worksheet.clear)
+            print(f"Cleared existing worksheet '{OUTPUT_WORKSHEET_NAME}'.")
+        except gspread.exceptions.WorksheetNotFound:
+            output_worksheet = sheets_governor.call('write', spreadsheet.add_worksheet, title=OUTPUT_WORKSHEET_NAME,
+                                                    rows=str(len(cleaned_df) + 100),
+                                                    cols=str(len(cleaned_df.columns) + 5))
+            print(f"Created new worksheet '{OUTPUT_WORKSHEET_NAME}'.")
+
+        # Convert DataFrame to a list of lists (including header)
+        data_to_write = [cleaned_df.columns.tolist()] + cleaned_df.values.tolist()
+
+        # Update the worksheet with the cleaned data
+        sheets_governor.call('write', output_worksheet.update, data_to_write, range_name='A1')
+        print(
+            f"\nSuccessfully wrote cleaned data to worksheet '{OUTPUT_WORKSHEET_NAME}' in Google Sheet '{SPREADSHEET_NAME}'.")
+        return True
+
+    except Exception as e:
+        print(f"An error occurred while writing data back to Google Sheet: {e}")
+        return False
+
+
+# --- Incremental mode ---
+
+def row_fingerprints(df):
+    """A short hash of each source row's raw cells."""
+    return [hashlib.blake2b('\x1f'.join(row).encode('utf-8'), digest_size=8).hexdigest()
+            for row in df.to_numpy(dtype=object).tolist()]
+
+
+def load_state(path=STATE_FILE):
+    """
+    Returns:
+        dict or None: The saved incremental state, or None if missing or unreadable.
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        print(f"Warning: Could not read state file '{path}' ({e}). Running a full consolidation.")
+        return None
+    return state if state.get('version') == STATE_VERSION else None
+
+
+def build_state(df, keys, output_columns, output_keys, fingerprints=None):
+    """
+    Args:
+        df (pd.DataFrame): The source rows.
+        keys (list): The (artist, title) key of each source row.
+        output_columns (list): Header of the output tab.
+        output_keys (list): The key written on each output row, top to bottom.
+        fingerprints (list): row_fingerprints(df), if already computed.
+
+    Returns:
+        dict: JSON-serializable state for the next incremental run.
+    """
+    rows = {}
+    for fingerprint, (artist, title) in zip(fingerprints or row_fingerprints(df), keys):
+        if fingerprint in rows:
+            rows[fingerprint][0] += 1
+        else:
+            rows[fingerprint] = [1, artist, title]
+    return {
+        'version': STATE_VERSION,
+        'spreadsheet': SPREADSHEET_NAME,
+        'worksheet': WORKSHEET_NAME,
+        'source_columns': df.columns.tolist(),
+        'output_columns': list(output_columns),
+        'rows': rows,
+        'output_keys': [list(key) for key in output_keys],
+    }
+
+
+def save_state(state, path=STATE_FILE):
+    """Write the state via a temporary file, so a crash never leaves half a state behind."""
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.write(json.dumps(state, ensure_ascii=False))
+    os.replace(temp_path, path)
+
+
+def plan_incremental(df, state):
+    """
+    Work out which consolidated rows the edits since the last run touch.
+
+    A song's consolidated row depends only on the source rows with its key, so
+    only keys whose source rows were added, changed or removed are
+    re-consolidated. Songs that disappear are filled by moving the last output
+    row into their place, and new songs are appended at the bottom.
+
+    Args:
+        df (pd.DataFrame): The current source rows.
+        state (dict): State saved by the previous run.
+
+    Returns:
+        dict with 'fingerprints' and 'keys' (per source row), 'output_keys' (new output order),
+        'recompute' (keys whose output rows must be rewritten), 'changed_rows',
+        'removed' and 'appended' counts and 'cleared' (output rows, 0-based, left
+        empty at the bottom) - or None when nothing in the source changed.
+    """
+    fingerprints = row_fingerprints(df)
+    saved_rows = state['rows']
+    counts = Counter(fingerprints)
+
+    # Keys of rows that were removed, or are duplicates whose count changed
+    affected = {(artist, title) for fingerprint, (count, artist, title) in saved_rows.items()
+                if counts.get(fingerprint, 0) != count}
+
+    # Only rows we haven't seen need their key worked out
+    new_positions = [i for i, fingerprint in enumerate(fingerprints) if fingerprint not in saved_rows]
+    new_keys = row_keys(df.iloc[new_positions])
+    keys = [tuple(saved_rows[fingerprint][1:]) if fingerprint in saved_rows else None for fingerprint in fingerprints]
+    for position, key in zip(new_positions, new_keys):
+        keys[position] = key
+    affected.update(new_keys)
+
+    if not affected:
+        return None
+
+    output_keys = [tuple(key) for key in state['output_keys']]
+    old_length = len(output_keys)
+    position = {key: i for i, key in enumerate(output_keys)}
+    live_keys = set(keys)
+
+    # Fill the gaps left by songs that no longer exist, bottom-up, with the current last row
+    moved = set()
+    removed = [position[key] for key in affected if key in position and key not in live_keys]
+    for i in sorted(removed, reverse=True):
+        last_key = output_keys.pop()
+        if i < len(output_keys):
+            output_keys[i] = last_key
+            moved.add(last_key)
+
+    # New songs go at the bottom, in the order they first appear in the source
+    appended = 0
+    for key in dict.fromkeys(keys):
+        if key in affected and key not in position:
+            output_keys.append(key)
+            appended += 1
+
+    return {
+        'fingerprints': fingerprints,
+        'keys': keys,
+        'output_keys': output_keys,
+        'recompute': (affected | moved) & live_keys,
+        'changed_rows': len(new_positions),
+        'removed': len(removed),
+        'appended': appended,
+        'cleared': list(range(len(output_keys), old_length)),
+    }
 
-    # Convert DataFrame to a list of lists (including header)
-    data_to_write = [cleaned_df.columns.tolist()] + cleaned_df.values.tolist()
 
-    # Update the worksheet with the cleaned data
-    output_worksheet.update(data_to_write, range_name='A1')
-    print(
-        f"\nSuccessfully wrote cleaned data to worksheet '{OUTPUT_WORKSHEET_NAME}' in Google Sheet '{SPREADSHEET_NAME}'.")
+def _row_range(first_row, last_row, num_columns):
+    """A1 range of whole output rows (1-based sheet rows)."""
+    return f"A{first_row}:{gspread.utils.rowcol_to_a1(last_row, num_columns)}"
+
+
+def patch_updates(cleaned_df, plan, output_columns):
+    """
+    Turn the re-consolidated songs into batch_update ranges for their output rows.
+
+    Returns:
+        list of {'range': ..., 'values': [[...], ...]} dicts, consecutive rows merged.
+    """
+    aligned = cleaned_df.reindex(columns=output_columns).astype(object)
+    aligned = aligned.where(aligned.notna(), '')
+    rows_by_key = {(artist, title): row for artist, title, row in
+                   zip(aligned['אמן'], aligned['שם השיר'], aligned.values.tolist())}
+
+    sheet_rows = {}  # 1-based sheet row -> values (output row 0 sits under the header)
+    for i, key in enumerate(plan['output_keys']):
+        if key in plan['recompute']:
+            sheet_rows[i + 2] = rows_by_key[key]
+    for i in plan['cleared']:
+        sheet_rows[i + 2] = [''] * len(output_columns)
+
+    updates = []
+    for row in sorted(sheet_rows):
+        if updates and updates[-1]['last'] == row - 1:
+            updates[-1]['last'] = row
+            updates[-1]['values'].append(sheet_rows[row])
+        else:
+            updates.append({'first': row, 'last': row, 'values': [sheet_rows[row]]})
+    return [{'range': _row_range(update['first'], update['last'], len(output_columns)), 'values': update['values']}
+            for update in updates]
+
+
+def run_incremental(spreadsheet, df, state):
+    """
+    Patch OUTPUT_WORKSHEET_NAME with the songs whose source rows changed since the last run.
+
+    Returns:
+        dict: The new state, or None if a full consolidation is needed instead
+        (no usable state, changed source columns, new output columns, or an
+        output tab that no longer matches the state).
+    """
+    if state is None or (state.get('spreadsheet'), state.get('worksheet')) != (SPREADSHEET_NAME, WORKSHEET_NAME):
+        print("No incremental state for this worksheet yet. Running a full consolidation.")
+        return None
+    if state['source_columns'] != df.columns.tolist():
+        print("Source columns changed since the last run. Running a full consolidation.")
+        return None
 
-except Exception as e:
-    print(f"An error occurred while writing data back to Google Sheet: {e}")
\ No newline at end of file
+    try:
+        output_worksheet = spreadsheet.worksheet(OUTPUT_WORKSHEET_NAME)
+        output_header = sheets_governor.call('read', output_worksheet.row_values, 1)
+    except gspread.exceptions.WorksheetNotFound:
+        print(f"Worksheet '{OUTPUT_WORKSHEET_NAME}' is missing. Running a full consolidation.")
+        return None
+    output_columns = state['output_columns']
+    if output_header != output_columns:
+        print(f"Worksheet '{OUTPUT_WORKSHEET_NAME}' was edited since the last run. Running a full consolidation.")
+        return None
+
+    plan = plan_incremental(df, state)
+    if plan is None:
+        print("No changes in the source rows since the last run. Nothing to update.")
+        return state
+
+    keys = plan['keys']
+    subset = df[[key in plan['recompute'] for key in keys]]
+    cleaned_df = consolidate(subset) if len(subset) else pd.DataFrame(columns=desired_column_order)
+    new_columns = [col for col in cleaned_df.columns if col not in output_columns]
+    if new_columns:
+        print(f"New output columns {new_columns}. Running a full consolidation.")
+        return None
+
+    updates = patch_updates(cleaned_df, plan, output_columns)
+    print(f"\n{plan['changed_rows']} new or changed source rows -> {len(plan['recompute'])} songs to rewrite, "
+          f"{plan['appended']} new, {plan['removed']} removed ({len(updates)} ranges).")
+
+    needed_rows = len(plan['output_keys']) + 1
+    if needed_rows > output_worksheet.row_count:
+        sheets_governor.call('write', output_worksheet.add_rows, needed_rows - output_worksheet.row_count)
+    for start in range(0, len(updates), MAX_RANGES_PER_BATCH):
+        sheets_governor.call('write', output_worksheet.batch_update, updates[start:start + MAX_RANGES_PER_BATCH])
+    print(f"Successfully patched worksheet '{OUTPUT_WORKSHEET_NAME}' in Google Sheet '{SPREADSHEET_NAME}'.")
+
+    return build_state(df, keys, output_columns, plan['output_keys'], plan['fingerprints'])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Consolidate duplicate songs into the Cleaned_Songs_Data tab.")
+    parser.add_argument('--legacy', action='store_true', help="Use the original row-by-row consolidation")
+    parser.add_argument('--incremental', action='store_true',
+                        help=f"Only re-consolidate songs whose source rows changed since the last run ({STATE_FILE})")
+    parser.add_argument('--state-file', default=STATE_FILE)
+    args = parser.parse_args(argv)
+
+    spreadsheet, worksheet = connect()
+    if worksheet is None:
+        return
+
+    # Fetch all values from the worksheet
+    all_values = sheets_governor.call('read', worksheet.get_all_values)
+    if not all_values:
+        print("No data found in the worksheet. Exiting.")
+        return
+
+    df = build_dataframe(all_values)
+    if df is None:
+        print("No data rows found beyond the header. Exiting.")
+        return
+
+    print("\n--- Original DataFrame Head ---")
+    print(df.head())
+    print("\nOriginal Columns (after initial processing):", df.columns.tolist())
+
+    if args.incremental:
+        try:
+            state = run_incremental(spreadsheet, df, load_state(args.state_file))
+        except Exception as e:
+            print(f"An error occurred while patching the Google Sheet: {e}. Running a full consolidation.")
+            state = None
+        if state is not None:
+            save_state(state, args.state_file)
+            return
+
+    # --- 1. Standardize Column Names and Consolidate Data ---
+    cleaned_df = consolidate_legacy(df) if args.legacy else consolidate(df)
+
+    print("\n--- Cleaned DataFrame Head ---")
+    print(cleaned_df.head())
+    print("\nCleaned Columns:", cleaned_df.columns.tolist())
+    print(f"\nOriginal rows: {len(df)} | Cleaned rows: {len(cleaned_df)}")
+
+    # --- 2. Write Cleaned Data Back to Google Sheet ---
+    if write_output(spreadsheet, cleaned_df):
+        output_keys = list(zip(cleaned_df['אמן'], cleaned_df['שם השיר']))
+        save_state(build_state(df, row_keys(df), cleaned_df.columns, output_keys), args.state_file)
+
+
+if __name__ == '__main__':
+    main()
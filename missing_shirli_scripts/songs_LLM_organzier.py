@@ -2,10 +2,17 @@ import gspread
 import pandas as pd
 from googleapiclient.discovery import build
 import spotipy
-from spotipy.oauth2 import SpotifyClientCredentials
 import time
 import re
 import os
+import sys
+
+# Shared helpers (metrics) live in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import metrics
+import sheets_governor
+from spotify_token_cache import SharedClientCredentials
+from job_state import JobState, row_fingerprint
 
 # Import your LLM client library
 # For OpenAI:
@@ -40,8 +47,8 @@ youtube_service = build('youtube', 'v3', developerKey=YOUTUBE_API_KEY)
 print("YouTube API client initialized.")
 
 # Spotify API
-sp = spotipy.Spotify(auth_manager=SpotifyClientCredentials(client_id=SPOTIFY_CLIENT_ID,
-                                                           client_secret=SPOTIFY_CLIENT_SECRET))
+sp = spotipy.Spotify(auth_manager=SharedClientCredentials(client_id=SPOTIFY_CLIENT_ID,
+                                                          client_secret=SPOTIFY_CLIENT_SECRET))
 print("Spotify API client initialized.")
 
 # LLM Client
@@ -68,7 +75,8 @@ def get_youtube_metadata_from_url(url):
             part="snippet",
             id=video_id
         )
-        response = request.execute()
+        with metrics.timed('youtube', 'videos.list'):
+            response = request.execute()
         if response and response['items']:
             snippet = response['items'][0]['snippet']
             title = snippet.get('title', '')
@@ -89,7 +97,8 @@ def get_spotify_metadata_from_url(url):
         return None, None
     track_id = track_id_match.group(1)
     try:
-        track_info = sp.track(track_id)
+        with metrics.timed('spotify', 'track'):
+            track_info = sp.track(track_id)
         if track_info:
             artist_name = track_info['artists'][0]['name'] if track_info['artists'] else None
             song_title = track_info['name']
@@ -110,7 +119,8 @@ def search_youtube(artist, song_title, youtube_client):
             type="video",
             maxResults=5  # Get a few results to pick the best
         )
-        response = request.execute()
+        with metrics.timed('youtube', 'search.list'):
+            response = request.execute()
 
         # Prioritize official channels, official video/audio, lyric video
         best_link = None
@@ -143,7 +153,8 @@ def search_youtube(artist, song_title, youtube_client):
 def search_spotify(artist, song_title):
     """Searches Spotify for a track by artist and song title."""
     try:
-        results = sp.search(q=f"track:{song_title} artist:{artist}", type="track", limit=5)
+        with metrics.timed('spotify', 'search'):
+            results = sp.search(q=f"track:{song_title} artist:{artist}", type="track", limit=5)
         if results and results['tracks']['items']:
             for track in results['tracks']['items']:
                 # Basic check: artist name should be in the track's artist list
@@ -375,7 +386,8 @@ def llm_process_song_info(artist, song_title_or_lyrics):
     """
     # For Google Gemini
     try:
-        response = llm_model.generate_content(prompt)
+        with metrics.timed('gemini', 'generate_content'):
+            response = llm_model.generate_content(prompt)
         # Assuming the LLM responds with a string that can be parsed as JSON
         llm_output_text = response.text.strip()
         # Clean up common LLM output issues (e.g., markdown code blocks)
@@ -396,8 +408,21 @@ def llm_process_song_info(artist, song_title_or_lyrics):
 
 # --- 4. Main Processing Logic ---
 
-def process_song_data():
-    data = worksheet.get_all_values()
+JOB_PROVIDER = 'llm_organizer'
+
+
+def input_fingerprint(row):
+    """Fingerprint of the cells a row is processed from: artist, title and existing links."""
+    return row_fingerprint(row['Artist'], row['Song Title'], row['YouTube Link'], row[' Spotify Link'])
+
+
+def process_song_data(state=None):
+    """
+    Args:
+        state (JobState): Optional; rows whose artist, title and links are unchanged since they
+            were last processed are skipped, and processed rows are recorded once the sheet is written.
+    """
+    data = sheets_governor.call('read', worksheet.get_all_values)
     headers = data[0]
     df = pd.DataFrame(data[1:], columns=headers)
 
@@ -405,8 +430,16 @@ def process_song_data():
     if 'Notes' not in df.columns:
         df['Notes'] = ''
 
+    sheet_key = state.sheet_key(worksheet) if state else None
+    finished_rows = []  # Job state entries, recorded once the sheet is written
+    unchanged = 0
+
     # Iterate through each row using df.iterrows() for easy updates
     for index, row in df.iterrows():
+        if state and state.is_finished(sheet_key, index + 2, JOB_PROVIDER, input_fingerprint(row)):
+            unchanged += 1
+            continue
+
         original_artist = row['Artist']
         original_song_title = row['Song Title']
         tags = row['Tags']
@@ -478,16 +511,26 @@ def process_song_data():
         df.at[index, 'YouTube Link'] = youtube_link
         df.at[index, 'Spotify Link'] = spotify_link
         df.at[index, 'Notes'] = notes
+        metrics.record_row('llm_organizer', 'processed')
+        finished_rows.append((index + 2, 'done', input_fingerprint(df.loc[index])))
 
         # Add a delay to avoid hitting API rate limits
         time.sleep(1.5)  # Adjust as needed for your API quotas
 
     # Write the updated DataFrame back to the Google Sheet
     # Clear existing data and then write headers + df.values.tolist()
-    worksheet.clear()
-    worksheet.update([df.columns.values.tolist()] + df.values.tolist())
-    print("\nProcessing complete. Google Sheet updated.")
+    sheets_governor.call('write', worksheet.clear)
+    sheets_governor.call('write', worksheet.update, [df.columns.values.tolist()] + df.values.tolist())
+    if state:
+        state.record_many(sheet_key, JOB_PROVIDER, finished_rows)
+    metrics.record_row('llm_organizer', 'unchanged', unchanged)
+    print(f"\nProcessing complete. Google Sheet updated. Skipped {unchanged} unchanged rows.")
 
 
 if __name__ == '__main__':
-    process_song_data()
\ No newline at end of file
+    job_state = JobState()
+    try:
+        process_song_data(job_state)
+    finally:
+        job_state.close()
+        metrics.export_run('llm_organizer')
\ No newline at end of file
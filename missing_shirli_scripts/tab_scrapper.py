@@ -5,36 +5,23 @@ from google.oauth2.service_account import Credentials
 import time
 import random
 import urllib.parse
-import logging
 from typing import Optional, Tuple
 import json
-import re # Import re for regex operations
-import sys # Import sys to configure stdout encoding
+import sys
+import os
 
-# Configure logging
-# Set up a logger instance
-logger = logging.getLogger()
-logger.setLevel(logging.INFO)
+# Shared helpers (metrics, structured_logging) live in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import candidate_ranking
+import metrics
+import sheets_governor
+import structured_logging
+from job_state import JobState, row_fingerprint
 
-# Clear existing handlers to prevent duplicate logs if run multiple times
-if logger.handlers:
-    for handler in logger.handlers:
-        logger.removeHandler(handler)
-
-# Create a file handler with UTF-8 encoding
-file_handler = logging.FileHandler('scraper.log', encoding='utf-8')
-file_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
-logger.addHandler(file_handler)
-
-# Create a stream handler (for console output) with UTF-8 encoding
-# Ensure sys.stdout encoding is set to utf-8 for the console output
-# This is crucial for Windows environments where default might be cp1252
-if sys.stdout.encoding != 'utf-8':
-    sys.stdout = open(sys.stdout.fileno(), mode='w', encoding='utf-8', buffering=1)
-
-stream_handler = logging.StreamHandler(sys.stdout)
-stream_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
-logger.addHandler(stream_handler)
+# Configure logging: JSON-lines events in scraper.jsonl (rotated and gzipped by size)
+# plus console output, written by a background thread so the scrape loop never
+# waits on disk. Set SHIRLI_LOG_QUIET=1 to log per-row details only for failed rows.
+logger = structured_logging.setup_logging('scraper.jsonl')
 
 
 class Tab4UScraper:
@@ -165,68 +152,25 @@ class Tab4UScraper:
                 logger.warning(f"No chord results found for {artist} - {song}")
                 return None
 
-            # --- Refined Matching Logic ---
-            # 1. Try to find an exact match (both artist and song)
-            for result in results_found:
-                artist_match = (
-                        artist.lower() in result['artist'].lower() or
-                        result['artist'].lower() in artist.lower() or
-                        self._similar_text(artist, result['artist'])
-                )
-                song_match = (
-                        song.lower() in result['song'].lower() or
-                        result['song'].lower() in song.lower() or
-                        self._similar_text(song, result['song'])
-                )
-                if artist_match and song_match:
-                    logger.info(f"Found exact match (artist + song) for {artist} - {song}: {result['url']}")
-                    return result['url']
-
-            # 2. If no exact match, try to find a song-only match
-            for result in results_found:
-                song_match = (
-                        song.lower() in result['song'].lower() or
-                        result['song'].lower() in song.lower() or
-                        self._similar_text(song, result['song'])
-                )
-                if song_match:
-                    logger.info(f"Found song-only match for '{song}' (original artist '{artist}'): {result['url']}")
-                    return result['url']
-
-            # 3. If neither exact nor song-only match, return None (leave empty)
-            logger.info(f"No exact or song-only match found for {artist} - {song}. Leaving URL empty.")
-            return None
+            # --- Matching: the song must match; the same artist ranks first ---
+            top = candidate_ranking.best(
+                [candidate_ranking.Candidate(result['url'], result['song'], (result['artist'],))
+                 for result in results_found],
+                artist, song, require_title_match=True)
+            if top is None:
+                logger.info(f"No exact or song-only match found for {artist} - {song}. Leaving URL empty.")
+                return None
+            if top.artist_score >= candidate_ranking.HIGH_PROBABILITY_THRESHOLD:
+                logger.info(f"Found exact match (artist + song) for {artist} - {song}: {top.candidate.url}")
+            else:
+                logger.info(f"Found song-only match for '{song}' (original artist '{artist}'): {top.candidate.url}")
+            return top.candidate.url
 
         except Exception as e:
             logger.error(f"Error extracting chord URL for {artist} - {song}: {e}")
             return None
 
-    def _similar_text(self, text1: str, text2: str) -> bool:
-        """
-        Check if two texts are similar (for Hebrew text matching).
-        """
-        # Remove common punctuation and normalize
-        def normalize(text):
-            # Remove punctuation and extra spaces
-            text = re.sub(r'[^\w\s]', '', text)
-            text = re.sub(r'\s+', ' ', text)
-            return text.strip().lower()
-
-        norm1 = normalize(text1)
-        norm2 = normalize(text2)
-
-        # Check if one contains the other (at least 70% overlap)
-        if len(norm1) > 0 and len(norm2) > 0:
-            shorter = norm1 if len(norm1) < len(norm2) else norm2
-            longer = norm2 if len(norm1) < len(norm2) else norm1
-
-            # Simple substring check for similarity
-            if len(shorter) >= 3:  # Only for meaningful text
-                return shorter in longer
-
-        return False
-
-    def _search_tab4u(self, artist: str, song: str) -> Optional[str]:
+    def _search_tab4u(self, artist: str, song: str) -> Tuple[Optional[str], Optional[str]]:
         """
         Search for a song on tab4u.com and return the direct chord URL.
 
@@ -235,28 +179,31 @@ class Tab4UScraper:
             song: Song title
 
         Returns:
-            Direct chord URL or None if not found
+            Tuple of (direct chord URL or None if not found, error message or None). The error is
+            set when the search request itself failed, so the song may still be on tab4u.com
         """
         search_url = self._construct_search_url(artist, song)
         logger.info(f"Searching tab4u.com for: {artist} - {song}")
         logger.info(f"Search URL: {search_url}")
 
         try:
-            response = self.session.get(search_url, timeout=30)
+            with metrics.timed('tab4u', 'search'):
+                response = self.session.get(search_url, timeout=30)
             response.raise_for_status()
 
             chord_url = self._extract_chord_url(response.text, artist, song)
-            return chord_url
+            return chord_url, None
 
         except requests.exceptions.RequestException as e:
             logger.error(f"Request failed for {artist} - {song}: {e}")
-            return None
+            return None, f"Request failed: {e}"
         except Exception as e:
             logger.error(f"Unexpected error searching for {artist} - {song}: {e}")
-            return None
+            return None, f"Unexpected error: {e}"
 
 
-    def process_worksheet(self, worksheet: gspread.Worksheet, start_row: int, end_row: int):
+    def process_worksheet(self, worksheet: gspread.Worksheet, start_row: int, end_row: int,
+                          state: Optional[JobState] = None):
         """
         Process specified rows in a given Google Sheet worksheet and update with chord URLs.
 
@@ -264,12 +211,14 @@ class Tab4UScraper:
             worksheet: The gspread Worksheet object to process.
             start_row: The 1-indexed starting row number to process.
             end_row: The 1-indexed ending row number to process.
+            state: Optional job state; rows searched in earlier runs (and unchanged since) are
+                skipped, and outcomes are recorded once the batch update has written them.
         """
         try:
             logger.info(f"\n--- Processing worksheet: '{worksheet.title}' (Rows {start_row}-{end_row}) ---")
 
             # Get column headers to identify artist and song columns
-            headers = worksheet.row_values(1)
+            headers = sheets_governor.call('read', worksheet.row_values, 1)
             logger.info(f"Available columns in '{worksheet.title}': {headers}")
 
             # Try to identify artist and song columns (flexible mapping)
@@ -304,7 +253,7 @@ class Tab4UScraper:
                 f"Using Song column: {song_col_idx + 1} ({headers[song_col_idx] if song_col_idx < len(headers) else 'N/A'})")
 
             # Get all data from the worksheet
-            all_data = worksheet.get_all_values()
+            all_data = sheets_governor.call('read', worksheet.get_all_values)
             total_rows_in_sheet = len(all_data)
 
             # Adjust end_row if it's 'end' or exceeds actual data
@@ -318,10 +267,14 @@ class Tab4UScraper:
 
             processed_count = 0
             found_count = 0
+            resumed_count = 0
             updates_batch = [] # To store updates for batch processing
+            outcomes = [] # Job state entries, recorded after the batch update
+            sheet_key = state.sheet_key(worksheet) if state else None
 
             # Iterate from the specified start_row to actual_end_row (1-indexed)
             for row_num_1_indexed in range(start_row, actual_end_row + 1):
+                structured_logging.set_row(row_num_1_indexed, worksheet.title)
                 # Convert to 0-indexed for list access
                 idx_0_indexed = row_num_1_indexed - 1
 
@@ -337,46 +290,82 @@ class Tab4UScraper:
 
                 # Skip empty rows or rows missing essential data
                 if not artist and not song:
-                    logger.info(f"Row {row_num_1_indexed}: Skipping empty row")
+                    logger.info(f"Row {row_num_1_indexed}: Skipping empty row", extra={'outcome': 'skipped'})
+                    metrics.record_row('tab4u', 'skipped')
                     continue
 
                 if not artist or not song:
                     logger.warning(f"Row {row_num_1_indexed}: Missing data - Artist: '{artist}', Song: '{song}'")
+                    metrics.record_row('tab4u', 'skipped')
+                    continue
+
+                # Column K (index 10) holds the result; it is part of the fingerprint so a
+                # cleared cell is searched again
+                existing_url = row_data[10].strip() if len(row_data) > 10 else ""
+                if state and state.is_finished(sheet_key, row_num_1_indexed, 'tab4u',
+                                               row_fingerprint(artist, song, existing_url)):
+                    resumed_count += 1
                     continue
 
                 logger.info(f"Processing row {row_num_1_indexed}: Artist='{artist}', Song='{song}'")
                 processed_count += 1
 
                 # Check if URL already exists in Column K (index 10)
-                existing_url = row_data[10].strip() if len(row_data) > 10 else ""
                 if existing_url and existing_url != "Not Found":
-                    logger.info(f"✅ Row {row_num_1_indexed}: URL already exists: {existing_url}. Skipping search.")
+                    logger.info(f"✅ Row {row_num_1_indexed}: URL already exists: {existing_url}. Skipping search.",
+                                extra={'provider': 'tab4u', 'outcome': 'existing', 'url': existing_url})
                     found_count += 1
+                    metrics.record_row('tab4u', 'existing')
+                    outcomes.append((row_num_1_indexed, 'existing', row_fingerprint(artist, song, existing_url),
+                                     None, existing_url))
                     continue
 
                 # Search for chord URL
-                chord_url = self._search_tab4u(artist, song)
+                search_started = time.perf_counter()
+                chord_url, search_error = self._search_tab4u(artist, song)
+                event = {'provider': 'tab4u', 'artist': artist, 'song': song,
+                         'latency': time.perf_counter() - search_started}
 
                 # Prepare update for batch processing
-                if chord_url:
+                if search_error:
+                    # The search never got an answer: leave the cell as it is and record an error,
+                    # so the next run searches the row again (job_state.MAX_ATTEMPTS)
+                    logger.warning(f"⚠️ Row {row_num_1_indexed}: search failed, will retry next run: {search_error}",
+                                   extra={**event, 'outcome': 'error', 'error': search_error})
+                    metrics.record_row('tab4u', 'error')
+                    outcomes.append((row_num_1_indexed, 'error', row_fingerprint(artist, song, existing_url),
+                                     search_error))
+                elif chord_url:
                     updates_batch.append({'range': f'K{row_num_1_indexed}', 'values': [[chord_url]]})
-                    logger.info(f"✅ Prepared update for row {row_num_1_indexed} with URL: {chord_url}")
+                    logger.info(f"✅ Prepared update for row {row_num_1_indexed} with URL: {chord_url}",
+                                extra={**event, 'outcome': 'found', 'url': chord_url})
                     found_count += 1
+                    metrics.record_row('tab4u', 'found')
+                    outcomes.append((row_num_1_indexed, 'found', row_fingerprint(artist, song, chord_url),
+                                     None, chord_url))
                 else:
                     updates_batch.append({'range': f'K{row_num_1_indexed}', 'values': [["Not Found"]]})
-                    logger.info(f"❌ Prepared update for row {row_num_1_indexed} with 'Not Found'")
+                    logger.info(f"❌ Prepared update for row {row_num_1_indexed} with 'Not Found'",
+                                extra={**event, 'outcome': 'not_found'})
+                    metrics.record_row('tab4u', 'not_found')
+                    outcomes.append((row_num_1_indexed, 'not_found', row_fingerprint(artist, song, "Not Found")))
 
                 # Polite delay after each search (not after every row update)
                 self._polite_sleep()
 
+            structured_logging.set_row(None)
+
             # Apply all updates in a single batch operation
             if updates_batch:
                 logger.info(f"Applying {len(updates_batch)} updates to worksheet '{worksheet.title}'...")
-                worksheet.batch_update(updates_batch)
+                sheets_governor.call('write', worksheet.batch_update, updates_batch)
                 logger.info("✅ All batch updates completed!")
             else:
                 logger.info("No updates needed for this worksheet/row range.")
-
+            if state:
+                state.record_many(sheet_key, 'tab4u', outcomes)
+            if resumed_count:
+                logger.info(f"⏩ Skipped {resumed_count} rows searched in earlier runs")
 
             logger.info(f"Worksheet '{worksheet.title}' processing completed.")
             logger.info(f"📊 Summary for '{worksheet.title}': Processed {processed_count} songs, Found URLs for {found_count} songs")
@@ -401,6 +390,7 @@ def main():
     # Configuration - UPDATE THESE PATHS
     CREDENTIALS_FILE = "credentials.json"
 
+    state = JobState()
     try:
         scraper = Tab4UScraper(CREDENTIALS_FILE)
 
@@ -470,7 +460,7 @@ def main():
                     end_row = ws.row_count
 
             # Call the processing function for the current worksheet and determined row range
-            scraper.process_worksheet(ws, start_row, end_row)
+            scraper.process_worksheet(ws, start_row, end_row, state)
 
         logger.info(f"\n🎉 All selected worksheets in '{spreadsheet_name}' processed!")
 
@@ -478,7 +468,10 @@ def main():
         logger.error(f"\n❌ An unexpected error occurred in the main script: {e}")
         # Optionally, re-raise if you want the script to terminate with an error code
         # raise
+    finally:
+        state.close()
 
+    metrics.export_run('tab4u')
     input("\nPress Enter to exit...")
 
 
@@ -4,6 +4,7 @@ Test script to verify the fixes work correctly
 
 import logging
 from ultimate_scraper import UltimateGuitarScraper
+import sheets_governor  # On the path once ultimate_scraper is imported
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -24,16 +25,17 @@ def test_google_sheets_update():
 
         print("Testing Google Sheets update...")
         scraper.update_chord_cell(test_row, test_url)
+        sheets_governor.flush()  # update_chord_cell only queues the cell
 
         # Verify the update
-        cell_value = scraper.sheet.cell(test_row, 6).value
+        cell_value = sheets_governor.call('read', scraper.sheet.cell, test_row, 6).value
         if cell_value == test_url:
             print("✅ Google Sheets update test PASSED")
         else:
             print(f"❌ Google Sheets update test FAILED. Expected: {test_url}, Got: {cell_value}")
 
         # Clean up test
-        scraper.sheet.update_cell(test_row, 6, "")
+        sheets_governor.call('write', scraper.sheet.update_cell, test_row, 6, "")
         scraper.cleanup()
 
     except Exception as e:
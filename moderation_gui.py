@@ -2,52 +2,234 @@ import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
 import requests
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
+from link_checker import LinkChecker
+
 # Load environment variables from .env file
 load_dotenv()
 
 # Base URL for your Next.js API
 API_BASE_URL = os.getenv("API_BASE_URL", "https://shirli.vercel.app") # Replace with your Vercel deployment URL
 
+# All network calls run on a small thread pool so the window never freezes
+MAX_WORKERS = 4
+POLL_INTERVAL_MS = 100       # How often the Tk loop collects finished calls
+REQUEST_TIMEOUT = (5, 20)    # (connect, read) seconds for API calls
+REFRESH_INTERVAL_MS = 60_000  # Background check for new/changed requests (conditional, so usually a 304)
+
+# Bulk moderation: (batch endpoint, per-request endpoint used when the backend has no batch endpoint)
+BULK_ENDPOINTS = {
+    "approve": ("approve-requests", "approve-request"),
+    "reject": ("reject-requests", "reject-request"),
+}
+BULK_CONCURRENCY = 8  # Per-request calls in flight at once when falling back
+
+TREE_COLUMNS = ("Song ID", "Title", "Artist", "Request Type", "Status")
+DETAIL_FIELDS = ("Song ID", "Title", "Artist", "YouTube Link", "Spotify Link", "Tab4u Link", "Tags", "Request Type", "Reason")
+LINK_FIELDS = ("YouTube Link", "Spotify Link", "Tab4u Link")
+
+
+# --- API calls (run on worker threads; they must not touch Tk widgets) ---
+
+def fetch_pending_requests(etag=None):
+    """
+    Fetch the pending list, conditionally when we have the ETag of the last copy.
+
+    Returns:
+        tuple: (requests, etag), where requests is None if the list is unchanged (HTTP 304).
+    """
+    headers = {"If-None-Match": etag} if etag else {}
+    response = requests.get(f"{API_BASE_URL}/api/get-pending-requests", headers=headers, timeout=REQUEST_TIMEOUT)
+    if response.status_code == 304:
+        return None, etag
+    response.raise_for_status()
+    return response.json().get("requests", []), response.headers.get("ETag")
+
+
+def post_bulk(action, payloads, cancelled, use_batch=True):
+    """
+    Approve or reject several requests: one batched call when the backend has the batch
+    endpoint, otherwise concurrent per-request calls.
+
+    Args:
+        action (str): 'approve' or 'reject'.
+        payloads (list): The per-request payloads ({"requestId": ..., ...}).
+        cancelled (threading.Event): Once set, per-request calls not yet sent are skipped.
+        use_batch (bool): Try the batch endpoint first.
+
+    Returns:
+        tuple: ({request ID: None on success or an error message}, whether the batch endpoint exists)
+    """
+    batch_endpoint, single_endpoint = BULK_ENDPOINTS[action]
+    if use_batch:
+        response = requests.post(f"{API_BASE_URL}/api/{batch_endpoint}", json={"requests": payloads},
+                                 timeout=REQUEST_TIMEOUT)
+        if response.status_code not in (404, 405):
+            response.raise_for_status()
+            try:
+                reported = {str(item.get("requestId")): item for item in response.json().get("results", [])}
+            except (ValueError, AttributeError):
+                reported = {}  # No per-item report: a 2xx means every request went through
+            results = {}
+            for payload in payloads:
+                item = reported.get(str(payload["requestId"]), {})
+                results[payload["requestId"]] = None if item.get("success", True) else (item.get("error") or "Failed")
+            return results, True
+
+    def post_one(payload):
+        if cancelled.is_set():
+            return payload["requestId"], "Cancelled"
+        try:
+            post_action(single_endpoint, payload)
+            return payload["requestId"], None
+        except requests.exceptions.RequestException as e:
+            return payload["requestId"], str(e)
+
+    with ThreadPoolExecutor(max_workers=BULK_CONCURRENCY) as executor:
+        return dict(executor.map(post_one, payloads)), False
+
+
+def request_key(request_data, index):
+    """Key of a request in the local model (and its Treeview item id)."""
+    return str(request_data.get("Request ID") or f"_row{index}")
+
+
+def post_action(endpoint, payload):
+    response = requests.post(f"{API_BASE_URL}/api/{endpoint}", json=payload, timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()
+    return response
+
+
+class BackgroundTasks:
+    """
+    Runs blocking calls on a thread pool and hands their results back on the Tk
+    thread, polling finished futures with after().
+
+    Each call gets a threading.Event it can check to stop early. Cancelling sets
+    the event, drops calls that haven't started, and discards the results of
+    calls already in flight (an HTTP request itself can't be interrupted).
+    """
+
+    def __init__(self, master, on_change, max_workers=MAX_WORKERS):
+        self.master = master
+        self.on_change = on_change  # Called on the Tk thread whenever the set of running tasks changes
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="moderation")
+        self.tasks = {}  # future -> (label, on_success, on_error, cancelled event)
+        self._polling = False
+
+    def submit(self, label, func, on_success, on_error):
+        """
+        Run func(cancelled) in the background.
+
+        Args:
+            label (str): Shown in the status bar while the call runs.
+            func (callable): Takes the task's cancel threading.Event.
+            on_success (callable): Called on the Tk thread with func's return value.
+            on_error (callable): Called on the Tk thread with the exception func raised.
+        """
+        cancelled = threading.Event()
+        future = self.executor.submit(func, cancelled)
+        self.tasks[future] = (label, on_success, on_error, cancelled)
+        if not self._polling:
+            self._polling = True
+            self.master.after(POLL_INTERVAL_MS, self._poll)
+        self.on_change()
+        return future
+
+    def running(self):
+        """Labels of the calls that are queued or in flight and not cancelled."""
+        return [label for label, _, _, cancelled in self.tasks.values() if not cancelled.is_set()]
+
+    def cancel_all(self):
+        for future, (_, _, _, cancelled) in self.tasks.items():
+            cancelled.set()
+            future.cancel()
+        self.on_change()
+
+    def shutdown(self):
+        self.cancel_all()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def _poll(self):
+        for future in [future for future in self.tasks if future.done()]:
+            label, on_success, on_error, cancelled = self.tasks.pop(future)
+            if cancelled.is_set() or future.cancelled():
+                continue
+            error = future.exception()
+            if error is not None:
+                on_error(error)
+            else:
+                on_success(future.result())
+        self.on_change()
+        if self.tasks:
+            self.master.after(POLL_INTERVAL_MS, self._poll)
+        else:
+            self._polling = False
+
+
 class ModerationGUI:
     def __init__(self, master):
         self.master = master
         master.title("Shir-li Moderation GUI")
         master.geometry("1000x800") # Increased window size
 
-        self.requests = []
-        self.current_request_index = -1
+        self.requests = {}                # request key -> request, in list order
+        self.current_request_key = None   # Request shown in the details form
+        self.etag = None                  # ETag of the pending list we hold
+        self.link_checker = LinkChecker() # Results are cached, so re-tests and re-verifies are free
+        self.batch_supported = {}         # action -> whether the backend has its batch endpoint
+        self.busy_request_ids = set()  # Requests with a save/approve/reject call in flight
+        self.load_generation = 0       # Only the newest list load may fill the list
+        self.status_message = "Ready"
+        self.tasks = BackgroundTasks(master, self.update_status)
 
         # --- Request List Frame ---
         self.request_list_frame = ttk.LabelFrame(master, text="Pending Requests")
         self.request_list_frame.pack(padx=10, pady=10, fill="both", expand=True)
 
-        self.tree = ttk.Treeview(self.request_list_frame, columns=("ID", "Title", "Artist", "Type", "Status"), show="headings")
+        self.tree = ttk.Treeview(self.request_list_frame, columns=("ID", "Title", "Artist", "Type", "Status", "Links"), show="headings")
         self.tree.heading("ID", text="Song ID")
         self.tree.heading("Title", text="Title")
         self.tree.heading("Artist", text="Artist")
         self.tree.heading("Type", text="Request Type")
         self.tree.heading("Status", text="Status")
+        self.tree.heading("Links", text="Links")
 
         self.tree.column("ID", width=100, anchor="w")
         self.tree.column("Title", width=200, anchor="w")
         self.tree.column("Artist", width=150, anchor="w")
         self.tree.column("Type", width=100, anchor="w")
         self.tree.column("Status", width=80, anchor="w")
+        self.tree.column("Links", width=90, anchor="w")
 
         self.tree.pack(fill="both", expand=True)
         self.tree.bind("<Double-1>", self.on_request_double_click) # Double-click to load details
 
-        self.load_button = ttk.Button(self.request_list_frame, text="Load Pending Requests", command=self.load_pending_requests)
-        self.load_button.pack(pady=5)
+        # Ctrl/Shift-click selects several requests for the bulk buttons
+        self.list_button_frame = ttk.Frame(self.request_list_frame)
+        self.list_button_frame.pack(pady=5)
+
+        self.load_button = ttk.Button(self.list_button_frame, text="Load Pending Requests",
+                                      command=lambda: self.load_pending_requests(force=True))
+        self.load_button.pack(side="left", padx=5)
+
+        self.bulk_approve_button = ttk.Button(self.list_button_frame, text="Approve Selected",
+                                              command=lambda: self.bulk_moderate("approve"))
+        self.bulk_approve_button.pack(side="left", padx=5)
+
+        self.bulk_reject_button = ttk.Button(self.list_button_frame, text="Reject Selected",
+                                             command=lambda: self.bulk_moderate("reject"))
+        self.bulk_reject_button.pack(side="left", padx=5)
 
         # --- Request Details Frame ---
         self.details_frame = ttk.LabelFrame(master, text="Request Details")
         self.details_frame.pack(padx=10, pady=10, fill="x")
 
         self.fields = {}
-        field_names = ["Song ID", "Title", "Artist", "YouTube Link", "Spotify Link", "Tab4u Link", "Tags", "Request Type", "Reason"]
+        field_names = DETAIL_FIELDS
         for i, field in enumerate(field_names):
             row = i // 2
             col = i % 2 * 2
@@ -80,7 +262,57 @@ class ModerationGUI:
         self.clear_details_button = ttk.Button(self.button_frame, text="Clear Details", command=self.clear_details)
         self.clear_details_button.pack(side="left", padx=5)
 
+        # --- Status Bar (background calls) ---
+        self.status_frame = ttk.Frame(master)
+        self.status_frame.pack(padx=10, pady=(0, 10), fill="x")
+
+        self.progress = ttk.Progressbar(self.status_frame, mode="indeterminate", length=150)
+        self.progress.pack(side="left", padx=5)
+
+        self.status_label = ttk.Label(self.status_frame, text="Ready")
+        self.status_label.pack(side="left", padx=5, fill="x", expand=True)
+
+        self.cancel_button = ttk.Button(self.status_frame, text="Cancel", command=self.cancel_tasks, state="disabled")
+        self.cancel_button.pack(side="right", padx=5)
+
+        master.protocol("WM_DELETE_WINDOW", self.on_close)
+
         self.load_pending_requests() # Load requests on startup
+        self.master.after(REFRESH_INTERVAL_MS, self.auto_refresh)
+
+    # --- Background call plumbing ---
+
+    def update_status(self, message=None):
+        if message:
+            self.status_message = message
+        running = self.tasks.running()
+        if running:
+            self.progress.start(10)
+            self.cancel_button.config(state="normal")
+            more = f" (+{len(running) - 1} more)" if len(running) > 1 else ""
+            self.status_label.config(text=f"{running[0]}...{more}")
+        else:
+            self.progress.stop()
+            self.cancel_button.config(state="disabled")
+            self.status_label.config(text=self.status_message)
+
+    def show_error(self, action):
+        """Error callback for a background call: a dialog naming the failed action."""
+        def on_error(error):
+            if isinstance(error, requests.exceptions.RequestException):
+                messagebox.showerror("Error", f"Failed to {action}: {error}")
+            else:
+                messagebox.showerror("Error", f"An unexpected error occurred: {error}")
+        return on_error
+
+    def cancel_tasks(self):
+        self.tasks.cancel_all()
+        self.busy_request_ids.clear()
+        self.update_status("Cancelled")
+
+    def on_close(self):
+        self.tasks.shutdown()
+        self.master.destroy()
 
     def clear_details(self):
         for field_name, entry_widget in self.fields.items():
@@ -88,52 +320,125 @@ class ModerationGUI:
                 entry_widget.delete(1.0, tk.END)
             else:
                 entry_widget.delete(0, tk.END)
-        self.current_request_index = -1 # No request selected
-
-    def load_pending_requests(self):
-        for i in self.tree.get_children():
-            self.tree.delete(i)
-        self.requests = []
-        self.clear_details()
+        self.current_request_key = None # No request selected
+
+    def load_pending_requests(self, force=False):
+        """
+        Fetch the pending list in the background and merge it into the local model.
+
+        Args:
+            force (bool): Skip the ETag check and always download the list.
+        """
+        self.load_generation += 1
+        generation = self.load_generation
+        etag = None if force else self.etag
+
+        def on_success(result):
+            if generation != self.load_generation: # Skip results a newer load has superseded
+                return
+            pending_requests, self.etag = result
+            if pending_requests is None:
+                self.update_status(f"{len(self.requests)} pending requests (no changes).")
+            else:
+                self.merge_requests(pending_requests)
+
+        self.tasks.submit("Loading pending requests", lambda cancelled: fetch_pending_requests(etag),
+                          on_success, self.show_error("fetch requests"))
+
+    def auto_refresh(self):
+        if not self.tasks.running():
+            self.load_pending_requests()
+        self.master.after(REFRESH_INTERVAL_MS, self.auto_refresh)
+
+    def merge_requests(self, pending_requests):
+        """
+        Patch the Treeview to match a freshly fetched list: delete, insert, update or
+        move only the rows that differ. The request being reviewed (and its unsaved
+        edits) is kept as long as it's still pending.
+        """
+        fresh = {}
+        for i, req in enumerate(pending_requests):
+            fresh.setdefault(request_key(req, i), req)
+
+        for key in self.requests:
+            if key not in fresh:
+                self.tree.delete(key)
+        for position, (key, req) in enumerate(fresh.items()):
+            if key not in self.requests:
+                self.tree.insert("", position, iid=key, values=self.row_values(req))
+                continue
+            if req != self.requests[key]:
+                self.tree.item(key, values=self.row_values(req))
+            if self.tree.index(key) != position:
+                self.tree.move(key, "", position)
+        self.requests = fresh
+
+        if self.current_request_key not in self.requests:
+            self.clear_details()
+        self.update_status(f"Loaded {len(self.requests)} pending requests.")
+        self.verify_links()
+
+    def row_values(self, request_data):
+        return tuple(request_data.get(column, "") for column in TREE_COLUMNS) + (self.link_summary(request_data),)
+
+    def link_summary(self, request_data):
+        """Links column: ✓ all alive, ✗ N broken, ? some unchecked or unreachable, blank for no links."""
+        links = [(request_data.get(field) or "").strip() for field in LINK_FIELDS]
+        links = [link for link in links if link]
+        if not links:
+            return ""
+        results = [self.link_checker.cached(link) for link in links]
+        broken = sum(1 for result in results if result is not None and result.ok is False)
+        if broken:
+            return f"✗ {broken} broken"
+        if all(result is not None and result.ok for result in results):
+            return "✓"
+        return "?"
+
+    def verify_links(self):
+        """Pre-verify the links of every pending request in the background and fill the Links column."""
+        links = [(request_data.get(field) or "").strip() for request_data in self.requests.values() for field in LINK_FIELDS]
+        links = [link for link in dict.fromkeys(links) if link and self.link_checker.cached(link) is None]
+        if not links:
+            return
 
-        try:
-            response = requests.get(f"{API_BASE_URL}/api/get-pending-requests")
-            response.raise_for_status()
-            data = response.json()
-            self.requests = data.get("requests", [])
-
-            for req in self.requests:
-                self.tree.insert("", "end", values=(
-                    req.get("Song ID", ""),
-                    req.get("Title", ""),
-                    req.get("Artist", ""),
-                    req.get("Request Type", ""),
-                    req.get("Status", "")
-                ))
-            messagebox.showinfo("Success", f"Loaded {len(self.requests)} pending requests.")
-        except requests.exceptions.RequestException as e:
-            messagebox.showerror("Error", f"Failed to fetch requests: {e}")
-        except Exception as e:
-            messagebox.showerror("Error", f"An unexpected error occurred: {e}")
+        def on_success(results):
+            for key, request_data in self.requests.items():
+                self.tree.item(key, values=self.row_values(request_data))
+            broken = sum(1 for result in results.values() if result.ok is False)
+            self.update_status(f"Verified {len(results)} links, {broken} broken.")
+
+        self.tasks.submit(f"Verifying {len(links)} links",
+                          lambda cancelled: self.link_checker.check_many(links, cancelled),
+                          on_success, self.show_error("verify links"))
+
+    def remove_request(self, key):
+        """Drop a request that was approved or rejected from the model and the list."""
+        if self.requests.pop(key, None) is not None:
+            self.tree.delete(key)
+        if key == self.current_request_key:
+            self.clear_details()
+
+    def update_request(self, key, updated_data):
+        """Apply saved edits to the model and patch the request's row."""
+        if key not in self.requests:
+            return
+        self.requests[key] = {**self.requests[key], **updated_data}
+        self.tree.item(key, values=self.row_values(self.requests[key]))
+        self.verify_links() # The edit may have changed links
 
     def on_request_double_click(self, event):
         selected_item = self.tree.selection()
         if not selected_item:
             return
 
-        item_id = selected_item[0]
-        values = self.tree.item(item_id, "values")
-        song_id_to_load = values[0]
-
-        # Find the full request object from self.requests
-        for i, req in enumerate(self.requests):
-            if req.get("Song ID") == song_id_to_load:
-                self.current_request_index = i
-                self.populate_details(req)
-                break
+        key = selected_item[0]
+        if key in self.requests:
+            self.populate_details(self.requests[key])
+            self.current_request_key = key
 
     def populate_details(self, request_data):
-        self.clear_details() # Clear previous details first
+        self.clear_details() # Clear previous details first (also clears the selection)
         for field_name, entry_widget in self.fields.items():
             value = request_data.get(field_name, "")
             if isinstance(entry_widget, scrolledtext.ScrolledText):
@@ -152,117 +457,142 @@ class ModerationGUI:
                 details[field_name] = entry_widget.get().strip()
         return details
 
-    def save_edits(self):
-        if self.current_request_index == -1:
-            messagebox.showwarning("No Request Selected", "Please select a request to save edits for.")
-            return
-
-        updated_data = self.get_current_details()
-        original_request = self.requests[self.current_request_index]
-        request_id = original_request.get("Request ID") # Use Request ID for update
+    def selected_request_id(self, action):
+        """Request ID of the request being reviewed, or None (after telling the moderator why)."""
+        if self.current_request_key not in self.requests:
+            messagebox.showwarning("No Request Selected", f"Please select a request to {action}.")
+            return None
 
+        request_id = self.requests[self.current_request_key].get("Request ID")
         if not request_id:
             messagebox.showerror("Error", "Request ID is missing for the selected request.")
+            return None
+        if request_id in self.busy_request_ids:
+            messagebox.showwarning("Please Wait", "This request is still being updated.")
+            return None
+        return request_id
+
+    def run_request_action(self, label, endpoint, payload, request_id, success_message, action, on_done):
+        """
+        Post a save/approve/reject call in the background. On success on_done(request key)
+        patches the local model, so no reload of the whole list is needed.
+        """
+        self.busy_request_ids.add(request_id)
+        key = str(request_id)
+
+        def on_success(response):
+            self.busy_request_ids.discard(request_id)
+            on_done(key)
+            self.update_status(success_message)
+
+        def on_error(error):
+            self.busy_request_ids.discard(request_id)
+            self.show_error(action)(error)
+
+        self.tasks.submit(label, lambda cancelled: post_action(endpoint, payload), on_success, on_error)
+
+    def save_edits(self):
+        request_id = self.selected_request_id("save edits for") # Use Request ID for update
+        if not request_id:
             return
 
-        try:
-            response = requests.post(
-                f"{API_BASE_URL}/api/update-request-data",
-                json={"requestId": request_id, "updatedData": updated_data}
-            )
-            response.raise_for_status()
-            messagebox.showinfo("Success", "Request data updated successfully!")
-            self.load_pending_requests() # Reload to reflect changes
-        except requests.exceptions.RequestException as e:
-            messagebox.showerror("Error", f"Failed to save edits: {e}")
-        except Exception as e:
-            messagebox.showerror("Error", f"An unexpected error occurred: {e}")
+        updated_data = self.get_current_details()
+        self.run_request_action("Saving edits", "update-request-data",
+                                {"requestId": request_id, "updatedData": updated_data}, request_id,
+                                "Request data updated successfully!", "save edits",
+                                lambda key: self.update_request(key, updated_data))
 
     def approve_request(self):
-        if self.current_request_index == -1:
-            messagebox.showwarning("No Request Selected", "Please select a request to approve.")
+        request_id = self.selected_request_id("approve")
+        if not request_id:
             return
 
         request_data = self.get_current_details()
-        request_id = self.requests[self.current_request_index].get("Request ID")
+        self.run_request_action("Approving request", "approve-request",
+                                {"requestId": request_id, "songData": request_data}, request_id,
+                                "Request approved and processed!", "approve request", self.remove_request)
 
+    def reject_request(self):
+        request_id = self.selected_request_id("reject")
         if not request_id:
-            messagebox.showerror("Error", "Request ID is missing for the selected request.")
             return
 
-        try:
-            response = requests.post(
-                f"{API_BASE_URL}/api/approve-request",
-                json={"requestId": request_id, "songData": request_data}
-            )
-            response.raise_for_status()
-            messagebox.showinfo("Success", "Request approved and processed!")
-            self.load_pending_requests() # Reload to remove approved request
-        except requests.exceptions.RequestException as e:
-            messagebox.showerror("Error", f"Failed to approve request: {e}")
-        except Exception as e:
-            messagebox.showerror("Error", f"An unexpected error occurred: {e}")
+        self.run_request_action("Rejecting request", "reject-request", {"requestId": request_id}, request_id,
+                                "Request rejected!", "reject request", self.remove_request)
 
-    def reject_request(self):
-        if self.current_request_index == -1:
-            messagebox.showwarning("No Request Selected", "Please select a request to reject.")
+    def bulk_moderate(self, action):
+        """Approve or reject every selected request, with the data stored for each one."""
+        keys = [key for key in self.tree.selection() if key in self.requests]
+        if not keys:
+            messagebox.showwarning("No Requests Selected", f"Please select the requests to {action}.")
             return
 
-        request_id = self.requests[self.current_request_index].get("Request ID")
+        payloads = []
+        skipped = 0
+        for key in keys:
+            request_data = self.requests[key]
+            request_id = request_data.get("Request ID")
+            if not request_id or request_id in self.busy_request_ids:
+                skipped += 1
+                continue
+            payload = {"requestId": request_id}
+            if action == "approve":
+                payload["songData"] = {field: request_data.get(field, "") for field in DETAIL_FIELDS}
+            payloads.append(payload)
+        if not payloads:
+            messagebox.showwarning("Nothing To Do", "The selected requests are missing IDs or still being updated.")
+            return
 
-        if not request_id:
-            messagebox.showerror("Error", "Request ID is missing for the selected request.")
+        note = f"\n({skipped} selected requests are missing IDs or still being updated and will be skipped.)" if skipped else ""
+        if not messagebox.askyesno(f"{action.capitalize()} Requests", f"{action.capitalize()} {len(payloads)} requests?{note}"):
             return
 
-        try:
-            response = requests.post(
-                f"{API_BASE_URL}/api/reject-request",
-                json={"requestId": request_id}
-            )
-            response.raise_for_status()
-            messagebox.showinfo("Success", "Request rejected!")
-            self.load_pending_requests() # Reload to remove rejected request
-        except requests.exceptions.RequestException as e:
-            messagebox.showerror("Error", f"Failed to reject request: {e}")
-        except Exception as e:
-            messagebox.showerror("Error", f"An unexpected error occurred: {e}")
+        request_ids = [payload["requestId"] for payload in payloads]
+        self.busy_request_ids.update(request_ids)
+        use_batch = self.batch_supported.get(action, True)
+
+        def on_success(result):
+            results, self.batch_supported[action] = result
+            failures = []
+            for request_id, error in results.items():
+                self.busy_request_ids.discard(request_id)
+                if error is None:
+                    self.remove_request(str(request_id))
+                else:
+                    failures.append(f"{request_id}: {error}")
+            done = "Approved" if action == "approve" else "Rejected"
+            self.update_status(f"{done} {len(results) - len(failures)} of {len(results)} requests.")
+            if failures:
+                shown = "\n".join(failures[:20]) + (f"\n... and {len(failures) - 20} more" if len(failures) > 20 else "")
+                messagebox.showwarning("Some Requests Failed", f"{len(failures)} requests failed:\n{shown}")
+
+        def on_error(error):
+            self.busy_request_ids.difference_update(request_ids)
+            self.show_error(f"{action} requests")(error)
+
+        label = f"{'Approving' if action == 'approve' else 'Rejecting'} {len(payloads)} requests"
+        self.tasks.submit(label, lambda cancelled: post_bulk(action, payloads, cancelled, use_batch),
+                          on_success, on_error)
 
     def test_links(self):
         details = self.get_current_details()
-        youtube_link = details.get("YouTube Link")
-        spotify_link = details.get("Spotify Link")
-        tab4u_link = details.get("Tab4u Link")
-
-        results = []
-
-        if youtube_link:
-            try:
-                response = requests.head(youtube_link, allow_redirects=True, timeout=5)
-                results.append(f"YouTube Link ({youtube_link}): {'OK' if response.status_code == 200 else f'Error {response.status_code}'}")
-            except requests.exceptions.RequestException as e:
-                results.append(f"YouTube Link ({youtube_link}): Failed ({e})")
-        else:
-            results.append("YouTube Link: Not provided")
-
-        if spotify_link:
-            try:
-                response = requests.head(spotify_link, allow_redirects=True, timeout=5)
-                results.append(f"Spotify Link ({spotify_link}): {'OK' if response.status_code == 200 else f'Error {response.status_code}'}")
-            except requests.exceptions.RequestException as e:
-                results.append(f"Spotify Link ({spotify_link}): Failed ({e})")
-        else:
-            results.append("Spotify Link: Not provided")
-
-        if tab4u_link:
-            try:
-                response = requests.head(tab4u_link, allow_redirects=True, timeout=5)
-                results.append(f"Tab4u Link ({tab4u_link}): {'OK' if response.status_code == 200 else f'Error {response.status_code}'}")
-            except requests.exceptions.RequestException as e:
-                results.append(f"Tab4u Link ({tab4u_link}): Failed ({e})")
-        else:
-            results.append("Tab4u Link: Not provided")
-
-        messagebox.showinfo("Link Test Results", "\n".join(results))
+        links = {field: details.get(field, "") for field in LINK_FIELDS}
+
+        def on_success(results):
+            lines = []
+            for field, link in links.items():
+                result = results.get(link.strip())
+                if not link.strip():
+                    lines.append(f"{field}: Not provided")
+                elif result is None:
+                    lines.append(f"{field} ({link}): Not checked")
+                else:
+                    lines.append(f"{field} ({link}): {result.detail}")
+            self.update_status("Link test finished.")
+            messagebox.showinfo("Link Test Results", "\n".join(lines))
+
+        self.tasks.submit("Testing links", lambda cancelled: self.link_checker.check_many(links.values(), cancelled),
+                          on_success, self.show_error("test links"))
 
 if __name__ == "__main__":
     root = tk.Tk()
@@ -0,0 +1,137 @@
+"""
+Column- and chunk-sliced worksheet reads.
+
+worksheet.get_all_values() downloads every column of every row, formatted as
+displayed, in one response. The scripts only need a few columns (artist and
+title in A:B plus their output columns), so the readers here request just those
+ranges - one values.batchGet per READ_CHUNK_ROWS rows - with unformatted values,
+and iter_rows hands the rows over chunk by chunk, so a 100k-row sheet is never
+held whole.
+
+Rows come back shaped like get_all_values() rows: strings, cells at their usual
+column index, '' in the columns that weren't read. A script can switch over
+without changing how it indexes rows.
+
+Usage:
+    from sheet_reader import iter_rows, read_rows
+
+    values = read_rows(worksheet, ['A:B', 'E'])   # like get_all_values(), with A, B and E filled in
+    for row_number, row in iter_rows(worksheet, ['A:B'], first_row=2):
+        ...
+"""
+
+import sheets_governor
+
+READ_CHUNK_ROWS = 5000  # Rows per values.batchGet
+
+# Numbers and booleans unformatted (no display formatting, smaller payload); dates stay readable strings
+VALUE_RENDER_OPTION = 'UNFORMATTED_VALUE'
+DATE_TIME_RENDER_OPTION = 'FORMATTED_STRING'
+
+
+def column_letter(number):
+    """1 -> 'A', 27 -> 'AA'."""
+    letters = ''
+    while number > 0:
+        number, remainder = divmod(number - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def column_number(letters):
+    """'A' -> 1, 'AA' -> 27."""
+    number = 0
+    for char in letters.upper():
+        number = number * 26 + ord(char) - ord('A') + 1
+    return number
+
+
+def all_columns(worksheet):
+    """The column spec covering the whole grid, for scripts that inspect every column."""
+    return [f"A:{column_letter(worksheet.col_count)}"]
+
+
+def _spans(columns):
+    """Sorted (first, last) column numbers of 'A:B' / 'E' specs, adjacent spans merged."""
+    spans = []
+    for spec in columns:
+        first, _, last = spec.partition(':')
+        spans.append((column_number(first), column_number(last or first)))
+    merged = []
+    for first, last in sorted(spans):
+        if merged and first <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], last))
+        else:
+            merged.append((first, last))
+    return merged
+
+
+def _cell_text(value):
+    """An unformatted cell as get_all_values() would show it for a plain-formatted cell."""
+    if isinstance(value, bool):
+        return 'TRUE' if value else 'FALSE'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def iter_row_chunks(worksheet, columns, first_row=1, last_row=None, chunk_rows=READ_CHUNK_ROWS):
+    """
+    Read the given columns chunk by chunk, up to last_row (default: the end of the grid).
+
+    Args:
+        worksheet: gspread Worksheet.
+        columns (list): Column letters or spans, e.g. ['A:B', 'E'].
+        first_row (int): 1-indexed row to start from.
+        last_row (int): Last row to read.
+        chunk_rows (int): Rows per request.
+
+    Yields:
+        tuple: (row number of the chunk's first row, rows). Trailing empty rows of a
+        chunk are left out, as the API leaves them out; an empty chunk isn't yielded.
+    """
+    spans = _spans(columns)
+    width = spans[-1][1]
+    last_row = last_row or worksheet.row_count
+    start = first_row
+    while start <= last_row:
+        end = min(start + chunk_rows - 1, last_row)
+        ranges = [f"{column_letter(first)}{start}:{column_letter(last)}{end}" for first, last in spans]
+        responses = sheets_governor.read(worksheet, ranges, value_render_option=VALUE_RENDER_OPTION,
+                                         date_time_render_option=DATE_TIME_RENDER_OPTION)
+        height = max((len(values) for values in responses), default=0)
+        if height:
+            rows = [[''] * width for _ in range(height)]
+            for (first, _), values in zip(spans, responses):
+                for offset, cells in enumerate(values):
+                    rows[offset][first - 1:first - 1 + len(cells)] = [_cell_text(value) for value in cells]
+            yield start, rows
+        start = end + 1
+
+
+def iter_rows(worksheet, columns, first_row=1, last_row=None, chunk_rows=READ_CHUNK_ROWS):
+    """
+    Like iter_row_chunks, one row at a time.
+
+    Yields:
+        tuple: (row number, row)
+    """
+    for start, rows in iter_row_chunks(worksheet, columns, first_row, last_row, chunk_rows):
+        for offset, row in enumerate(rows):
+            yield start + offset, row
+
+
+def read_rows(worksheet, columns, first_row=1, last_row=None, chunk_rows=READ_CHUNK_ROWS):
+    """
+    The given columns of a range of rows, as one list (values[i] is row first_row + i).
+
+    Returns:
+        list: Rows up to the last non-empty one, like get_all_values() when first_row is 1.
+    """
+    width = _spans(columns)[-1][1]
+    values = []
+    for start, rows in iter_row_chunks(worksheet, columns, first_row, last_row, chunk_rows):
+        # Rows a previous chunk left out as trailing empties
+        values.extend([''] * width for _ in range(start - first_row - len(values)))
+        values.extend(rows)
+    return values
@@ -0,0 +1,287 @@
+"""
+One gate for every Google Sheets request the scripts make.
+
+The Sheets API allows about 60 read and 60 write requests per minute per user.
+Scripts running side by side used to spend that quota blind: one would hit a
+429 and exit (the YTMusic linker) or fall back to even more single-cell writes
+(the Ultimate Guitar scraper). The governor instead:
+
+  * counts reads and writes in a one-minute window shared by every process
+    (QUOTA_FILE, under a file lock) and waits for a free slot before sending;
+  * on a 429 / quota error pauses every job for a growing backoff, then
+    resumes the request - it never gives up on a rate limit;
+  * retries transient failures (5xx, dropped connections) a few times;
+  * coalesces queued cell writes into one values.batchUpdate per worksheet
+    (up to MAX_RANGES_PER_BATCH ranges), sent when MAX_PENDING_RANGES are
+    queued, FLUSH_INTERVAL_SECONDS after the first one, or on flush() / exit.
+
+Reads that go through sheet_reader are already merged into one batchGet per
+chunk; other reads and writes go through call().
+
+Usage:
+    import sheets_governor
+
+    values = sheets_governor.call('read', worksheet.get_all_values)
+    sheets_governor.call('write', worksheet.batch_update, updates)
+
+    sheets_governor.queue_update(worksheet, 'F12', [[url]], on_written=lambda: record(12))
+    sheets_governor.flush()
+"""
+
+import atexit
+import json
+import os
+import random
+import threading
+import time
+
+import metrics
+from file_lock import FileLock
+
+QUOTA_FILE = os.environ.get('SHIRLI_SHEETS_QUOTA_FILE',
+                            os.path.join(os.path.expanduser('~'), '.shirli_sheets_quota.json'))
+READ_REQUESTS_PER_MINUTE = int(os.environ.get('SHIRLI_SHEETS_READS_PER_MINUTE', 60))
+WRITE_REQUESTS_PER_MINUTE = int(os.environ.get('SHIRLI_SHEETS_WRITES_PER_MINUTE', 60))
+WINDOW_SECONDS = 60
+
+MAX_BACKOFF_SECONDS = 64   # Longest pause after repeated rate limits (the quota window is a minute)
+TRANSIENT_RETRIES = 5      # Attempts after a 5xx or a dropped connection before the error is raised
+
+MAX_RANGES_PER_BATCH = 500
+MAX_PENDING_RANGES = 200
+FLUSH_INTERVAL_SECONDS = 30
+
+# gspread method -> API endpoint, for metrics
+ENDPOINTS = {
+    'get_all_values': 'values.get',
+    'get_all_records': 'values.get',
+    'row_values': 'values.get',
+    'col_values': 'values.get',
+    'cell': 'values.get',
+    'batch_get': 'values.batchGet',
+    'update': 'values.update',
+    'update_cell': 'values.update',
+    'batch_update': 'values.batchUpdate',
+    'clear': 'values.clear',
+    'append_rows': 'values.append',
+    'add_worksheet': 'batchUpdate',
+    'add_rows': 'batchUpdate',
+}
+
+
+def _status(error):
+    code = getattr(error, 'code', None)  # gspread >= 6
+    if isinstance(code, int):
+        return code
+    return getattr(getattr(error, 'response', None), 'status_code', None)
+
+
+def is_rate_limited(error):
+    """Whether an API error means "too many requests" (429, or the older 403 quota reasons)."""
+    text = str(error)
+    return (_status(error) == 429 or 'RESOURCE_EXHAUSTED' in text
+            or 'quotaExceeded' in text or 'rateLimitExceeded' in text)
+
+
+def _is_transient(error):
+    status = _status(error)
+    return (isinstance(status, int) and status >= 500) or isinstance(error, OSError)  # requests' errors are OSErrors
+
+
+class SheetsGovernor:
+    """Shared per-minute read/write budget, rate-limit pauses and coalesced writes."""
+
+    def __init__(self, limits=None, path=QUOTA_FILE):
+        """
+        Args:
+            limits (dict): Requests per minute by kind ('read', 'write'); None for a kind
+                sends without counting (rate-limit pauses still apply).
+            path (str): Window file shared by the processes that should split the quota.
+        """
+        self.limits = limits if limits is not None else {'read': READ_REQUESTS_PER_MINUTE,
+                                                          'write': WRITE_REQUESTS_PER_MINUTE}
+        self.path = path
+        self.lock = FileLock(f"{path}.lock")
+        self._queue_lock = threading.RLock()
+        self._pending = {}  # id(worksheet) -> (worksheet, {range: (values, callbacks)})
+        self._pending_ranges = 0
+        self._first_queued_at = None
+
+    # ----------------------------------------
+    # Shared window
+    # ----------------------------------------
+
+    def _read_window(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_window(self, window):
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(window, f)
+        os.replace(temp_path, self.path)
+
+    def _reserve(self, kind):
+        """Wait until a request of this kind may be sent, and count it."""
+        limit = self.limits.get(kind)
+        while True:
+            with self.lock:
+                window = self._read_window()
+                now = time.time()
+                # While paused after a rate limit just wait (the pausing call already said so)
+                wait = window.get('paused_until', 0) - now
+                if wait <= 0:
+                    sent = [stamp for stamp in window.get(kind, []) if now - stamp < WINDOW_SECONDS]
+                    if not limit or len(sent) < limit:
+                        if limit:
+                            window[kind] = sent + [now]
+                            self._write_window(window)
+                        return
+                    wait = min(sent) + WINDOW_SECONDS - now
+                    if wait > 1:
+                        print(f"⏳ Google Sheets {kind} quota in use; waiting {wait:.0f}s...")
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        """Hold every process's requests for `seconds` (longer pauses already set are kept)."""
+        with self.lock:
+            window = self._read_window()
+            window['paused_until'] = max(window.get('paused_until', 0), time.time() + seconds)
+            self._write_window(window)
+
+    # ----------------------------------------
+    # Requests
+    # ----------------------------------------
+
+    def call(self, kind, func, *args, endpoint=None, **kwargs):
+        """
+        Send one request within the quota, pausing on rate limits and retrying transient errors.
+
+        Args:
+            kind (str): 'read' or 'write'.
+            func: The gspread method to call, e.g. worksheet.batch_update.
+            endpoint (str): Metrics name (default: looked up in ENDPOINTS).
+
+        Returns:
+            Whatever func returns.
+
+        Raises:
+            Exception: func's error, if it isn't a rate limit and retries didn't help.
+        """
+        name = getattr(func, '__name__', 'call')
+        endpoint = endpoint or ENDPOINTS.get(name, name)
+        backoff = 1
+        failures = 0
+        while True:
+            self._reserve(kind)
+            try:
+                with metrics.timed('sheets', endpoint):
+                    return func(*args, **kwargs)
+            except Exception as e:
+                if is_rate_limited(e):
+                    wait = min(backoff, MAX_BACKOFF_SECONDS) + random.uniform(0, 1)
+                    backoff *= 2
+                    print(f"⏳ Google Sheets rate limit reached; pausing all jobs for {wait:.0f}s, then resuming...")
+                    self.pause(wait)
+                elif _is_transient(e) and failures < TRANSIENT_RETRIES:
+                    failures += 1
+                    wait = 2 ** failures + random.uniform(0, 1)
+                    print(f"⚠️ Google Sheets error ({e}); retrying in {wait:.0f}s "
+                          f"({failures}/{TRANSIENT_RETRIES})...")
+                    time.sleep(wait)
+                else:
+                    raise
+
+    def read(self, worksheet, ranges, **kwargs):
+        """Several ranges of a worksheet in one values.batchGet."""
+        return self.call('read', worksheet.batch_get, ranges, **kwargs)
+
+    # ----------------------------------------
+    # Coalesced writes
+    # ----------------------------------------
+
+    def queue_update(self, worksheet, range_name, values, on_written=None):
+        """
+        Queue a write; a later write to the same range replaces it.
+
+        Args:
+            worksheet: gspread Worksheet.
+            range_name (str): A1 range, e.g. 'F12'.
+            values (list): Rows of values, e.g. [[url]].
+            on_written: Called once the write has been sent (e.g. to record job state).
+        """
+        with self._queue_lock:
+            _, ranges = self._pending.setdefault(id(worksheet), (worksheet, {}))
+            previous = ranges.pop(range_name, None)
+            callbacks = (previous[1] if previous else []) + ([on_written] if on_written else [])
+            ranges[range_name] = (values, callbacks)
+            if previous is None:
+                self._pending_ranges += 1
+            if self._first_queued_at is None:
+                self._first_queued_at = time.monotonic()
+            due = (self._pending_ranges >= MAX_PENDING_RANGES
+                   or time.monotonic() - self._first_queued_at >= FLUSH_INTERVAL_SECONDS)
+        if due:
+            self.flush()
+
+    def pending(self):
+        """Number of queued ranges not yet sent."""
+        with self._queue_lock:
+            return self._pending_ranges
+
+    def flush(self):
+        """Send every queued write, one values.batchUpdate per worksheet and MAX_RANGES_PER_BATCH ranges."""
+        with self._queue_lock:
+            batches = []  # (key, worksheet, [(range, (values, callbacks))])
+            for key, (worksheet, ranges) in self._pending.items():
+                items = list(ranges.items())
+                batches += [(key, worksheet, items[start:start + MAX_RANGES_PER_BATCH])
+                            for start in range(0, len(items), MAX_RANGES_PER_BATCH)]
+            self._pending = {}
+            self._pending_ranges = 0
+            self._first_queued_at = None
+            for position, (_, worksheet, chunk) in enumerate(batches):
+                try:
+                    self.call('write', worksheet.batch_update,
+                              [{'range': range_name, 'values': values} for range_name, (values, _) in chunk])
+                except Exception:
+                    # Keep what wasn't sent, so a later flush can try again
+                    for key, worksheet, unsent in batches[position:]:
+                        self._pending.setdefault(key, (worksheet, {}))[1].update(unsent)
+                        self._pending_ranges += len(unsent)
+                    self._first_queued_at = time.monotonic()
+                    raise
+                for _, (_, callbacks) in chunk:
+                    for callback in callbacks:
+                        callback()
+
+
+GOVERNOR = SheetsGovernor()
+
+
+def call(kind, func, *args, **kwargs):
+    return GOVERNOR.call(kind, func, *args, **kwargs)
+
+
+def read(worksheet, ranges, **kwargs):
+    return GOVERNOR.read(worksheet, ranges, **kwargs)
+
+
+def queue_update(worksheet, range_name, values, on_written=None):
+    GOVERNOR.queue_update(worksheet, range_name, values, on_written)
+
+
+def flush():
+    GOVERNOR.flush()
+
+
+@atexit.register
+def _flush_at_exit():
+    # Don't lose queued writes when a script ends without flushing
+    try:
+        GOVERNOR.flush()
+    except Exception as e:
+        print(f"❌ Could not write {GOVERNOR.pending()} queued Google Sheets updates: {e}")
@@ -0,0 +1,98 @@
+"""
+One Spotify client-credentials token shared by every script and worker process.
+
+spotipy's default cache is a '.cache' file in the working directory: scripts run
+from different folders fetch their own tokens, and parallel workers in one folder
+overwrite each other's file. SharedClientCredentials keeps the tokens of all
+client IDs in one per-user file instead. A token is refreshed REFRESH_MARGIN_SECONDS
+before it expires, by whichever process gets there first under a file lock; the
+others wait for the lock, then pick up the new token instead of requesting their own.
+
+Usage:
+    import spotipy
+    from spotify_token_cache import SharedClientCredentials
+
+    sp = spotipy.Spotify(auth_manager=SharedClientCredentials(client_id=..., client_secret=...))
+"""
+
+import json
+import os
+import time
+
+from spotipy.cache_handler import CacheHandler
+from spotipy.oauth2 import SpotifyClientCredentials
+
+import metrics
+from file_lock import FileLock
+
+TOKEN_CACHE_FILE = os.environ.get('SHIRLI_SPOTIFY_TOKEN_CACHE',
+                                  os.path.join(os.path.expanduser('~'), '.shirli_spotify_tokens.json'))
+REFRESH_MARGIN_SECONDS = 300  # Tokens last an hour; replace them 5 minutes early so no request sees a 401
+
+
+def _expires_soon(token_info):
+    return token_info['expires_at'] - time.time() < REFRESH_MARGIN_SECONDS
+
+
+class SharedTokenCache(CacheHandler):
+    """spotipy cache handler storing {client ID: token} in one JSON file, guarded by a file lock."""
+
+    def __init__(self, client_id, path=TOKEN_CACHE_FILE):
+        self.client_id = client_id
+        self.path = path
+        self.lock = FileLock(f"{path}.lock")
+        self._token = None  # In-memory copy, so API calls don't read the file until the token ages
+
+    def _read(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def get_cached_token(self, reload=False):
+        if reload or self._token is None or _expires_soon(self._token):
+            self._token = self._read().get(self.client_id)
+        return self._token
+
+    def save_token_to_cache(self, token_info):
+        with self.lock:
+            tokens = self._read()
+            tokens[self.client_id] = token_info
+            temp_path = f"{self.path}.{os.getpid()}.tmp"
+            # Owner-only, like any credentials file: the token grants API access
+            with os.fdopen(os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), 'w',
+                           encoding='utf-8') as f:
+                json.dump(tokens, f)
+            os.replace(temp_path, self.path)
+        self._token = token_info
+
+
+class SharedClientCredentials(SpotifyClientCredentials):
+    """SpotifyClientCredentials whose token is shared across processes (see module docstring)."""
+
+    def __init__(self, client_id=None, client_secret=None, cache_path=TOKEN_CACHE_FILE, **kwargs):
+        client_id = client_id or os.getenv('SPOTIPY_CLIENT_ID')
+        super().__init__(client_id, client_secret, cache_handler=SharedTokenCache(client_id, cache_path), **kwargs)
+
+    @staticmethod
+    def is_token_expired(token_info):
+        return _expires_soon(token_info)
+
+    def get_access_token(self, as_dict=True, check_cache=True):
+        if check_cache:
+            token_info = self.cache_handler.get_cached_token()
+            if token_info and not self.is_token_expired(token_info):
+                return token_info if as_dict else token_info['access_token']
+
+        with self.cache_handler.lock:
+            # Another process may have refreshed the token while we waited for the lock
+            token_info = self.cache_handler.get_cached_token(reload=True)
+            fresh = check_cache and token_info and not self.is_token_expired(token_info)
+            metrics.record_cache('spotify_token', hit=bool(fresh))
+            if fresh:
+                return token_info if as_dict else token_info['access_token']
+            with metrics.timed('spotify', 'token'):
+                token_info = self._add_custom_values_to_token_info(self._request_access_token())
+            self.cache_handler.save_token_to_cache(token_info)
+        return token_info if as_dict else token_info['access_token']
@@ -0,0 +1,229 @@
+"""
+Structured, non-blocking logging shared by the scrapers.
+
+Log records are handed to a QueueHandler, so the scrape loop never waits on
+disk or console I/O; a QueueListener thread writes them out:
+
+  * a JSON-lines file (one event per line, with row/provider/latency/outcome
+    fields when given) that rotates by size and gzips the rotated files
+  * the usual human-readable console output
+
+In quiet mode the per-row detail lines (search URL, match decisions, ...) are
+held back and only written when that row fails; successful rows are reduced
+to their one-line outcome event.
+
+Usage:
+    import structured_logging
+
+    logger = structured_logging.setup_logging('scraper.jsonl')
+    structured_logging.set_row(42, worksheet='songs')
+    logger.info("Searching tab4u", extra={'provider': 'tab4u'})
+    structured_logging.log_event(logger, "Found URL", provider='tab4u',
+                                 outcome='found', latency=0.41, url=url)
+"""
+
+import atexit
+import contextvars
+import gzip
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import shutil
+import sys
+from datetime import datetime
+
+DEFAULT_MAX_BYTES = 5 * 1024 * 1024
+DEFAULT_BACKUP_COUNT = 5
+CONSOLE_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+# Event fields copied from the record (passed via extra=... or log_event) into the JSON line
+EVENT_FIELDS = ('row', 'worksheet', 'provider', 'latency', 'outcome', 'artist', 'song', 'query', 'url')
+
+# Outcomes that make quiet mode flush the buffered details of a row
+FAILURE_OUTCOMES = {'not_found', 'error', 'quota', 'rate_limited'}
+
+# Details kept per row in quiet mode; older lines are dropped first
+QUIET_BUFFER_LIMIT = 50
+
+_current_row = contextvars.ContextVar('current_row', default=(None, None))
+_listener = None
+
+
+def set_row(row, worksheet=None):
+    """
+    Tag every record logged from now on (in this thread/context) with a row.
+
+    Args:
+        row: 1-indexed sheet row, or None to clear the tag.
+        worksheet: Optional worksheet title.
+    """
+    _current_row.set((row, worksheet))
+
+
+def log_event(logger, message, level=logging.INFO, **fields):
+    """Log one structured event; fields must be names from EVENT_FIELDS."""
+    logger.log(level, message, extra=fields)
+
+
+class _RowContextFilter(logging.Filter):
+    """Copies the current row tag onto records. Runs in the logging thread, before queuing."""
+
+    def filter(self, record):
+        row, worksheet = _current_row.get()
+        if row is not None and getattr(record, 'row', None) is None:
+            record.row = row
+        if worksheet is not None and getattr(record, 'worksheet', None) is None:
+            record.worksheet = worksheet
+        return True
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Formats a record as a single JSON object per line."""
+
+    def format(self, record):
+        event = {
+            'ts': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        for field in EVENT_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                event[field] = round(value, 4) if field == 'latency' else value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text and record.exc_text not in event['msg']:
+            event['exc'] = record.exc_text
+        return json.dumps(event, ensure_ascii=False)
+
+
+class GzipRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """Size-based rotation that compresses rotated files to <name>.N.gz."""
+
+    def __init__(self, filename, max_bytes=DEFAULT_MAX_BYTES, backup_count=DEFAULT_BACKUP_COUNT):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
+        self.namer = lambda name: f"{name}.gz"
+        self.rotator = self._gzip_rotator
+
+    @staticmethod
+    def _gzip_rotator(source, dest):
+        with open(source, 'rb') as f_in, gzip.open(dest, 'wb') as f_out:
+            shutil.copyfileobj(f_in, f_out)
+        os.remove(source)
+
+
+class QuietRowHandler(logging.Handler):
+    """
+    Wraps the real handlers for quiet mode.
+
+    Records without a row pass straight through. Detail records of a row are
+    buffered; a warning/error or a failure outcome writes the buffer followed by
+    the record, while a success outcome writes only itself. Moving to another
+    row discards what is left of the buffer.
+    """
+
+    def __init__(self, targets):
+        super().__init__()
+        self.targets = targets
+        self._row = None
+        self._buffer = []
+
+    def _write(self, record):
+        for target in self.targets:
+            if record.levelno >= target.level:
+                target.handle(record)
+
+    def emit(self, record):
+        row = getattr(record, 'row', None)
+        if row is None:
+            self._write(record)
+            return
+        if (row, getattr(record, 'worksheet', None)) != self._row:
+            self._row = (row, getattr(record, 'worksheet', None))
+            self._buffer.clear()
+
+        outcome = getattr(record, 'outcome', None)
+        if record.levelno >= logging.WARNING or outcome in FAILURE_OUTCOMES:
+            for buffered in self._buffer:
+                self._write(buffered)
+            self._buffer.clear()
+            self._write(record)
+        elif outcome is not None:
+            self._buffer.clear()
+            self._write(record)
+        else:
+            self._buffer.append(record)
+            if len(self._buffer) > QUIET_BUFFER_LIMIT:
+                self._buffer.pop(0)
+
+    def flush(self):
+        for target in self.targets:
+            target.flush()
+
+
+def setup_logging(log_file='scraper.jsonl', quiet=None, level=logging.INFO, console=True,
+                  max_bytes=DEFAULT_MAX_BYTES, backup_count=DEFAULT_BACKUP_COUNT):
+    """
+    Route the root logger through a queue to a rotating JSON-lines file and the console.
+
+    Args:
+        log_file: Path of the JSON-lines log; rotated files become <log_file>.N.gz.
+        quiet: Only log per-row details for failed rows. Defaults to the
+            SHIRLI_LOG_QUIET environment variable ('1' enables it).
+        level: Root logger level.
+        console: Also print human-readable lines to stdout.
+        max_bytes: Rotate once the file reaches this size.
+        backup_count: Number of gzipped files to keep.
+
+    Returns:
+        The root logger.
+    """
+    global _listener
+    if quiet is None:
+        quiet = os.environ.get('SHIRLI_LOG_QUIET') == '1'
+
+    shutdown()  # Calling setup twice must not leave two listeners writing the same file
+
+    handlers = [GzipRotatingFileHandler(log_file, max_bytes, backup_count)]
+    handlers[0].setFormatter(JsonLinesFormatter())
+    if console:
+        # Windows consoles default to cp1252; Hebrew artist names need UTF-8
+        if hasattr(sys.stdout, 'reconfigure') and (sys.stdout.encoding or '').lower() != 'utf-8':
+            sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setFormatter(logging.Formatter(CONSOLE_FORMAT))
+        handlers.append(console_handler)
+    if quiet:
+        handlers = [QuietRowHandler(handlers)]
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(_RowContextFilter())
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    return root
+
+
+def shutdown():
+    """Drain the queue and close the handlers. Registered with atexit."""
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    for handler in _listener.handlers:
+        for target in getattr(handler, 'targets', [handler]):
+            target.close()
+    _listener = None
+
+
+atexit.register(shutdown)
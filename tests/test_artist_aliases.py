@@ -0,0 +1,38 @@
+import json
+
+import pytest
+
+from artist_aliases import ArtistAliases, names_match
+
+
+@pytest.mark.parametrize('artist, provider_artist', [('Noa', 'Nova'), ('Avi Biter', 'Tair'),
+                                                     ('Eyal Golan', 'Eyal Golan & Omer Adam')])
+def test_different_artists_are_not_learned(tmp_path, artist, provider_artist):
+    aliases = ArtistAliases(path=str(tmp_path / 'aliases.json'))
+
+    assert not names_match(artist, provider_artist)
+    assert not aliases.learn(artist, 'spotify', provider_artist)
+    assert aliases.lookup(artist, 'spotify') is None
+
+
+def test_spellings_of_one_artist_are_learned(tmp_path):
+    aliases = ArtistAliases(path=str(tmp_path / 'aliases.json'))
+
+    assert aliases.learn('Eyal Golan', 'spotify', 'אייל גולן')
+    assert aliases.lookup('Eyal Golan', 'spotify') == 'אייל גולן'
+    assert aliases.lookup('Noa', 'spotify') is None
+
+
+def test_saves_of_two_runs_are_merged(tmp_path):
+    path = str(tmp_path / 'aliases.json')
+    first, second = ArtistAliases.load(path), ArtistAliases.load(path)
+    first.learn('Eyal Golan', 'spotify', 'אייל גולן')
+    second.learn('Omer Adam', 'spotify', 'עומר אדם')
+
+    first.save()
+    second.save()
+
+    with open(path, encoding='utf-8') as f:
+        artists = json.load(f)['artists']
+    assert sorted(entry['name'] for entry in artists.values()) == ['Eyal Golan', 'Omer Adam']
+    assert not [name for name in tmp_path.iterdir() if name.suffix == '.tmp']
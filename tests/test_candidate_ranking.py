@@ -0,0 +1,191 @@
+import importlib
+import os
+import re
+import sys
+
+import pytest
+from fuzzywuzzy import fuzz
+
+import candidate_ranking
+from api_fixtures import tab4u_results_html
+from candidate_ranking import Candidate, rank
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# ========================================
+# The rules candidate_ranking replaced, as references
+# ========================================
+
+def _old_check_match(normalize_artist_name, normalize_song_title, sheet_artist, sheet_song, link_artist, link_song):
+    artist_score = fuzz.token_set_ratio(normalize_artist_name(sheet_artist), normalize_artist_name(link_artist))
+    song_score = fuzz.token_set_ratio(normalize_song_title(sheet_song), normalize_song_title(link_song))
+    if song_score >= 90:
+        return "exact"
+    if song_score >= 75 and artist_score >= 75:
+        return "high_probability"
+    return "none"
+
+
+def _old_tab4u_choice(results, artist, song):
+    def normalize(text):
+        return re.sub(r'\s+', ' ', re.sub(r'[^\w\s]', '', text)).strip().lower()
+
+    def similar(text1, text2):
+        norm1, norm2 = normalize(text1), normalize(text2)
+        shorter, longer = sorted((norm1, norm2), key=len)
+        return len(shorter) >= 3 and shorter in longer
+
+    def matches(wanted, found):
+        return wanted.lower() in found.lower() or found.lower() in wanted.lower() or similar(wanted, found)
+
+    for result in results:
+        if matches(artist, result['artist']) and matches(song, result['song']):
+            return result['url']
+    for result in results:
+        if matches(song, result['song']):
+            return result['url']
+    return None
+
+
+def _old_ultimate_guitar_order(results, target_artist, target_song):
+    def normalize(text):
+        return re.sub(r'[^\w\s]', '', text.lower()).strip()
+
+    def score(result):
+        artist, song = normalize(result['artist']), normalize(result['song'])
+        wanted_artist, wanted_song = normalize(target_artist), normalize(target_song)
+        if not (wanted_song in song or song in wanted_song):
+            return 0
+        points = 1000 + (500 if wanted_song == song else 0)
+        if wanted_artist in artist or artist in wanted_artist:
+            points += 2000 + (1000 if wanted_artist == artist else 0)
+        return points + min(result['rating'], 100)
+
+    scored = [(score(result), result['url']) for result in results]
+    return [url for points, url in sorted(scored, key=lambda item: item[0], reverse=True) if points > 0]
+
+
+# ========================================
+# Link finder tiers
+# ========================================
+
+LINK_FINDER_CASES = [
+    ('Avi Biter', 'Ahava', 'Avi Biter', 'Ahava'),
+    ('Avi Biter', 'Ahava', 'Tair', 'Ahava'),
+    ('Noa', 'Hallelujah', 'Nova', 'Hallelujah'),
+    ('Noa', 'Hallelujah', 'Noa', 'Hallelujah (Live)'),
+    ('Eyal Golan', 'Metoka', 'אייל גולן', 'מתוקה'),
+    ('Eyal Golan', 'Metoka Mi Dvash', 'Eyal Golan', 'Metoka'),
+    ('Eyal Golan', 'Metoka Mi Dvash', 'Omer Adam', 'Metoka'),
+    ('Shlomo Artzi', 'Tel Aviv Yafo', 'Shlomo Arzi', 'Tel Aviv Jaffa'),
+    ('Shlomo Artzi', 'Tel Aviv Yafo', 'Tair', 'Tel Aviv Jaffa'),
+    ('Omer Adam', 'Tel Aviv', 'Omer Adam', 'Yafa Sheli'),
+]
+
+
+@pytest.fixture(scope='module')
+def link_finder():
+    return importlib.import_module('YouTube_spotify_Link_Finder')
+
+
+@pytest.mark.parametrize('sheet_artist, sheet_song, link_artist, link_song', LINK_FINDER_CASES)
+def test_link_finder_tiers_are_unchanged(link_finder, sheet_artist, sheet_song, link_artist, link_song):
+    expected = _old_check_match(link_finder.normalize_artist_name, link_finder.normalize_song_title,
+                                sheet_artist, sheet_song, link_artist, link_song)
+
+    assert link_finder.check_match(sheet_artist, sheet_song, link_artist, link_song) == expected
+
+
+def test_link_finder_tiers_need_the_artist_below_the_exact_title(link_finder):
+    assert link_finder.check_match('Shlomo Artzi', 'Tel Aviv Yafo', 'Shlomo Arzi', 'Tel Aviv Jaffa') == 'high_probability'
+    assert link_finder.check_match('Shlomo Artzi', 'Tel Aviv Yafo', 'Tair', 'Tel Aviv Jaffa') == 'none'
+    assert not link_finder.artist_matches('Avi Biter', 'Tair')
+    assert link_finder.artist_matches('Eyal Golan', 'Eyal Golan & Omer Adam')
+
+
+# ========================================
+# tab4u
+# ========================================
+
+TAB4U_CASES = [
+    # (results as (artist, title), row artist, row song)
+    ([('Tair', 'Ahava'), ('Avi Biter', 'Ahava')], 'Avi Biter', 'Ahava'),
+    ([('Tair', 'Ahava')], 'Avi Biter', 'Ahava'),
+    ([('Nova', 'Hallelujah'), ('Noa', 'Hallelujah')], 'Noa', 'Hallelujah'),
+    ([('Avi Biter', 'Other Song')], 'Avi Biter', 'Ahava'),
+    ([('Avi Biter', 'Ahava Rishona')], 'Avi Biter', 'Ahava'),
+    ([('שלמה ארצי', 'אהבתיה'), ('שלמה ארצי', 'תרנגולים')], 'שלמה ארצי', 'אהבתיה'),
+]
+
+
+@pytest.fixture(scope='module')
+def tab4u_scraper(tmp_path_factory):
+    # The scraper logs to scraper.jsonl in the working directory from import on
+    cwd = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp('tab4u'))
+    sys.path.insert(0, os.path.join(ROOT, 'missing_shirli_scripts'))
+    try:
+        module = importlib.import_module('tab_scrapper')
+        yield module.Tab4UScraper.__new__(module.Tab4UScraper)
+    finally:
+        sys.path.remove(os.path.join(ROOT, 'missing_shirli_scripts'))
+        importlib.import_module('structured_logging').shutdown()
+        os.chdir(cwd)
+
+
+@pytest.mark.parametrize('results, artist, song', TAB4U_CASES)
+def test_tab4u_picks_what_the_old_tiers_picked(tab4u_scraper, results, artist, song):
+    html = tab4u_results_html([{'artist': found_artist, 'title': title} for found_artist, title in results])
+    expected = _old_tab4u_choice([{'artist': found_artist, 'song': title, 'url': url} for (found_artist, title), url
+                                  in zip(results, re.findall(r'href="([^"]+)"', html))], artist, song)
+
+    url = tab4u_scraper._extract_chord_url(html, artist, song)
+
+    assert url == (expected and f"https://www.tab4u.com/{expected}")
+
+
+# ========================================
+# Ultimate Guitar
+# ========================================
+
+def test_ultimate_guitar_order_is_unchanged():
+    results = [
+        {'artist': 'Tair', 'song': 'Ahava', 'rating': 100, 'url': 'tair'},
+        {'artist': 'Avi Biter', 'song': 'Ahava', 'rating': 5, 'url': 'low'},
+        {'artist': 'Avi Biter', 'song': 'Ahava', 'rating': 50, 'url': 'high'},
+        {'artist': 'Avi Biter', 'song': 'Other Song', 'rating': 100, 'url': 'other'},
+        {'artist': 'Avi Biter', 'song': 'Ahava (Live)', 'rating': 10, 'url': 'live'},
+    ]
+    candidates = [Candidate(result['url'], result['song'], (result['artist'],), rating=result['rating'])
+                  for result in results]
+
+    # As parse_search_results ranks them
+    ranked = rank(candidates, 'Avi Biter', 'Ahava', preferred_version='Original', require_title_match=True)
+
+    assert [entry.candidate.url for entry in ranked] == _old_ultimate_guitar_order(results, 'Avi Biter', 'Ahava')
+    assert [entry.candidate.url for entry in ranked] == ['high', 'low', 'live', 'tair']
+
+
+# ========================================
+# Wrong artists
+# ========================================
+
+@pytest.mark.parametrize('artist, wrong_artist', [('Avi Biter', 'Tair'), ('Noa', 'Nova')])
+def test_a_wrong_artist_gets_no_artist_credit(artist, wrong_artist):
+    wrong, right = rank([Candidate('wrong', 'Ahava', (wrong_artist,)), Candidate('right', 'Ahava', (artist,))],
+                        artist, 'Ahava')[::-1]
+
+    assert right.candidate.url == 'right'
+    assert wrong.artist_score < candidate_ranking.HIGH_PROBABILITY_THRESHOLD
+    assert wrong.score < right.score - candidate_ranking.ARTIST_BONUS
+
+
+def test_ytmusic_does_not_write_another_artists_song(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    linker = importlib.import_module('youtube_ytmusicapi_linker')
+    results = [{'videoId': 'ahava00000t', 'title': 'Ahava', 'artists': [{'name': 'Tair'}]}]
+
+    candidate = linker.best_candidate(results, 'Avi Biter', 'Ahava')
+
+    assert candidate.confidence < linker.MATCH_THRESHOLD
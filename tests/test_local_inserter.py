@@ -0,0 +1,48 @@
+import importlib.util
+import os
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _inserter():
+    spec = importlib.util.spec_from_file_location('youtube_local_inserter',
+                                                  os.path.join(ROOT, 'youtube_local Inserter.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _collect(tmp_path, lines):
+    log = tmp_path / 'link_finder.log'
+    log.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    return _inserter().collect_updates([str(log)])
+
+
+def test_spotify_alternative_survives_later_youtube_results(tmp_path):
+    cells = _collect(tmp_path, [
+        "--- Processing worksheet: 'Songs' ---",
+        "Processing Row 2: 'Hallelujah' by 'Noa'",
+        "   🎵 Spotify (High Probability Match - Alternative): https://open.spotify.com/track/a",
+        "Processing Row 3: 'Ahava' by 'Tair'",
+        "   🎵 Spotify: Not Found.",
+        "   📺 Row 2 YouTube (High Probability Match - Alternative): https://www.youtube.com/watch?v=b",
+        "   📺 Row 3 YouTube (High Probability Match - Alternative): https://www.youtube.com/watch?v=c",
+        "   📺 Row 2 YouTube (Exact Match): https://www.youtube.com/watch?v=d",
+    ])
+
+    assert cells == {'Songs': {
+        ('J', 2): 'https://open.spotify.com/track/a',
+        ('J', 3): 'https://www.youtube.com/watch?v=c',
+        ('E', 2): 'https://www.youtube.com/watch?v=d',
+    }}
+
+
+def test_later_spotify_alternative_replaces_a_youtube_one(tmp_path):
+    cells = _collect(tmp_path, [
+        "--- Processing worksheet: 'Songs' ---",
+        "   📺 Row 2 YouTube (High Probability Match - Alternative): https://www.youtube.com/watch?v=b",
+        "Processing Row 2: 'Hallelujah' by 'Noa'",
+        "   🎵 Spotify (High Probability Match - Alternative): https://open.spotify.com/track/a",
+    ])
+
+    assert cells == {'Songs': {('J', 2): 'https://open.spotify.com/track/a'}}
@@ -0,0 +1,48 @@
+from log_analytics import iter_log_events
+
+
+def _results(tmp_path, lines):
+    log = tmp_path / 'link_finder.log'
+    log.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    return [event for event in iter_log_events([str(log)]) if event.kind == 'result']
+
+
+def test_link_finder_results_keep_their_rows(tmp_path):
+    results = _results(tmp_path, [
+        "--- Processing worksheet: 'Songs' ---",
+        "Processing Row 2: 'Hallelujah' by 'Noa'",
+        "   🎵 Spotify (Exact Match): https://open.spotify.com/track/a",
+        "Processing Row 3: 'Ahava' by 'Tair'",
+        "   🎵 Spotify: Not Found.",
+        # The batched YouTube search reports every row after the last one started
+        "   📺 Row 2 YouTube (Exact Match): https://www.youtube.com/watch?v=a",
+        "   📺 Row 3 YouTube (High Probability Match - Alternative): https://www.youtube.com/watch?v=b",
+        "   📺 Row 4 YouTube: No definitive match found.",
+        "   📺 Row 5 YouTube: Not Found.",
+    ])
+
+    assert [(e.row, e.provider, e.outcome, e.url) for e in results] == [
+        (2, 'spotify', 'found', 'https://open.spotify.com/track/a'),
+        (3, 'spotify', 'not_found', None),
+        (2, 'youtube', 'found', 'https://www.youtube.com/watch?v=a'),
+        (3, 'youtube', 'high_probability', 'https://www.youtube.com/watch?v=b'),
+        (4, 'youtube', 'no_match', None),
+        (5, 'youtube', 'not_found', None),
+    ]
+    assert {e.worksheet for e in results} == {'Songs'}
+
+
+def test_old_youtube_lines_use_the_current_row(tmp_path):
+    results = _results(tmp_path, [
+        "Processing Row 7: 'Ahava' by 'Tair'",
+        "   📺 YouTube (Exact Match): https://www.youtube.com/watch?v=c",
+    ])
+
+    assert [(e.row, e.provider, e.outcome) for e in results] == [(7, 'youtube', 'found')]
+
+
+def test_other_lines_mentioning_providers_are_not_results(tmp_path):
+    assert _results(tmp_path, [
+        "Processing Row 7: 'Ahava' by 'Tair'",
+        "Row 7 Spotify search failed: timeout",
+    ]) == []
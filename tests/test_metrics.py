@@ -0,0 +1,98 @@
+import httplib2
+import pytest
+from googleapiclient.errors import HttpError
+
+import metrics
+from youtube_batch import YouTubeBatchExecutor
+
+
+@pytest.fixture(autouse=True)
+def clean_registry():
+    metrics.REGISTRY.reset()
+    yield
+    metrics.REGISTRY.reset()
+
+
+def _http_error(status):
+    return HttpError(httplib2.Response({'status': status}), b'{"error": {"code": %d}}' % status)
+
+
+def _youtube_quota():
+    return metrics.REGISTRY.quota.get('youtube', 0)
+
+
+class _Request:
+    def __init__(self, endpoint):
+        self.endpoint = endpoint
+
+
+class _YouTube:
+    """new_batch_http_request() only: answers each request with its entry in `answers`, or fails the round trip."""
+
+    def __init__(self, answers=None, round_trip_error=None):
+        self.answers = answers or {}
+        self.round_trip_error = round_trip_error
+
+    def new_batch_http_request(self, callback=None):
+        youtube = self
+
+        class _Batch:
+            def __init__(self):
+                self.request_ids = []
+
+            def add(self, request, request_id=None):
+                self.request_ids.append(request_id)
+
+            def execute(self):
+                for request_id in self.request_ids:
+                    if request_id not in youtube.answers:
+                        raise youtube.round_trip_error
+                    answer = youtube.answers[request_id]
+                    if isinstance(answer, Exception):
+                        callback(request_id, None, answer)
+                    else:
+                        callback(request_id, answer, None)
+        return _Batch()
+
+
+def test_timed_charges_quota_for_answered_calls():
+    with metrics.timed('youtube', 'search.list'):
+        pass
+    with pytest.raises(HttpError):
+        with metrics.timed('youtube', 'search.list'):
+            raise _http_error(403)
+    assert _youtube_quota() == 200
+
+
+def test_timed_does_not_charge_transport_failures():
+    for error in (TimeoutError('timed out'), ConnectionResetError(), httplib2.ServerNotFoundError()):
+        with pytest.raises(type(error)):
+            with metrics.timed('youtube', 'search.list'):
+                raise error
+    assert _youtube_quota() == 0
+    assert metrics.REGISTRY.calls[('youtube', 'search.list', 'TimeoutError')] == 1
+
+
+def test_batch_charges_only_requests_the_api_answered():
+    youtube = _YouTube(answers={'0': {'items': []}, '1': _http_error(404)},
+                       round_trip_error=TimeoutError('timed out'))
+    results = []
+    executor = YouTubeBatchExecutor(youtube)
+    for endpoint in ('search.list', 'videos.list', 'search.list'):
+        executor.add(_Request(endpoint), lambda response, error: results.append((response, type(error).__name__)))
+    executor.flush()
+
+    assert results == [({'items': []}, 'NoneType'), (None, 'HttpError'), (None, 'TimeoutError')]
+    assert _youtube_quota() == 101
+
+
+def test_batch_failed_round_trip_costs_no_quota():
+    executor = YouTubeBatchExecutor(_YouTube(round_trip_error=ConnectionResetError()))
+    errors = []
+    for _ in range(3):
+        executor.add(_Request('search.list'), lambda response, error: errors.append(error))
+    executor.flush()
+
+    assert len(errors) == 3 and all(isinstance(error, ConnectionResetError) for error in errors)
+    assert _youtube_quota() == 0
+    assert metrics.REGISTRY.calls[('youtube', 'search.list', 'ConnectionResetError')] == 3
@@ -0,0 +1,70 @@
+import importlib.util
+import os
+
+import pytest
+
+from text_matching import artist_block_key, artist_similarity, artist_skeleton
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# One artist, spelled in English and Hebrew
+SAME_ARTISTS = [('Eyal Golan', 'אייל גולן'), ('Omer Adam', 'עומר אדם'), ('Avi Biter', 'אבי ביטר'),
+                ('Boaz Sharabi', 'בועז שרעבי'), ('Ishay Ribo', 'ישי ריבו'), ('Eyal Golan', 'Eyal  Golan!')]
+
+
+def _doubles_deletion():
+    spec = importlib.util.spec_from_file_location(
+        'doubles_deletion', os.path.join(ROOT, 'missing_shirli_scripts', 'doubles deletion.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.mark.parametrize('artist_a, artist_b', SAME_ARTISTS)
+def test_spellings_of_one_artist_match(artist_a, artist_b):
+    assert artist_skeleton(artist_a) == artist_skeleton(artist_b)
+    assert artist_similarity(artist_a, artist_b) == 100
+
+
+@pytest.mark.parametrize('artist_a, artist_b', [('Noa', 'Nova'), ('Avi Biter', 'Tair')])
+def test_different_artists_do_not_match(artist_a, artist_b):
+    assert artist_skeleton(artist_a) != artist_skeleton(artist_b)
+    assert artist_block_key(artist_a) != artist_block_key(artist_b)
+    assert artist_similarity(artist_a, artist_b) < 75
+
+
+def test_b_and_v_are_kept():
+    assert artist_skeleton('Bob Dylan') == 'dln v'
+    assert artist_skeleton('Nova') == 'nv'
+
+
+def test_short_skeletons_and_empty_artists_are_not_block_keys():
+    assert artist_skeleton('Noa') == artist_skeleton('נועה') == 'n'
+    assert artist_block_key('Noa') == 'noa'
+    assert artist_block_key('Noa') != artist_block_key('Nia')
+    assert artist_block_key('') == ''
+    assert artist_similarity('Noa', 'Nia') < 100
+
+
+def test_doubles_keep_different_artists_apart():
+    rows = [
+        ['Noa', 'Hallelujah'],
+        ['Nova', 'Hallelujah'],
+        ['Avi Biter', 'Ahava'],
+        ['Tair', 'Ahava'],
+        ['', 'Ahava'],
+        ['', 'Ahava'],
+        ['Eyal Golan', 'Metoka'],
+        ['אייל גולן', 'Metoka'],
+    ]
+
+    groups = _doubles_deletion().find_duplicate_groups(rows)
+
+    assert [members for members, _ in groups] == [[6, 7]]
+
+
+def test_doubles_still_group_shared_links_without_artist():
+    link = 'https://www.youtube.com/watch?v=dQw4w9WgXcQ'
+    groups = _doubles_deletion().find_duplicate_groups([['', 'Ahava', link], ['', 'Ahava!', link]])
+
+    assert [members for members, _ in groups] == [[0, 1]]
@@ -0,0 +1,181 @@
+"""
+Shared text normalization and matching helpers for Hebrew/English song data.
+
+  * normalize_artist_name / normalize_song_title - the link finder's cleaning rules
+  * artist_skeleton - a transliterated consonant skeleton, so "אייל גולן",
+    "Eyal Golan" and "Eyal  Golan!" share one key
+  * artist_block_key - the skeleton, when it is long enough to group rows by
+  * canonical_link_id - ('youtube' | 'spotify', id) for any YouTube / YTMusic /
+    Spotify URL form
+  * title_similarity - fuzzy score (0-100) of two song titles
+  * artist_similarity - fuzzy score (0-100) of two artist names in any script
+"""
+
+import re
+import unicodedata
+from functools import lru_cache
+from urllib.parse import parse_qs, urlparse
+
+import unidecode
+from fuzzywuzzy import fuzz
+
+try:
+    # fuzz.ratio delegates to this when python-Levenshtein is installed; calling it
+    # directly skips fuzzywuzzy's per-call wrappers in tight comparison loops
+    from Levenshtein import ratio as _levenshtein_ratio
+except ImportError:
+    _levenshtein_ratio = None
+
+# Hebrew points and cantillation marks (niqqud) carry no identity for matching
+_HEBREW_MARKS = re.compile(r'[֑-ׇ]')
+_NON_WORD = re.compile(r'[^\w\s]', re.UNICODE)
+_SPACES = re.compile(r'\s+')
+
+# Spelling variants that transliterations of the same Hebrew name produce, applied in order
+_SKELETON_DIGRAPHS = (('sh', 's'), ('tz', 'z'), ('ts', 'z'), ('kh', 'k'), ('ch', 'h'), ('ck', 'k'),
+                      ('ph', 'f'), ('q', 'k'), ('c', 'k'), ('p', 'f'), ('w', 'v'), ('b', 'v'), ('j', 'g'))
+# Aleph, ayin and a single vav after another letter (o/u) spell vowels; a leading or doubled vav is v
+_HEBREW_VOWEL_LETTERS = re.compile(r'[אע]|(?<=[א-הז-ת])ו(?!ו)')
+# Letters that Hebrew spells as optional vowels (yod, he, aleph, ayin) plus English vowels.
+# v (also b and w) and f (also p) stay, so "Noa" and "Nova" keep different skeletons
+_SKELETON_DROP = re.compile(r'[aeiouyh]')
+_REPEATS = re.compile(r'(.)\1+')
+
+MIN_SKELETON_LENGTH = 3          # Letters; shorter skeletons ("n" for "Noa") are shared by too many artists
+SKELETON_CONFIRM_THRESHOLD = 50  # Fuzzy score of the transliterated names that confirms an equal skeleton
+
+_YOUTUBE_ID = re.compile(r'^[A-Za-z0-9_-]{11}$')
+_SPOTIFY_ID = re.compile(r'^[A-Za-z0-9]{22}$')
+
+
+def _clean(text):
+    text = unicodedata.normalize('NFKC', text)
+    text = _HEBREW_MARKS.sub('', text)
+    text = _NON_WORD.sub(' ', text.lower())
+    return _SPACES.sub(' ', text).strip()
+
+
+def normalize_artist_name(text):
+    """Normalizes an artist name, including transliteration for non-Latin characters."""
+    if not isinstance(text, str):
+        return ""
+    return _clean(unidecode.unidecode(text))
+
+
+def normalize_song_title(text):
+    """Normalizes a song title, preserving original script (e.g., Hebrew) but cleaning."""
+    if not isinstance(text, str):
+        return ""
+    return _clean(text)
+
+
+@lru_cache(maxsize=65536)
+def artist_skeleton(text):
+    """
+    Blocking key for an artist: transliterate, fold spelling variants, drop vowel
+    letters and doubled consonants, and sort the words.
+
+    Returns:
+        str: e.g. 'gln l' for both 'אייל גולן' and 'Eyal Golan'. Falls back to the
+        normalized name when nothing but vowels is left.
+    """
+    if isinstance(text, str):
+        text = _HEBREW_VOWEL_LETTERS.sub('', _HEBREW_MARKS.sub('', text))
+    normalized = normalize_artist_name(text)
+    words = []
+    for word in normalized.split():
+        for variant, replacement in _SKELETON_DIGRAPHS:
+            word = word.replace(variant, replacement)
+        word = _REPEATS.sub(r'\1', _SKELETON_DROP.sub('', word))
+        if word:
+            words.append(word)
+    return ' '.join(sorted(words)) or normalized
+
+
+def artist_block_key(text):
+    """
+    Key to group an artist's rows under before comparing them: the skeleton, or
+    the normalized name when the skeleton is shorter than MIN_SKELETON_LENGTH.
+
+    Returns:
+        str: The key; empty when there is no artist.
+    """
+    skeleton = artist_skeleton(text)
+    if len(skeleton.replace(' ', '')) >= MIN_SKELETON_LENGTH:
+        return skeleton
+    return normalize_artist_name(text)
+
+
+def canonical_link_id(url):
+    """
+    Canonical identity of a YouTube / YouTube Music / Spotify track link.
+
+    Returns:
+        tuple: ('youtube', video_id) or ('spotify', track_id), or None for other links.
+    """
+    if not isinstance(url, str):
+        return None
+    url = url.strip()
+    if url.startswith('spotify:track:'):
+        track_id = url.rsplit(':', 1)[-1]
+        return ('spotify', track_id) if _SPOTIFY_ID.match(track_id) else None
+    if not url.startswith(('http://', 'https://')):
+        return None
+
+    parsed = urlparse(url)
+    host = parsed.netloc.lower().split(':')[0]
+    parts = [part for part in parsed.path.split('/') if part]
+
+    if host == 'youtu.be' and parts:
+        video_id = parts[0]
+    elif host.endswith('youtube.com'):
+        if parts[:1] == ['watch']:
+            video_id = parse_qs(parsed.query).get('v', [''])[0]
+        elif len(parts) >= 2 and parts[0] in ('shorts', 'embed', 'live', 'v'):
+            video_id = parts[1]
+        else:
+            return None
+    elif host == 'open.spotify.com':
+        if parts and parts[0].startswith('intl-'):
+            parts = parts[1:]
+        if len(parts) >= 2 and parts[0] == 'track' and _SPOTIFY_ID.match(parts[1]):
+            return 'spotify', parts[1]
+        return None
+    else:
+        return None
+    return ('youtube', video_id) if _YOUTUBE_ID.match(video_id) else None
+
+
+def title_similarity(title_a, title_b):
+    """
+    Fuzzy similarity (0-100) of two normalized titles, ignoring spaces so that
+    stray or missing spaces don't count as differences.
+    """
+    title_a, title_b = title_a.replace(' ', ''), title_b.replace(' ', '')
+    if _levenshtein_ratio is not None:
+        return int(round(100 * _levenshtein_ratio(title_a, title_b)))
+    return fuzz.ratio(title_a, title_b)
+
+
+def artist_similarity(artist_a, artist_b):
+    """
+    Fuzzy similarity (0-100) of two artist names, in the same or different scripts:
+    the token-set score of the transliterated names (so one artist of a duet credit
+    still matches), capped by the token-set score of their skeletons, so a consonant
+    apart ("Noa" / "Nova") is not a near match.
+
+    A shared skeleton of at least MIN_SKELETON_LENGTH letters scores 100 once the
+    names also reach SKELETON_CONFIRM_THRESHOLD (Hebrew transliterates without most
+    vowels, so the same name scores low across scripts).
+    """
+    if not artist_a or not artist_b:
+        return 0
+    name_a, name_b = normalize_artist_name(artist_a), normalize_artist_name(artist_b)
+    score = fuzz.token_set_ratio(name_a, name_b)
+    skeleton_a, skeleton_b = artist_skeleton(artist_a), artist_skeleton(artist_b)
+    if skeleton_a != skeleton_b:
+        return min(score, fuzz.token_set_ratio(skeleton_a, skeleton_b))
+    if (len(skeleton_a.replace(' ', '')) >= MIN_SKELETON_LENGTH
+            and max(score, title_similarity(name_a, name_b)) >= SKELETON_CONFIRM_THRESHOLD):
+        return 100
+    return score
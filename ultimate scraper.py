@@ -5,7 +5,6 @@ from bs4 import BeautifulSoup
 import time
 import random
 from urllib.parse import quote_plus, urljoin
-import re
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
@@ -14,13 +13,18 @@ from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 import logging
 
+import candidate_ranking
+import metrics
+import sheets_governor
+from job_state import JobState, row_fingerprint
+
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 
 class UltimateGuitarScraper:
-    def __init__(self, credentials_path, sheet_url, min_delay=2, max_delay=5):
+    def __init__(self, credentials_path, sheet_url, min_delay=2, max_delay=5, job_state=None):
         """
         Initialize the scraper with Google Sheets credentials and configuration
 
@@ -29,11 +33,13 @@ class UltimateGuitarScraper:
             sheet_url (str): URL of the Google Sheet
             min_delay (int): Minimum delay between requests (seconds)
             max_delay (int): Maximum delay between requests (seconds)
+            job_state (JobState): Optional; rows searched in earlier runs (and unchanged since) are skipped
         """
         self.credentials_path = credentials_path
         self.sheet_url = sheet_url
         self.min_delay = min_delay
         self.max_delay = max_delay
+        self.job_state = job_state
 
         # Initialize Google Sheets client
         self.setup_google_sheets()
@@ -130,6 +136,10 @@ class UltimateGuitarScraper:
 
         Returns:
             str: URL of the best matching chord page, or None if not found
+
+        Raises:
+            Exception: The last error when every attempt failed (WebDriver crashes, page errors),
+                so the caller records the row as an error instead of 'Not Found'
         """
         for attempt in range(max_retries):
             try:
@@ -140,7 +150,8 @@ class UltimateGuitarScraper:
                 logger.info(f"Searching for: {search_query} (Attempt {attempt + 1}/{max_retries})")
 
                 # Navigate to search page
-                self.driver.get(search_url)
+                with metrics.timed('ultimate_guitar', 'search'):
+                    self.driver.get(search_url)
                 self.random_delay()
 
                 # Wait for search results to load
@@ -173,7 +184,8 @@ class UltimateGuitarScraper:
                         continue
                     else:
                         logger.error("Failed to reinitialize WebDriver")
-                        break
+                # Out of retries: the song may still be on Ultimate Guitar
+                raise
 
         return None
 
@@ -189,7 +201,7 @@ class UltimateGuitarScraper:
         Returns:
             list: List of matching results sorted by preference
         """
-        results = []
+        candidates = []
 
         # Find all result rows
         result_rows = soup.find_all('div', class_='dyhP1')
@@ -234,75 +246,26 @@ class UltimateGuitarScraper:
                 if 'chords' not in song_type.lower():
                     continue  # Only accept chord versions
 
-                # Calculate match score
-                score = self.calculate_match_score(artist, song_title, target_artist, target_song, rating)
-
-                if score > 0:
-                    results.append({
-                        'artist': artist,
-                        'song': song_title,
-                        'url': urljoin('https://www.ultimate-guitar.com', url) if not url.startswith('http') else url,
-                        'type': song_type,
-                        'rating': rating,
-                        'score': score
-                    })
+                url = urljoin('https://www.ultimate-guitar.com', url) if not url.startswith('http') else url
+                candidates.append((candidate_ranking.Candidate(url, song_title, (artist,), rating=rating), song_type))
 
             except Exception as e:
                 logger.warning(f"Error parsing result row: {e}")
                 continue
 
-        # Sort by score (higher is better)
-        results.sort(key=lambda x: x['score'], reverse=True)
-
-        return results
-
-    def calculate_match_score(self, artist, song_title, target_artist, target_song, rating):
-        """
-        Calculate match score for search results
-
-        Args:
-            artist (str): Result artist
-            song_title (str): Result song title
-            target_artist (str): Target artist
-            target_song (str): Target song title
-            rating (int): Rating of the result
-
-        Returns:
-            int: Match score (higher is better)
-        """
-        score = 0
-
-        # Normalize strings for comparison
-        def normalize(text):
-            return re.sub(r'[^\w\s]', '', text.lower()).strip()
-
-        norm_artist = normalize(artist)
-        norm_song = normalize(song_title)
-        norm_target_artist = normalize(target_artist)
-        norm_target_song = normalize(target_song)
-
-        # Song title match (most important)
-        if norm_target_song in norm_song or norm_song in norm_target_song:
-            score += 1000
-
-            # Exact song match bonus
-            if norm_target_song == norm_song:
-                score += 500
-        else:
-            return 0  # If song doesn't match, skip
-
-        # Artist match bonus
-        if norm_target_artist in norm_artist or norm_artist in norm_target_artist:
-            score += 2000  # Same artist is highly preferred
-
-            # Exact artist match bonus
-            if norm_target_artist == norm_artist:
-                score += 1000
-
-        # Rating bonus (up to 100 points)
-        score += min(rating, 100)
-
-        return score
+        # Only results whose title matches the song; the same artist, the plain (not live/remix)
+        # title and higher ratings first
+        ranked = candidate_ranking.rank([candidate for candidate, _ in candidates], target_artist, target_song,
+                                        preferred_version='Original', require_title_match=True)
+        return [{
+            'artist': entry.candidate.artists[0],
+            'song': entry.candidate.title,
+            'url': entry.candidate.url,
+            'type': candidates[entry.index][1],
+            'rating': entry.candidate.rating,
+            'confidence': entry.confidence,
+            'score': entry.score
+        } for entry in ranked]
 
     def get_sheet_data(self, start_row=2, end_row=None):
         """
@@ -317,12 +280,12 @@ class UltimateGuitarScraper:
         """
         try:
             if end_row is None:
-                all_values = self.sheet.get_all_values()
+                all_values = sheets_governor.call('read', self.sheet.get_all_values)
                 end_row = len(all_values)
 
             # Get the range of data
             range_name = f'A{start_row}:F{end_row}'
-            values = self.sheet.batch_get([range_name])[0]
+            values = sheets_governor.read(self.sheet, [range_name])[0]
 
             return values
 
@@ -330,27 +293,18 @@ class UltimateGuitarScraper:
             logger.error(f"Error getting sheet data: {e}")
             return []
 
-    def update_chord_cell(self, row_num, url):
+    def update_chord_cell(self, row_num, url, on_written=None):
         """
-        Update the chord URL in column F
+        Queue the chord URL for column F. Queued cells are sent together in one
+        batch_update by sheets_governor (which also handles rate limits and retries).
 
         Args:
             row_num (int): Row number (1-indexed)
             url (str): URL to insert
+            on_written: Called once the cell has actually been written
         """
-        try:
-            # Use the correct format for gspread update
-            self.sheet.update(f'F{row_num}', [[url]])
-            logger.info(f"Updated row {row_num} with URL: {url}")
-
-        except Exception as e:
-            logger.error(f"Error updating row {row_num}: {e}")
-            # Try alternative method
-            try:
-                self.sheet.update_cell(row_num, 6, url)  # Column F is index 6
-                logger.info(f"Updated row {row_num} with URL using alternative method: {url}")
-            except Exception as e2:
-                logger.error(f"Alternative update method also failed for row {row_num}: {e2}")
+        sheets_governor.queue_update(self.sheet, f'F{row_num}', [[url]], on_written)
+        logger.info(f"Queued row {row_num} with URL: {url}")
 
     def process_rows(self, start_row=2, end_row=None, rows_to_process=None):
         """
@@ -365,22 +319,23 @@ class UltimateGuitarScraper:
             if rows_to_process:
                 # Process specific rows
                 for row_num in rows_to_process:
-                    row_data = self.sheet.row_values(row_num)
-                    self.process_single_row(row_data, row_num)
-                    self.random_delay()
+                    row_data = sheets_governor.call('read', self.sheet.row_values, row_num)
+                    if self.process_single_row(row_data, row_num):
+                        self.random_delay()
             else:
                 # Process range of rows
                 data = self.get_sheet_data(start_row, end_row)
 
                 for i, row_data in enumerate(data):
                     current_row = start_row + i
-                    self.process_single_row(row_data, current_row)
-                    self.random_delay()
+                    if self.process_single_row(row_data, current_row):
+                        self.random_delay()
 
         except Exception as e:
             logger.error(f"Error processing rows: {e}")
         finally:
             self.cleanup()
+            metrics.export_run('ultimate_guitar')
 
     def process_single_row(self, row_data, row_num):
         """
@@ -389,7 +344,13 @@ class UltimateGuitarScraper:
         Args:
             row_data (list): Row data from the sheet
             row_num (int): Row number (1-indexed)
+
+        Returns:
+            bool: Whether Ultimate Guitar was searched (callers only pause after searches)
         """
+        state = self.job_state
+        sheet_key = state.sheet_key(self.sheet) if state else None
+        fingerprint = None
         try:
             # Ensure we have enough columns
             while len(row_data) < 6:
@@ -402,47 +363,57 @@ class UltimateGuitarScraper:
             # Skip if artist or song title is empty
             if not artist or not song_title:
                 logger.info(f"Row {row_num}: Skipping - missing artist or song title")
-                return
+                metrics.record_row('ultimate_guitar', 'skipped')
+                return False
+
+            # The chords cell is part of the fingerprint, so a cleared cell is searched again
+            fingerprint = row_fingerprint(artist, song_title, chords_cell)
+            if state and state.is_finished(sheet_key, row_num, 'ultimate_guitar', fingerprint):
+                logger.info(f"Row {row_num}: Skipping - searched in an earlier run")
+                return False
 
             # Check if we need to process this row
             if chords_cell and chords_cell.lower() != 'not found' and chords_cell.startswith('http'):
                 logger.info(f"Row {row_num}: Skipping - already has URL")
-                return
+                metrics.record_row('ultimate_guitar', 'existing')
+                if state:
+                    state.record(sheet_key, row_num, 'ultimate_guitar', 'existing', fingerprint, result=chords_cell)
+                return False
 
             logger.info(f"Row {row_num}: Processing {artist} - {song_title}")
 
             # Search for chord URL
             url = self.search_ultimate_guitar(artist, song_title)
 
-            if url:
-                # Try to update the cell
-                success = False
-                for attempt in range(3):  # Try up to 3 times
-                    try:
-                        self.update_chord_cell(row_num, url)
-                        success = True
-                        logger.info(f"Row {row_num}: Successfully found and updated URL")
-                        break
-                    except Exception as e:
-                        logger.warning(f"Row {row_num}: Update attempt {attempt + 1} failed: {e}")
-                        if attempt < 2:
-                            time.sleep(2)  # Wait before retry
-
-                if not success:
-                    logger.error(f"Row {row_num}: Failed to update after 3 attempts")
-            else:
-                # Try to update with "Not Found"
-                try:
-                    self.update_chord_cell(row_num, 'Not Found')
+            metrics.record_row('ultimate_guitar', 'found' if url else 'not_found')
+            status, value = ('found', url) if url else ('not_found', 'Not Found')
+
+            # The row is recorded as finished only once its cell is actually written
+            def on_written():
+                if url:
+                    logger.info(f"Row {row_num}: Successfully found and updated URL")
+                else:
                     logger.info(f"Row {row_num}: No results found, marked as 'Not Found'")
-                except Exception as e:
-                    logger.error(f"Row {row_num}: Failed to update with 'Not Found': {e}")
+                if state:
+                    state.record(sheet_key, row_num, 'ultimate_guitar', status,
+                                 row_fingerprint(artist, song_title, value), result=url)
+
+            self.update_chord_cell(row_num, value, on_written)
 
         except Exception as e:
+            # The cell is left as it is; the row is searched again next run (job_state.MAX_ATTEMPTS)
             logger.error(f"Error processing row {row_num}: {e}")
+            metrics.record_row('ultimate_guitar', 'error')
+            if state and fingerprint:
+                state.record(sheet_key, row_num, 'ultimate_guitar', 'error', fingerprint, error=str(e))
+        return True
 
     def cleanup(self):
-        """Clean up resources"""
+        """Write the queued cells and clean up resources"""
+        try:
+            sheets_governor.flush()
+        except Exception as e:
+            logger.error(f"Error writing queued cells: {e}")
         try:
             if hasattr(self, 'driver'):
                 self.driver.quit()
@@ -464,7 +435,8 @@ def main():
         credentials_path=CREDENTIALS_PATH,
         sheet_url=SHEET_URL,
         min_delay=7,  # Minimum delay between requests
-        max_delay=13  # Maximum delay between requests
+        max_delay=13,  # Maximum delay between requests
+        job_state=JobState()  # Rows searched in earlier runs are skipped
     )
 
     # Option 1: Process all rows starting from row 2
@@ -0,0 +1,108 @@
+"""
+Batched YouTube Data API requests.
+
+googleapiclient can pack many search.list / videos.list calls into one multipart
+HTTP request (BatchHttpRequest). YouTubeBatchExecutor queues requests built by
+the scripts as usual - youtube.search().list(...) - sends them BATCH_SIZE at a
+time, and hands each response (or error) to the callback it was queued with, so
+a run over thousands of rows pays one connection round trip per batch instead
+of one per request.
+
+Batching saves round trips, not quota: every request in a batch still costs its
+own units (100 per search.list). The fields masks below trim each response to
+what the scripts read.
+
+Usage:
+    from youtube_batch import SEARCH_FIELDS, YouTubeBatchExecutor
+
+    with YouTubeBatchExecutor(youtube) as batch:
+        for row, query in queries:
+            request = youtube.search().list(q=query, part='snippet', type='video', maxResults=1,
+                                            fields=SEARCH_FIELDS)
+            batch.add(request, lambda response, error, row=row: handle(row, response, error))
+    # Leaving the block sends whatever is still queued
+"""
+
+import time
+
+import metrics
+
+BATCH_SIZE = 50  # Requests per HTTP round trip (Google's batch endpoint allows up to 1000; YouTube advises 50)
+
+# Partial-response masks: only the parts of each item the scripts read
+SEARCH_FIELDS = 'items(id/videoId,snippet(title,channelTitle,thumbnails/high/url))'
+VIDEOS_FIELDS = 'items(id,snippet(title,channelTitle,thumbnails/high/url))'
+
+
+class YouTubeBatchExecutor:
+    """Queues YouTube requests and sends them as multipart batches of up to batch_size."""
+
+    def __init__(self, youtube, batch_size=BATCH_SIZE):
+        """
+        Args:
+            youtube: Client returned by build('youtube', 'v3', ...) (or api_clients.youtube_client).
+            batch_size (int): Requests per HTTP round trip.
+        """
+        self.youtube = youtube
+        self.batch_size = batch_size
+        self._queue = []  # (request, callback)
+
+    def add(self, request, callback):
+        """
+        Queue one request; a full queue is sent right away.
+
+        Args:
+            request: An unexecuted request, e.g. youtube.search().list(...).
+            callback: Called as callback(response, error) once the request's batch is
+                sent: the response dict and None, or None and the exception
+                (an HttpError for that request, or whatever failed the whole batch).
+        """
+        self._queue.append((request, callback))
+        if len(self._queue) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Send the queued requests and dispatch their results. Callbacks run in queue order."""
+        if not self._queue:
+            return
+        queued, self._queue = self._queue, []
+        results = {}
+
+        def collect(request_id, response, exception):
+            results[request_id] = (response, exception, True)
+
+        batch = self.youtube.new_batch_http_request(callback=collect)
+        for position, (request, _) in enumerate(queued):
+            batch.add(request, request_id=str(position))
+        started = time.perf_counter()
+        try:
+            with metrics.timed('youtube', 'batch', quota_units=0):
+                batch.execute()
+        except Exception as e:
+            # The round trip itself failed: every request without a result gets the error
+            for position in range(len(queued)):
+                results.setdefault(str(position), (None, e, False))
+        seconds = time.perf_counter() - started
+
+        for position, (request, callback) in enumerate(queued):
+            response, error, answered = results.get(str(position), (None, None, True))
+            # Each request is still counted under its own endpoint, and charged quota only
+            # if the API answered it (its own response or HttpError, not the failed round trip)
+            endpoint = _endpoint(request)
+            charged = answered and (error is None or metrics.reached_api(error))
+            metrics.record_call('youtube', endpoint, seconds, type(error).__name__ if error else 'ok',
+                                metrics.YOUTUBE_QUOTA_COST.get(endpoint, 0) if charged else 0)
+            callback(response, error)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.flush()
+
+
+def _endpoint(request):
+    """'search.list' / 'videos.list' for a googleapiclient request (or an api_fixtures fake)."""
+    method_id = getattr(request, 'methodId', None) or getattr(request, 'endpoint', '')
+    return method_id.replace('youtube.', '', 1)
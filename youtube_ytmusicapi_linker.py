@@ -1,88 +1,110 @@
 import gspread
+import glob
+import json
+import os
 import time
 import random
 import sys
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from ytmusicapi import YTMusic
-from gspread.exceptions import APIError
+from gspread.utils import rowcol_to_a1
+
+import candidate_ranking
+import metrics
+import sheets_governor
+from file_lock import FileLock
+from job_state import JobState, row_fingerprint
+from sheet_reader import column_letter, read_rows
+from jsonmaker import extract_curl_headers
+from text_matching import normalize_artist_name, normalize_song_title
 
 # --- Configuration ---
 GOOGLE_SHEET_NAME = 'songs'
 WORKSHEET_NAME = 'songs1'
 CREDENTIALS_FILE = 'credentials.json'
-YTMUSIC_AUTH_FILE = 'headers_auth1.json' # This file needs to be generated by manually extracting headers
-LOG_FILE = 'progress.log'
+# One file per account: ytmusicapi headers JSON, or a cURL command copied from the browser's
+# network tab (parsed with jsonmaker). Searches are spread round-robin over all accounts.
+YTMUSIC_AUTH_FILES = 'headers_auth*'
+LEGACY_LOG_FILE = 'progress.log' # Old single-row resume file; imported into job_state.db once
+MATCH_CACHE_FILE = 'ytmusic_matches.json' # Best search candidate per (artist, title), kept across runs
+JOB_PROVIDER = 'ytmusic'
 
 # Column assignments (1-indexed)
 ARTIST_COLUMN = 1   # Column A
 SONG_TITLE_COLUMN = 2 # Column B
 YOUTUBE_LINK_COLUMN = 5 # Column E (header 'youtube')
 
-MIN_DELAY = 5 # seconds
+MIN_DELAY = 5 # seconds between two searches of the same account
 MAX_DELAY = 12 # seconds
 MAX_RETRIES = 3 # for API calls
 RETRY_BACKOFF_FACTOR = 2 # for exponential backoff
+WRITE_BATCH_SIZE = 25 # Rows per batched sheet write (one request instead of one per found link)
+SESSION_MAX_FAILURES = 3 # Rows failed in a row after which an account is taken out of rotation
 
-# --- Helper Functions ---
+# Result ranking: confidence (0-100) of candidate_ranking, weighted title and artist similarity to the sheet's row
+MATCH_THRESHOLD = 80 # Candidates at least this confident are written to the sheet
+REVIEW_THRESHOLD = 60 # Less confident candidates above this are kept as 'high_probability', not written
+MATCH_CACHE_TTL_DAYS = 30
+NO_MATCH_CACHE_TTL_DAYS = 7 # Searches without a candidate are repeated sooner
 
-def get_last_processed_row():
-  """Reads the last processed row number from the log file."""
-  try:
-      with open(LOG_FILE, 'r') as f:
-          return int(f.read().strip())
-  except (FileNotFoundError, ValueError):
-      return 1 # Start from row 1 if no log or invalid content
+Candidate = namedtuple('Candidate', 'video_id title artist confidence')
 
-def save_last_processed_row(row_number):
-  """Saves the last processed row number to the log file."""
-  with open(LOG_FILE, 'w') as f:
-      f.write(str(row_number))
+# --- Helper Functions ---
 
-def retry_api_call(func, *args, **kwargs):
+def row_state_fingerprint(row_data, youtube_link=None):
   """
-  Retries an API call with exponential backoff.
-  Handles gspread.exceptions.APIError and general exceptions.
+  Fingerprint of the artist, the song title and the YouTube cell (as it is, or as it
+  will be once youtube_link is written), so edited or cleared rows are searched again.
   """
-  for attempt in range(MAX_RETRIES):
-      try:
-          result = func(*args, **kwargs)
-          return result
-      except APIError as e:
-          if "quotaExceeded" in str(e):
-              print(f"\n--- Google Sheets API Quota Exceeded! ---")
-              print(f"Error: {e}")
-              print(f"Please wait for your quota to reset (usually 24 hours).")
-              print(f"The script will exit. You can resume from the last logged row.")
-              sys.exit(1) # Exit script if quota is exceeded
-          else:
-              print(f"Google Sheets API Error (attempt {attempt + 1}/{MAX_RETRIES}): {e}")
-      except Exception as e:
-          print(f"General API Error (attempt {attempt + 1}/{MAX_RETRIES}): {e}")
+  artist_name = row_data[ARTIST_COLUMN - 1] if len(row_data) >= ARTIST_COLUMN else ""
+  song_title = row_data[SONG_TITLE_COLUMN - 1] if len(row_data) >= SONG_TITLE_COLUMN else ""
+  if youtube_link is None:
+      youtube_link = row_data[YOUTUBE_LINK_COLUMN - 1] if len(row_data) >= YOUTUBE_LINK_COLUMN else ""
+  return row_fingerprint(artist_name, song_title, youtube_link)
 
-      if attempt < MAX_RETRIES - 1:
-          sleep_time = RETRY_BACKOFF_FACTOR ** attempt + random.uniform(0, 1)
-          print(f"Retrying in {sleep_time:.2f} seconds...")
-          time.sleep(sleep_time)
-      else:
-          raise # Re-raise the last exception if all retries fail
-  return None # Should not be reached
+def migrate_legacy_progress(state, sheet, all_values):
+  """
+  Imports the old progress.log cursor: rows up to it count as finished for their
+  current contents. The file is renamed so this happens only once.
+  """
+  if not os.path.exists(LEGACY_LOG_FILE):
+      return
+  try:
+      with open(LEGACY_LOG_FILE, 'r') as f:
+          last_processed = int(f.read().strip())
+  except ValueError:
+      last_processed = 1
+  entries = [(row_number, 'done', row_state_fingerprint(all_values[row_number - 1]))
+             for row_number in range(2, min(last_processed, len(all_values)) + 1)]
+  state.record_many(sheet, JOB_PROVIDER, entries)
+  os.replace(LEGACY_LOG_FILE, LEGACY_LOG_FILE + '.migrated')
+  print(f"Imported {len(entries)} finished rows from '{LEGACY_LOG_FILE}' into '{state.path}'.")
+
+def best_candidate(results, artist_name, song_title):
+  """
+  Ranks every result that has a videoId against the row (candidate_ranking).
 
-def search_youtube_music_with_retry(ytmusic, query):
+  Returns:
+      Candidate: The best-ranked one, or None if no result has a videoId.
+  """
+  candidates = [candidate_ranking.from_ytmusic_result(result) for result in results or [] if result.get('videoId')]
+  top = candidate_ranking.best(candidates, artist_name, song_title)
+  if top is None:
+      return None
+  return Candidate(top.candidate.url, top.candidate.title, ', '.join(top.candidate.artists), top.confidence)
+
+def search_youtube_music_with_retry(ytmusic, query, artist_name='', song_title=''):
   """
   Searches YouTube Music with retry logic and random delay.
-  Returns the videoId if found, otherwise None.
+  Returns the best-ranked Candidate for the artist and title, otherwise None.
   """
   for attempt in range(MAX_RETRIES):
       try:
-          results = ytmusic.search(query, filter='songs')
-          if results:
-              # Prioritize results that have a videoId (actual YouTube video)
-              for result in results:
-                  if 'videoId' in result and result['videoId']:
-                      return result['videoId']
-              # Fallback to first result if no videoId found in initial loop
-              if 'videoId' in results[0] and results[0]['videoId']:
-                  return results[0]['videoId']
-          return None
+          with metrics.timed('ytmusic', 'search'):
+              results = ytmusic.search(query, filter='songs')
+          return best_candidate(results, artist_name, song_title)
       except Exception as e:
           print(f"YTMusicAPI Error for '{query}' (attempt {attempt + 1}/{MAX_RETRIES}): {e}")
           if attempt < MAX_RETRIES - 1:
@@ -91,7 +113,183 @@ def search_youtube_music_with_retry(ytmusic, query):
               time.sleep(sleep_time)
           else:
               print(f"Failed to search for '{query}' after {MAX_RETRIES} attempts.")
-              return None # Return None if all retries fail
+              raise # Let the caller record the row as failed (not as 'not found')
+
+def load_auth_headers(path):
+  """
+  Reads one account's request headers: a ytmusicapi headers JSON file, or a cURL
+  command copied from the browser (parsed with jsonmaker.extract_curl_headers).
+  """
+  with open(path, 'r', encoding='utf-8') as f:
+      content = f.read()
+  try:
+      return json.loads(content)
+  except ValueError:
+      headers = extract_curl_headers(content)
+      if 'cookie' not in {name.lower() for name in headers}:
+          raise ValueError(f"'{path}' is neither a headers JSON file nor a cURL command with cookies")
+      return {name.lower(): value for name, value in headers.items()}
+
+class YTMusicSession:
+  """One account's YTMusic client; it runs one search at a time, paced on its own."""
+
+  def __init__(self, name, ytmusic):
+      self.name = name
+      self.ytmusic = ytmusic
+      self.lock = threading.Lock()
+      self.next_search_at = 0.0
+      self.failures = 0 # Rows failed in a row
+
+class NoSessionsLeft(Exception):
+  """Every account failed SESSION_MAX_FAILURES rows in a row."""
+
+class SessionPool:
+  """
+  Hands out the sessions round-robin. Each session waits MIN_DELAY-MAX_DELAY seconds
+  between its own searches, so N accounts search N times as fast as one.
+  """
+
+  def __init__(self, sessions):
+      self.sessions = list(sessions)
+      self._turn = 0
+      self._lock = threading.Lock()
+
+  def __len__(self):
+      return len(self.sessions)
+
+  def _next_session(self):
+      with self._lock:
+          active = [session for session in self.sessions if session.failures < SESSION_MAX_FAILURES]
+          if not active:
+              raise NoSessionsLeft("All YTMusic sessions keep failing; refresh their header files.")
+          session = active[self._turn % len(active)]
+          self._turn += 1
+          return session
+
+  def search(self, query, artist_name='', song_title=''):
+      """Searches with the next session in turn, once that session's delay has passed."""
+      session = self._next_session()
+      with session.lock:
+          wait = session.next_search_at - time.monotonic()
+          if wait > 0:
+              time.sleep(wait)
+          try:
+              candidate = search_youtube_music_with_retry(session.ytmusic, query, artist_name, song_title)
+          except Exception:
+              session.failures += 1
+              if session.failures == SESSION_MAX_FAILURES:
+                  print(f"Session '{session.name}' failed {SESSION_MAX_FAILURES} rows in a row; taking it out of rotation.")
+              raise
+          finally:
+              session.next_search_at = time.monotonic() + random.uniform(MIN_DELAY, MAX_DELAY)
+          session.failures = 0
+          return candidate
+
+def create_session_pool(pattern=YTMUSIC_AUTH_FILES):
+  """
+  Builds one YTMusic session per header file matching pattern.
+
+  Returns:
+      SessionPool: The sessions that could be created (possibly none).
+  """
+  sessions = []
+  for path in sorted(glob.glob(pattern)):
+      try:
+          sessions.append(YTMusicSession(os.path.basename(path), YTMusic(load_auth_headers(path))))
+          print(f"Authenticated with YTMusicAPI using '{path}'.")
+      except Exception as e:
+          print(f"Skipping YTMusicAPI header file '{path}': {e}")
+  return SessionPool(sessions)
+
+class MatchCache:
+  """
+  Best candidate per (artist, title), saved in MATCH_CACHE_FILE, so a song that appears
+  in several rows or sheets (or is searched again after a row edit) costs no search.
+  """
+
+  def __init__(self, path=MATCH_CACHE_FILE):
+      self.path = path
+      self._lock = threading.Lock()
+      self._entries = self._read(path)
+      self._new = {} # Entries added since the last save
+
+  @staticmethod
+  def _read(path):
+      try:
+          with open(path, 'r', encoding='utf-8') as f:
+              return json.load(f)
+      except (OSError, ValueError):
+          return {}
+
+  @staticmethod
+  def key(artist_name, song_title):
+      return f"{normalize_artist_name(artist_name)}|{normalize_song_title(song_title)}"
+
+  def get(self, artist_name, song_title):
+      """
+      Returns:
+          tuple: (hit, Candidate or None). A hit with None means the last search found nothing.
+      """
+      with self._lock:
+          entry = self._entries.get(self.key(artist_name, song_title))
+      if entry is not None:
+          ttl_days = MATCH_CACHE_TTL_DAYS if entry['candidate'] else NO_MATCH_CACHE_TTL_DAYS
+          if time.time() - entry['checked_at'] > ttl_days * 86400:
+              entry = None
+      metrics.record_cache('ytmusic_matches', hit=entry is not None)
+      if entry is None:
+          return False, None
+      return True, Candidate(**entry['candidate']) if entry['candidate'] else None
+
+  def put(self, artist_name, song_title, candidate):
+      entry = {'candidate': candidate._asdict() if candidate else None, 'checked_at': time.time()}
+      with self._lock:
+          self._entries[self.key(artist_name, song_title)] = entry
+          self._new[self.key(artist_name, song_title)] = entry
+
+  def save(self):
+      """Merges the new entries into the file (another run may have saved since we loaded)."""
+      with self._lock:
+          if not self._new:
+              return
+          with FileLock(f"{self.path}.lock"):
+              entries = self._read(self.path)
+              entries.update(self._new)
+              temp_path = f"{self.path}.{os.getpid()}.tmp"
+              with open(temp_path, 'w', encoding='utf-8') as f:
+                  f.write(json.dumps(entries, ensure_ascii=False))
+              os.replace(temp_path, self.path)
+          self._entries, self._new = entries, {}
+
+class SheetWriteBuffer:
+  """
+  Collects found links and job state entries, and writes the links with a single
+  batch_update every WRITE_BATCH_SIZE rows. Rows are recorded in the job state only
+  after the write holding their link, so a crash never marks an unwritten row done.
+  """
+
+  def __init__(self, worksheet, state, sheet, batch_size=WRITE_BATCH_SIZE):
+      self.worksheet = worksheet
+      self.state = state
+      self.sheet = sheet
+      self.batch_size = batch_size
+      self.cells = []
+      self.entries = []
+
+  def add(self, row_number, status, fingerprint, link=None, error=None, write=False):
+      """Queues a row's outcome; with write=True its link is also written to the YouTube column."""
+      if write:
+          self.cells.append({'range': rowcol_to_a1(row_number, YOUTUBE_LINK_COLUMN), 'values': [[link]]})
+      self.entries.append((row_number, status, fingerprint, error, link))
+      if len(self.entries) >= self.batch_size:
+          self.flush()
+
+  def flush(self):
+      if self.cells:
+          sheets_governor.call('write', self.worksheet.batch_update, self.cells)
+          print(f"Wrote {len(self.cells)} links to the sheet.")
+      self.state.record_many(self.sheet, JOB_PROVIDER, self.entries)
+      self.cells, self.entries = [], []
 
 # --- Main Script ---
 def main():
@@ -114,7 +312,7 @@ def main():
 
   # Verify header for YouTube links
   try:
-      header_cell = worksheet.cell(1, YOUTUBE_LINK_COLUMN).value
+      header_cell = sheets_governor.call('read', worksheet.cell, 1, YOUTUBE_LINK_COLUMN).value
       if header_cell != 'youtube':
           print(f"Warning: Header in column {chr(64 + YOUTUBE_LINK_COLUMN)} (row 1) is '{header_cell}', expected 'youtube'.")
           print("Please ensure the header is correct or adjust YOUTUBE_LINK_COLUMN.")
@@ -122,27 +320,25 @@ def main():
       print(f"Error reading header cell: {e}")
       sys.exit(1)
 
-  # 2. Authenticate with YTMusicAPI
-  try:
-      ytmusic = YTMusic(YTMUSIC_AUTH_FILE)
-      print(f"Successfully authenticated with YTMusicAPI using '{YTMUSIC_AUTH_FILE}'.")
-  except FileNotFoundError:
-      print(f"Error: YTMusicAPI authentication file '{YTMUSIC_AUTH_FILE}' not found.")
-      print("Please ensure you have created it manually as per the instructions.")
-      sys.exit(1)
-  except Exception as e:
-      print(f"Error initializing YTMusicAPI: {e}")
-      print("Please check your authentication file content and internet connection.")
+  # 2. Authenticate with YTMusicAPI, once per account
+  pool = create_session_pool()
+  if not len(pool):
+      print(f"Error: no usable YTMusicAPI header files matching '{YTMUSIC_AUTH_FILES}'.")
+      print("Please ensure you have created at least one as per the instructions.")
       sys.exit(1)
+  print(f"Searching with {len(pool)} account(s), {MIN_DELAY}-{MAX_DELAY}s apart per account.")
 
-  # 3. Get rows to process from user
-  last_processed = get_last_processed_row()
-  print(f"Last successfully processed row: {last_processed}")
+  # 3. Load the job state; rows finished in earlier runs are skipped wherever they are
+  state = JobState()
+  sheet = state.sheet_key(worksheet)
+  finished = state.summary(sheet, JOB_PROVIDER)
+  if finished:
+      print(f"Job state for '{sheet}': {', '.join(f'{count} {status}' for status, count in sorted(finished.items()))}")
 
   while True:
       try:
-          start_row_input = input(f"Enter the starting row to process (default: {last_processed + 1}): ")
-          start_row = int(start_row_input) if start_row_input else last_processed + 1
+          start_row_input = input("Enter the starting row to process (default: 2, finished rows are skipped): ")
+          start_row = int(start_row_input) if start_row_input else 2
           if start_row < 2: # Data starts from row 2, row 1 is header
               print("Starting row cannot be less than 2 (header row). Setting to 2.")
               start_row = 2
@@ -165,10 +361,16 @@ def main():
 
   # 4. Process rows
   current_row = start_row
+  resumed = 0
+  buffer = SheetWriteBuffer(worksheet, state, sheet)
+  cache = MatchCache()
+  executor = ThreadPoolExecutor(max_workers=len(pool))
   try:
-      # Fetch all values once for efficiency, then iterate
-      all_values = worksheet.get_all_values()
+      # Fetch the artist, title and link columns once for efficiency, then iterate
+      all_values = read_rows(worksheet, [column_letter(column) for column in
+                                         (ARTIST_COLUMN, SONG_TITLE_COLUMN, YOUTUBE_LINK_COLUMN)])
       max_sheet_row = len(all_values)
+      migrate_legacy_progress(state, sheet, all_values)
 
       if end_row is None:
           end_row = max_sheet_row
@@ -177,9 +379,14 @@ def main():
           print(f"Starting row {start_row} is beyond the last row in the sheet ({max_sheet_row}). No rows to process.")
           return
 
+      to_search = [] # (row number, row data, artist, song title, search query, fingerprint)
       for r_idx in range(start_row - 1, min(end_row, max_sheet_row)): # r_idx is 0-indexed for list
           current_row = r_idx + 1 # current_row is 1-indexed for sheet
           row_data = all_values[r_idx]
+          fingerprint = row_state_fingerprint(row_data)
+          if state.is_finished(sheet, current_row, JOB_PROVIDER, fingerprint):
+              resumed += 1
+              continue
 
           # Extract song title and artist name, handling potential missing columns
           # Python's string handling and these libraries are Unicode-aware,
@@ -199,7 +406,8 @@ def main():
 
           if not search_query:
               print(f"Skipping row {current_row}: Empty search query after checking song title and artist.")
-              save_last_processed_row(current_row)
+              metrics.record_row('ytmusic_linker', 'skipped')
+              buffer.add(current_row, 'skipped', fingerprint)
               continue
 
           existing_link = ""
@@ -208,36 +416,71 @@ def main():
 
           if existing_link and "youtube.com/watch" in existing_link:
               print(f"Row {current_row}: '{search_query}' already has a YouTube link. Skipping.")
-              save_last_processed_row(current_row)
+              metrics.record_row('ytmusic_linker', 'existing')
+              buffer.add(current_row, 'existing', fingerprint, link=existing_link)
               continue
 
-          print(f"Processing row {current_row}: Searching for '{search_query}'...")
-          video_id = search_youtube_music_with_retry(ytmusic, search_query)
-
-          if video_id:
-              youtube_link = f"https://music.youtube.com/watch?v={video_id}"
-              print(f"Found link: {youtube_link}")
-              retry_api_call(worksheet.update_cell, current_row, YOUTUBE_LINK_COLUMN, youtube_link)
-              print(f"Updated row {current_row}.")
+          to_search.append((current_row, row_data, artist_name, song_title, search_query, fingerprint))
+
+      print(f"{len(to_search)} rows to search.")
+
+      def search_row(item):
+          row_number, _, artist_name, song_title, search_query, _ = item
+          hit, candidate = cache.get(artist_name, song_title)
+          if hit:
+              return candidate, None
+          print(f"Processing row {row_number}: Searching for '{search_query}'...")
+          try:
+              candidate = pool.search(search_query, artist_name, song_title)
+          except NoSessionsLeft:
+              raise
+          except Exception as e:
+              return None, e
+          cache.put(artist_name, song_title, candidate)
+          return candidate, None
+
+      # Searches run concurrently (one per account); results are handled in row order
+      for (current_row, row_data, _, _, search_query, fingerprint), (candidate, error) in zip(
+              to_search, executor.map(search_row, to_search)):
+          if error is not None:
+              metrics.record_row('ytmusic_linker', 'error')
+              buffer.add(current_row, 'error', fingerprint, error=str(error))
+              continue
+          youtube_link = f"https://music.youtube.com/watch?v={candidate.video_id}" if candidate else None
+          if candidate and candidate.confidence >= MATCH_THRESHOLD:
+              print(f"Row {current_row}: found link {youtube_link} ({candidate.confidence}% match)")
+              metrics.record_row('ytmusic_linker', 'found')
+              buffer.add(current_row, 'found', row_state_fingerprint(row_data, youtube_link), link=youtube_link,
+                         write=True)
+          elif candidate and candidate.confidence >= REVIEW_THRESHOLD:
+              print(f"Row {current_row}: best result '{candidate.artist} - {candidate.title}' is only a "
+                    f"{candidate.confidence}% match; not written ({youtube_link}).")
+              metrics.record_row('ytmusic_linker', 'high_probability')
+              buffer.add(current_row, 'high_probability', fingerprint, link=youtube_link)
           else:
-              print(f"No YouTube link found for '{search_query}'.")
-              # Optionally, write a placeholder or leave blank
-              # retry_api_call(worksheet.update_cell, current_row, YOUTUBE_LINK_COLUMN, "NOT FOUND")
-
-          save_last_processed_row(current_row)
-
-          # Add random delay between requests
-          delay = random.uniform(MIN_DELAY, MAX_DELAY)
-          print(f"Waiting for {delay:.2f} seconds...")
-          time.sleep(delay)
-
+              print(f"No YouTube link found for '{search_query}'." +
+                    (f" Best result: '{candidate.artist} - {candidate.title}' ({candidate.confidence}%)." if candidate else ""))
+              metrics.record_row('ytmusic_linker', 'not_found')
+              buffer.add(current_row, 'not_found', fingerprint)
+
+  except NoSessionsLeft as e:
+      print(f"\n{e}")
+      print("The script stopped. Finished rows are recorded; the next run continues with the rest.")
   except Exception as e:
       print(f"\nAn unexpected error occurred at row {current_row}: {e}")
-      print(f"The script stopped. Last successfully processed row was {current_row - 1}.")
-      print("You can resume from this row in the next run.")
+      print("The script stopped. Finished rows are recorded; the next run continues with the rest.")
   finally:
+      executor.shutdown(wait=False, cancel_futures=True)
+      try:
+          buffer.flush() # Links found before a stop are still written
+      except BaseException as e:
+          print(f"Could not write the last {len(buffer.cells)} links: {e}. Those rows are searched again next run.")
+      cache.save()
       print("\nScript finished or stopped.")
-      print(f"Last processed row logged: {get_last_processed_row()}")
+      if resumed:
+          print(f"Skipped {resumed} rows finished in earlier runs.")
+      state.close()
+      metrics.export_run('ytmusic_linker')
 
 if __name__ == "__main__":
   main()